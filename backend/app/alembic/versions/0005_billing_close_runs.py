@@ -0,0 +1,23 @@
+"""Add billing close run checkpoint tables."""
+
+from alembic import op
+
+from app.modules.billing.models.billing_close_run import BillingCloseRun, BillingCloseRunItem
+
+revision = "0005_billing_close_runs"
+down_revision = "0004_auth_refactor_social_only"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has these tables; checkfirst keeps the revision idempotent.
+    bind = op.get_bind()
+    BillingCloseRun.__table__.create(bind, checkfirst=True)
+    BillingCloseRunItem.__table__.create(bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS billing_close_run_items")
+    op.execute("DROP TABLE IF EXISTS billing_close_runs")
@@ -0,0 +1,49 @@
+"""Add daily order activity buckets and make activity_metrics one row per entity."""
+
+from alembic import op
+
+from app.modules.customer_hierarchy.models.activity_metrics import EntityOrderActivityDaily
+
+revision = "0006_activity_rollup"
+down_revision = "0005_billing_close_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has this table; checkfirst keeps the revision idempotent.
+    EntityOrderActivityDaily.__table__.create(op.get_bind(), checkfirst=True)
+
+    # activity_metrics is derived data (rescored from the daily buckets), so
+    # duplicate entity rows are dropped rather than audited, keeping the newest.
+    op.execute(
+        """
+DELETE FROM activity_metrics a
+USING activity_metrics b
+WHERE a.entity_type = b.entity_type
+  AND a.entity_id = b.entity_id
+  AND (a.calculation_date, a.id::text) < (b.calculation_date, b.id::text)
+"""
+    )
+    op.execute(
+        """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_constraint
+        WHERE conname = 'uq_activity_metrics_entity'
+          AND conrelid = 'activity_metrics'::regclass
+    ) THEN
+        ALTER TABLE activity_metrics
+        ADD CONSTRAINT uq_activity_metrics_entity UNIQUE (entity_type, entity_id);
+    END IF;
+END $$
+"""
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE activity_metrics DROP CONSTRAINT IF EXISTS uq_activity_metrics_entity")
+    op.execute("DROP TABLE IF EXISTS entity_order_activity_daily")
@@ -0,0 +1,20 @@
+"""Add durable background job queue table."""
+
+from alembic import op
+
+from orderly_fastapi_core.models.background_job import BackgroundJobRecord
+
+revision = "0007_background_jobs"
+down_revision = "0006_activity_rollup"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has this table; checkfirst keeps the revision idempotent.
+    BackgroundJobRecord.__table__.create(op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS background_jobs")
@@ -0,0 +1,20 @@
+"""Add composite index for SKU visibility filtering."""
+
+from alembic import op
+
+revision = "0008_sku_visibility_index"
+down_revision = "0007_background_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SKU list/search endpoints filter on (type, creator_id, isActive) before paging.
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_product_skus_visibility '
+        'ON product_skus (type, creator_id, "isActive")'
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_product_skus_visibility")
@@ -0,0 +1,36 @@
+"""Add trigram and prefix indexes for hierarchy search and typeahead."""
+
+from alembic import op
+
+revision = "0009_hierarchy_search_indexes"
+down_revision = "0008_sku_visibility_index"
+branch_labels = None
+depends_on = None
+
+SEARCH_TABLES = ("customer_groups", "customer_companies", "customer_locations", "business_units")
+TYPEAHEAD_TABLES = ("customer_companies", "customer_locations")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Hierarchy search matches lower(name) with LIKE '%q%' and ranks with similarity().
+    for table in SEARCH_TABLES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_name_trgm "
+            f"ON {table} USING gin (lower(name) gin_trgm_ops)"
+        )
+
+    # Typeahead pickers match lower(name) LIKE 'q%' and order by name.
+    for table in TYPEAHEAD_TABLES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_name_prefix "
+            f"ON {table} (lower(name) text_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    for table in TYPEAHEAD_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_prefix")
+    for table in SEARCH_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_trgm")
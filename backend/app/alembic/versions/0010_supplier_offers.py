@@ -0,0 +1,37 @@
+"""Add the supplier_offers price-break table and backfill it from supplier_skus."""
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.modules.products.models.supplier_offer import SupplierOffer
+from app.modules.products.models.supplier_sku import SupplierSKU
+from app.modules.products.services.supplier_offer_service import REBUILD_CHUNK_SIZE, write_offers
+
+revision = "0010_supplier_offers"
+down_revision = "0009_hierarchy_search_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has this table; checkfirst keeps the revision idempotent.
+    SupplierOffer.__table__.create(bind, checkfirst=True)
+
+    # Offers are derived data: rebuild them from supplier_skus in id order.
+    table = SupplierSKU.__table__
+    last_id = None
+    while True:
+        query = sa.select(table).order_by(table.c.id).limit(REBUILD_CHUNK_SIZE)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        chunk = bind.execute(query).all()
+        if not chunk:
+            break
+        write_offers(bind, chunk)
+        last_id = chunk[-1].id
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS supplier_offers")
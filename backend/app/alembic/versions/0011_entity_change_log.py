@@ -0,0 +1,47 @@
+"""Add the partitioned entity_change_log table and drain extra_data audit trails into it."""
+
+from alembic import op
+
+from app.modules.customer_hierarchy.models import CustomerMigrationLog, hierarchy_models
+from app.modules.customer_hierarchy.models.entity_change_log import EntityChangeLog, ensure_partitions
+
+revision = "0011_entity_change_log"
+down_revision = "0010_supplier_offers"
+branch_labels = None
+depends_on = None
+
+AUDITED_MODELS = [*hierarchy_models, CustomerMigrationLog]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has the parent table; checkfirst keeps the revision idempotent.
+    EntityChangeLog.__table__.create(bind, checkfirst=True)
+    ensure_partitions(bind)
+
+    # Move every extra_data['audit_trail'] entry into the log, then drop the
+    # key. Timestamps were written as naive UTC isoformat strings.
+    for model in AUDITED_MODELS:
+        table = model.__tablename__
+        op.execute(
+            f"""
+INSERT INTO entity_change_log (id, changed_at, entity_type, entity_id, action, actor_id, details)
+SELECT gen_random_uuid()::text,
+       COALESCE((entry->>'timestamp')::timestamp AT TIME ZONE 'UTC', now()),
+       COALESCE(entry->>'entity_type', '{model.__name__}'),
+       t.id,
+       COALESCE(entry->>'action', 'unknown'),
+       entry->>'user_id',
+       COALESCE(entry->'details', '{{}}'::jsonb)
+FROM {table} t
+CROSS JOIN LATERAL jsonb_array_elements(t.extra_data->'audit_trail') AS entry
+WHERE jsonb_typeof(t.extra_data->'audit_trail') = 'array'
+"""
+        )
+        op.execute(f"UPDATE {table} SET extra_data = extra_data - 'audit_trail' WHERE extra_data ? 'audit_trail'")
+
+
+def downgrade() -> None:
+    # The drained history is not copied back into extra_data.
+    op.execute("DROP TABLE IF EXISTS entity_change_log CASCADE")
@@ -0,0 +1,25 @@
+"""Add the product_category_closure table and backfill it from parentId."""
+
+from alembic import op
+
+from app.modules.products.models.category_closure import ProductCategoryClosure
+from app.modules.products.services.category_tree_service import rebuild_closure
+
+revision = "0012_category_closure"
+down_revision = "0011_entity_change_log"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has this table; checkfirst keeps the revision idempotent.
+    ProductCategoryClosure.__table__.create(bind, checkfirst=True)
+
+    # The closure is derived data: rebuild it from the parentId links.
+    rebuild_closure(bind)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS product_category_closure")
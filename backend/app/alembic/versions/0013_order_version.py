@@ -0,0 +1,18 @@
+"""Add the orders.version optimistic-locking counter."""
+
+from alembic import op
+
+revision = "0013_order_version"
+down_revision = "0012_category_closure"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has this column; IF NOT EXISTS keeps the revision idempotent.
+    op.execute("ALTER TABLE orders ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE orders DROP COLUMN IF EXISTS version")
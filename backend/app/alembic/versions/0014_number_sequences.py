@@ -0,0 +1,20 @@
+"""Add the number_sequences table for block-leased document numbers."""
+
+from alembic import op
+
+from orderly_fastapi_core.models.number_sequence import NumberSequence
+
+revision = "0014_number_sequences"
+down_revision = "0013_order_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has this table; checkfirst keeps the revision idempotent.
+    NumberSequence.__table__.create(op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS number_sequences")
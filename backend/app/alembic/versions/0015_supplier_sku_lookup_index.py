@@ -0,0 +1,20 @@
+"""Add partial index for counting active suppliers per SKU."""
+
+from alembic import op
+
+revision = "0015_supplier_sku_lookup_index"
+down_revision = "0014_number_sequences"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SKU list/search endpoints select the active supplier count per SKU on each page.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_supplier_skus_sku_supplier "
+        "ON supplier_skus (sku_id, supplier_id) WHERE is_active"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_supplier_skus_sku_supplier")
@@ -0,0 +1,18 @@
+"""Hold uploaded SKU CSVs on sku_uploads until their job finishes."""
+
+from alembic import op
+
+revision = "0016_sku_upload_file_content"
+down_revision = "0015_supplier_sku_lookup_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The upload job may run on any instance, so the CSV lives in the database
+    # rather than under a local upload directory; it is cleared when the job ends.
+    op.execute("ALTER TABLE sku_uploads ADD COLUMN IF NOT EXISTS file_content TEXT")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE sku_uploads DROP COLUMN IF EXISTS file_content")
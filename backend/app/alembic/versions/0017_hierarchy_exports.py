@@ -0,0 +1,20 @@
+"""Add hierarchy_exports for bulk export files served from any instance."""
+
+from alembic import op
+
+from app.modules.customer_hierarchy.models.hierarchy_export import HierarchyExport
+
+revision = "0017_hierarchy_exports"
+down_revision = "0016_sku_upload_file_content"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 0001 builds from the live unified metadata, so a from-scratch database
+    # already has the table; checkfirst keeps the revision idempotent.
+    HierarchyExport.__table__.create(op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS hierarchy_exports")
@@ -0,0 +1,32 @@
+"""Rebuild the typeahead prefix indexes on lower(name) under the "C" collation."""
+
+from alembic import op
+
+revision = "0018_hierarchy_typeahead_collation"
+down_revision = "0017_hierarchy_exports"
+branch_labels = None
+depends_on = None
+
+TYPEAHEAD_TABLES = ("customer_companies", "customer_locations")
+
+
+def upgrade() -> None:
+    # Typeahead filters lower(name) COLLATE "C" LIKE 'q%' and orders by the same
+    # expression inside each branch; one btree serves both the range scan and
+    # the order, so each branch stops after its LIMIT. text_pattern_ops (0009)
+    # only serves the LIKE, not the ORDER BY.
+    for table in TYPEAHEAD_TABLES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_name_prefix_c "
+            f'ON {table} ((lower(name) COLLATE "C"), id)'
+        )
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_prefix")
+
+
+def downgrade() -> None:
+    for table in TYPEAHEAD_TABLES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_name_prefix "
+            f"ON {table} (lower(name) text_pattern_ops)"
+        )
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_prefix_c")
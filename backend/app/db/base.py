@@ -1,5 +1,25 @@
 """Single SQLAlchemy declarative Base for all backend modules."""
 
+import importlib
+import pkgutil
+from types import ModuleType
+
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
+
+
+def import_models(package_name: str) -> ModuleType:
+    """Import a ``models`` package and ALL of its submodules.
+
+    Some modules (orders, acceptance, notifications) ship their ``models``
+    directory WITHOUT an ``__init__.py``, so a bare import resolves them as
+    namespace packages and does NOT execute the files that declare the tables.
+    Importing every submodule registers each model on ``Base.metadata``
+    regardless of what the package re-exports.
+    """
+    package = importlib.import_module(package_name)
+    for mod_info in pkgutil.iter_modules(list(getattr(package, "__path__", []))):
+        if mod_info.name != "__init__":
+            importlib.import_module(f"{package_name}.{mod_info.name}")
+    return package
@@ -3,19 +3,31 @@
 Mounts every module's pre-built routers into ONE FastAPI app so the whole backend
 runs as a single `uvicorn app.main:app` process on localhost.
 
-Approach: each module's main.py already builds a FastAPI app via
-orderly_fastapi_core.create_service_app and registers its routers at the surveyed
-prefixes (including dual /api + no-prefix mounts). We re-include each module's
-`.router` here so those exact paths are preserved, and apply CORS + Auth
-middleware ONCE at this top level.
+Approach: each module exposes a `ServiceModule` (app.modules.<name>.module) whose
+router carries its routes at the surveyed prefixes (including dual /api +
+no-prefix mounts). Modules are imported lazily through app.module_registry — only
+the ones selected by ORDERLY_MODULES (default: all) — and their routers are
+included here so those exact paths are preserved. CORS, Auth middleware and
+structlog are configured ONCE at this top level; module main.py files are only
+used when a module runs standalone.
 """
 import os
+from contextlib import asynccontextmanager
 from typing import Dict
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
+from orderly_fastapi_core import (
+    background_jobs,
+    configure_structlog,
+    dispose_shared_engine,
+    get_settings,
+    read_replica_router,
+    redis_manager,
+    shared_async_engine,
+)
 from orderly_fastapi_core.middleware import (
     AuthMiddleware,
     DEFAULT_PUBLIC_PATHS,
@@ -25,36 +37,41 @@ from orderly_fastapi_core.middleware import (
 )
 from orderly_fastapi_core.errors import register_exception_handlers
 
-# Shared auth settings (all modules validate JWT against the same env JWT_SECRET).
-from app.modules.users.core.config import settings as _settings
-from app.modules.users.core.database import async_engine as _users_async_engine
-
-# Module apps — importing each runs its create_service_app() and mounts its routers.
-from app.modules.notifications.main import app as _notifications_app
-from app.modules.acceptance.main import app as _acceptance_app
-from app.modules.suppliers.main import app as _suppliers_app
-from app.modules.orders.main import app as _orders_app
-from app.modules.billing.main import app as _billing_app
-from app.modules.users.main import app as _users_app
-from app.modules.customer_hierarchy.main import app as _customer_hierarchy_app
-from app.modules.products.main import app as _products_app
-
-# (module_name, module_app) in mount order.
-MODULES = [
-    ("notifications", _notifications_app),
-    ("acceptance", _acceptance_app),
-    ("suppliers", _suppliers_app),
-    ("orders", _orders_app),
-    ("billing", _billing_app),
-    ("users", _users_app),
-    ("customer_hierarchy", _customer_hierarchy_app),
-    ("products", _products_app),
-]
+from app.module_registry import IMPORT_SECONDS, load_modules
+
+# Shared settings from env: every module validates JWT against the same JWT_SECRET
+# and shares REDIS_URL, so the monolith reads them from the core, not from a module.
+_settings = get_settings()
+
+configure_structlog("orderly-monolith")
+
+# (module_name, ServiceModule) in mount order, limited to ORDERLY_MODULES when set.
+# Importing a module also registers its background job types.
+MODULES = load_modules()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run module hooks and background job workers in every app process (they share the Postgres queue)."""
+    for _, module in MODULES:
+        await module.startup()
+    if _settings.enable_background_workers:
+        await background_jobs.start()
+    yield
+    await background_jobs.stop()
+    for _, module in reversed(MODULES):
+        await module.shutdown()
+    # Replica engines, the shared primary engine and Redis pools are shared by every module; close them once, last
+    await read_replica_router.dispose()
+    await dispose_shared_engine()
+    await redis_manager.close()
+
 
 app = FastAPI(
     title="Orderly Monolith",
     version="0.1.0",
     description="井然 Orderly modular-monolith (9 services collapsed into one app)",
+    lifespan=lifespan,
 )
 
 # CORS once at the top (origins from env CORS_ORIGINS, falling back to local dev).
@@ -104,6 +121,8 @@ _verification_requirements: Dict[str, int] = {
     "/reconciliations": 3,
     "/api/billing-periods": 3,
     "/billing-periods": 3,
+    "/api/billing-close-runs": 3,
+    "/billing-close-runs": 3,
     "/api/fee-configs": 3,
     "/fee-configs": 3,
     "/api/products/create": 3,
@@ -119,12 +138,8 @@ _verification_requirements: Dict[str, int] = {
 # endpoints (OTP, auth, etc.) keep working through the single middleware.
 _public_paths = set(DEFAULT_PUBLIC_PATHS)
 _public_paths |= _health_public_paths
-for _name, _mapp in MODULES:
-    for _mw in getattr(_mapp, "user_middleware", []):
-        _opts = getattr(_mw, "kwargs", {}) or getattr(_mw, "options", {})
-        _pp = _opts.get("public_paths") if isinstance(_opts, dict) else None
-        if _pp:
-            _public_paths |= set(_pp)
+for _name, _module in MODULES:
+    _public_paths |= _module.public_paths
 app.add_middleware(
     AuthMiddleware,
     settings=_settings,
@@ -137,6 +152,11 @@ app.add_middleware(SecurityHeadersMiddleware, **SecurityHeadersConfig.for_api())
 register_exception_handlers(app)
 
 
+@app.get("/", tags=["monolith"])
+def root():
+    return {"service": "Orderly orderly-monolith", "docs": "/docs"}
+
+
 @app.get("/health", tags=["monolith"])
 def health():
     """Liveness probe for /restart and load balancers."""
@@ -150,7 +170,7 @@ def live():
 
 async def _db_ping() -> bool:
     try:
-        async with _users_async_engine.begin() as conn:
+        async with shared_async_engine().begin() as conn:
             await conn.execute(text("SELECT 1"))
         return True
     except Exception:
@@ -184,6 +204,7 @@ async def detailed_health():
         "status": "healthy" if healthy else "unhealthy",
         "service": "orderly-monolith",
         "modules": [name for name, _ in MODULES],
+        "module_import_ms": {name: round(IMPORT_SECONDS[name] * 1000, 1) for name, _ in MODULES},
         "database": healthy,
     }
 
@@ -235,5 +256,5 @@ def service_map():
 
 # Mount every module's routers at their existing prefixes (dual /api + no-prefix,
 # /api/v2, etc. all preserved exactly as each module declared them).
-for _name, _mapp in MODULES:
-    app.include_router(_mapp.router)
+for _name, _module in MODULES:
+    app.include_router(_module.router)
@@ -0,0 +1,105 @@
+"""Module registry for the Orderly modular monolith.
+
+Each business module exposes a `ServiceModule` (routers, public paths, lifecycle
+hooks) from `app.modules.<name>.module`. Modules are imported on demand, so a
+process only pays the import cost of the modules it actually serves.
+
+All modules share one declarative Base and reference each other's tables by
+foreign key (orders -> organizations, order_items -> products, ...), so every
+module's `models` package is always imported: table definitions only, no
+services, routers or engines. Beyond models, a loaded module must not import
+another module's code at import time (cross-module calls import lazily);
+`load_modules` logs `modules.unlisted_imports` when one does.
+
+`ORDERLY_MODULES` selects the modules for this process as a comma-separated
+list (e.g. `ORDERLY_MODULES=orders,billing` for an orders+billing worker); unset
+or empty mounts every module. Background job workers only start for job types
+registered by the loaded modules.
+"""
+import importlib
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from orderly_fastapi_core import ServiceModule
+
+from app.db.base import import_models
+
+logger = structlog.get_logger()
+
+MODULES_ENV = "ORDERLY_MODULES"
+
+# module name -> import path, in mount order (earlier modules win on duplicate paths).
+MODULE_PATHS: Dict[str, str] = {
+    "notifications": "app.modules.notifications.module",
+    "acceptance": "app.modules.acceptance.module",
+    "suppliers": "app.modules.suppliers.module",
+    "orders": "app.modules.orders.module",
+    "billing": "app.modules.billing.module",
+    "users": "app.modules.users.module",
+    "customer_hierarchy": "app.modules.customer_hierarchy.module",
+    "products": "app.modules.products.module",
+}
+
+# module name -> seconds spent importing it in this process (first load only).
+IMPORT_SECONDS: Dict[str, float] = {}
+
+
+def selected_module_names(value: Optional[str] = None) -> List[str]:
+    """Resolve the module selection (defaults to the ORDERLY_MODULES env var), in mount order."""
+    if value is None:
+        value = os.environ.get(MODULES_ENV, "")
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    if not requested:
+        return list(MODULE_PATHS)
+
+    unknown = requested - MODULE_PATHS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown module(s) in {MODULES_ENV}: {', '.join(sorted(unknown))}; "
+            f"expected any of {', '.join(MODULE_PATHS)}"
+        )
+    return [name for name in MODULE_PATHS if name in requested]
+
+
+def load_schema() -> None:
+    """Import every module's models so cross-module foreign keys resolve."""
+    for name in MODULE_PATHS:
+        import_models(f"app.modules.{name}.models")
+
+
+def unlisted_imports(names: Iterable[str]) -> List[str]:
+    """Packages of modules outside `names` (other than their models) imported in this process."""
+    selected = set(names)
+    found = set()
+    for imported in list(sys.modules):
+        parts = imported.split(".")
+        if len(parts) > 3 and parts[:2] == ["app", "modules"] and parts[2] not in selected and parts[3] != "models":
+            found.add(".".join(parts[2:4]))
+    return sorted(found)
+
+
+def load_module(name: str) -> ServiceModule:
+    """Import a module definition and record how long the import took."""
+    started = time.perf_counter()
+    module = importlib.import_module(MODULE_PATHS[name]).module
+    IMPORT_SECONDS.setdefault(name, time.perf_counter() - started)
+    return module
+
+
+def load_modules(names: Optional[List[str]] = None) -> List[Tuple[str, ServiceModule]]:
+    """Load modules in mount order as (name, module) pairs."""
+    load_schema()
+    loaded = [(name, load_module(name)) for name in (names if names is not None else selected_module_names())]
+    unlisted = unlisted_imports(name for name, _ in loaded)
+    if unlisted:
+        logger.warning("modules.unlisted_imports", modules=[name for name, _ in loaded], imported=unlisted)
+    logger.info(
+        "modules.loaded",
+        modules=[name for name, _ in loaded],
+        import_ms={name: round(IMPORT_SECONDS[name] * 1000, 1) for name, _ in loaded},
+    )
+    return loaded
@@ -21,12 +21,12 @@ remains load-bearing because it gives deterministic table ownership metadata.
 
 from __future__ import annotations
 
-import importlib
-import pkgutil
 from typing import Dict, List, Tuple
 
 import sqlalchemy as sa
 
+from app.db.base import import_models
+
 # Module processing order is load-bearing: USER-SERVICE must be first so its
 # `organizations` + `supplier_profiles` are copied before the suppliers stubs,
 # making the user-service definitions canonical under name-based dedup.
@@ -45,26 +45,8 @@ _MODELS_PACKAGE = "app.modules.{module}.models"
 
 
 def _import_models_package(module: str) -> object:
-    """Import a module's ``models`` package and ALL of its submodules.
-
-    Some modules (orders, acceptance, notifications) ship their ``models``
-    directory WITHOUT an ``__init__.py``, so a bare ``import ...models`` resolves
-    them as namespace packages and does NOT execute the files that declare the
-    tables. Walking + importing every submodule guarantees each model class is
-    defined and registered on its module ``Base.metadata`` regardless of whether
-    the package re-exports it.
-    """
-    pkg_name = _MODELS_PACKAGE.format(module=module)
-    package = importlib.import_module(pkg_name)
-
-    # Import every direct submodule so all model classes are registered.
-    search_paths = list(getattr(package, "__path__", []))
-    if search_paths:
-        for mod_info in pkgutil.iter_modules(search_paths):
-            if mod_info.name == "__init__":
-                continue
-            importlib.import_module(f"{pkg_name}.{mod_info.name}")
-    return package
+    """Import a module's ``models`` package and ALL of its submodules (see ``import_models``)."""
+    return import_models(_MODELS_PACKAGE.format(module=module))
 
 
 def _infer_owner(table_name: str) -> str:
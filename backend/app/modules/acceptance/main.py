@@ -2,15 +2,11 @@
 FastAPI Acceptance Service Application
 使用統一的應用程式工廠簡化初始化
 """
-import os
-import sys
-
-
 from orderly_fastapi_core import create_service_app
 
 from app.modules.acceptance.core.config import settings
 from app.modules.acceptance.core.database import async_engine
-from app.modules.acceptance.api.v1.acceptance import router as acceptance_router
+from app.modules.acceptance.module import module
 
 app = create_service_app(
     service_name="acceptance-service-fastapi",
@@ -19,13 +15,5 @@ app = create_service_app(
     get_db_url=settings.get_database_url_async,
     settings=settings,
     debug=getattr(settings, "debug", False),
+    module=module,
 )
-
-
-@app.get("/acceptance/health")
-async def health_legacy():
-    """Legacy health endpoint for backward compatibility"""
-    return {"status": "healthy", "service": "acceptance-service-fastapi"}
-
-
-app.include_router(acceptance_router)
@@ -0,0 +1,27 @@
+"""
+Acceptance Service 模組定義
+供單體組合根與獨立入口（main.py）共用的路由與生命週期
+"""
+from fastapi import APIRouter
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.acceptance.core.database import async_engine
+from app.modules.acceptance.api.v1.acceptance import router as acceptance_router
+
+router = APIRouter()
+
+
+@router.get("/acceptance/health")
+async def health_legacy():
+    """Legacy health endpoint for backward compatibility"""
+    return {"status": "healthy", "service": "acceptance-service-fastapi"}
+
+
+router.include_router(acceptance_router)
+
+module = ServiceModule(
+    name="acceptance",
+    router=router,
+    on_shutdown=[async_engine.dispose],
+)
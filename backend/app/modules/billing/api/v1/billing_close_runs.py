@@ -0,0 +1,118 @@
+"""
+Billing Close Run API Endpoints
+月結批次結案 API 端點
+"""
+
+import structlog
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.billing.core.database import get_async_session
+from app.modules.billing.schemas.billing_close_run import (
+    BillingCloseRunCreate,
+    BillingCloseRunResponse,
+    BillingCloseRunProgress,
+)
+from app.modules.billing.services.billing_close_service import BillingCloseService, RESUMABLE_STATUSES
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/billing-close-runs", tags=["Billing Close Runs"])
+
+
+def get_tenant_id(x_tenant_id: str = Header(None, alias="X-Tenant-Id")) -> str:
+    """從 Header 取得 tenant_id"""
+    if not x_tenant_id:
+        raise HTTPException(status_code=400, detail="X-Tenant-Id header is required")
+    return x_tenant_id
+
+
+def get_user_id(x_user_id: str = Header(None, alias="X-User-Id")) -> Optional[str]:
+    """從 Header 取得 user_id"""
+    return x_user_id
+
+
+@router.post("", response_model=BillingCloseRunResponse, status_code=202)
+async def start_billing_close_run(
+    data: BillingCloseRunCreate,
+    tenant_id: str = Depends(get_tenant_id),
+    user_id: Optional[str] = Depends(get_user_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """啟動月結批次結案（以可持久化的背景工作執行）"""
+    if not user_id:
+        raise HTTPException(status_code=400, detail="X-User-Id header is required")
+
+    service = BillingCloseService(session)
+    run = await service.start_run(tenant_id, data, created_by=user_id)
+    return BillingCloseRunResponse.model_validate(run)
+
+
+@router.get("")
+async def list_billing_close_runs(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100, alias="pageSize"),
+    tenant_id: str = Depends(get_tenant_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """列出月結批次作業"""
+    service = BillingCloseService(session)
+    items, total = await service.list_runs(tenant_id, page=page, page_size=page_size)
+
+    total_pages = (total + page_size - 1) // page_size
+
+    return {
+        "items": [BillingCloseRunResponse.model_validate(item) for item in items],
+        "total": total,
+        "page": page,
+        "pageSize": page_size,
+        "totalPages": total_pages,
+    }
+
+
+@router.get("/{run_id}", response_model=BillingCloseRunResponse)
+async def get_billing_close_run(
+    run_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """取得月結批次作業"""
+    service = BillingCloseService(session)
+    run = await service.get_run(run_id, tenant_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing close run not found")
+    return BillingCloseRunResponse.model_validate(run)
+
+
+@router.get("/{run_id}/progress", response_model=BillingCloseRunProgress)
+async def get_billing_close_run_progress(
+    run_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """取得月結批次作業進度與吞吐量"""
+    service = BillingCloseService(session)
+    run = await service.get_run(run_id, tenant_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing close run not found")
+    return await service.get_progress(run)
+
+
+@router.post("/{run_id}/resume", response_model=BillingCloseRunResponse, status_code=202)
+async def resume_billing_close_run(
+    run_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    user_id: Optional[str] = Depends(get_user_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """續跑中斷或有失敗項目的月結批次作業"""
+    service = BillingCloseService(session)
+    run = await service.get_run(run_id, tenant_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing close run not found")
+    if run.status not in RESUMABLE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Billing close run is {run.status}")
+
+    await service.submit_run(run, created_by=user_id)
+    return BillingCloseRunResponse.model_validate(run)
@@ -5,6 +5,7 @@ Fee Config API Endpoints
 
 import structlog
 from datetime import date
+from decimal import Decimal
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +17,8 @@ from app.modules.billing.schemas.fee_config import (
     FeeConfigResponse,
     FeeCalculationRequest,
     FeeCalculationResponse,
+    FeeBatchCalculationRequest,
+    FeeBatchCalculationResponse,
 )
 from app.modules.billing.services.fee_config_service import FeeConfigService
 
@@ -175,6 +178,32 @@ async def calculate_fee(
     )
 
 
+@router.post("/calculate-batch", response_model=FeeBatchCalculationResponse)
+async def calculate_fees_batch(
+    data: FeeBatchCalculationRequest,
+    tenant_id: str = Depends(get_tenant_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """批量計算訂單費用"""
+    service = FeeConfigService(session)
+    results = await service.calculate_fees_batch(tenant_id=tenant_id, orders=data.orders)
+
+    items = [
+        FeeCalculationResponse(
+            order_id=order.order_id,
+            order_amount=order.order_amount,
+            fee_breakdown=result["fee_breakdown"],
+            total_fee=result["total_fee"],
+            fee_configs_applied=result["fee_configs_applied"],
+        )
+        for order, result in zip(data.orders, results)
+    ]
+    return FeeBatchCalculationResponse(
+        results=items,
+        total_fee=sum((item.total_fee for item in items), Decimal("0")),
+    )
+
+
 @router.get("/default-rate")
 async def get_default_transaction_fee_rate(
     tenant_id: str = Depends(get_tenant_id),
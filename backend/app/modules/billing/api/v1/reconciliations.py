@@ -9,7 +9,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.modules.billing.core.database import get_async_session
+from app.modules.billing.core.database import get_async_session, get_read_session
 from app.modules.billing.models.enums import ReconciliationStatus
 from app.modules.billing.schemas.reconciliation import (
     ReconciliationCreate,
@@ -66,7 +66,7 @@ async def list_reconciliations(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100, alias="pageSize"),
     tenant_id: str = Depends(get_tenant_id),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """列出對帳記錄"""
     service = ReconciliationService(session)
@@ -95,7 +95,7 @@ async def get_reconciliation_stats(
     restaurant_id: Optional[str] = Query(None, alias="restaurantId"),
     supplier_id: Optional[str] = Query(None, alias="supplierId"),
     tenant_id: str = Depends(get_tenant_id),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """取得對帳統計"""
     service = ReconciliationService(session)
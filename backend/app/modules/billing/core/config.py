@@ -30,10 +30,16 @@ class BillingServiceSettings(UnifiedSettings):
     reconciliation_auto_close_days: int = Field(default=30, description="自動結案天數")
     auto_approve_threshold: float = Field(default=0.95, description="自動審批信心閾值")
 
+    # 月結批次結案配置
+    billing_close_concurrency: int = Field(default=8, description="月結批次結案 worker 數")
+    billing_close_max_concurrency: int = Field(default=32, description="月結批次結案 worker 上限")
+    billing_close_max_attempts: int = Field(default=3, description="單一週期結案最大嘗試次數")
+
     # 費率配置
     default_transaction_fee_pct: float = Field(default=0.008, description="預設交易佣金 (0.8%)")
     transaction_fee_min_pct: float = Field(default=0.0, description="最低佣金")
     transaction_fee_max_pct: float = Field(default=0.03, description="最高佣金 (3%)")
+    fee_rule_index_ttl_seconds: int = Field(default=300, description="費率規則索引快取秒數（另以 Redis 版本號跨進程失效）")
 
     # 快速撥款配置
     fast_payout_fee_min: float = Field(default=0.005, description="快速撥款最低費率")
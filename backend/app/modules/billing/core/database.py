@@ -4,6 +4,7 @@ import os, sys
 from orderly_fastapi_core import (
     create_db_engines,
     get_async_session_dependency,
+    get_read_session_dependency,
 )
 
 
@@ -13,3 +14,5 @@ async_engine, sync_engine, AsyncSessionLocal, SessionLocal = create_db_engines(
 
 
 get_async_session = get_async_session_dependency(AsyncSessionLocal)
+# 列表 / 統計等唯讀端點（可路由到 read replica）
+get_read_session = get_read_session_dependency(AsyncSessionLocal)
@@ -10,6 +10,7 @@ from .enums import (
     SubscriptionPlan,
 )
 from .reconciliation import Reconciliation, ReconciliationItem, BillingPeriod, FeeConfig
+from .billing_close_run import BillingCloseRun, BillingCloseRunItem
 
 __all__ = [
     "Base",
@@ -25,4 +26,6 @@ __all__ = [
     "ReconciliationItem",
     "BillingPeriod",
     "FeeConfig",
+    "BillingCloseRun",
+    "BillingCloseRunItem",
 ]
@@ -0,0 +1,98 @@
+"""
+Billing Close Run Models
+月結批次結案作業（斷點續跑用的檢查點表）
+"""
+
+from datetime import datetime, date
+from typing import Optional, List
+
+from sqlalchemy import Boolean, String, DateTime, Date, ForeignKey, Integer, Text, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship, Mapped, mapped_column
+
+from orderly_fastapi_core.ids import new_id
+
+from .base import Base
+
+
+class BillingCloseRun(Base):
+    """月結批次作業：一次列舉所有到期未結案週期並以 worker pool 平行結案"""
+
+    __tablename__ = "billing_close_runs"
+
+    # Primary key
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=new_id)
+
+    # 多租戶
+    tenant_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False, index=True)
+
+    # 作業範圍：period_end <= cutoff_date 的開放週期
+    cutoff_date: Mapped[date] = mapped_column(Date, nullable=False)
+    auto_reconcile: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    concurrency: Mapped[int] = mapped_column(Integer, nullable=False, default=8)
+
+    # 狀態: pending, running, completed, completed_with_errors, failed
+    status: Mapped[str] = mapped_column(String(30), nullable=False, default="pending")
+    total_periods: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # 時間戳
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # 審計欄位
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_by: Mapped[Optional[str]] = mapped_column(UUID(as_uuid=False), nullable=True)
+
+    # Relationships
+    items: Mapped[List["BillingCloseRunItem"]] = relationship(
+        "BillingCloseRunItem",
+        back_populates="run",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        Index("idx_billing_close_runs_tenant_status", "tenant_id", "status"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<BillingCloseRun {self.id} ({self.status})>"
+
+
+class BillingCloseRunItem(Base):
+    """批次作業明細：每個 restaurant–supplier 週期一列，作為檢查點"""
+
+    __tablename__ = "billing_close_run_items"
+
+    # Primary key
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=new_id)
+
+    run_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("billing_close_runs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    billing_period_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("billing_periods.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # 狀態: pending, done, failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reconciliation_id: Mapped[Optional[str]] = mapped_column(UUID(as_uuid=False), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    run: Mapped["BillingCloseRun"] = relationship("BillingCloseRun", back_populates="items")
+
+    __table_args__ = (
+        UniqueConstraint("run_id", "billing_period_id", name="uq_billing_close_run_items_period"),
+        Index("idx_billing_close_run_items_run_status", "run_id", "status"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<BillingCloseRunItem {self.billing_period_id} ({self.status})>"
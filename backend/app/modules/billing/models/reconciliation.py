@@ -6,7 +6,6 @@ Reconciliation Models
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List
-from uuid import uuid4
 
 from sqlalchemy import (
     Column, String, Boolean, DateTime, Date, ForeignKey,
@@ -15,6 +14,8 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
+from orderly_fastapi_core.ids import new_id
+
 from .base import Base
 from .enums import ReconciliationStatus, DiscrepancyType
 
@@ -25,7 +26,7 @@ class Reconciliation(Base):
     __tablename__ = "reconciliations"
 
     # Primary key
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=new_id)
 
     # Unique identifier
     reconciliation_number: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
@@ -114,7 +115,7 @@ class ReconciliationItem(Base):
     __tablename__ = "reconciliation_items"
 
     # Primary key
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=new_id)
 
     # Foreign keys
     reconciliation_id: Mapped[str] = mapped_column(
@@ -183,7 +184,7 @@ class BillingPeriod(Base):
     __tablename__ = "billing_periods"
 
     # Primary key
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=new_id)
 
     # 多租戶
     tenant_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False, index=True)
@@ -229,7 +230,7 @@ class FeeConfig(Base):
     __tablename__ = "fee_configs"
 
     # Primary key
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=new_id)
 
     # 適用對象
     tenant_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False, index=True)
@@ -0,0 +1,32 @@
+"""
+Billing Service 模組定義
+供單體組合根與獨立入口（main.py）共用的路由與生命週期
+"""
+from fastapi import APIRouter
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.billing.core.database import async_engine
+from app.modules.billing.api.v1.reconciliations import router as reconciliations_router
+from app.modules.billing.api.v1.billing_periods import router as billing_periods_router
+from app.modules.billing.api.v1.fee_configs import router as fee_configs_router
+from app.modules.billing.api.v1.billing_close_runs import router as billing_close_runs_router
+
+router = APIRouter()
+
+# 註冊帳務路由（含 /api 前綴和根路徑以相容 API Gateway）
+router.include_router(reconciliations_router, prefix="/api", tags=["Reconciliations"])
+router.include_router(billing_periods_router, prefix="/api", tags=["Billing Periods"])
+router.include_router(fee_configs_router, prefix="/api", tags=["Fee Configs"])
+router.include_router(billing_close_runs_router, prefix="/api", tags=["Billing Close Runs"])
+
+router.include_router(reconciliations_router, prefix="", tags=["Reconciliations"])
+router.include_router(billing_periods_router, prefix="", tags=["Billing Periods"])
+router.include_router(fee_configs_router, prefix="", tags=["Fee Configs"])
+router.include_router(billing_close_runs_router, prefix="", tags=["Billing Close Runs"])
+
+module = ServiceModule(
+    name="billing",
+    router=router,
+    on_shutdown=[async_engine.dispose],
+)
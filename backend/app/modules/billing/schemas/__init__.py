@@ -12,6 +12,11 @@ from .billing_period import (
     BillingPeriodUpdate,
     BillingPeriodResponse,
 )
+from .billing_close_run import (
+    BillingCloseRunCreate,
+    BillingCloseRunResponse,
+    BillingCloseRunProgress,
+)
 from .fee_config import (
     FeeConfigCreate,
     FeeConfigUpdate,
@@ -31,6 +36,10 @@ __all__ = [
     "BillingPeriodCreate",
     "BillingPeriodUpdate",
     "BillingPeriodResponse",
+    # BillingCloseRun
+    "BillingCloseRunCreate",
+    "BillingCloseRunResponse",
+    "BillingCloseRunProgress",
     # FeeConfig
     "FeeConfigCreate",
     "FeeConfigUpdate",
@@ -0,0 +1,49 @@
+"""
+Billing Close Run Schemas
+Pydantic schemas for the month-end batch close job
+"""
+
+from datetime import datetime, date
+from typing import Optional
+from pydantic import Field
+
+# Import shared schema utilities from core library
+from orderly_fastapi_core import CamelCaseModel
+
+
+class BillingCloseRunCreate(CamelCaseModel):
+    """啟動月結批次結案請求"""
+    cutoff_date: Optional[date] = Field(None, description="結案截止日（period_end <= 此日期），預設為今日")
+    auto_reconcile: bool = Field(True, description="結案時是否執行自動對帳")
+    concurrency: Optional[int] = Field(None, ge=1, description="平行 worker 數，預設取設定值")
+
+
+class BillingCloseRunResponse(CamelCaseModel):
+    """月結批次作業回應 Schema"""
+    id: str
+    tenant_id: str
+    cutoff_date: date
+    auto_reconcile: bool
+    concurrency: int
+    status: str
+    total_periods: int
+    last_error: Optional[str]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    created_at: datetime
+    created_by: Optional[str]
+
+
+class BillingCloseRunProgress(CamelCaseModel):
+    """月結批次作業進度與吞吐量"""
+    run_id: str
+    status: str
+    total_periods: int
+    pending: int = Field(0, description="尚未處理")
+    done: int = Field(0, description="已結案")
+    failed: int = Field(0, description="失敗（可 resume 重試）")
+    percent_complete: float = Field(0.0, description="完成百分比")
+    elapsed_seconds: float = Field(0.0, description="已執行秒數")
+    periods_per_second: float = Field(0.0, description="整體吞吐量")
+    recent_periods_per_second: float = Field(0.0, description="最近一分鐘吞吐量")
+    eta_seconds: Optional[float] = Field(None, description="預估剩餘秒數")
@@ -5,7 +5,7 @@ Pydantic schemas for fee configuration (依 PRD-Billing-Master.md)
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import Field, field_validator
 from app.modules.billing.models.enums import FeeType, PricingModel, BillingCycle, WhoPays
 
@@ -104,6 +104,17 @@ class FeeCalculationResponse(CamelCaseModel):
     fee_configs_applied: list = Field(default_factory=list, description="套用的費率配置")
 
 
+class FeeBatchCalculationRequest(CamelCaseModel):
+    """批量費用計算請求 Schema"""
+    orders: List[FeeCalculationRequest] = Field(..., min_length=1, max_length=10000, description="訂單列表")
+
+
+class FeeBatchCalculationResponse(CamelCaseModel):
+    """批量費用計算回應 Schema"""
+    results: List[FeeCalculationResponse]
+    total_fee: Decimal
+
+
 # ============ Tiered Pricing Structure ============
 
 class TieredPricingTier(CamelCaseModel):
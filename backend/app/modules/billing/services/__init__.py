@@ -2,10 +2,12 @@ from .reconciliation_service import ReconciliationService
 from .billing_period_service import BillingPeriodService
 from .fee_config_service import FeeConfigService
 from .reconciliation_engine import ReconciliationEngine
+from .billing_close_service import BillingCloseService
 
 __all__ = [
     "ReconciliationService",
     "BillingPeriodService",
     "FeeConfigService",
     "ReconciliationEngine",
+    "BillingCloseService",
 ]
@@ -0,0 +1,401 @@
+"""
+Billing Close Service
+月結批次結案：列舉到期未結案週期，以有上限的 worker pool 平行結案並自動對帳
+
+每個 restaurant–supplier 週期在獨立的 session / transaction 中以
+BillingPeriodService.close_billing_period 結案，結案、對帳與檢查點
+（billing_close_run_items.status = done）在同一個 commit 內完成，因此中途崩潰的
+作業可直接 resume，只會重跑尚未完成的週期。
+
+作業以可持久化的背景工作（orderly_fastapi_core.background_jobs）執行：worker
+重啟後租約到期，由其他 worker 接手並自檢查點續跑。
+"""
+
+import asyncio
+import structlog
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Dict, Optional, List, Tuple
+from sqlalchemy import select, func, and_, insert, literal, update
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from orderly_fastapi_core.background_jobs import JobCancelled, JobContext, background_jobs
+
+from app.modules.billing.core.config import settings
+from app.modules.billing.core.database import AsyncSessionLocal
+from app.modules.billing.models.billing_close_run import BillingCloseRun, BillingCloseRunItem
+from app.modules.billing.models.reconciliation import BillingPeriod
+from app.modules.billing.schemas.billing_close_run import BillingCloseRunCreate, BillingCloseRunProgress
+from app.modules.billing.services.billing_period_service import BillingPeriodService
+
+logger = structlog.get_logger()
+
+# 背景工作類型
+BILLING_CLOSE_JOB = "billing.close_run"
+
+# 可 resume 的作業狀態（running 代表前次執行中途中斷）
+RESUMABLE_STATUSES = ("pending", "running", "failed", "completed_with_errors")
+
+# 最近吞吐量的統計窗口
+RECENT_WINDOW = timedelta(seconds=60)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """將 naive datetime 視為 UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class BillingCloseService:
+    """月結批次結案服務"""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        self.session = session
+        self.session_factory = session_factory
+
+    # ============ 作業建立與查詢 ============
+
+    async def start_run(
+        self,
+        tenant_id: str,
+        data: BillingCloseRunCreate,
+        created_by: Optional[str] = None,
+    ) -> BillingCloseRun:
+        """建立批次作業，並以單一 INSERT ... SELECT 列舉所有到期未結案週期"""
+        cutoff_date = data.cutoff_date or date.today()
+        concurrency = min(
+            data.concurrency or settings.billing_close_concurrency,
+            settings.billing_close_max_concurrency,
+        )
+
+        run = BillingCloseRun(
+            tenant_id=tenant_id,
+            cutoff_date=cutoff_date,
+            auto_reconcile=data.auto_reconcile,
+            concurrency=concurrency,
+            status="pending",
+            created_by=created_by,
+        )
+        self.session.add(run)
+        await self.session.flush()
+
+        items = BillingCloseRunItem.__table__.c
+        result = await self.session.execute(
+            insert(BillingCloseRunItem).from_select(
+                [items.id, items.run_id, items.billing_period_id, items.status, items.attempts],
+                select(
+                    func.gen_random_uuid(),
+                    literal(run.id, PgUUID(as_uuid=False)),
+                    BillingPeriod.id,
+                    literal("pending"),
+                    literal(0),
+                ).where(
+                    and_(
+                        BillingPeriod.tenant_id == tenant_id,
+                        BillingPeriod.is_closed == False,
+                        BillingPeriod.period_end <= cutoff_date,
+                    )
+                ),
+                include_defaults=False,
+            )
+        )
+        run.total_periods = result.rowcount or 0
+
+        # 作業與其背景工作在同一交易內建立
+        await self.submit_run(run, created_by=created_by, commit=False)
+        await self.session.commit()
+        await self.session.refresh(run)
+
+        logger.info(
+            "billing_close.run.created",
+            run_id=run.id,
+            tenant_id=tenant_id,
+            cutoff_date=str(cutoff_date),
+            total_periods=run.total_periods,
+            concurrency=concurrency,
+        )
+        return run
+
+    async def submit_run(
+        self,
+        run: BillingCloseRun,
+        created_by: Optional[str] = None,
+        commit: bool = True,
+    ) -> str:
+        """排入背景工作執行（或續跑）批次作業，回傳 job id"""
+        job_id = await background_jobs.submit_job(
+            BILLING_CLOSE_JOB,
+            {"run_id": run.id},
+            metadata={"tenant_id": run.tenant_id},
+            created_by=created_by,
+            session=self.session,
+        )
+        if commit:
+            await self.session.commit()
+        return job_id
+
+    async def get_run(self, run_id: str, tenant_id: str) -> Optional[BillingCloseRun]:
+        """根據 ID 取得批次作業"""
+        result = await self.session.execute(
+            select(BillingCloseRun).where(
+                and_(
+                    BillingCloseRun.id == run_id,
+                    BillingCloseRun.tenant_id == tenant_id,
+                )
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def list_runs(
+        self,
+        tenant_id: str,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Tuple[List[BillingCloseRun], int]:
+        """列出批次作業"""
+        condition = BillingCloseRun.tenant_id == tenant_id
+
+        total_result = await self.session.execute(
+            select(func.count(BillingCloseRun.id)).where(condition)
+        )
+        total = total_result.scalar() or 0
+
+        result = await self.session.execute(
+            select(BillingCloseRun)
+            .where(condition)
+            .order_by(BillingCloseRun.created_at.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        return list(result.scalars().all()), total
+
+    async def get_progress(self, run: BillingCloseRun) -> BillingCloseRunProgress:
+        """計算批次作業進度與吞吐量（單一聚合查詢）"""
+        now = datetime.now(timezone.utc)
+        item = BillingCloseRunItem
+        result = await self.session.execute(
+            select(
+                func.count(item.id).filter(item.status == "pending").label("pending"),
+                func.count(item.id).filter(item.status == "done").label("done"),
+                func.count(item.id).filter(item.status == "failed").label("failed"),
+                func.count(item.id).filter(
+                    and_(item.status == "done", item.finished_at >= now - RECENT_WINDOW)
+                ).label("recent_done"),
+            ).where(item.run_id == run.id)
+        )
+        row = result.one()
+        pending, done, failed = row.pending or 0, row.done or 0, row.failed or 0
+
+        started_at = _utc(run.started_at)
+        finished_at = _utc(run.finished_at)
+        elapsed = ((finished_at or now) - started_at).total_seconds() if started_at else 0.0
+        periods_per_second = done / elapsed if elapsed > 0 else 0.0
+        recent_per_second = (row.recent_done or 0) / RECENT_WINDOW.total_seconds()
+
+        remaining = pending + failed
+        rate = recent_per_second or periods_per_second
+        eta = remaining / rate if rate > 0 and remaining and finished_at is None else None
+
+        return BillingCloseRunProgress(
+            run_id=run.id,
+            status=run.status,
+            total_periods=run.total_periods,
+            pending=pending,
+            done=done,
+            failed=failed,
+            percent_complete=round(done / run.total_periods * 100, 2) if run.total_periods else 100.0,
+            elapsed_seconds=round(elapsed, 3),
+            periods_per_second=round(periods_per_second, 3),
+            recent_periods_per_second=round(recent_per_second, 3),
+            eta_seconds=round(eta, 1) if eta is not None else None,
+        )
+
+    # ============ 執行 ============
+
+    async def execute_run(self, run_id: str, context: Optional[JobContext] = None) -> None:
+        """
+        執行（或續跑）批次作業
+
+        只處理尚未完成且未超過最大嘗試次數的週期；每個週期由 worker 以獨立
+        session 處理，worker 數受 run.concurrency 限制。由背景工作執行時，
+        每完成一個週期回報一次進度。
+        """
+        async with self.session_factory() as session:
+            run = await session.get(BillingCloseRun, run_id)
+            if run is None:
+                logger.warning("billing_close.run.not_found", run_id=run_id)
+                return
+            if run.status not in RESUMABLE_STATUSES:
+                logger.info("billing_close.run.skip", run_id=run_id, status=run.status)
+                return
+
+            run.status = "running"
+            run.started_at = run.started_at or datetime.utcnow()
+            run.finished_at = None
+            run.last_error = None
+
+            result = await session.execute(
+                select(BillingCloseRunItem.id)
+                .where(
+                    and_(
+                        BillingCloseRunItem.run_id == run_id,
+                        BillingCloseRunItem.status != "done",
+                        BillingCloseRunItem.attempts < settings.billing_close_max_attempts,
+                    )
+                )
+                .order_by(BillingCloseRunItem.id)
+            )
+            item_ids = [row[0] for row in result.all()]
+            tenant_id, auto_reconcile, created_by = run.tenant_id, run.auto_reconcile, run.created_by
+            concurrency = max(1, run.concurrency)
+            await session.commit()
+
+        logger.info("billing_close.run.start", run_id=run_id, items=len(item_ids), concurrency=concurrency)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item_id in item_ids:
+            queue.put_nowait(item_id)
+        processed = 0
+        cancelled = False
+
+        async def worker() -> None:
+            nonlocal processed, cancelled
+            while not cancelled:
+                try:
+                    item_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._close_one(item_id, tenant_id, auto_reconcile, created_by)
+                processed += 1
+                if context is not None:
+                    try:
+                        await context.report_progress(run_id=run_id, processed=processed, total=len(item_ids))
+                    except JobCancelled:
+                        cancelled = True
+
+        error: Optional[str] = None
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(concurrency, len(item_ids)) or 1)))
+        except Exception as e:  # pragma: no cover - workers swallow per-item errors
+            error = str(e)
+            logger.error("billing_close.run.error", run_id=run_id, error=error)
+
+        if cancelled:
+            error = "Background job cancelled"
+        await self._finish_run(run_id, error)
+        if cancelled:
+            raise JobCancelled(context.job_id)
+
+    async def _close_one(
+        self,
+        item_id: str,
+        tenant_id: str,
+        auto_reconcile: bool,
+        closed_by: Optional[str],
+    ) -> None:
+        """在獨立 session 中結案單一週期並寫入檢查點"""
+        async with self.session_factory() as session:
+            try:
+                # SKIP LOCKED：同一作業被重複 resume 時不會重複處理同一週期
+                item = (
+                    await session.execute(
+                        select(BillingCloseRunItem)
+                        .where(
+                            and_(
+                                BillingCloseRunItem.id == item_id,
+                                BillingCloseRunItem.status != "done",
+                            )
+                        )
+                        .with_for_update(skip_locked=True)
+                    )
+                ).scalar_one_or_none()
+                if item is None:
+                    return
+
+                item.attempts += 1
+                period = await BillingPeriodService(session).close_billing_period(
+                    item.billing_period_id,
+                    tenant_id,
+                    closed_by,
+                    create_reconciliation=auto_reconcile,
+                    commit=False,
+                )
+                if period is None:
+                    raise LookupError(f"Billing period {item.billing_period_id} not found")
+
+                item.status = "done"
+                item.error = None
+                item.reconciliation_id = period.reconciliation_id
+                item.finished_at = datetime.utcnow()
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error("billing_close.item.error", item_id=item_id, error=str(e))
+                await session.execute(
+                    update(BillingCloseRunItem)
+                    .where(BillingCloseRunItem.id == item_id)
+                    .values(
+                        status="failed",
+                        attempts=BillingCloseRunItem.attempts + 1,
+                        error=str(e)[:2000],
+                        finished_at=datetime.utcnow(),
+                    )
+                )
+                await session.commit()
+
+    async def _finish_run(self, run_id: str, error: Optional[str]) -> None:
+        """
+        依明細狀態決定作業最終狀態
+
+        仍被其他執行（並行的 resume）鎖定處理中的明細不算失敗：此時作業維持
+        running，由最後完成的那次執行收尾。作業列以 FOR UPDATE 鎖定，並行的
+        收尾彼此排隊。
+        """
+        async with self.session_factory() as session:
+            run = (
+                await session.execute(
+                    select(BillingCloseRun).where(BillingCloseRun.id == run_id).with_for_update()
+                )
+            ).scalar_one_or_none()
+            if run is None:
+                return
+
+            not_done = and_(
+                BillingCloseRunItem.run_id == run_id,
+                BillingCloseRunItem.status != "done",
+            )
+            remaining = (
+                await session.execute(select(func.count(BillingCloseRunItem.id)).where(not_done))
+            ).scalar() or 0
+            idle = (
+                await session.execute(
+                    select(BillingCloseRunItem.id).where(not_done).with_for_update(skip_locked=True)
+                )
+            ).all()
+            in_progress = remaining - len(idle)
+            if in_progress:
+                await session.rollback()
+                logger.info("billing_close.run.still_in_progress", run_id=run_id, in_progress=in_progress)
+                return
+
+            if error:
+                run.status = "failed"
+                run.last_error = error
+            else:
+                run.status = "completed" if remaining == 0 else "completed_with_errors"
+            run.finished_at = datetime.utcnow()
+            await session.commit()
+
+            logger.info("billing_close.run.finished", run_id=run_id, status=run.status, remaining=remaining)
+
+
+@background_jobs.job_handler(BILLING_CLOSE_JOB, concurrency=1, timeout=6 * 3600)
+async def run_billing_close(context: JobContext, payload: Dict[str, Any]) -> None:
+    """背景工作：執行（或續跑）月結批次作業"""
+    async with AsyncSessionLocal() as session:
+        await BillingCloseService(session).execute_run(payload["run_id"], context=context)
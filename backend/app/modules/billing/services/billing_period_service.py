@@ -137,11 +137,29 @@ class BillingPeriodService:
         self,
         period_id: str,
         tenant_id: str,
-        closed_by: str,
+        closed_by: Optional[str],
         create_reconciliation: bool = True,
+        commit: bool = True,
     ) -> Optional[BillingPeriod]:
-        """結案計費週期"""
-        billing_period = await self.get_billing_period_by_id(period_id, tenant_id)
+        """
+        結案計費週期（單筆結案與月結批次共用）
+
+        以 SELECT ... FOR UPDATE 鎖定週期，已結案者原樣回傳，因此重複結案不會
+        產生第二筆對帳。結案時先重算期間內可對帳訂單的金額，create_reconciliation
+        時再以 ReconciliationEngine 自動對帳並回寫訂單數與金額；commit=False
+        時只 flush，由呼叫端在同一交易內提交。
+        """
+        result = await self.session.execute(
+            select(BillingPeriod)
+            .where(
+                and_(
+                    BillingPeriod.id == period_id,
+                    BillingPeriod.tenant_id == tenant_id,
+                )
+            )
+            .with_for_update()
+        )
+        billing_period = result.scalar_one_or_none()
         if not billing_period:
             return None
 
@@ -154,31 +172,61 @@ class BillingPeriodService:
         billing_period.closed_by = closed_by
         billing_period.updated_at = datetime.utcnow()
 
+        # 結案前依已存行總計與調整項重算期間訂單金額，對帳與週期金額以此為準
+        await self._reprice_period_orders(billing_period)
+
         # 如果需要創建對帳記錄
         if create_reconciliation:
-            from app.modules.billing.services.reconciliation_service import ReconciliationService
-            from app.modules.billing.schemas.reconciliation import ReconciliationCreate
+            from app.modules.billing.services.reconciliation_engine import ReconciliationEngine
 
-            recon_service = ReconciliationService(self.session)
-            recon_data = ReconciliationCreate(
-                period_start=billing_period.period_start,
-                period_end=billing_period.period_end,
+            reconciliation = await ReconciliationEngine(self.session).run_auto_reconciliation(
+                tenant_id=tenant_id,
                 restaurant_id=billing_period.restaurant_id,
                 supplier_id=billing_period.supplier_id,
-            )
-            reconciliation = await recon_service.create_reconciliation(
-                tenant_id=tenant_id,
-                data=recon_data,
+                period_start=billing_period.period_start,
+                period_end=billing_period.period_end,
                 created_by=closed_by,
+                commit=False,
             )
             billing_period.reconciliation_id = reconciliation.id
+            billing_period.total_orders = reconciliation.total_orders
+            billing_period.total_amount = reconciliation.total_amount
 
-        await self.session.commit()
-        await self.session.refresh(billing_period)
+        if commit:
+            await self.session.commit()
+            await self.session.refresh(billing_period)
+        else:
+            await self.session.flush()
 
         logger.info("billing_period.closed", id=period_id)
         return billing_period
 
+    async def _reprice_period_orders(self, billing_period: BillingPeriod) -> int:
+        """重算週期內可對帳訂單的金額（order_totals.reprice_orders，不提交），回傳訂單數"""
+        from app.modules.billing.services.reconciliation_engine import ReconciliationEngine
+        from app.modules.orders.models.order import Order
+        from app.modules.orders.services import order_totals
+
+        order_ids = (
+            await self.session.execute(
+                select(Order.id).where(
+                    and_(
+                        *ReconciliationEngine._period_order_conditions(
+                            billing_period.tenant_id,
+                            billing_period.restaurant_id,
+                            billing_period.supplier_id,
+                            billing_period.period_start,
+                            billing_period.period_end,
+                        )
+                    )
+                )
+            )
+        ).scalars().all()
+        totals = await order_totals.reprice_orders(self.session, order_ids)
+        if totals:
+            logger.info("billing_period.orders_repriced", id=billing_period.id, orders=len(totals))
+        return len(totals)
+
     async def get_current_period(
         self,
         tenant_id: str,
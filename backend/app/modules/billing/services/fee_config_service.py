@@ -6,13 +6,20 @@ Fee Config Service
 import structlog
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Tuple, Dict, Any
+from typing import Optional, List, Tuple, Dict, Any, Iterable
 from uuid import uuid4
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.billing.models.reconciliation import FeeConfig
 from app.modules.billing.schemas.fee_config import FeeConfigCreate, FeeConfigUpdate
+from app.modules.billing.services.fee_rule_index import (
+    FeeRuleIndex,
+    current_index_version,
+    get_cached_index,
+    invalidate_fee_rule_index,
+    store_index,
+)
 
 logger = structlog.get_logger()
 
@@ -57,6 +64,7 @@ class FeeConfigService:
         self.session.add(fee_config)
         await self.session.commit()
         await self.session.refresh(fee_config)
+        invalidate_fee_rule_index(tenant_id)
 
         logger.info("fee_config.created", id=fee_config.id)
         return fee_config
@@ -137,6 +145,7 @@ class FeeConfigService:
 
         await self.session.commit()
         await self.session.refresh(fee_config)
+        invalidate_fee_rule_index(tenant_id)
         return fee_config
 
     async def deactivate_fee_config(
@@ -155,6 +164,7 @@ class FeeConfigService:
 
         await self.session.commit()
         await self.session.refresh(fee_config)
+        invalidate_fee_rule_index(tenant_id)
 
         logger.info("fee_config.deactivated", id=config_id)
         return fee_config
@@ -219,67 +229,53 @@ class FeeConfigService:
         """
         計算訂單費用（依 PRD-Billing-Master.md 費率結構）
         """
-        configs = await self.get_applicable_fee_configs(
-            tenant_id, supplier_id, restaurant_id, order_date
-        )
-
-        fee_breakdown: Dict[str, Decimal] = {}
-        configs_applied: List[str] = []
+        index = await self.get_fee_rule_index(tenant_id)
+        return index.calculate(supplier_id, restaurant_id, order_amount, order_date)
 
-        for config in configs:
-            fee = Decimal("0")
-
-            if config.pricing_model == "percentage":
-                # 百分比模式
-                fee = order_amount * (config.value or Decimal("0"))
-            elif config.pricing_model == "fixed":
-                # 固定金額模式
-                fee = config.value or Decimal("0")
-            elif config.pricing_model == "tiered":
-                # 分層費率模式
-                fee = self._calculate_tiered_fee(order_amount, config.value_json)
-            elif config.pricing_model == "formula":
-                # 公式模式（簡化處理）
-                fee = Decimal("0")  # TODO: 實現公式計算
-
-            if fee > 0:
-                fee_breakdown[config.fee_type] = fee.quantize(Decimal("0.01"))
-                configs_applied.append(config.id)
-
-        total_fee = sum(fee_breakdown.values(), Decimal("0"))
-
-        return {
-            "order_amount": order_amount,
-            "fee_breakdown": fee_breakdown,
-            "total_fee": total_fee,
-            "fee_configs_applied": configs_applied,
-        }
-
-    def _calculate_tiered_fee(
+    async def calculate_fees_batch(
         self,
-        amount: Decimal,
-        tiers_config: Optional[Dict],
-    ) -> Decimal:
-        """計算分層費率（依 PRD-Billing-Master.md:69-78）"""
-        if not tiers_config or "tiers" not in tiers_config:
-            return Decimal("0")
-
-        tiers = tiers_config["tiers"]
-        for tier in tiers:
-            min_gmv = Decimal(str(tier.get("min_gmv", 0)))
-            max_gmv = tier.get("max_gmv")
-            rate = Decimal(str(tier.get("rate", 0)))
-
-            if max_gmv is None:
-                # 最後一層（無上限）
-                if amount >= min_gmv:
-                    return amount * rate
-            else:
-                max_gmv = Decimal(str(max_gmv))
-                if min_gmv <= amount <= max_gmv:
-                    return amount * rate
-
-        return Decimal("0")
+        tenant_id: str,
+        orders: Iterable[Any],
+    ) -> List[Dict[str, Any]]:
+        """
+        批量計算訂單費用（對帳、月結等大量計費使用）
+
+        orders 中每筆需具備 supplier_id、restaurant_id、order_amount、order_date
+        屬性（如 FeeCalculationRequest），結果依輸入順序回傳。
+        整批只讀取一次費率規則索引。
+        """
+        index = await self.get_fee_rule_index(tenant_id)
+        return [
+            index.calculate(
+                order.supplier_id,
+                order.restaurant_id,
+                order.order_amount,
+                order.order_date,
+            )
+            for order in orders
+        ]
+
+    async def get_fee_rule_index(self, tenant_id: str) -> FeeRuleIndex:
+        """取得租戶費率規則索引（快取失效時以單一查詢重建）"""
+        # 先取版本號再讀配置：與寫入交錯時存入的是舊版本號，下次取用即重建
+        version = await current_index_version(tenant_id)
+        index = get_cached_index(tenant_id, version)
+        if index is not None:
+            return index
+
+        result = await self.session.execute(
+            select(FeeConfig).where(
+                and_(
+                    FeeConfig.tenant_id == tenant_id,
+                    FeeConfig.is_active == True,
+                )
+            )
+        )
+        index = FeeRuleIndex(result.scalars().all())
+        store_index(tenant_id, index, version)
+
+        logger.info("fee_rule_index.built", tenant_id=tenant_id)
+        return index
 
     async def get_default_transaction_fee_rate(
         self,
@@ -0,0 +1,285 @@
+"""
+Fee Rule Index
+費率規則索引 - 將租戶的有效費率配置編譯為記憶體索引，供大量訂單計費使用
+
+- 依 (supplier_id, restaurant_id) 專屬程度分桶，每桶內按 fee_type 存放生效區間
+- 查詢順序與 FeeConfigService.get_applicable_fee_configs 相同：
+  特定供應商+餐廳 > 特定供應商 > 特定餐廳 > 全平台，同層取最新生效者
+- 分層費率預先解析為排序後的門檻，以二分搜尋定位
+- 索引依租戶快取於進程內，並記下建立時的 Redis 版本號；費率配置寫入提交後遞增版本號，
+  各 worker 下次取用時發現版本不同即重建。Redis 無法使用時不使用快取（每次重建）
+"""
+
+import asyncio
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from orderly_fastapi_core import redis_manager
+
+from app.modules.billing.core.config import settings
+from app.modules.billing.models.reconciliation import FeeConfig
+
+ZERO = Decimal("0")
+CENT = Decimal("0.01")
+
+logger = structlog.get_logger()
+
+# 每個索引保留的 (供應商, 餐廳, 日期) 查詢結果上限
+MEMO_MAX_ENTRIES = 50_000
+
+# Redis 版本號：全部租戶共用一個、各租戶各一個（租戶鍵為 f"{VERSION_KEY}:{tenant_id}"）
+VERSION_KEY = "billing:fee_rules:version"
+VERSION_TTL_SECONDS = 86400
+
+
+@dataclass(frozen=True)
+class TierSchedule:
+    """分層費率門檻（依 min_gmv 排序）"""
+
+    mins: Tuple[Decimal, ...]
+    maxs: Tuple[Optional[Decimal], ...]
+    rates: Tuple[Decimal, ...]
+    order: Tuple[int, ...]  # 原始設定順序，門檻重疊時以先設定者為準
+
+    @classmethod
+    def compile(cls, tiers_config: Optional[Dict[str, Any]]) -> "TierSchedule":
+        tiers = (tiers_config or {}).get("tiers") or []
+        compiled = sorted(
+            (
+                (
+                    Decimal(str(tier.get("min_gmv", 0))),
+                    Decimal(str(tier["max_gmv"])) if tier.get("max_gmv") is not None else None,
+                    Decimal(str(tier.get("rate", 0))),
+                    position,
+                )
+                for position, tier in enumerate(tiers)
+            ),
+            key=lambda tier: (tier[0], tier[3]),
+        )
+        return cls(
+            mins=tuple(tier[0] for tier in compiled),
+            maxs=tuple(tier[1] for tier in compiled),
+            rates=tuple(tier[2] for tier in compiled),
+            order=tuple(tier[3] for tier in compiled),
+        )
+
+    def rate_for(self, amount: Decimal) -> Optional[Decimal]:
+        """取得金額所屬層級的費率，無對應層級時回傳 None"""
+        best: Optional[Tuple[int, Decimal]] = None
+        # min_gmv 不超過金額的層級都要檢查：門檻重疊時先設定者可能位於更低的 min_gmv
+        for i in range(bisect_right(self.mins, amount) - 1, -1, -1):
+            upper = self.maxs[i]
+            if (upper is None or amount <= upper) and (best is None or self.order[i] < best[0]):
+                best = (self.order[i], self.rates[i])
+        return best[1] if best else None
+
+
+@dataclass(frozen=True)
+class FeeRule:
+    """編譯後的單一費率規則"""
+
+    id: str
+    fee_type: str
+    pricing_model: str
+    value: Decimal
+    effective_from: date
+    effective_to: Optional[date]
+    tiers: Optional[TierSchedule] = None
+
+    @classmethod
+    def from_config(cls, config: FeeConfig) -> "FeeRule":
+        return cls(
+            id=config.id,
+            fee_type=config.fee_type,
+            pricing_model=config.pricing_model,
+            value=config.value or ZERO,
+            effective_from=config.effective_from,
+            effective_to=config.effective_to,
+            tiers=TierSchedule.compile(config.value_json) if config.pricing_model == "tiered" else None,
+        )
+
+    def fee_for(self, amount: Decimal) -> Decimal:
+        if self.pricing_model == "percentage":
+            return amount * self.value
+        if self.pricing_model == "fixed":
+            return self.value
+        if self.pricing_model == "tiered":
+            rate = self.tiers.rate_for(amount)
+            return amount * rate if rate is not None else ZERO
+        # formula 模式尚未實作，與單筆計算一致回傳 0
+        return ZERO
+
+
+class _Intervals:
+    """同一 (供應商, 餐廳, fee_type) 的生效區間，依 effective_from 排序"""
+
+    __slots__ = ("starts", "rules")
+
+    def __init__(self, rules: List[FeeRule]):
+        rules.sort(key=lambda rule: rule.effective_from)
+        self.starts = [rule.effective_from for rule in rules]
+        self.rules = rules
+
+    def at(self, on: date) -> Optional[FeeRule]:
+        # 從最晚開始生效者往回找第一個尚未到期的規則
+        i = bisect_right(self.starts, on) - 1
+        while i >= 0:
+            rule = self.rules[i]
+            if rule.effective_to is None or rule.effective_to >= on:
+                return rule
+            i -= 1
+        return None
+
+
+class FeeRuleIndex:
+    """租戶費率規則索引"""
+
+    def __init__(self, configs: Iterable[FeeConfig]):
+        grouped: Dict[Tuple[Optional[str], Optional[str]], Dict[str, List[FeeRule]]] = {}
+        for config in configs:
+            scope = grouped.setdefault((config.supplier_id, config.restaurant_id), {})
+            scope.setdefault(config.fee_type, []).append(FeeRule.from_config(config))
+
+        self._scopes: Dict[Tuple[Optional[str], Optional[str]], Dict[str, _Intervals]] = {
+            key: {fee_type: _Intervals(rules) for fee_type, rules in by_type.items()}
+            for key, by_type in grouped.items()
+        }
+        self._memo: Dict[Tuple[str, str, date], List[FeeRule]] = {}
+
+    def applicable_rules(self, supplier_id: str, restaurant_id: str, on: date) -> List[FeeRule]:
+        """取得適用規則（每個 fee_type 一筆，依專屬程度優先）"""
+        key = (supplier_id, restaurant_id, on)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+
+        # 結果順序與逐筆查詢一致：依專屬程度，同一範圍內依 effective_from 由新到舊
+        rules: List[FeeRule] = []
+        seen = set()
+        for scope_key in (
+            (supplier_id, restaurant_id),
+            (supplier_id, None),
+            (None, restaurant_id),
+            (None, None),
+        ):
+            picked = []
+            for fee_type, intervals in self._scopes.get(scope_key, {}).items():
+                if fee_type in seen:
+                    continue
+                rule = intervals.at(on)
+                if rule is not None:
+                    picked.append(rule)
+            picked.sort(key=lambda rule: rule.effective_from, reverse=True)
+            rules.extend(picked)
+            seen.update(rule.fee_type for rule in picked)
+
+        if len(self._memo) >= MEMO_MAX_ENTRIES:
+            self._memo.clear()
+        self._memo[key] = rules
+        return rules
+
+    def calculate(
+        self,
+        supplier_id: str,
+        restaurant_id: str,
+        order_amount: Decimal,
+        order_date: date,
+    ) -> Dict[str, Any]:
+        """計算單筆訂單費用（回傳格式同 FeeConfigService.calculate_fee）"""
+        fee_breakdown: Dict[str, Decimal] = {}
+        configs_applied: List[str] = []
+
+        for rule in self.applicable_rules(supplier_id, restaurant_id, order_date):
+            fee = rule.fee_for(order_amount)
+            if fee > 0:
+                fee_breakdown[rule.fee_type] = fee.quantize(CENT)
+                configs_applied.append(rule.id)
+
+        return {
+            "order_amount": order_amount,
+            "fee_breakdown": fee_breakdown,
+            "total_fee": sum(fee_breakdown.values(), ZERO),
+            "fee_configs_applied": configs_applied,
+        }
+
+
+# tenant_id -> (建立時間, 版本號, 索引)
+_indexes: Dict[str, Tuple[float, str, FeeRuleIndex]] = {}
+
+# 背景遞增版本號的 task（完成前保留參照）
+_pending_bumps: set = set()
+
+
+def _redis():
+    return redis_manager.client("billing-fee-rules", url=settings.get_redis_url())
+
+
+async def current_index_version(tenant_id: str) -> Optional[str]:
+    """租戶索引目前的版本號；Redis 無法使用時回傳 None（應重建且不快取）"""
+    breaker = redis_manager.breaker(settings.get_redis_url())
+    if not breaker.allow():
+        return None
+    try:
+        versions = await _redis().mget(VERSION_KEY, f"{VERSION_KEY}:{tenant_id}")
+        breaker.record_success()
+    except Exception as e:
+        breaker.record_failure()
+        logger.warning("fee_rule_index.version_lookup_failed", error=str(e))
+        return None
+    return ":".join(version or "0" for version in versions)
+
+
+def get_cached_index(tenant_id: str, version: Optional[str]) -> Optional[FeeRuleIndex]:
+    """取得版本相同且未過期的租戶索引"""
+    entry = _indexes.get(tenant_id)
+    if (
+        entry
+        and version is not None
+        and entry[1] == version
+        and time.monotonic() - entry[0] < settings.fee_rule_index_ttl_seconds
+    ):
+        return entry[2]
+    return None
+
+
+def store_index(tenant_id: str, index: FeeRuleIndex, version: Optional[str]) -> None:
+    """存入索引；version 須在讀取費率配置之前取得"""
+    if version is not None:
+        _indexes[tenant_id] = (time.monotonic(), version, index)
+
+
+def invalidate_fee_rule_index(tenant_id: Optional[str] = None) -> None:
+    """
+    費率配置變更提交後呼叫：清除本進程的租戶索引（未指定租戶時全部清除），
+    並遞增 Redis 版本號使其他 worker 的索引失效
+    """
+    if tenant_id is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(tenant_id, None)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 同步情境（遷移、腳本）沒有事件迴圈；其他 worker 的索引依 TTL 過期
+        return
+    task = loop.create_task(_bump_version(tenant_id))
+    _pending_bumps.add(task)
+    task.add_done_callback(_pending_bumps.discard)
+
+
+async def _bump_version(tenant_id: Optional[str]) -> None:
+    key = VERSION_KEY if tenant_id is None else f"{VERSION_KEY}:{tenant_id}"
+    try:
+        await redis_manager.run_pipeline(
+            [("INCR", key), ("EXPIRE", key, VERSION_TTL_SECONDS)],
+            name="billing-fee-rules",
+            url=settings.get_redis_url(),
+        )
+    except Exception as e:
+        logger.warning("fee_rule_index.version_bump_failed", tenant_id=tenant_id, error=str(e))
@@ -7,20 +7,30 @@ import structlog
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List, Dict, Any, Tuple
-from uuid import uuid4
-from sqlalchemy import select, func, and_
+from sqlalchemy import Numeric, Select, and_, case, cast, false, func, insert, literal, null, select
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.expression import CTE, Subquery
 
+from orderly_fastapi_core.money import sum_amounts
+
+from app.modules.billing.core.config import settings
 from app.modules.billing.models.reconciliation import Reconciliation, ReconciliationItem
 from app.modules.billing.models.enums import ReconciliationStatus, DiscrepancyType
-from app.modules.billing.schemas.reconciliation import ReconciliationCreate, ReconciliationItemCreate
+from app.modules.billing.schemas.reconciliation import ReconciliationCreate
 from app.modules.billing.services.reconciliation_service import ReconciliationService
 from app.modules.orders.models.enums import OrderStatus
-from app.modules.orders.models.order import Order
+from app.modules.orders.models.order import Order, OrderItem
 
 logger = structlog.get_logger()
 
+# 可進入對帳的訂單狀態
+RECONCILABLE_ORDER_STATUSES = (OrderStatus.DELIVERED, OrderStatus.ACCEPTED, OrderStatus.COMPLETED)
+
+# acceptance_items.acceptedQty 為文字欄位，僅接受純數值內容
+NUMERIC_PATTERN = r"^\s*-?[0-9]+(\.[0-9]+)?\s*$"
+
 
 class ReconciliationEngine:
     """
@@ -40,12 +50,13 @@ class ReconciliationEngine:
         period_start: date,
         period_end: date,
         created_by: Optional[str] = None,
+        commit: bool = True,
     ) -> Reconciliation:
         """
         執行自動對帳
-        1. 從 Order Service 取得期間內的訂單
-        2. 比對訂單與實際驗收數據
-        3. 創建對帳記錄與明細
+        1. 建立對帳表頭
+        2. 於資料庫內以 hash join 比對訂單明細與驗收明細，INSERT ... SELECT 寫入對帳明細
+        3. 以 SQL 聚合計算匯總
         4. 根據信心分數判斷是否自動審核
         """
         logger.info(
@@ -56,51 +67,251 @@ class ReconciliationEngine:
             period=f"{period_start} - {period_end}",
         )
 
-        # Step 1: 取得訂單數據
-        orders = await self._fetch_orders(
-            tenant_id, restaurant_id, supplier_id, period_start, period_end
+        # Step 1: 建立對帳表頭
+        reconciliation = await self.recon_service.new_reconciliation(
+            tenant_id=tenant_id,
+            data=ReconciliationCreate(
+                period_start=period_start,
+                period_end=period_end,
+                restaurant_id=restaurant_id,
+                supplier_id=supplier_id,
+            ),
+            created_by=created_by,
         )
+        self.session.add(reconciliation)
+        await self.session.flush()
 
-        # Step 2: 取得驗收數據（模擬，實際應從 Acceptance Service 取得）
-        acceptances = await self._fetch_acceptances(
-            tenant_id, restaurant_id, supplier_id, period_start, period_end
+        # Step 2: 訂單 ↔ 驗收比對，全部在 SQL 內完成
+        inserted = await self._insert_matched_items(
+            reconciliation.id, tenant_id, restaurant_id, supplier_id, period_start, period_end
         )
 
-        # Step 3: 執行對帳比對
-        items = self._match_orders_with_acceptances(orders, acceptances)
+        # Step 3: 計算匯總
+        await self.recon_service.calculate_summary(reconciliation)
 
-        # Step 4: 創建對帳記錄
-        recon_data = ReconciliationCreate(
-            period_start=period_start,
-            period_end=period_end,
-            restaurant_id=restaurant_id,
-            supplier_id=supplier_id,
-            items=items,
-        )
-
-        reconciliation = await self.recon_service.create_reconciliation(
-            tenant_id=tenant_id,
-            data=recon_data,
-            created_by=created_by,
-        )
-
-        # Step 5: 判斷是否自動審核
+        # Step 4: 判斷是否自動審核
         if await self._should_auto_approve(reconciliation):
             reconciliation.auto_approved = True
             reconciliation.status = ReconciliationStatus.APPROVED
             reconciliation.reviewed_at = datetime.utcnow()
             reconciliation.review_notes = "自動審核通過（信心分數 >= 閾值）"
+
+        if commit:
             await self.session.commit()
+            await self.session.refresh(reconciliation)
+        else:
+            await self.session.flush()
 
         logger.info(
             "reconciliation.auto.complete",
             id=reconciliation.id,
+            items=inserted,
             auto_approved=reconciliation.auto_approved,
             confidence=reconciliation.confidence_score,
         )
 
         return reconciliation
 
+    @staticmethod
+    def _period_order_conditions(
+        tenant_id: str,
+        restaurant_id: str,
+        supplier_id: str,
+        period_start: date,
+        period_end: date,
+    ) -> List[Any]:
+        """期間內可對帳訂單的篩選條件"""
+        return [
+            Order.tenant_id == tenant_id,
+            Order.restaurant_id == restaurant_id,
+            Order.supplier_id == supplier_id,
+            Order.delivery_date >= period_start,
+            Order.delivery_date <= period_end,
+            Order.status.in_(RECONCILABLE_ORDER_STATUSES),
+            Order.is_deleted == False,
+        ]
+
+    def _acceptance_lines(self, order_ids: Select) -> Tuple[CTE, Subquery]:
+        """
+        驗收數據子查詢
+
+        回傳 (latest, lines)：
+        - latest: 每張訂單最新一筆驗收單 (order_id, acceptance_id)
+        - lines: 最新驗收單依 product_code 彙總的驗收數量
+
+        acceptance_items.acceptedQty 為文字欄位，非數值內容視為 NULL
+        （回退至訂單明細上的驗收/交貨數量）。
+        """
+        # 延遲匯入：ORDERLY_MODULES 未列 acceptance 時，載入 billing 不會匯入該模組
+        from app.modules.acceptance.models.acceptance import Acceptance, AcceptanceItem
+
+        latest = (
+            select(
+                Acceptance.order_id.label("order_id"),
+                Acceptance.id.label("acceptance_id"),
+            )
+            .distinct(Acceptance.order_id)
+            .where(Acceptance.order_id.in_(order_ids))
+            .order_by(Acceptance.order_id, Acceptance.created_at.desc())
+            .cte("latest_acceptance")
+        )
+
+        accepted_qty = case(
+            (
+                AcceptanceItem.accepted_qty.regexp_match(NUMERIC_PATTERN),
+                cast(func.trim(AcceptanceItem.accepted_qty), Numeric(15, 3)),
+            ),
+            else_=null(),
+        )
+        lines = (
+            select(
+                latest.c.order_id,
+                AcceptanceItem.product_code.label("product_code"),
+                func.sum(accepted_qty).label("accepted_qty"),
+            )
+            .join(AcceptanceItem, AcceptanceItem.acceptance_id == latest.c.acceptance_id)
+            .group_by(latest.c.order_id, AcceptanceItem.product_code)
+            .subquery("acceptance_lines")
+        )
+        return latest, lines
+
+    def _matched_items_select(
+        self,
+        reconciliation_id: str,
+        tenant_id: str,
+        restaurant_id: str,
+        supplier_id: str,
+        period_start: date,
+        period_end: date,
+    ) -> Select:
+        """
+        訂單明細 ⟕ 驗收明細 的比對查詢（依 order_id + product_code）
+
+        - 有驗收單且含該商品：實際數量 = 驗收數量
+        - 有驗收單但缺該商品：實際數量 = 0，標記 MISSING_ITEM
+        - 無驗收單：回退至訂單明細 accepted/delivered 數量，再回退至訂購數量
+        - 實際單價 = 確認價（時價商品）或訂購單價
+        差異類型優先順序與 ReconciliationService._create_reconciliation_item 相同。
+        """
+        conditions = self._period_order_conditions(
+            tenant_id, restaurant_id, supplier_id, period_start, period_end
+        )
+        order_ids = select(Order.id).where(and_(*conditions))
+        latest, lines = self._acceptance_lines(order_ids)
+
+        missing = and_(latest.c.acceptance_id.isnot(None), lines.c.product_code.is_(None))
+        matched = (
+            select(
+                OrderItem.order_id.label("order_id"),
+                OrderItem.product_code.label("product_code"),
+                OrderItem.product_name.label("product_name"),
+                OrderItem.sku_id.label("sku_code"),
+                OrderItem.quantity.label("expected_quantity"),
+                case(
+                    (missing, literal(Decimal("0"))),
+                    else_=func.coalesce(
+                        lines.c.accepted_qty,
+                        OrderItem.accepted_quantity,
+                        OrderItem.delivered_quantity,
+                        OrderItem.quantity,
+                    ),
+                ).label("actual_quantity"),
+                OrderItem.unit_price.label("expected_price"),
+                func.coalesce(OrderItem.confirmed_price, OrderItem.unit_price).label("actual_price"),
+                missing.label("missing"),
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .outerjoin(latest, latest.c.order_id == OrderItem.order_id)
+            .outerjoin(
+                lines,
+                and_(
+                    lines.c.order_id == OrderItem.order_id,
+                    lines.c.product_code == OrderItem.product_code,
+                ),
+            )
+            .where(and_(*conditions))
+            .subquery("matched")
+        )
+
+        m = matched.c
+        discrepancy_type_col = ReconciliationItem.__table__.c.discrepancy_type
+        discrepancy_type = case(
+            (m.missing, literal(DiscrepancyType.MISSING_ITEM, discrepancy_type_col.type)),
+            (m.actual_quantity != m.expected_quantity, literal(DiscrepancyType.QUANTITY, discrepancy_type_col.type)),
+            (m.actual_price != m.expected_price, literal(DiscrepancyType.PRICE, discrepancy_type_col.type)),
+            else_=literal(DiscrepancyType.NONE, discrepancy_type_col.type),
+        )
+        is_matched = and_(m.actual_quantity == m.expected_quantity, m.actual_price == m.expected_price)
+        expected_amount = m.expected_quantity * m.expected_price
+        actual_amount = m.actual_quantity * m.actual_price
+
+        return select(
+            func.gen_random_uuid(),
+            literal(reconciliation_id, PgUUID(as_uuid=False)),
+            cast(m.order_id, PgUUID(as_uuid=False)),
+            m.product_code,
+            m.product_name,
+            m.sku_code,
+            m.expected_quantity,
+            m.actual_quantity,
+            m.actual_quantity - m.expected_quantity,
+            m.expected_price,
+            m.actual_price,
+            m.actual_price - m.expected_price,
+            expected_amount,
+            actual_amount,
+            actual_amount - expected_amount,
+            discrepancy_type,
+            is_matched,
+            case((is_matched, literal(1.0)), else_=null()),
+            false(),
+            func.now(),
+            func.now(),
+        )
+
+    async def _insert_matched_items(
+        self,
+        reconciliation_id: str,
+        tenant_id: str,
+        restaurant_id: str,
+        supplier_id: str,
+        period_start: date,
+        period_end: date,
+    ) -> int:
+        """以單一 INSERT ... SELECT 寫入對帳明細，回傳寫入筆數"""
+        items = ReconciliationItem.__table__.c
+        stmt = insert(ReconciliationItem).from_select(
+            [
+                items.id,
+                items.reconciliation_id,
+                items.order_id,
+                items.product_code,
+                items.product_name,
+                items.sku_code,
+                items.expected_quantity,
+                items.actual_quantity,
+                items.quantity_difference,
+                items.expected_price,
+                items.actual_price,
+                items.price_difference,
+                items.expected_amount,
+                items.actual_amount,
+                items.amount_difference,
+                items.discrepancy_type,
+                items.is_matched,
+                items.match_confidence,
+                items.manually_adjusted,
+                items.created_at,
+                items.updated_at,
+            ],
+            self._matched_items_select(
+                reconciliation_id, tenant_id, restaurant_id, supplier_id, period_start, period_end
+            ),
+            include_defaults=False,
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount or 0
+
     async def _fetch_orders(
         self,
         tenant_id: str,
@@ -116,15 +327,9 @@ class ReconciliationEngine:
                 .options(selectinload(Order.items))
                 .where(
                     and_(
-                        Order.tenant_id == tenant_id,
-                        Order.restaurant_id == restaurant_id,
-                        Order.supplier_id == supplier_id,
-                        Order.delivery_date >= period_start,
-                        Order.delivery_date <= period_end,
-                        Order.status.in_(
-                            [OrderStatus.DELIVERED, OrderStatus.ACCEPTED, OrderStatus.COMPLETED]
-                        ),
-                        Order.is_deleted == False,
+                        *self._period_order_conditions(
+                            tenant_id, restaurant_id, supplier_id, period_start, period_end
+                        )
                     )
                 )
             )
@@ -157,79 +362,6 @@ class ReconciliationEngine:
             logger.error("reconciliation.fetch_orders.error", error=str(e))
             return []
 
-    async def _fetch_acceptances(
-        self,
-        tenant_id: str,
-        restaurant_id: str,
-        supplier_id: str,
-        period_start: date,
-        period_end: date,
-    ) -> List[Dict[str, Any]]:
-        """從 Acceptance Service 取得驗收數據（模擬）"""
-        # TODO: 實際整合 Acceptance Service
-        # 目前返回空列表，對帳將基於訂單數據
-        return []
-
-    def _match_orders_with_acceptances(
-        self,
-        orders: List[Dict[str, Any]],
-        acceptances: List[Dict[str, Any]],
-    ) -> List[ReconciliationItemCreate]:
-        """
-        比對訂單與驗收數據
-        實現 Database-Schema-Core.md 中的對帳配對邏輯
-        """
-        items: List[ReconciliationItemCreate] = []
-
-        # 建立驗收數據索引（以 order_id + product_code 為 key）
-        acceptance_map: Dict[str, Dict] = {}
-        for acc in acceptances:
-            key = f"{acc.get('orderId')}_{acc.get('productCode')}"
-            acceptance_map[key] = acc
-
-        # 遍歷訂單明細進行比對
-        for order in orders:
-            order_id = order.get("id")
-            order_items = order.get("items", [])
-
-            for item in order_items:
-                product_code = item.get("productCode", "")
-                key = f"{order_id}_{product_code}"
-
-                expected_qty = Decimal(str(item.get("quantity", 0)))
-                expected_price = Decimal(str(item.get("unitPrice", 0)))
-
-                # 查找對應的驗收數據
-                acc_data = acceptance_map.get(key)
-                if acc_data:
-                    actual_qty = Decimal(str(acc_data.get("actualQuantity", expected_qty)))
-                    actual_price = Decimal(str(acc_data.get("actualPrice", expected_price)))
-                else:
-                    # 無驗收數據，假設與訂單一致
-                    actual_qty = expected_qty
-                    actual_price = expected_price
-
-                # 判斷差異類型
-                discrepancy_type = None
-                if actual_qty != expected_qty:
-                    discrepancy_type = DiscrepancyType.QUANTITY
-                elif actual_price != expected_price:
-                    discrepancy_type = DiscrepancyType.PRICE
-
-                items.append(ReconciliationItemCreate(
-                    product_code=product_code,
-                    product_name=item.get("productName"),
-                    sku_code=item.get("skuCode"),
-                    order_id=order_id,
-                    expected_quantity=expected_qty,
-                    actual_quantity=actual_qty,
-                    expected_price=expected_price,
-                    actual_price=actual_price,
-                    discrepancy_type=discrepancy_type,
-                ))
-
-        return items
-
     async def _should_auto_approve(self, reconciliation: Reconciliation) -> bool:
         """
         判斷是否自動審核通過
@@ -280,10 +412,7 @@ class ReconciliationEngine:
             if o.get("id") not in reconciled_order_ids
         ]
 
-        total_amount = sum(
-            Decimal(str(o.get("totalAmount", 0)))
-            for o in candidates
-        )
+        total_amount = sum_amounts(o.get("totalAmount", 0) for o in candidates)
 
         return {
             "candidates": candidates,
@@ -7,11 +7,12 @@ import structlog
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List, Dict, Any, Tuple
-from uuid import uuid4
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from orderly_fastapi_core.ids import new_id, number_allocator
+
 from app.modules.billing.models.reconciliation import Reconciliation, ReconciliationItem
 from app.modules.billing.models.enums import ReconciliationStatus, DiscrepancyType
 from app.modules.billing.schemas.reconciliation import (
@@ -32,13 +33,12 @@ class ReconciliationService:
 
     # ============ 編號生成 ============
 
-    @staticmethod
-    def generate_reconciliation_number(tenant_id: str) -> str:
-        """生成對帳編號: REC-{tenant_prefix}-{timestamp}-{random}"""
+    async def generate_reconciliation_number(self, tenant_id: str) -> str:
+        """生成對帳編號: REC-{tenant_prefix}-{YYYYMMDD}-{每日流水號}"""
         tenant_prefix = tenant_id[:8].upper() if tenant_id else "XXXX"
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M")
-        random_suffix = str(uuid4())[:4].upper()
-        return f"REC-{tenant_prefix}-{timestamp}-{random_suffix}"
+        return await number_allocator.next_number(
+            self.session, "reconciliation", f"REC-{tenant_prefix}", width=5
+        )
 
     # ============ 核心 CRUD ============
 
@@ -51,19 +51,7 @@ class ReconciliationService:
         """創建對帳記錄"""
         logger.info("reconciliation.create", tenant_id=tenant_id, period_start=str(data.period_start))
 
-        reconciliation = Reconciliation(
-            id=str(uuid4()),
-            reconciliation_number=self.generate_reconciliation_number(tenant_id),
-            tenant_id=tenant_id,
-            restaurant_id=data.restaurant_id,
-            supplier_id=data.supplier_id,
-            period_start=data.period_start,
-            period_end=data.period_end,
-            status=ReconciliationStatus.PENDING,
-            summary={},
-            created_by=created_by,
-        )
-
+        reconciliation = await self.new_reconciliation(tenant_id, data, created_by)
         self.session.add(reconciliation)
 
         # 添加明細
@@ -75,7 +63,7 @@ class ReconciliationService:
         await self.session.flush()
 
         # 計算匯總
-        await self._calculate_summary(reconciliation)
+        await self.calculate_summary(reconciliation)
 
         await self.session.commit()
         await self.session.refresh(reconciliation)
@@ -83,6 +71,26 @@ class ReconciliationService:
         logger.info("reconciliation.created", id=reconciliation.id, number=reconciliation.reconciliation_number)
         return reconciliation
 
+    async def new_reconciliation(
+        self,
+        tenant_id: str,
+        data: ReconciliationCreate,
+        created_by: Optional[str] = None,
+    ) -> Reconciliation:
+        """建立對帳表頭（不含明細，未加入 session）"""
+        return Reconciliation(
+            id=new_id(),
+            reconciliation_number=await self.generate_reconciliation_number(tenant_id),
+            tenant_id=tenant_id,
+            restaurant_id=data.restaurant_id,
+            supplier_id=data.supplier_id,
+            period_start=data.period_start,
+            period_end=data.period_end,
+            status=ReconciliationStatus.PENDING,
+            summary={},
+            created_by=created_by,
+        )
+
     def _create_reconciliation_item(
         self,
         reconciliation_id: str,
@@ -111,7 +119,7 @@ class ReconciliationService:
         is_matched = (discrepancy_type == DiscrepancyType.NONE)
 
         return ReconciliationItem(
-            id=str(uuid4()),
+            id=new_id(),
             reconciliation_id=reconciliation_id,
             order_id=data.order_id,
             product_code=data.product_code,
@@ -132,11 +140,12 @@ class ReconciliationService:
             match_confidence=1.0 if is_matched else None,
         )
 
-    async def _calculate_summary(self, reconciliation: Reconciliation) -> None:
+    async def calculate_summary(self, reconciliation: Reconciliation) -> None:
         """計算對帳匯總"""
         result = await self.session.execute(
             select(
                 func.count(ReconciliationItem.id).label("total_items"),
+                func.count(func.distinct(ReconciliationItem.order_id)).label("total_orders"),
                 func.sum(ReconciliationItem.expected_amount).label("total_expected"),
                 func.sum(ReconciliationItem.actual_amount).label("total_actual"),
                 func.sum(func.abs(ReconciliationItem.amount_difference)).label("total_discrepancy"),
@@ -148,6 +157,7 @@ class ReconciliationService:
         row = result.one()
 
         total_items = row.total_items or 0
+        total_orders = row.total_orders or 0
         total_expected = row.total_expected or Decimal("0")
         total_actual = row.total_actual or Decimal("0")
         total_discrepancy = row.total_discrepancy or Decimal("0")
@@ -180,12 +190,14 @@ class ReconciliationService:
         }
 
         # 更新匯總
+        reconciliation.total_orders = total_orders
         reconciliation.total_items = total_items
         reconciliation.total_amount = total_expected
         reconciliation.matched_amount = total_expected - total_discrepancy
         reconciliation.discrepancy_amount = total_discrepancy
         reconciliation.confidence_score = confidence_score
         reconciliation.summary = {
+            "total_orders": total_orders,
             "total_items": total_items,
             "total_amount": str(total_expected),
             "matched_amount": str(total_expected - total_discrepancy),
@@ -449,7 +461,7 @@ class ReconciliationService:
 
         # 重新計算匯總
         await self.session.flush()
-        await self._calculate_summary(reconciliation)
+        await self.calculate_summary(reconciliation)
 
         await self.session.commit()
         await self.session.refresh(item)
@@ -2,7 +2,8 @@
 Bulk Operations API endpoints for batch processing
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 
@@ -28,7 +29,18 @@ from app.modules.customer_hierarchy.schemas.bulk import (
 from app.modules.customer_hierarchy.schemas.common import SuccessResponseSchema
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
+from app.modules.customer_hierarchy.services.hierarchy.export_store import get_export, iter_export_content
 from app.modules.customer_hierarchy.services.bulk_service import BulkService
+from orderly_fastapi_core.background_jobs import background_jobs
+from app.modules.customer_hierarchy.services.job_handlers import (
+    BULK_CREATE_JOB,
+    BULK_UPDATE_JOB,
+    BULK_DELETE_JOB,
+    BULK_MOVE_JOB,
+    BULK_IMPORT_JOB,
+    BULK_EXPORT_JOB,
+    bulk_payload
+)
 import structlog
 
 logger = structlog.get_logger(__name__)
@@ -39,7 +51,6 @@ router = APIRouter()
 async def bulk_create_entities(
     request: Request,
     bulk_data: BulkCreateRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -81,14 +92,13 @@ async def bulk_create_entities(
             user_context=hierarchy_context
         )
         
-        # Schedule background processing for large operations
+        # Queue durable background processing for large operations
         if len(bulk_data.entities) > bulk_data.batch_size:
-            background_tasks.add_task(
-                bulk_service.process_bulk_create_background,
-                operation_id=operation_result["operation_id"],
-                bulk_data=bulk_data,
-                user_id=user_id,
-                user_context=hierarchy_context
+            await background_jobs.submit_job(
+                BULK_CREATE_JOB,
+                bulk_payload(operation_result["operation_id"], "bulk_data", bulk_data, user_id, hierarchy_context),
+                created_by=user_id,
+                metadata={"operation_id": operation_result["operation_id"], "correlation_id": correlation_id}
             )
         
         # Log business event
@@ -130,7 +140,6 @@ async def bulk_create_entities(
 async def bulk_update_entities(
     request: Request,
     bulk_data: BulkUpdateRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -171,14 +180,13 @@ async def bulk_update_entities(
             user_context=hierarchy_context
         )
         
-        # Schedule background processing for large operations
+        # Queue durable background processing for large operations
         if len(bulk_data.updates) > bulk_data.batch_size:
-            background_tasks.add_task(
-                bulk_service.process_bulk_update_background,
-                operation_id=operation_result["operation_id"],
-                bulk_data=bulk_data,
-                user_id=user_id,
-                user_context=hierarchy_context
+            await background_jobs.submit_job(
+                BULK_UPDATE_JOB,
+                bulk_payload(operation_result["operation_id"], "bulk_data", bulk_data, user_id, hierarchy_context),
+                created_by=user_id,
+                metadata={"operation_id": operation_result["operation_id"], "correlation_id": correlation_id}
             )
         
         # Log business event
@@ -213,7 +221,6 @@ async def bulk_update_entities(
 async def bulk_delete_entities(
     request: Request,
     bulk_data: BulkDeleteRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -255,14 +262,13 @@ async def bulk_delete_entities(
             user_context=hierarchy_context
         )
         
-        # Schedule background processing for large operations
+        # Queue durable background processing for large operations
         if len(bulk_data.entities) > bulk_data.batch_size:
-            background_tasks.add_task(
-                bulk_service.process_bulk_delete_background,
-                operation_id=operation_result["operation_id"],
-                bulk_data=bulk_data,
-                user_id=user_id,
-                user_context=hierarchy_context
+            await background_jobs.submit_job(
+                BULK_DELETE_JOB,
+                bulk_payload(operation_result["operation_id"], "bulk_data", bulk_data, user_id, hierarchy_context),
+                created_by=user_id,
+                metadata={"operation_id": operation_result["operation_id"], "correlation_id": correlation_id}
             )
         
         # Log business event
@@ -336,7 +342,6 @@ async def bulk_validate_entities(
 async def bulk_move_entities(
     request: Request,
     move_data: BulkMoveRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -377,14 +382,13 @@ async def bulk_move_entities(
             user_context=hierarchy_context
         )
         
-        # Schedule background processing for large operations
+        # Queue durable background processing for large operations
         if len(move_data.moves) > move_data.batch_size:
-            background_tasks.add_task(
-                bulk_service.process_bulk_move_background,
-                operation_id=operation_result["operation_id"],
-                move_data=move_data,
-                user_id=user_id,
-                user_context=hierarchy_context
+            await background_jobs.submit_job(
+                BULK_MOVE_JOB,
+                bulk_payload(operation_result["operation_id"], "move_data", move_data, user_id, hierarchy_context),
+                created_by=user_id,
+                metadata={"operation_id": operation_result["operation_id"], "correlation_id": correlation_id}
             )
         
         # Log business event
@@ -419,7 +423,6 @@ async def bulk_move_entities(
 async def bulk_import_data(
     request: Request,
     import_data: BulkImportRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -460,13 +463,12 @@ async def bulk_import_data(
             user_context=hierarchy_context
         )
         
-        # Schedule background processing
-        background_tasks.add_task(
-            bulk_service.process_bulk_import_background,
-            operation_id=operation_result["operation_id"],
-            import_data=import_data,
-            user_id=user_id,
-            user_context=hierarchy_context
+        # Queue durable background processing
+        await background_jobs.submit_job(
+            BULK_IMPORT_JOB,
+            bulk_payload(operation_result["operation_id"], "import_data", import_data, user_id, hierarchy_context),
+            created_by=user_id,
+            metadata={"operation_id": operation_result["operation_id"], "correlation_id": correlation_id}
         )
         
         # Log business event
@@ -501,7 +503,6 @@ async def bulk_import_data(
 async def bulk_export_data(
     request: Request,
     export_data: BulkExportRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -529,13 +530,12 @@ async def bulk_export_data(
             user_context=hierarchy_context
         )
         
-        # Schedule background processing
-        background_tasks.add_task(
-            bulk_service.process_bulk_export_background,
-            operation_id=operation_result["operation_id"],
-            export_data=export_data,
-            user_id=user_id,
-            user_context=hierarchy_context
+        # Queue durable background processing
+        await background_jobs.submit_job(
+            BULK_EXPORT_JOB,
+            bulk_payload(operation_result["operation_id"], "export_data", export_data, user_id, hierarchy_context),
+            created_by=user_id,
+            metadata={"operation_id": operation_result["operation_id"], "correlation_id": correlation_id}
         )
         
         # Log business event
@@ -609,6 +609,48 @@ async def get_bulk_operation_status(
         )
 
 
+@router.get("/operations/{operation_id}/download")
+async def download_bulk_export(
+    request: Request,
+    operation_id: str,
+    db: AsyncSession = Depends(get_database),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Download the file of a completed bulk export
+
+    Exports are stored in the database, so any instance can serve them until
+    they expire (export_retention_hours).
+    """
+    correlation_id = get_correlation_id(request)
+    user_id = current_user.get("sub")
+
+    export = await get_export(db, operation_id)
+    if export is None or (export.created_by and export.created_by != user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Export {operation_id} not found or expired"
+        )
+
+    logger.info(
+        "Downloading bulk export",
+        operation_id=operation_id,
+        user_id=user_id,
+        size_bytes=export.size_bytes,
+        correlation_id=correlation_id
+    )
+
+    # The body runs after this request's session is released, so the stream opens its own
+    return StreamingResponse(
+        iter_export_content(operation_id),
+        media_type=export.content_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{export.filename}"',
+            "Content-Length": str(export.size_bytes),
+        }
+    )
+
+
 @router.get("/operations/{operation_id}/progress", response_model=BulkOperationProgressSchema)
 async def get_bulk_operation_progress(
     request: Request,
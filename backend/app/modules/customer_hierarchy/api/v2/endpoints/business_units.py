@@ -24,6 +24,7 @@ from app.modules.customer_hierarchy.schemas.business_unit import (
 )
 from app.modules.customer_hierarchy.schemas.common import SuccessResponseSchema
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context
+from app.modules.customer_hierarchy.services.access_index_service import apply_access_scope
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
 import structlog
 
@@ -61,6 +62,8 @@ async def list_business_units(
     )
     
     try:
+        # Restrict every query below to the nodes this user may see
+        await apply_access_scope(db, hierarchy_context)
         if name_contains:
             # Search business units by name
             business_units = await business_unit_crud.search_business_units(
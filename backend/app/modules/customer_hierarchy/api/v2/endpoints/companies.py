@@ -23,6 +23,7 @@ from app.modules.customer_hierarchy.schemas.company import (
 )
 from app.modules.customer_hierarchy.schemas.common import SuccessResponseSchema
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context
+from app.modules.customer_hierarchy.services.access_index_service import apply_access_scope
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
 import structlog
 
@@ -59,6 +60,8 @@ async def list_companies(
     )
     
     try:
+        # Restrict every query below to the nodes this user may see
+        await apply_access_scope(db, hierarchy_context)
         if name_contains:
             # Search companies by name/tax ID
             companies = await company_crud.search_companies(
@@ -25,6 +25,7 @@ from app.modules.customer_hierarchy.schemas.common import (
     PaginationSchema
 )
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context, require_permission
+from app.modules.customer_hierarchy.services.access_index_service import apply_access_scope
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
 import structlog
 
@@ -59,6 +60,7 @@ async def list_groups(
     
     try:
         # Apply hierarchy-based filtering
+        await apply_access_scope(db, hierarchy_context)
         groups = await group_crud.get_multi(
             db,
             skip=skip,
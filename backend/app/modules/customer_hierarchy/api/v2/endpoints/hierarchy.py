@@ -2,29 +2,41 @@
 Hierarchy Tree API endpoints for cross-level operations
 """
 
+import time
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any, Union
 
-from app.modules.customer_hierarchy.core.database import get_database
+from app.modules.customer_hierarchy.core.database import get_database, get_read_database
 from app.modules.customer_hierarchy.schemas.hierarchy import (
     TreeResponseSchema,
     HierarchyNodeSchema,
     SearchResponseSchema,
     SearchResultSchema,
+    HierarchyNodeType,
     HierarchySearchRequestSchema,
     HierarchyBreadcrumbSchema,
     HierarchyMoveRequestSchema,
     HierarchyValidationSchema,
     HierarchyStatsSchema,
-    HierarchyExportSchema,
     HierarchyImportSchema,
     HierarchyStructureSchema
 )
 from app.modules.customer_hierarchy.schemas.common import SuccessResponseSchema
+from app.modules.customer_hierarchy.schemas.activity import DashboardMetricsResponse
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
 from app.modules.customer_hierarchy.services.hierarchy_service import HierarchyService
+from app.modules.customer_hierarchy.services.access_index_service import hierarchy_access
+from app.modules.customer_hierarchy.services.cache_enhanced_service import EnhancedCacheService
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import LEVEL_ORDER, normalize_type
+from app.modules.customer_hierarchy.services.hierarchy.export_engine import (
+    HierarchyExportEngine,
+    export_media,
+    stream_export,
+)
 import structlog
 
 logger = structlog.get_logger(__name__)
@@ -39,7 +51,7 @@ async def get_hierarchy_tree(
     include_inactive: bool = Query(False, description="Include inactive entities"),
     include_stats: bool = Query(False, description="Include statistics for each node"),
     node_types: Optional[List[str]] = Query(None, description="Filter by node types: group, company, location, unit"),
-    db: AsyncSession = Depends(get_database),
+    db: AsyncSession = Depends(get_read_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -97,7 +109,7 @@ async def get_hierarchy_tree(
 async def search_hierarchy(
     request: Request,
     search_request: HierarchySearchRequestSchema,
-    db: AsyncSession = Depends(get_database),
+    db: AsyncSession = Depends(get_read_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -123,12 +135,10 @@ async def search_hierarchy(
             filters=search_request.filters,
             limit=search_request.limit,
             include_inactive=search_request.include_inactive,
-            user_context=hierarchy_context
+            user_context=hierarchy_context,
+            fuzzy=search_request.fuzzy
         )
         
-        # Transform to frontend-compatible format
-        import time
-        
         response = SearchResponseSchema(
             results=search_results.get("results", []),
             totalCount=search_results.get("total_matches", 0),
@@ -150,6 +160,57 @@ async def search_hierarchy(
         )
 
 
+@router.get("/typeahead", response_model=SearchResponseSchema)
+async def hierarchy_typeahead(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="Name prefix"),
+    types: List[HierarchyNodeType] = Query(
+        [HierarchyNodeType.COMPANY, HierarchyNodeType.LOCATION],
+        description="Node types to match"
+    ),
+    parent_id: Optional[str] = Query(None, description="Restrict to children of this node"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results"),
+    include_inactive: bool = Query(False, description="Include inactive nodes"),
+    db: AsyncSession = Depends(get_read_database),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Prefix lookup for company/location pickers, ordered by name
+    """
+    hierarchy_context = get_hierarchy_context(request)
+    started = time.perf_counter()
+    
+    try:
+        hierarchy_service = HierarchyService(db)
+        
+        results = await hierarchy_service.typeahead(
+            prefix=q,
+            types=types,
+            parent_id=parent_id,
+            limit=limit,
+            include_inactive=include_inactive,
+            user_context=hierarchy_context
+        )
+        
+        return SearchResponseSchema(
+            results=results,
+            totalCount=len(results),
+            queryTime=(time.perf_counter() - started) * 1000
+        )
+        
+    except Exception as e:
+        logger.error(
+            "Failed hierarchy typeahead",
+            error=str(e),
+            user_id=current_user.get("sub"),
+            correlation_id=get_correlation_id(request)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search hierarchy"
+        )
+
+
 @router.get("/breadcrumb/{node_id}", response_model=HierarchyBreadcrumbSchema)
 async def get_hierarchy_breadcrumb(
     request: Request,
@@ -350,7 +411,7 @@ async def get_hierarchy_stats(
     request: Request,
     root_id: Optional[str] = Query(None, description="Root node ID for scoped stats"),
     include_inactive: bool = Query(False, description="Include inactive entities in stats"),
-    db: AsyncSession = Depends(get_database),
+    db: AsyncSession = Depends(get_read_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -382,10 +443,70 @@ async def get_hierarchy_stats(
         )
 
 
-@router.get("/export", response_model=HierarchyExportSchema)
+@router.get("/metrics", response_model=DashboardMetricsResponse)
+async def get_dashboard_metrics(
+    request: Request,
+    include_cache_info: bool = Query(False, description="Include cache information"),
+    scope_type: Optional[str] = Query(None, description="Limit to the subtree of this entity type (group/company/location/business_unit)"),
+    scope_id: Optional[str] = Query(None, description="Root entity ID of the scope"),
+    db: AsyncSession = Depends(get_database),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get overall (or per-scope) dashboard metrics and activity summary
+
+    The scope is checked against the caller's access index before it is read,
+    so only scopes the caller may see are registered for background refresh.
+    Users limited to part of the hierarchy must name one of their scopes.
+    """
+    hierarchy_context = get_hierarchy_context(request)
+    correlation_id = get_correlation_id(request)
+
+    scope = None
+    if scope_type or scope_id:
+        scope_type = normalize_type(scope_type)
+        if scope_type not in LEVEL_ORDER or not scope_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"scope_type must be one of {', '.join(LEVEL_ORDER)} and scope_id is required",
+            )
+        scope = (scope_type, scope_id)
+
+    access = await hierarchy_access.for_context(db, hierarchy_context)
+    if scope is None and access.scoped:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="scope_type and scope_id are required for users with a limited hierarchy scope"
+        )
+    if scope is not None and not access.can_access(*scope):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Node {scope_id} not found or access denied"
+        )
+
+    try:
+        cache = EnhancedCacheService(db)
+        await cache.initialize_redis()
+        return await cache.get_dashboard_metrics_cached(include_cache_info, scope=scope)
+
+    except Exception as e:
+        logger.error(
+            "Failed to get dashboard metrics",
+            error=str(e),
+            scope_type=scope_type,
+            scope_id=scope_id,
+            correlation_id=correlation_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch dashboard metrics"
+        )
+
+
+@router.get("/export")
 async def export_hierarchy(
     request: Request,
-    format: str = Query("json", description="Export format: json, csv, xlsx"),
+    format: str = Query("json", description="Export format: json, csv, ndjson, xlsx"),
     root_id: Optional[str] = Query(None, description="Root node ID to export from"),
     include_inactive: bool = Query(False, description="Include inactive entities"),
     max_depth: Optional[int] = Query(None, ge=1, le=10, description="Maximum depth to export"),
@@ -394,6 +515,10 @@ async def export_hierarchy(
 ):
     """
     Export hierarchy structure
+
+    Rows are streamed in depth-first order from a server-side cursor, so the
+    response starts immediately and memory does not grow with the chain size.
+    Only nodes in the caller's access index are exported.
     """
     hierarchy_context = get_hierarchy_context(request)
     correlation_id = get_correlation_id(request)
@@ -408,17 +533,22 @@ async def export_hierarchy(
     )
     
     try:
-        hierarchy_service = HierarchyService(db)
-        
-        export_result = await hierarchy_service.export_hierarchy(
-            format=format,
-            root_id=root_id,
-            include_inactive=include_inactive,
-            max_depth=max_depth,
-            user_context=hierarchy_context,
-            exported_by=user_id
-        )
-        
+        media = export_media(format)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        access = await hierarchy_access.for_context(db, hierarchy_context)
+        root_type = None
+        if root_id:
+            try:
+                root_type = await HierarchyExportEngine(db, access=access).resolve_root_type(root_id)
+            except LookupError:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Node {root_id} not found or access denied"
+                )
+
         # Log business event
         log_business_event(
             event_type="hierarchy_exported",
@@ -429,9 +559,24 @@ async def export_hierarchy(
             correlation_id=correlation_id,
             format=format
         )
+
+        filename = f"hierarchy_export_{time.strftime('%Y%m%d_%H%M%S', time.gmtime())}.{media['extension']}"
+        # The body runs after this request's session is released, so the stream opens its own
+        return StreamingResponse(
+            stream_export(
+                format,
+                access=access,
+                root_id=root_id,
+                include_inactive=include_inactive,
+                max_depth=max_depth,
+                root_type=root_type
+            ),
+            media_type=media["content_type"],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
         
-        return HierarchyExportSchema(**export_result)
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "Failed to export hierarchy",
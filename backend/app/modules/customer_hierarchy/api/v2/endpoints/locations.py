@@ -21,6 +21,7 @@ from app.modules.customer_hierarchy.schemas.location import (
 )
 from app.modules.customer_hierarchy.schemas.common import SuccessResponseSchema
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context
+from app.modules.customer_hierarchy.services.access_index_service import apply_access_scope
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
 import structlog
 
@@ -60,6 +61,8 @@ async def list_locations(
     )
     
     try:
+        # Restrict every query below to the nodes this user may see
+        await apply_access_scope(db, hierarchy_context)
         if latitude and longitude and radius_km:
             # Geographic search
             locations = await location_crud.search_by_location(
@@ -2,7 +2,7 @@
 Data Migration API endpoints for hierarchy upgrades
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 
@@ -24,6 +24,8 @@ from app.modules.customer_hierarchy.schemas.common import SuccessResponseSchema
 from app.modules.customer_hierarchy.middleware.auth import get_current_user, get_hierarchy_context
 from app.modules.customer_hierarchy.middleware.logging import log_business_event, get_correlation_id
 from app.modules.customer_hierarchy.services.migration_service import MigrationService
+from orderly_fastapi_core.background_jobs import JobPriority, background_jobs
+from app.modules.customer_hierarchy.services.job_handlers import MIGRATION_EXECUTE_JOB
 import structlog
 
 logger = structlog.get_logger(__name__)
@@ -308,7 +310,6 @@ async def preview_migration(
 async def execute_migration(
     request: Request,
     plan_id: str,
-    background_tasks: BackgroundTasks,
     force_execute: bool = Query(False, description="Force execution even with warnings"),
     db: AsyncSession = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -349,12 +350,17 @@ async def execute_migration(
             force_execute=force_execute
         )
         
-        # Schedule background execution
-        background_tasks.add_task(
-            migration_service.execute_migration_background,
-            plan_id=plan_id,
-            execution_id=execution_result["execution_id"],
-            user_id=user_id
+        # Queue durable background execution
+        await background_jobs.submit_job(
+            MIGRATION_EXECUTE_JOB,
+            {
+                "plan_id": plan_id,
+                "execution_id": execution_result["execution_id"],
+                "user_id": user_id
+            },
+            priority=JobPriority.HIGH,
+            created_by=user_id,
+            metadata={"plan_id": plan_id, "correlation_id": correlation_id}
         )
         
         # Log business event
@@ -43,6 +43,7 @@ class CustomerHierarchyServiceSettings(UnifiedSettings):
     cache_tree_ttl: int = Field(default=600, description="層級樹緩存 TTL（10分鐘）")
     cache_entity_ttl: int = Field(default=300, description="個別實體緩存 TTL（5分鐘）")
     redis_ttl: int = Field(default=300, description="Redis 預設 TTL（5分鐘）")
+    cache_access_index_ttl: int = Field(default=900, description="使用者層級存取索引緩存 TTL（15分鐘）")
     cache_mode: str = Field(default="degraded", description="快取運作模式：strict｜degraded｜off")
     
     # 客戶管理配置
@@ -111,6 +112,21 @@ class CustomerHierarchyServiceSettings(UnifiedSettings):
     enable_data_export: bool = Field(default=True, description="啟用資料匯出")
     max_import_file_size_mb: int = Field(default=100, description="最大匯入檔案大小（MB）")
     supported_import_formats: str = Field(default="csv,xlsx,json", description="支援的匯入格式")
+    export_batch_size: int = Field(default=1000, description="匯出時伺服器端游標每批讀取筆數")
+    export_dir: str = Field(default="/tmp/exports/hierarchy", description="匯出暫存檔案目錄")
+    export_retention_hours: int = Field(default=24, description="批量匯出檔案保留時數（到期後由維護迴圈刪除）")
+    export_download_chunk_size: int = Field(default=1024 * 1024, description="下載批量匯出檔案時每次讀取位元組數")
+    export_store_chunk_size: int = Field(default=1024 * 1024, description="批量匯出檔案寫入資料庫時每次附加位元組數")
+
+    # 背景維護（過期匯出清理、異動紀錄分區預建等）
+    enable_maintenance_loop: bool = Field(default=True, description="在本程序背景執行層級維護工作")
+    maintenance_interval_seconds: int = Field(default=3600, description="層級維護工作執行間隔（秒）")
+    
+    # 儀表板預先計算（refresh-ahead）
+    enable_dashboard_refresh: bool = Field(default=True, description="在本程序背景預先計算儀表板指標")
+    dashboard_refresh_interval: int = Field(default=300, description="儀表板指標最長重算間隔（秒）")
+    dashboard_refresh_poll_seconds: float = Field(default=15.0, description="檢查活動資料是否變更的輪詢間隔（秒）")
+    dashboard_scope_idle_seconds: int = Field(default=3600, description="範圍（集團/公司等）多久未被查詢即停止預先計算（秒）")
     
     # 業務邏輯驗證
     enable_duplicate_detection: bool = Field(default=True, description="啟用重複檢測")
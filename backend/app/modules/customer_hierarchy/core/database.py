@@ -9,7 +9,7 @@ import structlog
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from orderly_fastapi_core import create_db_engines, get_async_session_dependency
+from orderly_fastapi_core import create_db_engines, get_async_session_dependency, get_read_session_dependency
 
 from .config import settings
 
@@ -25,6 +25,8 @@ from app.modules.customer_hierarchy.models import Base as Base  # re-export for
 # Dependency for FastAPI - primary async session getter
 get_database = get_async_session_dependency(AsyncSessionLocal)
 get_async_db = get_database  # Alias for compatibility
+# Read-only endpoints (tree, search, stats) - may be routed to a read replica
+get_read_database = get_read_session_dependency(AsyncSessionLocal)
 
 
 def get_sync_db():
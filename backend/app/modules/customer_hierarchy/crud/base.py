@@ -120,12 +120,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         
         try:
-            await db.commit()
-            await db.refresh(db_obj)
-            
-            # Log creation
+            # Log creation (written to entity_change_log by this commit)
             db_obj.audit_log('created', created_by)
             await db.commit()
+            await db.refresh(db_obj)
             
             logger.info(
                 "Entity created",
@@ -166,12 +164,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 setattr(db_obj, field, value)
         
         try:
-            await db.commit()
-            await db.refresh(db_obj)
-            
-            # Log update
+            # Log update (written to entity_change_log by this commit)
             db_obj.audit_log('updated', updated_by, obj_data)
             await db.commit()
+            await db.refresh(db_obj)
             
             logger.info(
                 "Entity updated",
@@ -16,14 +16,15 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
 # Add libs path for orderly_fastapi_core
-from orderly_fastapi_core import mask_database_url, get_db_info
+from orderly_fastapi_core import dispose_shared_engine, get_db_info, get_settings as get_core_settings, mask_database_url
 
 from app.modules.customer_hierarchy.core.config import settings
 from app.modules.customer_hierarchy.core.database import async_engine as engine, check_db_health
-from app.modules.customer_hierarchy.api.v2 import router as api_v2_router
+from app.modules.customer_hierarchy.module import module
 from app.modules.customer_hierarchy.middleware.auth import AuthMiddleware
 from app.modules.customer_hierarchy.middleware.error_handler import ErrorHandlerMiddleware
 from app.modules.customer_hierarchy.middleware.logging import LoggingMiddleware
+from orderly_fastapi_core.background_jobs import background_jobs
 
 logger = structlog.get_logger(__name__)
 
@@ -37,9 +38,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("db.config_log_failed", error=str(e))
     logger.info("Database connection will be verified on first health check")
+    await module.startup()
+    if get_core_settings().enable_background_workers:
+        await background_jobs.start()
     yield
     logger.info("customer-hierarchy-service.stop")
-    await engine.dispose()
+    await background_jobs.stop()
+    await module.shutdown()
+    await dispose_shared_engine()
 
 
 # FastAPI application instance
@@ -186,21 +192,8 @@ async def db_info_endpoint() -> Dict[str, Any]:
     return result
 
 
-# Metrics endpoint for Prometheus
-@app.get("/metrics", tags=["Monitoring"])
-async def get_metrics():
-    """Prometheus metrics endpoint"""
-    # This would return Prometheus-formatted metrics
-    # For now, return a placeholder
-    return {"metrics": "# HELP hierarchy_requests_total Total hierarchy requests"}
-
-
-# Include API routers
-app.include_router(
-    api_v2_router,
-    prefix=settings.api_v2_str,
-    tags=["API v2"]
-)
+# Include API routers (v2 API and metrics)
+app.include_router(module.router)
 
 # Note: All hierarchy endpoints now handled by the v2 router
 # Removed compatibility endpoints since proper v2 router is working
@@ -8,7 +8,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import time
 import structlog
-from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 
 from app.modules.customer_hierarchy.core.config import settings
@@ -16,7 +15,7 @@ from app.modules.customer_hierarchy.core.database import init_db, close_db, chec
 from app.modules.customer_hierarchy.models import CustomerGroup, CustomerCompany, CustomerLocation, BusinessUnit
 from app.modules.customer_hierarchy.schemas.activity import (
     ActivityQueryParams, PerformanceQueryParams, TrendQueryParams,
-    DashboardMetricsResponse, ActivityAnalyticsResponse, 
+    ActivityAnalyticsResponse, 
     EntityActivitySummary, ActivityMetricsResponse, PerformanceRankingResponse,
     DashboardSummaryResponse, ActivityLevel, EntityType
 )
@@ -427,68 +426,7 @@ async def search_hierarchy(
 
 
 # Activity and Analytics API endpoints
-@app.get("/api/v2/hierarchy/metrics", response_model=DashboardMetricsResponse)
-async def get_dashboard_metrics(
-    include_cache_info: bool = Query(False, description="Include cache information"),
-    session: AsyncSession = Depends(get_async_session)
-):
-    """Get overall dashboard metrics and activity summary"""
-    try:
-        global cache_service
-        
-        # Use cached service if available, otherwise fallback to direct calculation
-        if cache_service:
-            # Initialize cache service with current session
-            cache_service.session = session
-            return await cache_service.get_dashboard_metrics_cached(include_cache_info)
-        else:
-            # Fallback to direct calculation
-            logger.info("Cache service unavailable, calculating directly")
-            
-            activity_service = ActivityScoringService(session)
-            activity_metrics = await activity_service.calculate_all_entity_scores()
-            dashboard_summary = await activity_service.generate_dashboard_summary(activity_metrics)
-            top_performers = await activity_service.get_top_performers(activity_metrics, limit=10)
-            
-            # Get other insights
-            attention_needed = []
-            growth_leaders = []
-            recent_activity = []
-            
-            # Get entities that need attention (low scores)
-            low_score_metrics = [m for m in activity_metrics if m.activity_score < 30]
-            for metrics in sorted(low_score_metrics, key=lambda x: x.activity_score)[:5]:
-                summary = await activity_service._convert_to_summary(metrics)
-                attention_needed.append(summary)
-            
-            # Get growth leaders
-            high_growth_metrics = [m for m in activity_metrics if m.growth_rate > 0]
-            for metrics in sorted(high_growth_metrics, key=lambda x: x.growth_rate, reverse=True)[:5]:
-                summary = await activity_service._convert_to_summary(metrics)
-                growth_leaders.append(summary)
-            
-            # Get recently active entities
-            recent_metrics = [m for m in activity_metrics if m.last_order_date]
-            for metrics in sorted(recent_metrics, key=lambda x: x.last_order_date or datetime.min, reverse=True)[:5]:
-                summary = await activity_service._convert_to_summary(metrics)
-                recent_activity.append(summary)
-            
-            return DashboardMetricsResponse(
-                summary=dashboard_summary,
-                top_performers=top_performers,
-                recent_activity=recent_activity,
-                growth_leaders=growth_leaders,
-                attention_needed=attention_needed,
-                data_timestamp=datetime.now(timezone.utc),
-                total_entities_analyzed=len(activity_metrics),
-                cache_hit=False
-            )
-        
-    except Exception as e:
-        logger.error("Failed to get dashboard metrics", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to fetch dashboard metrics")
-
-
+# (dashboard metrics are served by the v2 router: api/v2/endpoints/hierarchy.py)
 @app.get("/api/v2/hierarchy/activity", response_model=List[ActivityMetricsResponse])
 async def get_activity_data(
     params: ActivityQueryParams = Depends(),
@@ -10,6 +10,8 @@ import jwt
 from typing import Optional, Dict, Any
 import structlog
 
+from orderly_fastapi_core import attach_principal, get_request_claims
+
 from app.modules.customer_hierarchy.core.config import settings
 
 logger = structlog.get_logger(__name__)
@@ -49,27 +51,23 @@ class AuthMiddleware(BaseHTTPMiddleware):
             request.url.path.startswith("/api/v2/health") or
             request.url.path.endswith("/openapi.json")):
             return await call_next(request)
+
+        # Already verified by the monolith's AuthMiddleware: reuse its claims
+        # and hierarchy context instead of decoding the token again
+        if get_request_claims(request) is not None:
+            return await call_next(request)
         
         # Extract and validate JWT token
         try:
             user_info = await self.authenticate_request(request)
             if user_info:
-                # Add user information to request state
-                request.state.user = user_info
-                request.state.user_id = user_info.get("sub")
-                request.state.user_permissions = user_info.get("permissions", [])
-                
-                # Add hierarchy context headers
+                # Add user information and hierarchy context to request state
                 await self.add_hierarchy_context(request, user_info)
             else:
                 # For development/testing, allow requests without auth
                 if settings.environment == "development":
                     logger.debug("No auth token provided, using dev-user in development mode")
                     dev_user_info = {"sub": "dev-user", "permissions": ["admin"]}
-                    request.state.user = dev_user_info
-                    request.state.user_id = "dev-user"
-                    request.state.user_permissions = ["admin"]
-                    # Add default hierarchy context for dev user
                     await self.add_hierarchy_context(request, dev_user_info)
                 else:
                     logger.warning("Authentication required but no token provided", path=request.url.path)
@@ -87,9 +85,6 @@ class AuthMiddleware(BaseHTTPMiddleware):
             if settings.environment == "development":
                 logger.warning("Auth error in development, falling back to dev-user", error=str(e))
                 dev_user_info = {"sub": "dev-user", "permissions": ["admin"]}
-                request.state.user = dev_user_info
-                request.state.user_id = "dev-user"
-                request.state.user_permissions = ["admin"]
                 await self.add_hierarchy_context(request, dev_user_info)
             else:
                 raise HTTPException(
@@ -154,21 +149,10 @@ class AuthMiddleware(BaseHTTPMiddleware):
             )
     
     async def add_hierarchy_context(self, request: Request, user_info: Dict[str, Any]):
-        """Add hierarchy context to request headers"""
-        
-        # Extract hierarchy information from user claims
+        """Attach the principal and its hierarchy context to request state"""
+        attach_principal(request, user_info)
         hierarchy_scope = user_info.get("hierarchy_scope", {})
         
-        # Add hierarchy context to request state
-        request.state.hierarchy_context = {
-            "group_ids": hierarchy_scope.get("group_ids", []),
-            "company_ids": hierarchy_scope.get("company_ids", []),
-            "location_ids": hierarchy_scope.get("location_ids", []),
-            "unit_ids": hierarchy_scope.get("unit_ids", []),
-            "scope_level": hierarchy_scope.get("level", "unit"),  # group, company, location, unit
-            "permissions": user_info.get("permissions", [])
-        }
-        
         logger.debug(
             "Hierarchy context added",
             user_id=user_info.get("sub"),
@@ -16,7 +16,11 @@ from .customer_company import CustomerCompany
 from .customer_location import CustomerLocation
 from .business_unit import BusinessUnit
 from .migration_log import CustomerMigrationLog
-from .activity_metrics import ActivityMetrics, DashboardSummary, PerformanceRanking, ActivityTrend
+from .entity_change_log import EntityChangeLog
+from .hierarchy_export import HierarchyExport
+from .activity_metrics import (
+    ActivityMetrics, DashboardSummary, PerformanceRanking, ActivityTrend, EntityOrderActivityDaily
+)
 
 # Export all models for Alembic and application use
 __all__ = [
@@ -27,10 +31,13 @@ __all__ = [
     "CustomerLocation",
     "BusinessUnit",
     "CustomerMigrationLog",
+    "EntityChangeLog",
+    "HierarchyExport",
     "ActivityMetrics",
     "DashboardSummary",
     "PerformanceRanking",
-    "ActivityTrend"
+    "ActivityTrend",
+    "EntityOrderActivityDaily"
 ]
 
 # For convenience in imports
@@ -46,12 +53,15 @@ activity_models = [
     ActivityMetrics,
     DashboardSummary,
     PerformanceRanking,
-    ActivityTrend
+    ActivityTrend,
+    EntityOrderActivityDaily
 ]
 
 # Migration and support models
 support_models = [
-    CustomerMigrationLog
+    CustomerMigrationLog,
+    EntityChangeLog,
+    HierarchyExport
 ]
 
 all_models = hierarchy_models + activity_models + support_models
\ No newline at end of file
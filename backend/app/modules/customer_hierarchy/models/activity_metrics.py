@@ -5,14 +5,14 @@ Models for tracking customer hierarchy activity, performance, and analytics.
 Supports dashboard functionality with scoring algorithms and trend analysis.
 """
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, ForeignKey, Index
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
 from typing import Optional, Dict, Any
 
-from .base import BaseModel
+from .base import Base, BaseModel
 
 
 class ActivityMetrics(BaseModel):
@@ -55,7 +55,9 @@ class ActivityMetrics(BaseModel):
     calculation_date = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     
     # Indexes for performance
+    # One row per entity: the table is the scored rollup refreshed from entity_order_activity_daily
     __table_args__ = (
+        UniqueConstraint('entity_type', 'entity_id', name='uq_activity_metrics_entity'),
         Index('ix_activity_entity_score', 'entity_type', 'activity_score'),
         Index('ix_activity_level_date', 'activity_level', 'calculation_date'),
         Index('ix_activity_revenue', 'total_revenue_30d'),
@@ -66,6 +68,30 @@ class ActivityMetrics(BaseModel):
         return f"<ActivityMetrics(entity_id={self.entity_id}, type={self.entity_type}, score={self.activity_score})>"
 
 
+class EntityOrderActivityDaily(Base):
+    """
+    Daily order aggregates per hierarchy entity (company / group / location)
+    Updated incrementally when an order reaches a terminal state; the rolling
+    7/30/60/90-day windows in ActivityMetrics are summed from these buckets.
+    """
+    __tablename__ = "entity_order_activity_daily"
+
+    entity_type = Column(String(50), primary_key=True)
+    entity_id = Column(String(255), primary_key=True)
+    activity_date = Column(Date, primary_key=True)
+
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    last_order_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_order_activity_date', 'activity_date'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EntityOrderActivityDaily(entity_id={self.entity_id}, date={self.activity_date}, orders={self.order_count})>"
+
+
 class DashboardSummary(BaseModel):
     """
     Dashboard summary metrics - aggregated data for quick loading
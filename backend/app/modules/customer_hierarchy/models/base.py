@@ -1,18 +1,23 @@
 """
 Base model with common fields and utilities for Customer Hierarchy Service
 """
-import uuid
-from datetime import datetime
+import json
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from sqlalchemy import Column, DateTime, String, Boolean, func, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import object_session
 import structlog
 
 from app.db.base import Base
+from orderly_fastapi_core.ids import new_id
 
 logger = structlog.get_logger(__name__)
 
+# Session.info key holding audit entries not yet written to entity_change_log
+CHANGE_LOG_BUFFER_KEY = "entity_change_log"
+
 
 class BaseModel(Base):
     """Abstract base model with common fields for hierarchy entities"""
@@ -24,7 +29,7 @@ class BaseModel(Base):
         primary_key=True,
         unique=True,
         nullable=False,
-        default=lambda: str(uuid.uuid4())
+        default=new_id
     )
     
     # Audit timestamps
@@ -108,8 +113,13 @@ class BaseModel(Base):
             if isinstance(value, datetime):
                 result[column.name] = value.isoformat()
             # Handle JSONB fields
-            elif column.name == 'extra_data' and not include_metadata:
-                continue
+            elif column.name == 'extra_data':
+                if not include_metadata:
+                    continue
+                # History lives in entity_change_log; never ship a legacy trail
+                result[column.name] = {
+                    key: item for key, item in (value or {}).items() if key != 'audit_trail'
+                }
             else:
                 result[column.name] = value
                 
@@ -118,29 +128,35 @@ class BaseModel(Base):
     @classmethod
     def generate_id(cls) -> str:
         """Generate new UUID for entity"""
-        return str(uuid.uuid4())
+        return new_id()
     
     def audit_log(self, action: str, user_id: str, details: Optional[Dict] = None):
-        """Log audit information"""
-        audit_data = {
+        """
+        Record an audit entry in entity_change_log
+
+        The entry is buffered on the owning session and inserted with the
+        session's next commit, so callers no longer need a second commit.
+        """
+        session = object_session(self)
+        if session is None:
+            logger.warning(
+                "Audit entry dropped for detached entity",
+                entity_type=self.__class__.__name__,
+                entity_id=self.id,
+                action=action
+            )
+            return
+
+        session.info.setdefault(CHANGE_LOG_BUFFER_KEY, []).append({
+            'id': new_id(),
+            'changed_at': datetime.now(timezone.utc),
             'entity_type': self.__class__.__name__,
             'entity_id': self.id,
             'action': action,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat(),
-            'details': details or {}
-        }
-        
-        # Update metadata with audit trail
-        self.extra_data = self.extra_data or {}
-        if 'audit_trail' not in self.extra_data:
-            self.extra_data['audit_trail'] = []
-        
-        self.extra_data['audit_trail'].append(audit_data)
-        
-        # Keep only last 10 audit entries to prevent metadata bloat
-        if len(self.extra_data['audit_trail']) > 10:
-            self.extra_data['audit_trail'] = self.extra_data['audit_trail'][-10:]
+            'actor_id': user_id,
+            # Update payloads may carry dates, decimals or enums
+            'details': json.loads(json.dumps(details or {}, default=str))
+        })
         
         logger.info(
             "Entity audit log",
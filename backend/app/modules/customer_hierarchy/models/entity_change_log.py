@@ -0,0 +1,101 @@
+"""
+Entity Change Log Model
+
+Append-only audit trail for hierarchy entities, range-partitioned by month on
+changed_at. BaseModel.audit_log buffers entries on the owning session; they
+are inserted in one multi-row statement just before that session commits, so
+the log row and the entity change land in the same transaction and the
+entity row itself is never rewritten to record history.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List
+import uuid
+
+import structlog
+from sqlalchemy import Column, DateTime, Index, String, event, insert, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .base import Base, CHANGE_LOG_BUFFER_KEY
+
+logger = structlog.get_logger(__name__)
+
+# Monthly partitions kept ahead of the current month; the DEFAULT partition
+# only catches rows outside that window.
+PARTITION_MONTHS_AHEAD = 3
+
+
+class EntityChangeLog(Base):
+    """One audit entry (created / updated / ...) for a hierarchy entity"""
+    __tablename__ = "entity_change_log"
+
+    # The partition key has to be part of the primary key
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    changed_at = Column(
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
+    )
+
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(String, nullable=False)
+    action = Column(String(50), nullable=False)
+    actor_id = Column(String, nullable=True)
+    details = Column(JSONB, nullable=False, default=dict, server_default="{}")
+
+    __table_args__ = (
+        # History of one entity, newest first
+        Index("ix_entity_change_log_entity", "entity_type", "entity_id", "changed_at"),
+        {"postgresql_partition_by": "RANGE (changed_at)"},
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "entity_type": self.entity_type,
+            "entity_id": self.entity_id,
+            "action": self.action,
+            "user_id": self.actor_id,
+            "timestamp": self.changed_at.isoformat() if self.changed_at else None,
+            "details": self.details or {},
+        }
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(connection: Connection, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create the DEFAULT partition and monthly partitions from this month on (idempotent)
+
+    Runs at startup and from the hierarchy maintenance loop, so the window keeps
+    moving forward in long-running processes. Returns the monthly partition names.
+    """
+    table = EntityChangeLog.__tablename__
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+
+    today = datetime.now(timezone.utc).date()
+    partitions = []
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        partition = f"{table}_{start:%Y%m}"
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        partitions.append(partition)
+    return partitions
+
+
+@event.listens_for(Session, "before_commit")
+def _write_buffered_changes(session: Session) -> None:
+    entries: List[Dict[str, Any]] = session.info.pop(CHANGE_LOG_BUFFER_KEY, None)
+    if entries:
+        session.execute(insert(EntityChangeLog), entries)
+        logger.debug("Entity change log written", entries=len(entries))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_buffered_changes(session: Session) -> None:
+    session.info.pop(CHANGE_LOG_BUFFER_KEY, None)
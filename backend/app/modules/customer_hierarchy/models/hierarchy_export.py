@@ -0,0 +1,51 @@
+"""
+Hierarchy Export Model
+
+Finished bulk export files. The file body is kept in the database rather than
+on the instance that ran the export job, so any instance can serve the
+download; rows expire after ``export_retention_hours`` and are purged by the
+hierarchy maintenance loop.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import deferred
+
+from .base import Base
+
+
+class HierarchyExport(Base):
+    """Stored output of one bulk export operation"""
+    __tablename__ = "hierarchy_exports"
+
+    # The bulk operation id
+    id = Column(String(36), primary_key=True)
+
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(100), nullable=False)
+    # Loaded in chunks by the download endpoint, never with the row
+    content = deferred(Column(LargeBinary, nullable=False))
+    size_bytes = Column(BigInteger, nullable=False)
+    record_count = Column(Integer, nullable=False)
+
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_hierarchy_exports_expires_at", "expires_at"),
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size_bytes": self.size_bytes,
+            "record_count": self.record_count,
+            "created_by": self.created_by,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
@@ -0,0 +1,60 @@
+"""
+Customer Hierarchy module definition
+Routes and lifecycle hooks shared by the monolith composition root and the
+standalone entry point (main.py)
+"""
+from fastapi import APIRouter
+import structlog
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.core.database import async_engine
+from app.modules.customer_hierarchy.api.v2 import router as api_v2_router
+from app.modules.customer_hierarchy.models.entity_change_log import ensure_partitions
+from app.modules.customer_hierarchy.services.dashboard_refresh_service import dashboard_refresher
+from app.modules.customer_hierarchy.services.maintenance_service import hierarchy_maintenance
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+
+async def startup():
+    """Keep entity_change_log partitions created ahead of the current month; start the background loops"""
+    try:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(ensure_partitions)
+    except Exception as e:
+        logger.error("Failed to create entity_change_log partitions", error=str(e))
+
+    # Precompute dashboard payloads ahead of requests
+    if settings.enable_dashboard_refresh:
+        await dashboard_refresher.start()
+
+    # Purge expired bulk exports, keep change log partitions ahead
+    if settings.enable_maintenance_loop:
+        await hierarchy_maintenance.start()
+
+
+# Metrics endpoint for Prometheus
+@router.get("/metrics", tags=["Monitoring"])
+async def get_metrics():
+    """Prometheus metrics endpoint"""
+    # This would return Prometheus-formatted metrics
+    # For now, return a placeholder
+    return {"metrics": "# HELP hierarchy_requests_total Total hierarchy requests"}
+
+
+# Include API routers
+router.include_router(
+    api_v2_router,
+    prefix=settings.api_v2_str,
+    tags=["API v2"]
+)
+
+module = ServiceModule(
+    name="customer_hierarchy",
+    router=router,
+    on_startup=[startup],
+    on_shutdown=[async_engine.dispose, dashboard_refresher.stop, hierarchy_maintenance.stop],
+)
@@ -70,7 +70,7 @@ class BulkImportRequestSchema(BaseModel):
 
 
 class BulkExportRequestSchema(BaseModel):
-    format: str = Field(..., description="Export format: csv, xlsx, json")
+    format: str = Field(..., description="Export format: csv, ndjson, xlsx, json")
     filters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Filter criteria for export")
 
 
@@ -10,7 +10,6 @@ Services package for business logic
 # from .integration_service import IntegrationService
 # from .audit_service import AuditService
 # from .validation_service import ValidationService
-# from .background_job_service import BackgroundJobService
 
 # New activity services (direct import to avoid circular dependencies)
 from .activity_service import ActivityScoringService
@@ -0,0 +1,466 @@
+"""
+HierarchyAccessService - per-user hierarchy access index
+
+Precomputes, once per user, which hierarchy entities that user may see or
+modify, so permission checks and row filtering no longer load the User or
+walk the tree node by node:
+- Unrestricted principals (``is_super_user``, the ``platform_admin`` role or
+  the ``*`` permission, the same set the per-call users lookup granted) see
+  and modify everything
+- A scope assigned in ``users.metadata["hierarchy_scope"]`` (same shape as the
+  token's ``hierarchy_scope`` claim), or for restaurant roles the companies
+  migrated from their organization, limits the user to those subtrees; the
+  ancestors of the scope roots stay visible (read-only) for navigation
+- Everyone else sees the whole hierarchy; non-read actions still need a
+  matching permission name
+
+The index is cached in Redis under a global version that is bumped after any
+commit that moves, adds or removes hierarchy entities or changes a user's
+role, permissions or scope, whether through the unit of work or through bulk
+ORM statements such as the import engine's. It is exposed as a membership check
+(``AccessIndex.can_access``), a SQL predicate (``AccessIndex.predicate``) and a
+session-wide row filter (``apply_access_scope``) for list endpoints.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+import asyncio
+import json
+
+import structlog
+from sqlalchemy import String, any_, event, false, inspect, literal, or_, select, true, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, object_session, with_loader_criteria
+from sqlalchemy.sql.elements import ColumnElement
+
+from orderly_fastapi_core import redis_manager
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.models import (
+    BusinessUnit,
+    CustomerCompany,
+    CustomerGroup,
+    CustomerLocation,
+)
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import (
+    LEVEL_ORDER,
+    MODELS,
+    PARENTS,
+    normalize_type,
+)
+from app.modules.users.models.user import User
+
+logger = structlog.get_logger(__name__)
+
+ACCESS_VERSION_KEY = "hierarchy:access:version"
+ACCESS_INDEX_PREFIX = "hierarchy:access:index"
+# session.info flags: this transaction changed access-relevant rows / the
+# index applied as a row filter to this session's ORM selects
+ACCESS_DIRTY_KEY = "hierarchy_access_dirty"
+ACCESS_SCOPE_KEY = "hierarchy_access_scope"
+
+UNRESTRICTED_ROLES = {"platform_admin"}
+ADMIN_PERMISSIONS = {"*"}
+READ_ACTIONS = {"read", "list", "view"}
+SCOPED_ROLE_PREFIX = "restaurant_"
+
+# Claim / metadata key per level
+_SCOPE_FIELDS = {
+    "group": "group_ids",
+    "company": "company_ids",
+    "location": "location_ids",
+    "business_unit": "unit_ids",
+}
+# Columns whose change can move a node between users' scopes
+_ACCESS_COLUMNS = ("group_id", "company_id", "location_id", "legacy_organization_id")
+_USER_ACCESS_COLUMNS = (
+    "role", "permissions", "is_super_user", "organization_id", "is_active", "user_metadata",
+)
+
+# Background version bumps (keep a reference until done)
+_pending_bumps: set = set()
+
+
+def _permission_names(permissions: Optional[Iterable[Any]]) -> FrozenSet[str]:
+    names = set()
+    for item in permissions or []:
+        if isinstance(item, str):
+            names.add(item)
+        elif isinstance(item, dict):
+            names.add(str(item.get("name", "")))
+    return frozenset(names)
+
+
+def _is_unrestricted(role: Optional[str], permissions: FrozenSet[str], is_super_user: bool = False) -> bool:
+    return bool(is_super_user) or role in UNRESTRICTED_ROLES or bool(permissions & ADMIN_PERMISSIONS)
+
+
+class AccessIndex:
+    """Hierarchy entities one user may see (``visible``) and modify (``nodes``)"""
+
+    def __init__(
+        self,
+        user_id: Optional[str],
+        permissions: Iterable[str] = (),
+        unrestricted: bool = False,
+        scoped: bool = False,
+        nodes: Optional[Dict[str, Iterable[str]]] = None,
+        ancestors: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        self.user_id = user_id
+        self.permissions = frozenset(permissions)
+        self.unrestricted = unrestricted
+        # False: the scope is the whole hierarchy
+        self.scoped = scoped and not unrestricted
+        self.nodes: Dict[str, FrozenSet[str]] = {
+            entity_type: frozenset((nodes or {}).get(entity_type, ())) for entity_type in LEVEL_ORDER
+        }
+        self.ancestors: Dict[str, FrozenSet[str]] = {
+            entity_type: frozenset((ancestors or {}).get(entity_type, ())) for entity_type in LEVEL_ORDER
+        }
+
+    @classmethod
+    def allow_all(cls, user_id: Optional[str] = None) -> "AccessIndex":
+        return cls(user_id, unrestricted=True)
+
+    @classmethod
+    def deny_all(cls, user_id: Optional[str] = None) -> "AccessIndex":
+        return cls(user_id, scoped=True)
+
+    def allows(self, resource_type: str, action: str = "read") -> bool:
+        """Whether the action is granted at all (scope aside)"""
+        action = action.lower()
+        if self.unrestricted or action in READ_ACTIONS:
+            return True
+        accepted = {
+            f"{resource_type}:*",
+            f"{resource_type}:{action}",
+            f"hierarchy:{action}",
+        }
+        if resource_type == "business_unit":
+            accepted |= {"unit:*", f"unit:{action}"}
+        return bool(self.permissions & accepted)
+
+    def visible(self, node_type: str) -> FrozenSet[str]:
+        node_type = normalize_type(node_type)
+        return self.nodes.get(node_type, frozenset()) | self.ancestors.get(node_type, frozenset())
+
+    def can_access(self, node_type: str, node_id: Optional[str], action: str = "read") -> bool:
+        """Membership check for one node"""
+        node_type = normalize_type(node_type)
+        if not self.allows(node_type, action):
+            return False
+        if not self.scoped:
+            return True
+        if node_id is None:
+            return False
+        if action.lower() in READ_ACTIONS:
+            return node_id in self.nodes.get(node_type, ()) or node_id in self.ancestors.get(node_type, ())
+        return node_id in self.nodes.get(node_type, ())
+
+    def predicate(self, node_type: str, id_column: ColumnElement, action: str = "read") -> ColumnElement:
+        """SQL condition on an id column restricting rows to what the user may access"""
+        node_type = normalize_type(node_type)
+        if not self.allows(node_type, action):
+            return false()
+        if not self.scoped:
+            return true()
+        ids = self.visible(node_type) if action.lower() in READ_ACTIONS else self.nodes.get(node_type, frozenset())
+        if not ids:
+            return false()
+        return id_column == any_(literal(sorted(ids), ARRAY(String)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "permissions": sorted(self.permissions),
+            "unrestricted": self.unrestricted,
+            "scoped": self.scoped,
+            "nodes": {entity_type: sorted(ids) for entity_type, ids in self.nodes.items() if ids},
+            "ancestors": {entity_type: sorted(ids) for entity_type, ids in self.ancestors.items() if ids},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AccessIndex":
+        return cls(
+            data.get("user_id"),
+            permissions=data.get("permissions", ()),
+            unrestricted=data.get("unrestricted", False),
+            scoped=data.get("scoped", False),
+            nodes=data.get("nodes"),
+            ancestors=data.get("ancestors"),
+        )
+
+
+def _scope_roots(user: User) -> Optional[Dict[str, list]]:
+    """Explicit scope roots from users.metadata, or None when none is assigned"""
+    scope = (user.user_metadata or {}).get("hierarchy_scope")
+    if not isinstance(scope, dict):
+        return None
+    return {
+        entity_type: list(scope[field])
+        for entity_type, field in _SCOPE_FIELDS.items()
+        if scope.get(field)
+    }
+
+
+def _visible_entities(roots: Dict[str, Any]):
+    """
+    (entity_type, entity_id, in_scope) of every scope node and its ancestors
+
+    Subtrees are expanded top-down (a node is in scope when it is a root or its
+    parent is in scope), then parents are collected bottom-up for the ancestors.
+    ``roots`` maps a level to root ids (a list or a SELECT of ids).
+    """
+    in_scope: Dict[str, Any] = {}
+    parent_scope = None
+    for entity_type in LEVEL_ORDER:
+        model = MODELS[entity_type]
+        conditions = []
+        if entity_type in roots:
+            conditions.append(model.id.in_(roots[entity_type]))
+        if parent_scope is not None:
+            conditions.append(getattr(model, PARENTS[entity_type][1]).in_(parent_scope))
+        parent_scope = in_scope[entity_type] = select(model.id).where(or_(false(), *conditions))
+
+    branches = []
+    below = None
+    for level in range(len(LEVEL_ORDER) - 1, -1, -1):
+        entity_type = LEVEL_ORDER[level]
+        model = MODELS[entity_type]
+        visible = in_scope[entity_type]
+        if below is not None:
+            child = MODELS[LEVEL_ORDER[level + 1]]
+            parent_fk = getattr(child, PARENTS[LEVEL_ORDER[level + 1]][1])
+            visible = visible.union(select(parent_fk).where(child.id.in_(below), parent_fk.isnot(None)))
+        below = visible
+        branches.append(
+            select(
+                literal(entity_type, String).label("entity_type"),
+                model.id.label("entity_id"),
+                model.id.in_(in_scope[entity_type]).label("in_scope"),
+            ).where(model.id.in_(visible))
+        )
+    return union_all(*branches)
+
+
+class HierarchyAccessService:
+    """Builds and caches AccessIndex per user"""
+
+    @staticmethod
+    def _redis():
+        return redis_manager.client("hierarchy-access", url=settings.redis_url)
+
+    @staticmethod
+    async def bump_version() -> None:
+        """Invalidate every cached index (called after commit)"""
+        try:
+            await HierarchyAccessService._redis().incr(ACCESS_VERSION_KEY)
+        except Exception as e:
+            logger.warning("Hierarchy access version bump failed", error=str(e))
+
+    async def for_context(
+        self, db: AsyncSession, user_context: Optional[Dict[str, Any]]
+    ) -> AccessIndex:
+        """
+        Index for a request's hierarchy context
+
+        No context means an internal call and is not restricted; a principal
+        without a users row (the development fallback user) only gets the
+        permissions carried by its token. An inactive users row is denied
+        whatever its token still claims.
+        """
+        if user_context is None:
+            return AccessIndex.allow_all()
+        user_id = user_context.get("user_id")
+        index = await self.for_user(user_id, db=db) if user_id else None
+        if index is not None:
+            return index
+        if _is_unrestricted(user_context.get("role"), _permission_names(user_context.get("permissions"))):
+            return AccessIndex.allow_all(user_id)
+        return AccessIndex.deny_all(user_id)
+
+    async def for_user(
+        self, user_id: str, db: Optional[AsyncSession] = None
+    ) -> Optional[AccessIndex]:
+        """Cached index of one user; None when the user does not exist, deny-all when inactive"""
+        redis = self._redis()
+        breaker = redis_manager.breaker(settings.redis_url)
+        cache_key = None
+        if settings.cache_mode != "off" and breaker.allow():
+            try:
+                version = await redis.get(ACCESS_VERSION_KEY) or "0"
+                cache_key = f"{ACCESS_INDEX_PREFIX}:v{version}:{user_id}"
+                cached = await redis.get(cache_key)
+                breaker.record_success()
+                if cached:
+                    data = json.loads(cached)
+                    return AccessIndex.from_dict(data) if data else None
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning("Hierarchy access cache read failed", error=str(e))
+
+        index = await self.build(user_id, db=db)
+
+        if cache_key:
+            try:
+                payload = json.dumps(index.to_dict() if index else None)
+                await redis.setex(cache_key, settings.cache_access_index_ttl, payload)
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning("Hierarchy access cache write failed", error=str(e))
+        return index
+
+    async def build(self, user_id: str, db: Optional[AsyncSession] = None) -> Optional[AccessIndex]:
+        """Compute the index from the users row and the hierarchy (no cache)"""
+        from app.modules.users.core.database import AsyncSessionLocal as UserSessionLocal
+
+        async with UserSessionLocal() as user_session:
+            user = (
+                await user_session.execute(select(User).where(User.id == user_id))
+            ).scalar_one_or_none()
+        if user is None:
+            return None
+        if not user.is_active:
+            return AccessIndex.deny_all(user.id)
+
+        permissions = _permission_names(user.permissions)
+        if _is_unrestricted(user.role, permissions, user.is_super_user):
+            return AccessIndex(user.id, permissions, unrestricted=True)
+
+        roots = _scope_roots(user)
+        if roots is None and str(user.role).startswith(SCOPED_ROLE_PREFIX):
+            roots = {"company": select(CustomerCompany.id).where(
+                CustomerCompany.legacy_organization_id == user.organization_id
+            )}
+        if roots is None:
+            return AccessIndex(user.id, permissions)
+
+        if db is None:
+            from app.modules.customer_hierarchy.core.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as session:
+                rows = await self._expand(session, roots)
+        else:
+            rows = await self._expand(db, roots)
+
+        nodes: Dict[str, set] = {}
+        ancestors: Dict[str, set] = {}
+        for row in rows:
+            (nodes if row.in_scope else ancestors).setdefault(row.entity_type, set()).add(row.entity_id)
+        logger.debug(
+            "Hierarchy access index built",
+            user_id=user.id,
+            nodes=sum(len(ids) for ids in nodes.values()),
+            ancestors=sum(len(ids) for ids in ancestors.values()),
+        )
+        return AccessIndex(user.id, permissions, scoped=True, nodes=nodes, ancestors=ancestors)
+
+    @staticmethod
+    async def _expand(db: AsyncSession, roots: Dict[str, Any]):
+        statement = select(_visible_entities(roots).subquery()).execution_options(
+            hierarchy_access_scope=False
+        )
+        return (await db.execute(statement)).all()
+
+
+async def apply_access_scope(db: AsyncSession, user_context: Optional[Dict[str, Any]]) -> AccessIndex:
+    """
+    Restrict every following ORM SELECT on this session to the user's visible entities
+
+    Used by list endpoints so all CRUD query paths filter in the database.
+    """
+    index = await hierarchy_access.for_context(db, user_context)
+    db.info[ACCESS_SCOPE_KEY] = index
+    return index
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _apply_access_scope(state: ORMExecuteState) -> None:
+    index: Optional[AccessIndex] = state.session.info.get(ACCESS_SCOPE_KEY)
+    if (
+        index is None
+        or not index.scoped
+        or not state.is_select
+        or not state.execution_options.get("hierarchy_access_scope", True)
+    ):
+        return
+    state.statement = state.statement.options(*(
+        with_loader_criteria(model, index.predicate(entity_type, model.id), include_aliases=True)
+        for entity_type, model in MODELS.items()
+    ))
+
+
+# Bulk ORM DML (insert(model) / update(model) / delete(model)) fires no mapper
+# events, so it marks the transaction dirty from do_orm_execute instead
+_BULK_DIRTY_MAPPERS = {
+    "insert": (CustomerGroup, CustomerCompany, CustomerLocation, BusinessUnit),
+    "update": (CustomerCompany, CustomerLocation, BusinessUnit, User),
+    "delete": (CustomerGroup, CustomerCompany, CustomerLocation, BusinessUnit, User),
+}
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_access_rows_changed(state: ORMExecuteState) -> None:
+    kind = "insert" if state.is_insert else "update" if state.is_update else "delete" if state.is_delete else None
+    mapper = state.bind_mapper if kind else None
+    if mapper is not None and mapper.class_ in _BULK_DIRTY_MAPPERS[kind]:
+        state.session.info[ACCESS_DIRTY_KEY] = True
+
+
+def _mark_dirty(target: Any) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[ACCESS_DIRTY_KEY] = True
+
+
+@event.listens_for(CustomerGroup, "after_insert")
+@event.listens_for(CustomerCompany, "after_insert")
+@event.listens_for(CustomerLocation, "after_insert")
+@event.listens_for(BusinessUnit, "after_insert")
+@event.listens_for(CustomerGroup, "after_delete")
+@event.listens_for(CustomerCompany, "after_delete")
+@event.listens_for(CustomerLocation, "after_delete")
+@event.listens_for(BusinessUnit, "after_delete")
+@event.listens_for(User, "after_delete")
+def _access_rows_changed(mapper, connection, target: Any) -> None:
+    _mark_dirty(target)
+
+
+@event.listens_for(CustomerCompany, "after_update")
+@event.listens_for(CustomerLocation, "after_update")
+@event.listens_for(BusinessUnit, "after_update")
+def _hierarchy_node_moved(mapper, connection, target: Any) -> None:
+    attrs = inspect(target).attrs
+    if any(key in attrs and attrs[key].history.has_changes() for key in _ACCESS_COLUMNS):
+        _mark_dirty(target)
+
+
+@event.listens_for(User, "after_update")
+def _user_access_changed(mapper, connection, target: User) -> None:
+    attrs = inspect(target).attrs
+    if any(attrs[key].history.has_changes() for key in _USER_ACCESS_COLUMNS):
+        _mark_dirty(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    if not session.info.pop(ACCESS_DIRTY_KEY, False):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync contexts (migrations, scripts) have no loop; cached indexes expire by TTL
+        return
+    task = loop.create_task(HierarchyAccessService.bump_version())
+    _pending_bumps.add(task)
+    task.add_done_callback(_pending_bumps.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty(session: Session) -> None:
+    session.info.pop(ACCESS_DIRTY_KEY, None)
+
+
+# Global instance
+hierarchy_access = HierarchyAccessService()
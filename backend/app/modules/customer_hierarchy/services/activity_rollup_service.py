@@ -0,0 +1,414 @@
+"""
+Activity Rollup Service
+
+Maintains order-driven activity data for the customer hierarchy:
+
+- ``entity_order_activity_daily``: per-entity daily order buckets, updated
+  incrementally when an order reaches a terminal state. An order's restaurant
+  organization is mapped to its company (``legacy_organization_id``), the
+  company's group, and — when the delivery address carries a location id — the
+  delivery location.
+- ``activity_metrics``: one scored row per active hierarchy entity. Rolling
+  7/30/60/90-day windows are summed from the daily buckets and the
+  frequency/recency/value score is computed for every entity in a single
+  INSERT ... ON CONFLICT statement.
+"""
+
+import structlog
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Date, DateTime, Float, Integer, String, and_, case, cast, column, delete, exists, func,
+    literal, select, tuple_, union_all, values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.customer_hierarchy.models import (
+    ActivityMetrics, BusinessUnit, CustomerCompany, CustomerGroup, CustomerLocation,
+    EntityOrderActivityDaily,
+)
+from app.modules.customer_hierarchy.schemas.activity import EntityType
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.models.order import Order
+
+logger = structlog.get_logger(__name__)
+
+# Order statuses that feed the activity rollup (terminal, non-cancelled)
+COUNTED_ORDER_STATUSES = (OrderStatus.COMPLETED,)
+
+# Keys accepted for a delivery location id inside orders.delivery_address
+LOCATION_ID_KEYS = ("locationId", "location_id")
+
+ROLLUP_ACTOR = "system:activity-rollup"
+
+
+class ActivityRollupService:
+    """Incremental order-activity aggregation and set-based scoring."""
+
+    # Scoring parameters mirror ActivityScoringService
+    FREQUENCY_WEIGHT = 0.40
+    RECENCY_WEIGHT = 0.35
+    VALUE_WEIGHT = 0.25
+    MAX_ORDERS_30D = 100
+    MAX_DAYS_RECENCY = 90
+    BASELINE_ORDER_VALUE = 5000.0
+    ACTIVITY_THRESHOLDS = {"active": 70, "medium": 50, "low": 25}
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    async def record_order(self, order: Order) -> int:
+        """
+        Add one terminal order to the daily buckets of every entity it rolls up to
+        and rescore those entities. Does not commit.
+
+        Returns the number of hierarchy entities touched.
+        """
+        return await self.record_orders([order])
+
+    async def record_orders(self, orders: Iterable[Order]) -> int:
+        """
+        Add a batch of terminal orders to the daily buckets in one upsert and
+        rescore every touched entity once. Does not commit.
+
+        Returns the number of hierarchy entities touched.
+        """
+        rows = []
+        for order in orders:
+            if order.status not in COUNTED_ORDER_STATUSES:
+                continue
+            ordered_at = order.created_at or datetime.now(timezone.utc)
+            address = order.delivery_address or {}
+            location_id = next((address.get(k) for k in LOCATION_ID_KEYS if address.get(k)), None)
+            rows.append((
+                order.restaurant_id,
+                str(location_id) if location_id else None,
+                ordered_at.date(),
+                1,
+                float(order.total_amount or Decimal("0")),
+                ordered_at,
+            ))
+        if not rows:
+            return 0
+
+        row = values(
+            column("restaurant_id", String),
+            column("location_id", String),
+            column("activity_date", Date),
+            column("order_count", Integer),
+            column("revenue", Float),
+            column("last_order_at", DateTime(timezone=True)),
+            name="order_row",
+        ).data(rows)
+        facts = select(row).cte("order_facts")
+
+        touched = await self._upsert_daily(facts)
+        if touched:
+            await self.refresh(entity_keys=touched)
+        return len(touched)
+
+    async def rebuild_daily(self) -> int:
+        """
+        Rebuild all daily buckets from the orders table (initial backfill / repair).
+        Does not commit.
+        """
+        ordered_on = cast(Order.created_at, Date)
+        facts = (
+            select(
+                Order.restaurant_id.label("restaurant_id"),
+                func.coalesce(
+                    *[Order.delivery_address[key].as_string() for key in LOCATION_ID_KEYS]
+                ).label("location_id"),
+                ordered_on.label("activity_date"),
+                func.count(Order.id).label("order_count"),
+                func.sum(cast(Order.total_amount, Float)).label("revenue"),
+                func.max(Order.created_at).label("last_order_at"),
+            )
+            .where(
+                and_(
+                    Order.status.in_(COUNTED_ORDER_STATUSES),
+                    Order.is_deleted == False,
+                )
+            )
+            .group_by(Order.restaurant_id, "location_id", ordered_on)
+            .cte("order_facts")
+        )
+
+        await self.session.execute(delete(EntityOrderActivityDaily))
+        touched = await self._upsert_daily(facts)
+        logger.info("activity_rollup.daily_rebuilt", entities=len(touched))
+        return len(touched)
+
+    async def _upsert_daily(self, facts) -> List[Tuple[str, str]]:
+        """Fan order facts out to company / group / location and upsert daily buckets."""
+        company = CustomerCompany.__table__
+        location = CustomerLocation.__table__
+
+        by_company = (
+            select(
+                literal(EntityType.COMPANY.value).label("entity_type"),
+                company.c.id.label("entity_id"),
+                facts.c.activity_date,
+                facts.c.order_count,
+                facts.c.revenue,
+                facts.c.last_order_at,
+            )
+            .join(company, company.c.legacy_organization_id == facts.c.restaurant_id)
+        )
+        by_group = (
+            select(
+                literal(EntityType.GROUP.value).label("entity_type"),
+                company.c.group_id.label("entity_id"),
+                facts.c.activity_date,
+                facts.c.order_count,
+                facts.c.revenue,
+                facts.c.last_order_at,
+            )
+            .join(company, company.c.legacy_organization_id == facts.c.restaurant_id)
+            .where(company.c.group_id.isnot(None))
+        )
+        by_location = (
+            select(
+                literal(EntityType.LOCATION.value).label("entity_type"),
+                location.c.id.label("entity_id"),
+                facts.c.activity_date,
+                facts.c.order_count,
+                facts.c.revenue,
+                facts.c.last_order_at,
+            )
+            .join(company, company.c.legacy_organization_id == facts.c.restaurant_id)
+            .join(
+                location,
+                and_(location.c.company_id == company.c.id, location.c.id == facts.c.location_id),
+            )
+        )
+        fanned = union_all(by_company, by_group, by_location).subquery("fanned")
+
+        rows = (
+            select(
+                fanned.c.entity_type,
+                fanned.c.entity_id,
+                fanned.c.activity_date,
+                cast(func.sum(fanned.c.order_count), Integer),
+                func.sum(fanned.c.revenue),
+                func.max(fanned.c.last_order_at),
+            )
+            .group_by(fanned.c.entity_type, fanned.c.entity_id, fanned.c.activity_date)
+        )
+
+        daily = EntityOrderActivityDaily.__table__
+        stmt = pg_insert(daily).from_select(
+            ["entity_type", "entity_id", "activity_date", "order_count", "revenue", "last_order_at"],
+            rows,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[daily.c.entity_type, daily.c.entity_id, daily.c.activity_date],
+            set_={
+                "order_count": daily.c.order_count + stmt.excluded.order_count,
+                "revenue": daily.c.revenue + stmt.excluded.revenue,
+                "last_order_at": func.greatest(daily.c.last_order_at, stmt.excluded.last_order_at),
+            },
+        ).returning(daily.c.entity_type, daily.c.entity_id)
+
+        result = await self.session.execute(stmt)
+        return sorted({(row.entity_type, row.entity_id) for row in result.all()})
+
+    # ------------------------------------------------------------------
+    # Set-based scoring
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _active_entities():
+        """(entity_type, entity_id) for every active hierarchy entity."""
+        return union_all(
+            select(literal(EntityType.GROUP.value).label("entity_type"), CustomerGroup.id.label("entity_id"))
+            .where(CustomerGroup.is_active == True),
+            select(literal(EntityType.COMPANY.value), CustomerCompany.id)
+            .where(CustomerCompany.is_active == True),
+            select(literal(EntityType.LOCATION.value), CustomerLocation.id)
+            .where(CustomerLocation.is_active == True),
+            select(literal(EntityType.BUSINESS_UNIT.value), BusinessUnit.id)
+            .where(BusinessUnit.is_active == True),
+        ).subquery("entities")
+
+    def _scored_select(self, entity_keys: Optional[Iterable[Tuple[str, str]]] = None):
+        """Rolling windows + component scores for all (or the given) entities."""
+        daily = EntityOrderActivityDaily
+        today = func.current_date()
+
+        def window(column, newer_than: int, older_than: int = 0):
+            condition = daily.activity_date > today - newer_than
+            if older_than:
+                condition = and_(condition, daily.activity_date <= today - older_than)
+            return func.coalesce(func.sum(column).filter(condition), 0)
+
+        windows = select(
+            daily.entity_type,
+            daily.entity_id,
+            window(daily.order_count, 30).label("orders_30d"),
+            window(daily.revenue, 30).label("revenue_30d"),
+            window(daily.order_count, 60, 30).label("orders_prev_30d"),
+            window(daily.order_count, 7).label("orders_7d"),
+            window(daily.order_count, 14, 7).label("orders_prev_7d"),
+            window(daily.order_count, 90).label("orders_90d"),
+            window(daily.revenue, 90).label("revenue_90d"),
+            func.max(daily.last_order_at).label("last_order_at"),
+        ).group_by(daily.entity_type, daily.entity_id)
+
+        entities = self._active_entities()
+        if entity_keys is not None:
+            keys = list(entity_keys)
+            windows = windows.where(tuple_(daily.entity_type, daily.entity_id).in_(keys))
+            entities = select(entities).where(
+                tuple_(entities.c.entity_type, entities.c.entity_id).in_(keys)
+            ).subquery("entities")
+        windows = windows.subquery("windows")
+
+        orders_30d = func.coalesce(windows.c.orders_30d, 0)
+        revenue_30d = cast(func.coalesce(windows.c.revenue_30d, 0), Float)
+        orders_prev_30d = func.coalesce(windows.c.orders_prev_30d, 0)
+        orders_7d = func.coalesce(windows.c.orders_7d, 0)
+        orders_prev_7d = func.coalesce(windows.c.orders_prev_7d, 0)
+        avg_value = case((orders_30d > 0, revenue_30d / orders_30d), else_=0.0)
+        days_since_last = func.floor(
+            func.extract("epoch", func.now() - windows.c.last_order_at) / 86400
+        )
+
+        def pct_change(current, previous):
+            return case(
+                (previous > 0, cast(current - previous, Float) / previous * 100),
+                (current > 0, 100.0),
+                else_=0.0,
+            )
+
+        base = (
+            select(
+                entities.c.entity_type,
+                entities.c.entity_id,
+                windows.c.last_order_at,
+                orders_30d.label("orders_30d"),
+                revenue_30d.label("revenue_30d"),
+                avg_value.label("avg_value"),
+                pct_change(orders_30d, orders_prev_30d).label("growth_rate"),
+                pct_change(orders_7d, orders_prev_7d).label("trend_percentage"),
+                func.coalesce(windows.c.orders_90d, 0).label("orders_90d"),
+                cast(func.coalesce(windows.c.revenue_90d, 0), Float).label("revenue_90d"),
+                func.least(cast(orders_30d, Float) / self.MAX_ORDERS_30D * 100, 100.0).label("frequency_score"),
+                case(
+                    (
+                        windows.c.last_order_at.isnot(None),
+                        func.greatest(
+                            0.0,
+                            (self.MAX_DAYS_RECENCY - days_since_last) / self.MAX_DAYS_RECENCY * 100,
+                        ),
+                    ),
+                    else_=0.0,
+                ).label("recency_score"),
+                (func.least(avg_value / self.BASELINE_ORDER_VALUE, 2.0) * 50).label("value_score"),
+            )
+            .select_from(entities)
+            .outerjoin(
+                windows,
+                and_(
+                    windows.c.entity_type == entities.c.entity_type,
+                    windows.c.entity_id == entities.c.entity_id,
+                ),
+            )
+            .subquery("base")
+        )
+
+        score = cast(
+            func.floor(
+                base.c.frequency_score * self.FREQUENCY_WEIGHT
+                + base.c.recency_score * self.RECENCY_WEIGHT
+                + base.c.value_score * self.VALUE_WEIGHT
+            ),
+            ActivityMetrics.activity_score.type,
+        )
+        level = case(
+            (score >= self.ACTIVITY_THRESHOLDS["active"], "active"),
+            (score >= self.ACTIVITY_THRESHOLDS["medium"], "medium"),
+            (score >= self.ACTIVITY_THRESHOLDS["low"], "low"),
+            else_="dormant",
+        )
+        return select(
+            func.gen_random_uuid(),
+            base.c.entity_id,
+            base.c.entity_type,
+            score,
+            level,
+            base.c.last_order_at,
+            base.c.orders_30d,
+            base.c.revenue_30d,
+            base.c.avg_value,
+            base.c.trend_percentage,
+            base.c.growth_rate,
+            base.c.frequency_score,
+            base.c.recency_score,
+            base.c.value_score,
+            func.jsonb_build_object(
+                "calculation_method", "order_rollup_v1",
+                "orders_90d", base.c.orders_90d,
+                "revenue_90d", base.c.revenue_90d,
+            ),
+            func.now(),
+            literal(ROLLUP_ACTOR),
+            literal(True),
+        )
+
+    async def refresh(self, entity_keys: Optional[Iterable[Tuple[str, str]]] = None) -> int:
+        """
+        Rescore all active entities (or only ``entity_keys``) in one statement.
+        A full refresh also drops rollup rows for entities that are no longer active.
+        Does not commit.
+        """
+        metrics = ActivityMetrics.__table__
+        columns = [
+            "id", "entity_id", "entity_type", "activity_score", "activity_level",
+            "last_order_date", "total_orders_30d", "total_revenue_30d", "avg_order_value_30d",
+            "trend_percentage", "growth_rate", "frequency_score", "recency_score", "value_score",
+            "additional_metadata", "calculation_date", "created_by", "is_active",
+        ]
+        stmt = pg_insert(metrics).from_select(columns, self._scored_select(entity_keys))
+        updatable = columns[3:16]
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_activity_metrics_entity",
+            set_={name: stmt.excluded[name] for name in updatable} | {"updatedAt": func.now()},
+        )
+        result = await self.session.execute(stmt)
+
+        if entity_keys is None:
+            entities = self._active_entities()
+            await self.session.execute(
+                delete(metrics).where(
+                    ~exists().where(
+                        and_(
+                            entities.c.entity_type == metrics.c.entity_type,
+                            entities.c.entity_id == metrics.c.entity_id,
+                        )
+                    )
+                )
+            )
+
+        logger.info(
+            "activity_rollup.refreshed",
+            scope="all" if entity_keys is None else "incremental",
+            rows=result.rowcount,
+        )
+        return result.rowcount or 0
+
+    async def oldest_calculation_at(self) -> Optional[datetime]:
+        """
+        Oldest calculation timestamp in the rollup (None when empty). Incremental
+        updates only rescore touched entities, so this is the time of the last
+        full refresh for entities without recent orders.
+        """
+        result = await self.session.execute(select(func.min(ActivityMetrics.calculation_date)))
+        return result.scalar_one_or_none()
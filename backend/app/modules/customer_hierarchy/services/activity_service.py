@@ -11,23 +11,45 @@ Provides business intelligence and analytics for customer hierarchy dashboard.
 
 import structlog
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
-from sqlalchemy.orm import selectinload
+from sqlalchemy import String, select, func, and_, desc, literal, tuple_, union_all
 
 from app.modules.customer_hierarchy.models import (
-    CustomerGroup, CustomerCompany, CustomerLocation, BusinessUnit,
-    ActivityMetrics, DashboardSummary, PerformanceRanking as PerformanceRankingModel, ActivityTrend
+    ActivityMetrics, DashboardSummary, PerformanceRanking as PerformanceRankingModel
 )
+from app.modules.customer_hierarchy.services.activity_rollup_service import ActivityRollupService
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import LEVEL_ORDER, MODELS, PARENTS
 from app.modules.customer_hierarchy.schemas.activity import (
-    ActivityLevel, EntityType, ActivityMetricsResponse, 
-    DashboardSummaryResponse, EntityActivitySummary,
-    ActivityAnalyticsResponse
+    ActivityLevel, EntityType, EntityActivitySummary,
+    ActivityAnalyticsResponse, DashboardMetricsResponse
 )
 
 logger = structlog.get_logger(__name__)
 
+# Rollup older than this is rescored before being served (incremental updates keep it fresh)
+ROLLUP_MAX_AGE = timedelta(hours=1)
+
+# (root entity type, root entity id): restricts metrics to one hierarchy subtree
+DashboardScope = Tuple[str, str]
+
+
+def scope_entities(scope: DashboardScope):
+    """(entity_type, entity_id) of the scope root and every entity below it"""
+    root_type, root_id = scope
+    top = LEVEL_ORDER.index(root_type)
+    branches = []
+    for level in range(top, len(LEVEL_ORDER)):
+        entity_type = LEVEL_ORDER[level]
+        model = MODELS[entity_type]
+        stmt = select(literal(entity_type, String).label("entity_type"), model.id.label("entity_id"))
+        for index in range(level, top, -1):
+            child = MODELS[LEVEL_ORDER[index]]
+            parent = MODELS[LEVEL_ORDER[index - 1]]
+            stmt = stmt.join_from(child, parent, getattr(child, PARENTS[LEVEL_ORDER[index]][1]) == parent.id)
+        branches.append(stmt.where(MODELS[root_type].id == root_id))
+    return union_all(*branches).subquery("scope_entities")
+
 
 class ActivityScoringService:
     """
@@ -105,15 +127,6 @@ class ActivityScoringService:
             "value_score": value_score
         }
         
-        logger.info(
-            "Calculated activity score",
-            entity_id=entity_id,
-            entity_type=entity_type,
-            activity_score=activity_score,
-            activity_level=activity_level,
-            components=component_scores
-        )
-        
         return activity_score, activity_level, component_scores
     
     def _determine_activity_level(self, score: int) -> ActivityLevel:
@@ -127,181 +140,95 @@ class ActivityScoringService:
         else:
             return ActivityLevel.DORMANT
     
-    async def calculate_all_entity_scores(self) -> List[ActivityMetrics]:
+    async def calculate_all_entity_scores(
+        self,
+        max_age: Optional[timedelta] = ROLLUP_MAX_AGE,
+        scope: Optional[DashboardScope] = None
+    ) -> List[ActivityMetrics]:
         """
-        Calculate activity scores for all entities in the hierarchy.
-        This would normally pull from order data, but we'll use mock data for now.
+        Return activity scores for all hierarchy entities (or one scope's subtree)
+        from the activity_metrics rollup.
         """
-        all_metrics = []
-        
-        # Process all entity types
-        for entity_type in [EntityType.GROUP, EntityType.COMPANY, EntityType.LOCATION, EntityType.BUSINESS_UNIT]:
-            entity_metrics = await self._calculate_entity_type_scores(entity_type)
-            all_metrics.extend(entity_metrics)
-        
-        return all_metrics
+        await self.ensure_rollup_fresh(max_age)
+        return await self.get_activity_metrics(scope=scope)
     
-    async def _calculate_entity_type_scores(self, entity_type: EntityType) -> List[ActivityMetrics]:
-        """Calculate scores for all entities of a specific type"""
-        metrics_list = []
-        
-        try:
-            if entity_type == EntityType.GROUP:
-                stmt = select(CustomerGroup).where(CustomerGroup.is_active == True)
-                result = await self.session.execute(stmt)
-                entities = result.scalars().all()
-                
-                for entity in entities:
-                    mock_data = self._generate_mock_order_data(entity.id, entity.name, entity_type)
-                    metrics = await self._create_activity_metrics(entity.id, entity_type, mock_data)
-                    metrics_list.append(metrics)
-                    
-            elif entity_type == EntityType.COMPANY:
-                stmt = select(CustomerCompany).where(CustomerCompany.is_active == True)
-                result = await self.session.execute(stmt)
-                entities = result.scalars().all()
-                
-                for entity in entities:
-                    mock_data = self._generate_mock_order_data(entity.id, entity.name, entity_type)
-                    metrics = await self._create_activity_metrics(entity.id, entity_type, mock_data)
-                    metrics_list.append(metrics)
-            
-            # Similar for locations and business units...
-            # For now, focus on groups and companies as they have the most impact
-            
-        except Exception as e:
-            logger.error("Failed to calculate entity scores", entity_type=entity_type, error=str(e))
-        
-        return metrics_list
+    async def ensure_rollup_fresh(self, max_age: Optional[timedelta] = ROLLUP_MAX_AGE) -> None:
+        """
+        Rescore all entities in one set-based statement when the rollup is empty or
+        older than ``max_age``. Completed orders keep touched entities current between
+        refreshes; the periodic refresh lets recency and rolling windows decay for the rest.
+        """
+        rollup = ActivityRollupService(self.session)
+        oldest = await rollup.oldest_calculation_at()
+        if oldest is None or (max_age is not None and datetime.now(timezone.utc) - oldest > max_age):
+            await rollup.refresh()
+            await self.session.commit()
     
-    def _generate_mock_order_data(self, entity_id: str, entity_name: str, entity_type: EntityType) -> Dict[str, Any]:
+    async def data_version(self) -> str:
         """
-        Generate realistic mock order data based on entity characteristics.
-        In production, this would query actual order data.
+        Cheap fingerprint of the scored rollup: changes whenever entities are
+        rescored, added or deactivated.
         """
-        
-        # Business patterns based on restaurant group names and types
-        business_patterns = {
-            # High activity patterns (major chains)
-            "統一企業": {"base_orders": 85, "avg_value": 12000, "volatility": 0.1},
-            "王品餐飲": {"base_orders": 78, "avg_value": 15000, "volatility": 0.15},
-            "鼎泰豐": {"base_orders": 65, "avg_value": 8500, "volatility": 0.2},
-            "晶華酒店": {"base_orders": 55, "avg_value": 25000, "volatility": 0.12},
-            
-            # Medium activity patterns
-            "欣葉餐廳": {"base_orders": 45, "avg_value": 7500, "volatility": 0.25},
-            "饗賓餐旅": {"base_orders": 38, "avg_value": 18000, "volatility": 0.2},
-            "瓦城泰統": {"base_orders": 42, "avg_value": 6000, "volatility": 0.3},
-            
-            # Lower activity patterns
-            "漢來美食": {"base_orders": 28, "avg_value": 12000, "volatility": 0.35},
-            "國賓大飯店": {"base_orders": 22, "avg_value": 22000, "volatility": 0.25},
-            
-            # Dormant patterns
-            "老爺酒店": {"base_orders": 8, "avg_value": 15000, "volatility": 0.5},
-        }
-        
-        # Default pattern for unknown entities
-        default_pattern = {"base_orders": 30, "avg_value": 8000, "volatility": 0.3}
-        
-        # Find matching pattern
-        pattern = default_pattern
-        for name_key, business_pattern in business_patterns.items():
-            if name_key in entity_name:
-                pattern = business_pattern
-                break
-        
-        # Generate realistic data with some randomness
-        import random
-        random.seed(hash(entity_id) % 2147483647)  # Deterministic but varied
-        
-        base_orders = pattern["base_orders"]
-        avg_value = pattern["avg_value"]
-        volatility = pattern["volatility"]
-        
-        # Add seasonal and random variations
-        seasonal_factor = 1.0 + (random.random() - 0.5) * 0.3  # ±15% seasonal variation
-        random_factor = 1.0 + (random.random() - 0.5) * volatility
-        
-        orders_30d = max(0, int(base_orders * seasonal_factor * random_factor))
-        avg_order_value = max(0, avg_value * (1.0 + (random.random() - 0.5) * 0.4))
-        total_revenue_30d = orders_30d * avg_order_value
-        
-        # Generate last order date
-        if orders_30d > 0:
-            days_ago = random.randint(1, min(15, max(1, 30 - orders_30d // 3)))
-            last_order_date = datetime.now(timezone.utc) - timedelta(days=days_ago)
-        else:
-            # Dormant entities - longer time since last order
-            days_ago = random.randint(45, 120)
-            last_order_date = datetime.now(timezone.utc) - timedelta(days=days_ago)
-        
-        # Calculate growth trends
-        prev_month_orders = max(0, int(orders_30d * (0.8 + random.random() * 0.4)))
-        if prev_month_orders > 0:
-            growth_rate = ((orders_30d - prev_month_orders) / prev_month_orders) * 100
-        else:
-            growth_rate = 100.0 if orders_30d > 0 else 0.0
-        
-        # Week-over-week trend
-        trend_percentage = (random.random() - 0.5) * 40  # ±20% weekly trend
-        
-        return {
-            "orders_30d": orders_30d,
-            "avg_order_value": avg_order_value,
-            "total_revenue_30d": total_revenue_30d,
-            "last_order_date": last_order_date,
-            "growth_rate": growth_rate,
-            "trend_percentage": trend_percentage,
-            "pattern_used": pattern
-        }
+        latest, active = (await self.session.execute(
+            select(func.max(ActivityMetrics.calculation_date), func.count())
+            .where(ActivityMetrics.is_active == True)
+        )).one()
+        return f"{latest.isoformat() if latest else '-'}|{active}"
     
-    async def _create_activity_metrics(
-        self, 
-        entity_id: str, 
-        entity_type: EntityType, 
-        order_data: Dict[str, Any]
-    ) -> ActivityMetrics:
-        """Create ActivityMetrics object from calculated data"""
-        
-        # Calculate activity score
-        activity_score, activity_level, component_scores = await self.calculate_entity_activity_score(
-            entity_id=entity_id,
-            entity_type=entity_type,
-            orders_30d=order_data["orders_30d"],
-            last_order_date=order_data["last_order_date"],
-            avg_order_value=order_data["avg_order_value"],
-            total_revenue_30d=order_data["total_revenue_30d"]
-        )
-        
-        # Create metrics object
-        metrics = ActivityMetrics(
-            entity_id=entity_id,
-            entity_type=entity_type.value,
-            activity_score=activity_score,
-            activity_level=activity_level.value,
-            last_order_date=order_data["last_order_date"],
-            total_orders_30d=order_data["orders_30d"],
-            total_revenue_30d=order_data["total_revenue_30d"],
-            avg_order_value_30d=order_data["avg_order_value"],
-            trend_percentage=order_data["trend_percentage"],
-            growth_rate=order_data["growth_rate"],
-            frequency_score=component_scores["frequency_score"],
-            recency_score=component_scores["recency_score"],
-            value_score=component_scores["value_score"],
-            additional_metadata={
-                "pattern_used": order_data["pattern_used"],
-                "calculation_method": "mock_data_v1"
-            }
+    async def get_activity_metrics(
+        self,
+        entity_type: Optional[str] = None,
+        activity_level: Optional[str] = None,
+        min_score: Optional[int] = None,
+        max_score: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        scope: Optional[DashboardScope] = None
+    ) -> List[ActivityMetrics]:
+        """Read scored rollup rows, filtered and ordered by score in SQL"""
+        conditions = [ActivityMetrics.is_active == True]
+        if scope is not None:
+            entities = scope_entities(scope)
+            conditions.append(
+                tuple_(ActivityMetrics.entity_type, ActivityMetrics.entity_id).in_(
+                    select(entities.c.entity_type, entities.c.entity_id)
+                )
+            )
+        if entity_type:
+            conditions.append(ActivityMetrics.entity_type == entity_type)
+        if activity_level:
+            conditions.append(ActivityMetrics.activity_level == activity_level)
+        if min_score is not None:
+            conditions.append(ActivityMetrics.activity_score >= min_score)
+        if max_score is not None:
+            conditions.append(ActivityMetrics.activity_score <= max_score)
+        
+        stmt = (
+            select(ActivityMetrics)
+            .where(and_(*conditions))
+            .order_by(desc(ActivityMetrics.activity_score), ActivityMetrics.entity_id)
+            .offset(offset)
         )
+        if limit is not None:
+            stmt = stmt.limit(limit)
         
-        return metrics
-    
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def generate_dashboard_summary(self, activity_metrics: List[ActivityMetrics]) -> DashboardSummary:
         """Generate dashboard summary from activity metrics"""
         
+        # Column defaults only apply on INSERT; this summary is never stored
+        now = datetime.now(timezone.utc)
         if not activity_metrics:
-            return DashboardSummary()
+            return DashboardSummary(
+                total_groups=0, total_companies=0, total_locations=0, total_business_units=0,
+                active_entities_count=0, active_entities_percentage=0.0, medium_entities_count=0,
+                low_entities_count=0, dormant_entities_count=0, total_revenue_30d=0.0,
+                avg_revenue_per_entity=0.0, total_orders_30d=0, avg_orders_per_entity=0.0,
+                avg_activity_score=0.0, top_performer_score=0.0, growth_rate_overall=0.0,
+                calculation_date=now, data_freshness_minutes=0,
+            )
         
         # Count entities by type
         type_counts = {}
@@ -334,6 +261,10 @@ class ActivityScoringService:
         active_count = activity_counts.get("active", 0)
         active_percentage = (active_count / total_entities * 100) if total_entities > 0 else 0
         
+        # Age of the latest scoring run behind these metrics
+        calculated = [m.calculation_date for m in activity_metrics if m.calculation_date]
+        data_freshness_minutes = int((now - max(calculated)).total_seconds() // 60) if calculated else 0
+        
         summary = DashboardSummary(
             total_groups=type_counts.get("group", 0),
             total_companies=type_counts.get("company", 0),
@@ -350,15 +281,53 @@ class ActivityScoringService:
             avg_orders_per_entity=avg_orders_per_entity,
             avg_activity_score=avg_activity_score,
             top_performer_score=top_performer_score,
-            growth_rate_overall=avg_growth_rate
+            growth_rate_overall=avg_growth_rate,
+            calculation_date=now,
+            data_freshness_minutes=data_freshness_minutes,
         )
         
         return summary
     
+    async def build_dashboard_metrics(self, scope: Optional[DashboardScope] = None) -> DashboardMetricsResponse:
+        """
+        Compute the full dashboard payload for all entities or one scope.
+
+        Display names of every highlighted entity (top performers and the three
+        insight lists) are resolved in a single query.
+        """
+        activity_metrics = await self.calculate_all_entity_scores(scope=scope)
+        dashboard_summary = await self.generate_dashboard_summary(activity_metrics)
+
+        top_metrics = sorted(activity_metrics, key=lambda m: m.activity_score, reverse=True)[:10]
+        attention_metrics = sorted(
+            (m for m in activity_metrics if m.activity_score < 30), key=lambda m: m.activity_score
+        )[:5]
+        growth_metrics = sorted(
+            (m for m in activity_metrics if m.growth_rate > 0), key=lambda m: m.growth_rate, reverse=True
+        )[:5]
+        recent_metrics = sorted(
+            (m for m in activity_metrics if m.last_order_date), key=lambda m: m.last_order_date, reverse=True
+        )[:5]
+
+        highlighted = top_metrics + attention_metrics + growth_metrics + recent_metrics
+        names = await self._get_entity_names([(m.entity_type, m.entity_id) for m in highlighted])
+
+        return DashboardMetricsResponse(
+            summary=dashboard_summary,
+            top_performers=await self.get_top_performers(activity_metrics, limit=10, names=names),
+            recent_activity=await self.convert_to_summaries(recent_metrics, names=names),
+            growth_leaders=await self.convert_to_summaries(growth_metrics, names=names),
+            attention_needed=await self.convert_to_summaries(attention_metrics, names=names),
+            data_timestamp=datetime.now(timezone.utc),
+            total_entities_analyzed=len(activity_metrics),
+            cache_hit=False
+        )
+
     async def get_top_performers(
         self, 
         activity_metrics: List[ActivityMetrics], 
-        limit: int = 10
+        limit: int = 10,
+        names: Optional[Dict[Tuple[str, str], str]] = None
     ) -> List[EntityActivitySummary]:
         """Get top performing entities by activity score"""
         
@@ -367,14 +336,13 @@ class ActivityScoringService:
         top_metrics = sorted_metrics[:limit]
         
         # Convert to summary format
+        if names is None:
+            names = await self._get_entity_names([(m.entity_type, m.entity_id) for m in top_metrics])
         summaries = []
         for rank, metrics in enumerate(top_metrics, 1):
-            # Get entity name
-            entity_name = await self._get_entity_name(metrics.entity_id, metrics.entity_type)
-            
             summary = EntityActivitySummary(
                 entity_id=metrics.entity_id,
-                entity_name=entity_name,
+                entity_name=names.get((metrics.entity_type, metrics.entity_id)) or f"Entity-{metrics.entity_id[:8]}",
                 entity_type=EntityType(metrics.entity_type),
                 activity_score=metrics.activity_score,
                 activity_level=ActivityLevel(metrics.activity_level),
@@ -388,42 +356,47 @@ class ActivityScoringService:
         
         return summaries
     
-    async def _get_entity_name(self, entity_id: str, entity_type: str) -> str:
-        """Get entity display name from database"""
-        try:
-            if entity_type == "group":
-                stmt = select(CustomerGroup.name).where(CustomerGroup.id == entity_id)
-            elif entity_type == "company":
-                stmt = select(CustomerCompany.name).where(CustomerCompany.id == entity_id)
-            elif entity_type == "location":
-                stmt = select(CustomerLocation.name).where(CustomerLocation.id == entity_id)
-            elif entity_type == "business_unit":
-                stmt = select(BusinessUnit.name).where(BusinessUnit.id == entity_id)
-            else:
-                return f"Unknown-{entity_id[:8]}"
-            
-            result = await self.session.execute(stmt)
-            name = result.scalar_one_or_none()
-            return name or f"Entity-{entity_id[:8]}"
-            
-        except Exception as e:
-            logger.error("Failed to get entity name", entity_id=entity_id, entity_type=entity_type, error=str(e))
-            return f"Entity-{entity_id[:8]}"
+    async def _get_entity_names(self, entity_keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Get display names for many (entity_type, entity_id) pairs in one UNION ALL query"""
+        ids_by_type: Dict[str, set] = {}
+        for entity_type, entity_id in entity_keys:
+            if entity_type in MODELS:
+                ids_by_type.setdefault(entity_type, set()).add(entity_id)
+        if not ids_by_type:
+            return {}
+        
+        lookups = [
+            select(
+                literal(entity_type, String).label("entity_type"),
+                MODELS[entity_type].id.label("entity_id"),
+                MODELS[entity_type].name.label("name"),
+            ).where(MODELS[entity_type].id.in_(sorted(ids)))
+            for entity_type, ids in ids_by_type.items()
+        ]
+        result = await self.session.execute(union_all(*lookups))
+        return {(row.entity_type, row.entity_id): row.name for row in result.all()}
     
-    async def _convert_to_summary(self, metrics: ActivityMetrics) -> EntityActivitySummary:
-        """Convert ActivityMetrics to EntityActivitySummary"""
-        entity_name = await self._get_entity_name(metrics.entity_id, metrics.entity_type)
-        
-        return EntityActivitySummary(
-            entity_id=metrics.entity_id,
-            entity_name=entity_name,
-            entity_type=EntityType(metrics.entity_type),
-            activity_score=metrics.activity_score,
-            activity_level=ActivityLevel(metrics.activity_level),
-            total_revenue_30d=metrics.total_revenue_30d,
-            total_orders_30d=metrics.total_orders_30d,
-            trend_percentage=metrics.trend_percentage
-        )
+    async def convert_to_summaries(
+        self,
+        metrics_list: List[ActivityMetrics],
+        names: Optional[Dict[Tuple[str, str], str]] = None
+    ) -> List[EntityActivitySummary]:
+        """Convert many ActivityMetrics to EntityActivitySummary with batched name lookups"""
+        if names is None:
+            names = await self._get_entity_names([(m.entity_type, m.entity_id) for m in metrics_list])
+        return [
+            EntityActivitySummary(
+                entity_id=metrics.entity_id,
+                entity_name=names.get((metrics.entity_type, metrics.entity_id)) or f"Entity-{metrics.entity_id[:8]}",
+                entity_type=EntityType(metrics.entity_type),
+                activity_score=metrics.activity_score,
+                activity_level=ActivityLevel(metrics.activity_level),
+                total_revenue_30d=metrics.total_revenue_30d,
+                total_orders_30d=metrics.total_orders_30d,
+                trend_percentage=metrics.trend_percentage
+            )
+            for metrics in metrics_list
+        ]
     
     async def calculate_advanced_analytics(
         self, 
@@ -18,6 +18,7 @@ import uuid
 import structlog
 
 from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.models.entity_change_log import EntityChangeLog
 
 logger = structlog.get_logger(__name__)
 
@@ -529,25 +530,32 @@ class AuditService:
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """
-        Retrieve audit trail with filtering options
+        Retrieve the entity audit trail (entity_change_log), newest first
         """
         try:
-            # This would query the audit log table
-            # For now, return empty list as we haven't created the table structure
-            # In production, this would execute complex queries on audit_logs table
-            
-            logger.info(
-                "Audit trail query",
-                entity_type=entity_type,
-                entity_id=entity_id,
-                actor=actor,
-                start_date=start_date.isoformat() if start_date else None,
-                end_date=end_date.isoformat() if end_date else None,
-                limit=limit,
-                offset=offset
+            log = EntityChangeLog
+            conditions = []
+            if entity_type:
+                conditions.append(log.entity_type == entity_type)
+            if entity_id:
+                conditions.append(log.entity_id == entity_id)
+            if actor:
+                conditions.append(log.actor_id == actor)
+            # Date bounds also prune partitions
+            if start_date:
+                conditions.append(log.changed_at >= start_date)
+            if end_date:
+                conditions.append(log.changed_at < end_date)
+
+            query = (
+                select(log)
+                .where(and_(*conditions))
+                .order_by(log.changed_at.desc(), log.id)
+                .limit(limit)
+                .offset(offset)
             )
-            
-            return []  # Placeholder
+            result = await self.db.execute(query)
+            return [entry.to_dict() for entry in result.scalars().all()]
             
         except Exception as e:
             logger.error(
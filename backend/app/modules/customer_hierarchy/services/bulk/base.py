@@ -19,7 +19,9 @@ from app.modules.customer_hierarchy.services.integration_service import Integrat
 from app.modules.customer_hierarchy.services.audit_service import AuditService
 from app.modules.customer_hierarchy.services.validation_service import ValidationService
 from app.modules.customer_hierarchy.services.hierarchy_service import HierarchyService
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import HierarchyImportEngine
 from app.modules.customer_hierarchy.services.bulk.types import BulkOperationStatus
+from orderly_fastapi_core.background_jobs import JobContext
 
 logger = structlog.get_logger(__name__)
 
@@ -37,6 +39,7 @@ class BulkOperationBase:
     default_batch_size: int = 50
 
     db: AsyncSession
+    job_context: Optional[JobContext] = None
     cache: CacheService
     integration: IntegrationService
     audit: AuditService
@@ -52,9 +55,10 @@ class BulkOperationBase:
     # Entity mapping for polymorphic operations
     entity_map: Dict[str, Dict[str, Any]]
 
-    def _init_services(self, db: AsyncSession) -> None:
+    def _init_services(self, db: AsyncSession, job_context: Optional[JobContext] = None) -> None:
         """Initialize all required services and CRUD objects."""
         self.db = db
+        self.job_context = job_context
         self.cache = CacheService()
         self.integration = IntegrationService()
         self.audit = AuditService(db)
@@ -104,6 +108,8 @@ class BulkOperationBase:
         operation_data["status"] = status
         operation_data.update(additional_data)
         await self.cache.set(cache_key, operation_data, ttl=86400)
+        if "progress" in additional_data:
+            await self._report_job_progress(status=status.value, **additional_data["progress"])
 
     async def _update_operation_progress(
         self,
@@ -114,6 +120,12 @@ class BulkOperationBase:
         operation_data = await self.cache.get(cache_key) or {}
         operation_data["progress"] = progress_data
         await self.cache.set(cache_key, operation_data, ttl=86400)
+        await self._report_job_progress(**progress_data)
+
+    async def _report_job_progress(self, **progress: Any) -> None:
+        """Mirror progress into the background job running this operation (no-op when run inline)."""
+        if self.job_context is not None:
+            await self.job_context.report_progress(**progress)
 
     async def _invalidate_hierarchy_caches(self) -> None:
         """Invalidate hierarchy-related caches after bulk operations."""
@@ -126,13 +138,25 @@ class BulkOperationBase:
         for pattern in cache_patterns:
             await self.cache.delete_pattern(pattern)
 
-    async def _validate_entity_for_create(
+    async def _validate_entities_for_create(
         self,
-        entity: Any,
+        entities: List[Any],
         user_context: Optional[Dict[str, Any]]
-    ) -> Dict[str, Any]:
-        """Validate individual entity for create operation."""
-        return {"is_valid": True, "errors": [], "warnings": []}
+    ) -> List[Dict[str, Any]]:
+        """Validate entities for create in one pass, returning per-entity failures."""
+        records = [
+            {**entity.data, "id": entity.data.get("id") or f"entity_{i}", "type": entity.entity_type}
+            for i, entity in enumerate(entities)
+        ]
+        plan = await HierarchyImportEngine(self.db).plan(records)
+        return [
+            {
+                "index": error["record_index"],
+                "entity_id": error["record_id"],
+                "errors": error["errors"]
+            }
+            for error in plan.errors
+        ]
 
     async def _validate_bulk_hierarchy_constraints(
         self,
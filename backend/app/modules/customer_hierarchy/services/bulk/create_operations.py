@@ -10,6 +10,7 @@ import structlog
 
 from app.modules.customer_hierarchy.schemas.bulk import BulkCreateRequestSchema
 from app.modules.customer_hierarchy.services.bulk.types import BulkOperationStatus, BulkOperationType
+from orderly_fastapi_core.background_jobs import JobCancelled
 
 logger = structlog.get_logger(__name__)
 
@@ -44,19 +45,10 @@ class BulkCreateMixin:
                     f"Unsupported entity types: {', '.join(unsupported_types)}"
                 )
 
-            # Validate individual entities
-            entity_validation_results = []
-            for i, entity in enumerate(bulk_data.entities):
-                entity_validation = await self._validate_entity_for_create(
-                    entity, user_context
-                )
-
-                if not entity_validation["is_valid"]:
-                    entity_validation_results.append({
-                        "index": i,
-                        "entity_id": entity.data.get("id", f"entity_{i}"),
-                        "errors": entity_validation["errors"]
-                    })
+            # Validate individual entities as one set-based pass
+            entity_validation_results = await self._validate_entities_for_create(
+                bulk_data.entities, user_context
+            )
 
             if entity_validation_results:
                 validation_errors.append(
@@ -241,6 +233,8 @@ class BulkCreateMixin:
                                 operation_id=operation_id
                             )
 
+                except JobCancelled:
+                    raise
                 except Exception as e:
                     logger.error(
                         "Failed to process batch in bulk create",
@@ -317,6 +311,8 @@ class BulkCreateMixin:
                 error=str(e),
                 operation_id=operation_id
             )
+            if isinstance(e, JobCancelled):
+                raise
 
     async def _execute_bulk_create_immediate(
         self,
@@ -4,15 +4,20 @@ Bulk export operations mixin.
 
 from typing import Dict, Optional, Any
 from datetime import datetime
+import os
 import uuid
 import structlog
 
+from app.modules.customer_hierarchy.core.config import settings
 from app.modules.customer_hierarchy.schemas.bulk import BulkExportRequestSchema
+from app.modules.customer_hierarchy.services.access_index_service import hierarchy_access
 from app.modules.customer_hierarchy.services.bulk.types import BulkOperationStatus, BulkOperationType
+from app.modules.customer_hierarchy.services.hierarchy.export_engine import HierarchyExportEngine, export_media
+from app.modules.customer_hierarchy.services.hierarchy.export_store import download_path, save_export
 
 logger = structlog.get_logger(__name__)
 
-ALLOWED_EXPORT_FORMATS = {"csv", "xlsx", "json"}
+ALLOWED_EXPORT_FORMATS = {"csv", "ndjson", "xlsx", "json"}
 
 
 class BulkExportMixin:
@@ -69,3 +74,74 @@ class BulkExportMixin:
                 exported_by=exported_by
             )
             raise
+
+    async def process_bulk_export_background(
+        self,
+        operation_id: str,
+        export_data: BulkExportRequestSchema,
+        user_id: str,
+        user_context: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Background processor for bulk export: streams the hierarchy into a local
+        scratch file, then stores it in hierarchy_exports for download.
+        """
+        key = f"bulk_operation:{operation_id}"
+        filters = export_data.filters or {}
+        media = export_media(export_data.format)
+        path = os.path.join(
+            settings.export_dir,
+            f"hierarchy_export_{operation_id}.{media['extension']}"
+        )
+
+        await self._update_operation_status(
+            key,
+            BulkOperationStatus.PROCESSING,
+            {"started_processing_at": datetime.utcnow().isoformat()}
+        )
+
+        try:
+            os.makedirs(settings.export_dir, exist_ok=True)
+            # The job runs outside the request, so the submitter's access is resolved here
+            access = await hierarchy_access.for_context(self.db, user_context)
+            record_count = await HierarchyExportEngine(self.db, access=access).write_file(
+                path,
+                export_data.format,
+                on_batch=lambda exported: self._report_job_progress(processed=exported),
+                root_id=filters.get("root_id"),
+                include_inactive=bool(filters.get("include_inactive", False)),
+                max_depth=filters.get("max_depth"),
+            )
+            export = await save_export(
+                self.db, operation_id, path, media["content_type"], record_count, created_by=user_id
+            )
+        except Exception as e:
+            logger.error(
+                "Bulk export failed",
+                operation_id=operation_id,
+                format=export_data.format,
+                error=str(e)
+            )
+            await self._update_operation_status(
+                key,
+                BulkOperationStatus.FAILED,
+                {"failed_at": datetime.utcnow().isoformat(), "error": str(e)}
+            )
+            if os.path.exists(path):
+                os.unlink(path)
+            raise
+
+        await self._update_operation_status(
+            key,
+            BulkOperationStatus.COMPLETED,
+            {
+                "completed_at": datetime.utcnow().isoformat(),
+                "final_results": {
+                    "record_count": record_count,
+                    "filename": export.filename,
+                    "size_bytes": export.size_bytes,
+                    "download_url": download_path(operation_id),
+                    "expires_at": export.expires_at.isoformat(),
+                },
+            }
+        )
@@ -10,8 +10,12 @@ This service handles bulk operations including:
 - Import/export functionality with multiple format support
 """
 
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from orderly_fastapi_core.background_jobs import JobContext
+
 from app.modules.customer_hierarchy.services.bulk.base import BulkOperationBase
 from app.modules.customer_hierarchy.services.bulk.create_operations import BulkCreateMixin
 from app.modules.customer_hierarchy.services.bulk.update_operations import BulkUpdateMixin
@@ -57,6 +61,6 @@ class BulkService(
     - BulkStatusMixin: get_operation_status, get_operation_progress, cancel_operation
     """
 
-    def __init__(self, db: AsyncSession) -> None:
-        """Initialize BulkService with database session."""
-        self._init_services(db)
+    def __init__(self, db: AsyncSession, job_context: Optional[JobContext] = None) -> None:
+        """Initialize BulkService with database session (and the background job running it, if any)."""
+        self._init_services(db, job_context)
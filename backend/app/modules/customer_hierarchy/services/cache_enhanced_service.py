@@ -2,24 +2,29 @@
 Enhanced Cache Service for Activity Metrics
 
 Redis-based caching layer for expensive dashboard calculations.
-Provides intelligent cache invalidation and background refresh capabilities.
+Provides intelligent cache invalidation and background refresh capabilities:
+dashboard payloads are precomputed per scope (all entities or one hierarchy
+subtree) by DashboardRefreshService and served straight from Redis.
 """
 
 import structlog
 import json
 import hashlib
+import time
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any, Union
 import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from orderly_fastapi_core import redis_manager
+
 from app.modules.customer_hierarchy.core.config import settings
 from app.modules.customer_hierarchy.models import ActivityMetrics, DashboardSummary
 from app.modules.customer_hierarchy.schemas.activity import (
     DashboardMetricsResponse, ActivityAnalyticsResponse,
     EntityActivitySummary, ActivityMetricsResponse
 )
-from app.modules.customer_hierarchy.services.activity_service import ActivityScoringService
+from app.modules.customer_hierarchy.services.activity_service import ActivityScoringService, DashboardScope
 from app.modules.customer_hierarchy.services.mock_data_service import MockDataService
 
 logger = structlog.get_logger(__name__)
@@ -29,7 +34,6 @@ class CacheConfig:
     """Cache configuration constants"""
     
     # Cache TTL (Time To Live) in seconds
-    DASHBOARD_METRICS_TTL = 300      # 5 minutes
     ACTIVITY_DATA_TTL = 180          # 3 minutes
     ANALYTICS_DATA_TTL = 600         # 10 minutes
     PERFORMANCE_DATA_TTL = 300       # 5 minutes
@@ -40,8 +44,13 @@ class CacheConfig:
     ANALYTICS_PREFIX = "hierarchy:analytics"
     PERFORMANCE_PREFIX = "hierarchy:performance"
     
-    # Background refresh thresholds
-    REFRESH_THRESHOLD_SECONDS = 60   # Refresh cache if < 60 seconds remaining
+    # Precomputed dashboards outlive the refresh interval so reads never wait
+    # on a rebuild; the refresher replaces them well before this expires
+    DASHBOARD_STALE_TTL = 3600
+    
+    # Refresh-ahead bookkeeping, outside the prefixes cleared by invalidate_cache
+    DASHBOARD_SCOPES_KEY = "hierarchy:refresh:dashboard_scopes"   # ZSET scope -> last read
+    DASHBOARD_LOCK_PREFIX = "hierarchy:refresh:dashboard_lock"
 
 
 class EnhancedCacheService:
@@ -49,9 +58,10 @@ class EnhancedCacheService:
     Enhanced caching service with intelligent cache management.
     """
     
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, redis_client: Optional[redis.Redis] = None):
         self.session = session
-        self.redis_client: Optional[redis.Redis] = None
+        # Pass an already verified client to skip initialize_redis per request
+        self.redis_client: Optional[redis.Redis] = redis_client
         self.activity_service = ActivityScoringService(session)
         self.mock_service = MockDataService()
         self.cache_mode = getattr(settings, "cache_mode", "degraded").strip().lower()
@@ -73,11 +83,23 @@ class EnhancedCacheService:
                 return
 
             redis_url = getattr(settings, 'redis_url', 'redis://localhost:6379/0')
-            self.redis_client = redis.from_url(redis_url, decode_responses=True)
+            # This service is built per request: skip the ping while the shared
+            # breaker is open instead of paying a connect timeout every time
+            breaker = redis_manager.breaker(redis_url)
+            if not breaker.allow():
+                raise ConnectionError("Redis circuit breaker open")
+
+            # Shared pooled client; no connection is opened per request
+            self.redis_client = redis_manager.client("hierarchy-dashboard", url=redis_url)
             
             # Test connection
-            await self.redis_client.ping()
-            logger.info("Redis cache initialized successfully", redis_url=redis_url)
+            try:
+                await self.redis_client.ping()
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            logger.debug("Redis cache initialized successfully", redis_url=redis_url)
             self.status["state"] = "ready"
             self.status["last_error"] = None
             
@@ -91,9 +113,8 @@ class EnhancedCacheService:
                 raise
     
     async def close_redis(self):
-        """Close Redis connection"""
-        if self.redis_client:
-            await self.redis_client.close()
+        """Release the shared Redis client (the pool itself stays open)"""
+        self.redis_client = None
     
     def _generate_cache_key(self, prefix: str, **kwargs) -> str:
         """Generate deterministic cache key from parameters"""
@@ -164,111 +185,138 @@ class EnhancedCacheService:
             self.status["last_error"] = str(e)
             return False
     
-    async def _check_cache_freshness(self, cache_key: str) -> Optional[int]:
-        """Check remaining TTL for cache key"""
+    @staticmethod
+    def dashboard_scope_member(scope: Optional[DashboardScope] = None) -> str:
+        """Registry member for a dashboard scope ("all" or "<type>:<id>")"""
+        return "all" if scope is None else f"{scope[0]}:{scope[1]}"
+    
+    @staticmethod
+    def parse_dashboard_scope(member: str) -> Optional[DashboardScope]:
+        if member == "all":
+            return None
+        entity_type, _, entity_id = member.partition(":")
+        return (entity_type, entity_id)
+    
+    def _dashboard_cache_key(self, member: str) -> str:
+        return self._generate_cache_key(CacheConfig.DASHBOARD_PREFIX, scope=member)
+    
+    async def get_dashboard_metrics_cached(
+        self, 
+        include_cache_info: bool = False,
+        scope: Optional[DashboardScope] = None
+    ) -> DashboardMetricsResponse:
+        """
+        Serve precomputed dashboard metrics for all entities or one scope.
+        
+        Payloads are rebuilt ahead of expiry by DashboardRefreshService; each
+        read also marks the scope as in use so the refresher keeps it warm.
+        Metrics are only computed at request time when the cache is cold.
+        """
+        member = self.dashboard_scope_member(scope)
+        cached = await self._read_dashboard(member)
+        if cached:
+            return self._dashboard_response(cached["metrics"], cache_hit=True)
+        
+        logger.info("Dashboard cache cold, calculating inline", scope=member)
+        return await self.refresh_dashboard(scope)
+    
+    async def refresh_dashboard(self, scope: Optional[DashboardScope] = None) -> DashboardMetricsResponse:
+        """Compute the dashboard for a scope and store it with the data version it reflects"""
+        member = self.dashboard_scope_member(scope)
+        start_time = datetime.now(timezone.utc)
+        response = await self.activity_service.build_dashboard_metrics(scope)
+        # Read after building: the build may have rescored a stale rollup
+        version = await self.activity_service.data_version()
+        
+        await self._set_cached_data(
+            self._dashboard_cache_key(member),
+            {
+                "version": version,
+                "built_at": start_time.timestamp(),
+                "metrics": response.dict(),
+            },
+            CacheConfig.DASHBOARD_STALE_TTL
+        )
+        logger.debug(
+            "Dashboard metrics rebuilt",
+            scope=member,
+            duration_ms=int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000),
+        )
+        return response
+    
+    async def _read_dashboard(self, member: str) -> Optional[Dict[str, Any]]:
+        """Fetch a cached dashboard and record the scope as in use, in one round trip"""
         if not self.redis_client:
             if self.status.get("state") != "disabled":
                 self.status["state"] = "degraded"
             return None
         
         try:
-            ttl = await self.redis_client.ttl(cache_key)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(self._dashboard_cache_key(member))
+                pipe.zadd(CacheConfig.DASHBOARD_SCOPES_KEY, {member: time.time()})
+                cached_data, _ = await pipe.execute()
             if self.status.get("state") not in ("disabled", "ready"):
                 self.status["state"] = "ready"
                 self.status["last_error"] = None
-            return ttl if ttl > 0 else None
+            return json.loads(cached_data) if cached_data else None
         except Exception as e:
-            logger.error("Cache TTL check failed", cache_key=cache_key, error=str(e))
+            logger.error("Dashboard cache read failed", scope=member, error=str(e))
             self.status["state"] = "degraded"
             self.status["last_error"] = str(e)
             return None
     
-    async def get_dashboard_metrics_cached(
-        self, 
-        include_cache_info: bool = False
-    ) -> DashboardMetricsResponse:
-        """Get dashboard metrics with caching"""
-        
-        cache_key = self._generate_cache_key(CacheConfig.DASHBOARD_PREFIX)
-        
-        # Try to get from cache first
-        cached_data = await self._get_cached_data(cache_key)
-        cache_hit = cached_data is not None
-        
-        if cached_data:
-            # Check if we should refresh in background
-            remaining_ttl = await self._check_cache_freshness(cache_key)
-            if remaining_ttl and remaining_ttl < CacheConfig.REFRESH_THRESHOLD_SECONDS:
-                # Background refresh (fire and forget)
-                logger.info("Triggering background cache refresh", cache_key=cache_key)
-                # In production, this would be a background task
+    async def get_dashboard_build_info(self, member: str) -> Optional[Dict[str, Any]]:
+        """Version and build time of a cached dashboard (None when not cached)"""
+        cached = await self._get_cached_data(self._dashboard_cache_key(member))
+        if not cached:
+            return None
+        return {"version": cached.get("version"), "built_at": cached.get("built_at")}
+    
+    async def active_dashboard_scopes(self, idle_seconds: int) -> List[str]:
+        """Scopes read within ``idle_seconds`` (always including "all"); idle ones are dropped"""
+        members = ["all"]
+        if not self.redis_client:
+            return members
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.zremrangebyscore(CacheConfig.DASHBOARD_SCOPES_KEY, "-inf", time.time() - idle_seconds)
+                pipe.zrange(CacheConfig.DASHBOARD_SCOPES_KEY, 0, -1)
+                _, active = await pipe.execute()
+        except Exception as e:
+            logger.error("Failed to read dashboard scope registry", error=str(e))
+            return members
+        return members + [member for member in active if member != "all"]
+    
+    async def acquire_refresh_lock(self, member: str, ttl_seconds: int) -> bool:
+        """Claim the rebuild of one scope so only one process recomputes it"""
+        if not self.redis_client:
+            return True
+        try:
+            return bool(await self.redis_client.set(
+                f"{CacheConfig.DASHBOARD_LOCK_PREFIX}:{member}", "1", nx=True, ex=ttl_seconds
+            ))
+        except Exception as e:
+            logger.error("Failed to acquire dashboard refresh lock", scope=member, error=str(e))
+            return False
+    
+    async def release_refresh_lock(self, member: str) -> None:
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.delete(f"{CacheConfig.DASHBOARD_LOCK_PREFIX}:{member}")
+        except Exception as e:
+            logger.warning("Failed to release dashboard refresh lock", scope=member, error=str(e))
+    
+    @staticmethod
+    def _dashboard_response(cached_data: Dict[str, Any], cache_hit: bool) -> DashboardMetricsResponse:
+        cached_data['cache_hit'] = cache_hit
         
-        if not cached_data:
-            # Calculate fresh data
-            logger.info("Calculating fresh dashboard metrics")
-            start_time = datetime.now(timezone.utc)
-            
-            # Get activity metrics
-            activity_metrics = await self.activity_service.calculate_all_entity_scores()
-            dashboard_summary = await self.activity_service.generate_dashboard_summary(activity_metrics)
-            top_performers = await self.activity_service.get_top_performers(activity_metrics, limit=10)
-            
-            # Get other insights
-            attention_needed = []
-            growth_leaders = []
-            recent_activity = []
-            
-            # Find entities needing attention
-            low_score_metrics = [m for m in activity_metrics if m.activity_score < 30]
-            for metrics in sorted(low_score_metrics, key=lambda x: x.activity_score)[:5]:
-                summary = await self.activity_service._convert_to_summary(metrics)
-                attention_needed.append(summary)
-            
-            # Find growth leaders
-            high_growth_metrics = [m for m in activity_metrics if m.growth_rate > 0]
-            for metrics in sorted(high_growth_metrics, key=lambda x: x.growth_rate, reverse=True)[:5]:
-                summary = await self.activity_service._convert_to_summary(metrics)
-                growth_leaders.append(summary)
-            
-            # Find recently active entities
-            recent_metrics = [m for m in activity_metrics if m.last_order_date]
-            for metrics in sorted(recent_metrics, key=lambda x: x.last_order_date or datetime.min, reverse=True)[:5]:
-                summary = await self.activity_service._convert_to_summary(metrics)
-                recent_activity.append(summary)
-            
-            calculation_time = datetime.now(timezone.utc)
-            
-            # Create response
-            response = DashboardMetricsResponse(
-                summary=dashboard_summary,
-                top_performers=top_performers,
-                recent_activity=recent_activity,
-                growth_leaders=growth_leaders,
-                attention_needed=attention_needed,
-                data_timestamp=calculation_time,
-                total_entities_analyzed=len(activity_metrics),
-                cache_hit=False
-            )
-            
-            # Convert to dict for caching
-            response_dict = response.dict()
-            
-            # Cache the result
-            await self._set_cached_data(cache_key, response_dict, CacheConfig.DASHBOARD_METRICS_TTL)
-            
-            return response
+        # Handle datetime conversion
+        if isinstance(cached_data.get('data_timestamp'), str):
+            cached_data['data_timestamp'] = datetime.fromisoformat(cached_data['data_timestamp'].replace('Z', '+00:00'))
         
-        else:
-            # Return cached data
-            # Convert cached dict back to response object
-            cached_data['cache_hit'] = True
-            
-            # Handle datetime conversion
-            if 'data_timestamp' in cached_data:
-                if isinstance(cached_data['data_timestamp'], str):
-                    cached_data['data_timestamp'] = datetime.fromisoformat(cached_data['data_timestamp'].replace('Z', '+00:00'))
-            
-            return DashboardMetricsResponse(**cached_data)
+        return DashboardMetricsResponse(**cached_data)
     
     async def get_activity_data_cached(
         self,
@@ -301,26 +349,15 @@ class EnhancedCacheService:
         logger.info("Calculating fresh activity data", 
                    entity_type=entity_type, activity_level=activity_level)
         
-        all_metrics = await self.activity_service.calculate_all_entity_scores()
-        
-        # Apply filters
-        filtered_metrics = all_metrics
-        
-        if entity_type:
-            filtered_metrics = [m for m in filtered_metrics if m.entity_type == entity_type]
-        
-        if activity_level:
-            filtered_metrics = [m for m in filtered_metrics if m.activity_level == activity_level]
-        
-        if min_score is not None:
-            filtered_metrics = [m for m in filtered_metrics if m.activity_score >= min_score]
-        
-        if max_score is not None:
-            filtered_metrics = [m for m in filtered_metrics if m.activity_score <= max_score]
-        
-        # Sort and paginate
-        filtered_metrics.sort(key=lambda m: m.activity_score, reverse=True)
-        paginated_metrics = filtered_metrics[offset:offset + limit]
+        await self.activity_service.ensure_rollup_fresh()
+        paginated_metrics = await self.activity_service.get_activity_metrics(
+            entity_type=entity_type,
+            activity_level=activity_level,
+            min_score=min_score,
+            max_score=max_score,
+            limit=limit,
+            offset=offset
+        )
         
         # Convert to response format
         response_data = [ActivityMetricsResponse.from_orm(m) for m in paginated_metrics]
@@ -355,13 +392,8 @@ class EnhancedCacheService:
         # Calculate fresh data
         logger.info("Calculating fresh analytics data", entity_type=entity_type)
         
-        all_metrics = await self.activity_service.calculate_all_entity_scores()
-        
-        # Filter by entity type if specified
-        if entity_type:
-            filtered_metrics = [m for m in all_metrics if m.entity_type == entity_type]
-        else:
-            filtered_metrics = all_metrics
+        await self.activity_service.ensure_rollup_fresh()
+        filtered_metrics = await self.activity_service.get_activity_metrics(entity_type=entity_type)
         
         if not filtered_metrics:
             raise ValueError("No data found for specified criteria")
@@ -2,26 +2,41 @@
 CacheService - Redis-based caching service for hierarchy operations
 
 This service provides high-performance caching with:
-- Redis integration with connection pooling
+- Redis integration through the process-wide shared connection pool
 - Intelligent cache key management and TTL strategies
 - Pattern-based cache invalidation
+- Versioned keys for entries built from hierarchy rows (tree, breadcrumb,
+  statistics): the version is bumped after every commit that wrote a hierarchy
+  row or changed access, so ordinary writes never serve a stale entry
 - Performance metrics and monitoring
 - Circuit breaker pattern for cache failures
 - Serialization/deserialization optimization
 """
 
 from typing import Dict, List, Optional, Any, Union
-import redis.asyncio as redis
+import asyncio
 import json
 import pickle
-from datetime import datetime, timedelta
 import structlog
 from contextlib import asynccontextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, object_session
+
+from orderly_fastapi_core import redis_manager
 
 from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.models import BusinessUnit, CustomerCompany, CustomerGroup, CustomerLocation
 
 logger = structlog.get_logger(__name__)
 
+HIERARCHY_VERSION_KEY = "hierarchy:data_version"
+# session.info flag: this transaction wrote a hierarchy row
+HIERARCHY_DIRTY_KEY = "hierarchy_data_dirty"
+_HIERARCHY_MODELS = (CustomerGroup, CustomerCompany, CustomerLocation, BusinessUnit)
+
+# Background version bumps (referenced until done)
+_pending_bumps: set = set()
+
 
 class CacheService:
     """
@@ -36,11 +51,9 @@ class CacheService:
     - JSON and binary serialization support
     """
     def __init__(self):
-        self.redis_pool = None
         self.connection_retries = 3
-        self.circuit_breaker_threshold = 5
-        self.circuit_breaker_failures = 0
-        self.circuit_breaker_last_failure = None
+        # Circuit breaker state is shared by every module talking to this Redis
+        self.breaker = redis_manager.breaker(settings.redis_url)
         self.performance_stats = {
             "hits": 0,
             "misses": 0,
@@ -55,35 +68,30 @@ class CacheService:
             "state": initial_state,
             "last_error": None,
         }
+        # Binary values: encoding is handled here (JSON first, pickle fallback).
+        # Creating the client is free; connections are borrowed per command.
+        self.redis = None if self.cache_mode == "off" else redis_manager.client(
+            "hierarchy-cache", url=settings.redis_url, decode_responses=False
+        )
     
     async def initialize(self):
-        """Initialize Redis connection pool"""
+        """Verify the shared Redis connection (optional; clients connect lazily)"""
         try:
             if self.cache_mode == "off":
                 logger.info("Cache service disabled via CACHE_MODE config", cache_mode=self.cache_mode)
                 self.status["state"] = "disabled"
                 return
 
-            self.redis_pool = redis.ConnectionPool.from_url(
-                settings.redis_url,
-                max_connections=20,
-                retry_on_timeout=True,
-                decode_responses=False  # Handle encoding manually for flexibility
-            )
-            
-            # Test connection
             async with self._get_connection() as conn:
                 await conn.ping()
             
             logger.info("Cache service initialized successfully", redis_url=settings.redis_url)
-            self.status["state"] = "ready"
-            self.status["last_error"] = None
+            self._reset_circuit_breaker()
             
         except Exception as e:
             logger.error("Failed to initialize cache service", error=str(e))
-            logger.warning("Cache service will operate in fallback mode without Redis - all cache operations will be bypassed")
-            self.redis_pool = None  # Ensure pool is None for fallback operations
-            self.status["state"] = "degraded"
+            logger.warning("Cache operations will be bypassed while the shared circuit breaker is open")
+            self._record_cache_failure()
             self.status["last_error"] = str(e)
             if self.cache_mode == "strict":
                 logger.critical("CACHE_MODE=strict -> failing startup due to Redis initialization error")
@@ -91,20 +99,45 @@ class CacheService:
     
     @asynccontextmanager
     async def _get_connection(self):
-        """Get Redis connection with connection pooling"""
-        if not self.redis_pool:
-            # If redis_pool is None, it means Redis is not available
-            # Don't retry initialization, just raise an exception for graceful fallback
+        """Yield the shared Redis client (connections are pooled process-wide)"""
+        if not self.redis:
             if self.status.get("state") != "disabled":
                 self.status["state"] = "degraded"
             raise Exception("Redis connection not available")
         
-        conn = redis.Redis(connection_pool=self.redis_pool)
-        try:
-            yield conn
-        finally:
-            await conn.close()
+        yield self.redis
     
+    async def versioned_key(self, key: str) -> Optional[str]:
+        """
+        Key for an entry built from hierarchy rows, suffixed with the current
+        hierarchy data and access versions
+
+        Returns None when the versions cannot be read: the caller then neither
+        reads nor writes the cache, so an unversioned entry is never stored.
+        """
+        # access_index_service imports the hierarchy package, which imports this module
+        from app.modules.customer_hierarchy.services.access_index_service import ACCESS_VERSION_KEY
+
+        if not self.redis or self._is_circuit_breaker_open():
+            return None
+        try:
+            data_version, access_version = await self.redis.mget(HIERARCHY_VERSION_KEY, ACCESS_VERSION_KEY)
+        except Exception as e:
+            self._record_cache_failure()
+            logger.error("Cache version read failed", key=key, error=str(e))
+            return None
+        return f"{key}:v{int(data_version or 0)}.{int(access_version or 0)}"
+
+    @staticmethod
+    async def bump_version() -> None:
+        """Invalidate every versioned entry (called after commit)"""
+        try:
+            await redis_manager.client("hierarchy-cache", url=settings.redis_url, decode_responses=False).incr(
+                HIERARCHY_VERSION_KEY
+            )
+        except Exception as e:
+            logger.warning("Hierarchy cache version bump failed", error=str(e))
+
     async def get(self, key: str, default: Any = None) -> Any:
         """
         Get value from cache with automatic deserialization
@@ -118,7 +151,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return default immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache get skipped - Redis not available", key=key)
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -173,7 +206,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return False immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache set skipped - Redis not available", key=key)
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -227,7 +260,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return False immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache delete skipped - Redis not available", key=key)
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -262,7 +295,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return 0 immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache delete_pattern skipped - Redis not available", pattern=pattern)
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -315,7 +348,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return False immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache exists check skipped - Redis not available", key=key)
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -349,7 +382,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return None immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache increment skipped - Redis not available", key=key)
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -389,7 +422,7 @@ class CacheService:
         """
         try:
             # If Redis is not available, return empty dict immediately
-            if not self.redis_pool:
+            if not self.redis:
                 logger.debug("Cache get_multi skipped - Redis not available", key_count=len(keys))
                 if self.status.get("state") != "disabled":
                     self.status["state"] = "degraded"
@@ -521,7 +554,7 @@ class CacheService:
         return {
             "hit_rate": hit_rate,
             "total_operations": total_operations,
-            "circuit_breaker_failures": self.circuit_breaker_failures,
+            "circuit_breaker_failures": self.breaker.failures,
             "circuit_breaker_open": self._is_circuit_breaker_open(),
             **self.performance_stats
         }
@@ -555,33 +588,20 @@ class CacheService:
             return {}
     
     def _is_circuit_breaker_open(self) -> bool:
-        """Check if circuit breaker is open"""
-        if self.circuit_breaker_failures < self.circuit_breaker_threshold:
-            return False
-        
-        if self.circuit_breaker_last_failure:
-            # Reset circuit breaker after 60 seconds
-            if datetime.utcnow() - self.circuit_breaker_last_failure > timedelta(seconds=60):
-                self.circuit_breaker_failures = 0
-                self.circuit_breaker_last_failure = None
-                return False
-        
-        return True
+        """Check if the shared circuit breaker is open"""
+        return self.breaker.is_open
     
     def _record_cache_failure(self):
         """Record cache failure for circuit breaker"""
-        self.circuit_breaker_failures += 1
-        self.circuit_breaker_last_failure = datetime.utcnow()
+        self.breaker.record_failure()
         self.performance_stats["errors"] += 1
         if self.status.get("state") != "disabled":
             self.status["state"] = "degraded"
 
     def _reset_circuit_breaker(self):
         """Reset circuit breaker on successful operation"""
-        if self.circuit_breaker_failures > 0:
-            self.circuit_breaker_failures = 0
-            self.circuit_breaker_last_failure = None
-        if self.redis_pool and self.status.get("state") not in ("disabled", "ready"):
+        self.breaker.record_success()
+        if self.redis and self.status.get("state") not in ("disabled", "ready"):
             self.status["state"] = "ready"
             self.status["last_error"] = None
 
@@ -589,5 +609,53 @@ class CacheService:
         """Expose current cache health status"""
         status_copy = dict(self.status)
         status_copy["circuit_breaker_open"] = self._is_circuit_breaker_open()
-        status_copy["has_connection"] = self.redis_pool is not None
+        status_copy["has_connection"] = self.redis is not None
         return status_copy
+
+
+def _mark_dirty(session: Optional[Session]) -> None:
+    if session is not None:
+        session.info[HIERARCHY_DIRTY_KEY] = True
+
+
+@event.listens_for(CustomerGroup, "after_insert")
+@event.listens_for(CustomerCompany, "after_insert")
+@event.listens_for(CustomerLocation, "after_insert")
+@event.listens_for(BusinessUnit, "after_insert")
+@event.listens_for(CustomerGroup, "after_update")
+@event.listens_for(CustomerCompany, "after_update")
+@event.listens_for(CustomerLocation, "after_update")
+@event.listens_for(BusinessUnit, "after_update")
+@event.listens_for(CustomerGroup, "after_delete")
+@event.listens_for(CustomerCompany, "after_delete")
+@event.listens_for(CustomerLocation, "after_delete")
+@event.listens_for(BusinessUnit, "after_delete")
+def _hierarchy_row_changed(mapper, connection, target: Any) -> None:
+    _mark_dirty(object_session(target))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_hierarchy_rows_changed(state: ORMExecuteState) -> None:
+    # Bulk / ORM-enabled INSERT, UPDATE and DELETE skip the mapper events
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None:
+        if state.bind_mapper.class_ in _HIERARCHY_MODELS:
+            _mark_dirty(state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    if not session.info.pop(HIERARCHY_DIRTY_KEY, False):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync contexts (migrations, scripts) have no loop; entries expire by TTL
+        return
+    task = loop.create_task(CacheService.bump_version())
+    _pending_bumps.add(task)
+    task.add_done_callback(_pending_bumps.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty(session: Session) -> None:
+    session.info.pop(HIERARCHY_DIRTY_KEY, None)
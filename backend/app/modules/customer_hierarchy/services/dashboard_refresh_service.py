@@ -0,0 +1,117 @@
+"""
+DashboardRefreshService - refresh-ahead scheduler for dashboard metrics
+
+Keeps the precomputed dashboard payload of every scope in use warm in Redis,
+so dashboard requests are served from cache without request-time computation:
+- Every poll it fingerprints the activity rollup (latest calculation time and
+  active entity count); a scope is rebuilt when its payload was built from an
+  older fingerprint or is older than the refresh interval
+- Scopes are registered by the reads themselves ("all" is always kept);
+  scopes nobody read for ``dashboard_scope_idle_seconds`` are dropped
+- A short Redis lock per scope makes sure only one process rebuilds it when
+  several app processes run the scheduler
+"""
+
+from typing import Optional
+import asyncio
+import time
+
+import structlog
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.core.database import AsyncSessionLocal
+from app.modules.customer_hierarchy.services.cache_enhanced_service import EnhancedCacheService
+
+logger = structlog.get_logger(__name__)
+
+
+class DashboardRefreshService:
+    """Background loop rebuilding stale dashboard payloads"""
+
+    def __init__(
+        self,
+        interval: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+        idle_seconds: Optional[int] = None,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.interval = interval or settings.dashboard_refresh_interval
+        self.poll_seconds = poll_seconds or settings.dashboard_refresh_poll_seconds
+        self.idle_seconds = idle_seconds or settings.dashboard_scope_idle_seconds
+        self.session_factory = session_factory
+        self.running = False
+        self.shutdown_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the refresh loop in this process"""
+        if self.running:
+            logger.warning("Dashboard refresh service is already running")
+            return
+        self.running = True
+        self.shutdown_event.clear()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Dashboard refresh service started", interval=self.interval, poll_seconds=self.poll_seconds)
+
+    async def stop(self, timeout: float = 30.0):
+        """Stop the loop, letting an in-flight rebuild finish within ``timeout``"""
+        if not self.running:
+            return
+        self.running = False
+        self.shutdown_event.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        logger.info("Dashboard refresh service stopped")
+
+    async def _run(self):
+        while self.running:
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                logger.error("Dashboard refresh cycle failed", error=str(e))
+
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def refresh_due(self) -> int:
+        """Rebuild every active scope whose payload is outdated; returns the number rebuilt"""
+        async with self.session_factory() as session:
+            cache = EnhancedCacheService(session)
+            await cache.initialize_redis()
+            # Without Redis there is nowhere to keep the payloads
+            if not cache.redis_client:
+                return 0
+
+            members = await cache.active_dashboard_scopes(self.idle_seconds)
+            version = await cache.activity_service.data_version()
+
+            rebuilt = 0
+            for member in members:
+                if not self.running:
+                    break
+                built = await cache.get_dashboard_build_info(member)
+                if built and built["version"] == version and time.time() - (built["built_at"] or 0) < self.interval:
+                    continue
+                if not await cache.acquire_refresh_lock(member, ttl_seconds=max(60, int(self.poll_seconds * 4))):
+                    continue
+                try:
+                    await cache.refresh_dashboard(cache.parse_dashboard_scope(member))
+                    rebuilt += 1
+                except Exception as e:
+                    await session.rollback()
+                    logger.error("Dashboard rebuild failed", scope=member, error=str(e))
+                finally:
+                    await cache.release_refresh_lock(member)
+
+        if rebuilt:
+            logger.info("Dashboard metrics refreshed", scopes=rebuilt, version=version)
+        return rebuilt
+
+
+# Global instance (started by the service lifespan)
+dashboard_refresher = DashboardRefreshService()
@@ -0,0 +1,285 @@
+"""
+Streaming hierarchy export engine
+
+Exports the hierarchy as flat rows without building the nested tree:
+
+- One UNION ALL query (a branch per level, each joined to its ancestors) is
+  ordered by the ancestors' (name, id) keys with NULLS FIRST, which yields a
+  depth-first pre-order: every node directly precedes its subtree
+- Rows are read through a server-side cursor (`AsyncSession.stream` with
+  `yield_per`), so memory stays bounded by one batch regardless of chain size
+- CSV, NDJSON and JSON are encoded batch by batch into byte chunks; XLSX is
+  written with openpyxl in write-only mode to a file
+- `stream_export` owns its database session so it can back a StreamingResponse
+  after the request-scoped session has been released
+- Given the caller's AccessIndex, every level is restricted to the nodes that
+  user may see, and an inaccessible root is reported as not found
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+from sqlalchemy import String, cast, func, literal, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.core.database import AsyncSessionLocal
+from app.modules.customer_hierarchy.models.customer_group import CustomerGroup
+from app.modules.customer_hierarchy.services.access_index_service import AccessIndex
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import (
+    LEVEL_ORDER,
+    MODELS,
+    PARENTS,
+    normalize_type,
+)
+
+logger = structlog.get_logger(__name__)
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+COLUMNS = ["id", "name", "type", "code", "parent_id", "parent_type", "is_active", "level", "path"]
+HEADERS = ["ID", "Name", "Type", "Code", "Parent ID", "Parent Type", "Is Active", "Level", "Path"]
+
+# Companies have no code of their own; their tax ID is exported in its place
+CODE_COLUMNS = {"group": "code", "company": "tax_id", "location": "code", "business_unit": "code"}
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def export_media(format: str) -> Dict[str, str]:
+    """Content type and file extension for an export format (ValueError if unsupported)"""
+    try:
+        content_type, extension = EXPORT_FORMATS[format.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported export format: {format} (expected one of {', '.join(EXPORT_FORMATS)})"
+        )
+    return {"content_type": content_type, "extension": extension}
+
+
+def _sort_keys(level: int, top: int) -> List[Any]:
+    keys = []
+    for index, entity_type in enumerate(LEVEL_ORDER):
+        model = MODELS[entity_type]
+        if top <= index <= level:
+            keys += [model.name, model.id]
+        else:
+            keys += [cast(null(), String), cast(null(), String)]
+    return [key.label(f"sort_{position}") for position, key in enumerate(keys)]
+
+
+def _level_select(
+    level: int,
+    top: int,
+    root_id: Optional[str],
+    include_inactive: bool,
+    access: Optional[AccessIndex] = None,
+):
+    """Rows of one level below `top`, joined up to `top` for path, sort keys and filters"""
+    entity_type = LEVEL_ORDER[level]
+    model = MODELS[entity_type]
+    parent_type, parent_column = PARENTS[entity_type]
+
+    source = model.__table__
+    for index in range(level, top, -1):
+        child_type = LEVEL_ORDER[index]
+        ancestor = MODELS[LEVEL_ORDER[index - 1]]
+        on = getattr(MODELS[child_type], PARENTS[child_type][1]) == ancestor.id
+        # Companies may have no group
+        source = source.outerjoin(ancestor.__table__, on) if ancestor is CustomerGroup else source.join(ancestor.__table__, on)
+
+    chain = [MODELS[LEVEL_ORDER[index]] for index in range(top, level + 1)]
+    stmt = select(
+        model.id.label("id"),
+        model.name.label("name"),
+        literal(entity_type, String).label("type"),
+        cast(getattr(model, CODE_COLUMNS[entity_type]), String).label("code"),
+        cast(getattr(model, parent_column) if parent_column else null(), String).label("parent_id"),
+        cast(literal(parent_type, String) if parent_type else null(), String).label("parent_type"),
+        model.is_active.label("is_active"),
+        literal(level - top + 1).label("level"),
+        func.concat_ws("/", *[ancestor.name for ancestor in chain]).label("path"),
+        *_sort_keys(level, top),
+    ).select_from(source)
+
+    if root_id is not None:
+        stmt = stmt.where(MODELS[LEVEL_ORDER[top]].id == root_id)
+    if not include_inactive:
+        for ancestor in chain:
+            active = ancestor.is_active.is_(True)
+            stmt = stmt.where(or_(ancestor.id.is_(None), active) if ancestor is CustomerGroup else active)
+    if access is not None:
+        stmt = stmt.where(access.predicate(entity_type, model.id))
+    return stmt
+
+
+class HierarchyExportEngine:
+    """Depth-first, server-side-cursor hierarchy export"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        batch_size: Optional[int] = None,
+        access: Optional[AccessIndex] = None,
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.export_batch_size
+        # None: internal export of the whole hierarchy
+        self.access = access
+
+    async def resolve_root_type(self, root_id: str) -> str:
+        """Level of an export root (LookupError when no node has this id or it is not accessible)"""
+        lookups = [
+            select(literal(entity_type, String).label("type")).where(MODELS[entity_type].id == root_id)
+            for entity_type in LEVEL_ORDER
+        ]
+        root_type = (await self.db.execute(union_all(*lookups).limit(1))).scalar_one_or_none()
+        if root_type is None or (self.access is not None and not self.access.can_access(root_type, root_id)):
+            raise LookupError(f"Hierarchy node {root_id} not found")
+        return root_type
+
+    async def rows(
+        self,
+        root_id: Optional[str] = None,
+        include_inactive: bool = False,
+        max_depth: Optional[int] = None,
+        root_type: Optional[str] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield export rows in depth-first order, one cursor batch at a time"""
+        top = 0
+        if root_id is not None:
+            root_type = normalize_type(root_type) or await self.resolve_root_type(root_id)
+            top = LEVEL_ORDER.index(root_type)
+        bottom = len(LEVEL_ORDER) - 1
+        if max_depth:
+            bottom = min(bottom, top + max_depth - 1)
+
+        branches = [
+            _level_select(level, top, root_id, include_inactive, self.access)
+            for level in range(top, bottom + 1)
+        ]
+        ordered = union_all(*branches).subquery("export_rows")
+        stmt = select(*[ordered.c[column] for column in COLUMNS]).order_by(
+            *[ordered.c[f"sort_{position}"].asc().nulls_first() for position in range(2 * len(LEVEL_ORDER))]
+        )
+
+        result = await self.db.stream(stmt.execution_options(yield_per=self.batch_size))
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+    async def iter_bytes(self, format: str, **filters: Any) -> AsyncIterator[bytes]:
+        """Encode rows as CSV, NDJSON or JSON, one chunk per cursor batch"""
+        async for chunk in _encode(format.lower(), self.rows(**filters)):
+            yield chunk
+
+    async def write_file(
+        self,
+        path: str,
+        format: str,
+        on_batch: Optional[Callable[[int], Awaitable[None]]] = None,
+        **filters: Any,
+    ) -> int:
+        """
+        Write the export to `path`; returns the number of exported nodes.
+        `on_batch` is awaited with the running node count after every batch.
+        """
+        format = format.lower()
+        export_media(format)
+        count = 0
+
+        async def batches() -> AsyncIterator[List[Dict[str, Any]]]:
+            nonlocal count
+            async for batch in self.rows(**filters):
+                count += len(batch)
+                if on_batch is not None:
+                    await on_batch(count)
+                yield batch
+
+        if format == "xlsx":
+            try:
+                from openpyxl import Workbook
+            except ImportError:
+                raise RuntimeError("XLSX export requires openpyxl")
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet("Hierarchy")
+            sheet.append(HEADERS)
+            async for batch in batches():
+                for row in batch:
+                    sheet.append([row[column] for column in COLUMNS])
+            workbook.save(path)
+        else:
+            with open(path, "wb") as output:
+                async for chunk in _encode(format, batches()):
+                    output.write(chunk)
+
+        logger.info("Hierarchy exported to file", path=path, format=format, record_count=count)
+        return count
+
+
+async def _encode(format: str, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HEADERS)
+        async for batch in batches:
+            writer.writerows([row[column] for column in COLUMNS] for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    elif format == "ndjson":
+        async for batch in batches:
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch).encode("utf-8")
+    elif format == "json":
+        opened = False
+        async for batch in batches:
+            if not batch:
+                continue
+            chunk = ",\n".join(json.dumps(row, ensure_ascii=False) for row in batch)
+            yield (("," if opened else "[") + "\n" + chunk).encode("utf-8")
+            opened = True
+        yield ("\n]\n" if opened else "[]\n").encode("utf-8")
+    else:
+        raise ValueError(f"Format {format} cannot be streamed; write it to a file instead")
+
+
+async def stream_export(
+    format: str, access: Optional[AccessIndex] = None, **filters: Any
+) -> AsyncIterator[bytes]:
+    """
+    Stream an export with a dedicated session (for StreamingResponse bodies)
+
+    `access` is the caller's index, resolved while the request was still open.
+
+    XLSX cannot be produced incrementally (the zip directory is written last),
+    so it is written to a temporary file first and then streamed from disk.
+    """
+    async with AsyncSessionLocal() as db:
+        engine = HierarchyExportEngine(db, access=access)
+        if format.lower() != "xlsx":
+            async for chunk in engine.iter_bytes(format, **filters):
+                yield chunk
+            return
+
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            await engine.write_file(path, "xlsx", **filters)
+            with open(path, "rb") as source:
+                while chunk := source.read(FILE_CHUNK_SIZE):
+                    yield chunk
+        finally:
+            os.unlink(path)
@@ -0,0 +1,121 @@
+"""
+Stored bulk exports
+
+Bulk export jobs write their file locally, then keep it in hierarchy_exports so
+the download can be served by whichever instance receives the request:
+- `save_export` moves a written file into the table chunk by chunk (and
+  removes the local file), so the job never holds the whole body in memory
+- `iter_export_content` reads the body back in chunks with its own session, so
+  it can back a StreamingResponse
+- `purge_expired_exports` deletes exports past their expiry (maintenance loop)
+"""
+
+from datetime import datetime, timedelta, timezone
+import os
+from typing import AsyncIterator, Optional
+
+import structlog
+from sqlalchemy import LargeBinary, delete, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.core.database import AsyncSessionLocal
+from app.modules.customer_hierarchy.models.hierarchy_export import HierarchyExport
+
+logger = structlog.get_logger(__name__)
+
+
+def download_path(export_id: str) -> str:
+    """API path serving a stored export"""
+    return f"{settings.api_v2_str}/bulk/operations/{export_id}/download"
+
+
+async def save_export(
+    db: AsyncSession,
+    export_id: str,
+    path: str,
+    content_type: str,
+    record_count: int,
+    created_by: Optional[str],
+    chunk_size: Optional[int] = None,
+) -> HierarchyExport:
+    """
+    Store a written export file (replacing a previous attempt) and delete the local copy
+
+    The row is written with an empty body first, then each chunk of the file is
+    appended in the database (`content || chunk`); everything commits together.
+    """
+    chunk_size = chunk_size or settings.export_store_chunk_size
+    export = await db.get(HierarchyExport, export_id) or HierarchyExport(id=export_id)
+    export.filename = os.path.basename(path)
+    export.content_type = content_type
+    export.content = b""
+    export.size_bytes = 0
+    export.record_count = record_count
+    export.created_by = created_by
+    export.created_at = datetime.now(timezone.utc)
+    export.expires_at = export.created_at + timedelta(hours=settings.export_retention_hours)
+    db.add(export)
+    await db.flush()
+
+    size_bytes = 0
+    with open(path, "rb") as source:
+        while chunk := source.read(chunk_size):
+            await db.execute(
+                update(HierarchyExport)
+                .where(HierarchyExport.id == export_id)
+                .values(content=HierarchyExport.content.op("||")(literal(chunk, LargeBinary)))
+                .execution_options(synchronize_session=False)
+            )
+            size_bytes += len(chunk)
+
+    export.size_bytes = size_bytes
+    # the in-memory body is still the empty placeholder
+    db.expire(export, ["content"])
+    await db.commit()
+    os.unlink(path)
+
+    logger.info(
+        "Hierarchy export stored",
+        export_id=export_id,
+        size_bytes=size_bytes,
+        expires_at=export.expires_at.isoformat(),
+    )
+    return export
+
+
+async def get_export(db: AsyncSession, export_id: str) -> Optional[HierarchyExport]:
+    """Unexpired export metadata (without the body)"""
+    return (
+        await db.execute(
+            select(HierarchyExport).where(HierarchyExport.id == export_id, HierarchyExport.expires_at > func.now())
+        )
+    ).scalar_one_or_none()
+
+
+async def iter_export_content(export_id: str, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Stream a stored export body chunk by chunk with a dedicated session"""
+    chunk_size = chunk_size or settings.export_download_chunk_size
+    async with AsyncSessionLocal() as db:
+        offset = 1  # substring() is 1-based
+        while True:
+            chunk = (
+                await db.execute(
+                    select(func.substring(HierarchyExport.content, offset, chunk_size)).where(
+                        HierarchyExport.id == export_id
+                    )
+                )
+            ).scalar_one_or_none()
+            if not chunk:
+                return
+            yield bytes(chunk)
+            offset += chunk_size
+
+
+async def purge_expired_exports(db: AsyncSession) -> int:
+    """Delete exports past their expiry; returns the number removed"""
+    result = await db.execute(delete(HierarchyExport).where(HierarchyExport.expires_at <= func.now()))
+    await db.commit()
+    if result.rowcount:
+        logger.info("Expired hierarchy exports purged", count=result.rowcount)
+    return result.rowcount
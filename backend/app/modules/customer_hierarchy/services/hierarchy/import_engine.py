@@ -0,0 +1,363 @@
+"""
+Set-based hierarchy import engine
+
+Validates and writes a whole batch of hierarchy records with a fixed number of
+queries instead of one lookup/insert per record:
+
+- Existing ids, group codes, tax IDs and scoped location/unit codes are loaded
+  into hash sets with one query per key (bound as a single array parameter)
+- Records are ordered top-down (group -> company -> location -> business unit)
+  so every parent is written before its children
+- Parent IDs are resolved from an in-memory map of accepted batch records and
+  preloaded database rows
+- Each level is written with chunked multi-row INSERTs and primary-key UPDATEs
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import String, any_, bindparam, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.models.business_unit import BusinessUnit
+from app.modules.customer_hierarchy.models.customer_company import CustomerCompany
+from app.modules.customer_hierarchy.models.customer_group import CustomerGroup
+from app.modules.customer_hierarchy.models.customer_location import CustomerLocation
+
+logger = structlog.get_logger(__name__)
+
+# Write order: parents always precede children
+LEVEL_ORDER = ("group", "company", "location", "business_unit")
+
+MODELS = {
+    "group": CustomerGroup,
+    "company": CustomerCompany,
+    "location": CustomerLocation,
+    "business_unit": BusinessUnit,
+}
+
+# Parent type and foreign key column for each level
+PARENTS: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    "group": (None, None),
+    "company": ("group", "group_id"),
+    "location": ("company", "company_id"),
+    "business_unit": ("location", "location_id"),
+}
+
+TYPE_ALIASES = {"unit": "business_unit"}
+
+# Rows per multi-row INSERT; keeps statements well under asyncpg's bind limit
+INSERT_CHUNK_SIZE = 500
+
+# Import keys that are not model columns
+_RECORD_ONLY_KEYS = {"type", "parent_id", "parent_type"}
+
+
+def normalize_type(entity_type: Optional[str]) -> Optional[str]:
+    """Map entity type aliases onto the canonical level name"""
+    return TYPE_ALIASES.get(entity_type, entity_type)
+
+
+def _array(name: str, values: Iterable[str]):
+    return bindparam(name, list(values), type_=ARRAY(String))
+
+
+@dataclass
+class ImportPlan:
+    """Validated batch, ordered by level and split into creates and updates"""
+
+    creates: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    updates: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def created_count(self) -> int:
+        return sum(len(rows) for rows in self.creates.values())
+
+    @property
+    def updated_count(self) -> int:
+        return sum(len(rows) for rows in self.updates.values())
+
+
+class HierarchyImportEngine:
+    """Validate and import hierarchy records in bulk"""
+
+    def __init__(self, db: AsyncSession, chunk_size: int = INSERT_CHUNK_SIZE) -> None:
+        self.db = db
+        self.chunk_size = chunk_size
+        self._columns = {
+            entity_type: {attr.key for attr in model.__mapper__.column_attrs}
+            for entity_type, model in MODELS.items()
+        }
+
+    async def plan(self, records: List[Dict[str, Any]]) -> ImportPlan:
+        """
+        Validate a batch against itself and the database and build the write plan
+
+        A record that fails validation is reported in ``plan.errors`` and its
+        descendants in the batch are rejected with it.
+        """
+        plan = ImportPlan(
+            creates={entity_type: [] for entity_type in LEVEL_ORDER},
+            updates={entity_type: [] for entity_type in LEVEL_ORDER},
+        )
+
+        indexed = []
+        for idx, record in enumerate(records):
+            record_errors = self._check_record(record, idx)
+            if record_errors:
+                plan.errors.append(self._error(idx, record, record_errors))
+            else:
+                indexed.append((idx, record, normalize_type(record["type"])))
+
+        existing = await self._load_existing(indexed)
+
+        # Ids accepted so far, by type; seeded with parents already in the database
+        resolved: Dict[str, Set[str]] = {
+            entity_type: set(existing["ids"][entity_type]) for entity_type in LEVEL_ORDER
+        }
+        seen_ids: Set[str] = set()
+        group_codes = dict(existing["group_codes"])
+        tax_ids = dict(existing["tax_ids"])
+        scoped_codes = {
+            "location": dict(existing["location_codes"]),
+            "business_unit": dict(existing["unit_codes"]),
+        }
+
+        level = {entity_type: n for n, entity_type in enumerate(LEVEL_ORDER)}
+        for idx, record, entity_type in sorted(indexed, key=lambda item: level[item[2]]):
+            record_id = record["id"]
+            errors: List[str] = []
+            row = self._to_row(record, entity_type)
+
+            if record_id in seen_ids:
+                errors.append(f"Record {idx}: Duplicate ID '{record_id}' in import data")
+
+            parent_type, parent_field = PARENTS[entity_type]
+            parent_id = record.get("parent_id") or (row.get(parent_field) if parent_field else None)
+            is_update = record_id in existing["ids"][entity_type]
+            if parent_type is None:
+                if parent_id:
+                    errors.append(f"Record {idx}: A group cannot have a parent")
+            elif parent_id:
+                declared = normalize_type(record.get("parent_type"))
+                if declared and declared != parent_type:
+                    errors.append(
+                        f"Record {idx}: A {entity_type} must be placed under a {parent_type}, not a {declared}"
+                    )
+                elif parent_id not in resolved[parent_type]:
+                    errors.append(f"Parent {parent_id} not found for record {record_id}")
+                else:
+                    row[parent_field] = parent_id
+            elif entity_type != "company" and not is_update:
+                errors.append(f"Record {idx}: A {entity_type} requires a parent {parent_type}")
+
+            errors.extend(
+                self._check_unique(
+                    idx, record_id, entity_type, row, group_codes, tax_ids, scoped_codes
+                )
+            )
+
+            if errors:
+                plan.errors.append(self._error(idx, record, errors))
+                continue
+
+            seen_ids.add(record_id)
+            resolved[entity_type].add(record_id)
+            self._claim_unique(record_id, entity_type, row, group_codes, tax_ids, scoped_codes)
+            if is_update:
+                plan.updates[entity_type].append(row)
+            else:
+                plan.creates[entity_type].append(row)
+
+        plan.errors.sort(key=lambda error: error["record_index"])
+        return plan
+
+    async def execute(self, plan: ImportPlan, imported_by: str) -> None:
+        """Write a plan level by level with chunked multi-row statements"""
+        for entity_type in LEVEL_ORDER:
+            model = MODELS[entity_type]
+
+            creates = plan.creates[entity_type]
+            for row in creates:
+                row.setdefault("is_active", True)
+                row.setdefault("extra_data", {})
+                row["created_by"] = imported_by
+            for start in range(0, len(creates), self.chunk_size):
+                await self.db.execute(insert(model), creates[start:start + self.chunk_size])
+
+            updates = plan.updates[entity_type]
+            for row in updates:
+                row["updated_by"] = imported_by
+            for start in range(0, len(updates), self.chunk_size):
+                await self.db.execute(update(model), updates[start:start + self.chunk_size])
+
+            if creates or updates:
+                logger.info(
+                    "hierarchy_import.level_written",
+                    entity_type=entity_type,
+                    created=len(creates),
+                    updated=len(updates),
+                )
+
+    def _check_record(self, record: Any, idx: int) -> List[str]:
+        """Shape checks that need no database state"""
+        if not isinstance(record, dict):
+            return [f"Record {idx}: Invalid record shape"]
+
+        errors = []
+        for required in ("id", "name", "type"):
+            if not record.get(required):
+                errors.append(f"Record {idx}: Missing required field '{required}'")
+
+        entity_type = normalize_type(record.get("type"))
+        if entity_type not in MODELS:
+            errors.append(f"Record {idx}: Invalid entity type '{record.get('type')}'")
+        elif entity_type == "company" and record.get("tax_id"):
+            if not re.match(settings.taiwan_company_tax_id_pattern, str(record["tax_id"]).strip()):
+                errors.append(f"Record {idx}: Invalid tax ID format")
+
+        return errors
+
+    def _to_row(self, record: Dict[str, Any], entity_type: str) -> Dict[str, Any]:
+        """Keep only model columns from an import record"""
+        columns = self._columns[entity_type]
+        row = {
+            key: value
+            for key, value in record.items()
+            if key not in _RECORD_ONLY_KEYS and key in columns
+        }
+        row["id"] = record["id"]
+        if row.get("tax_id"):
+            row["tax_id"] = str(row["tax_id"]).strip().upper()
+        return row
+
+    def _check_unique(
+        self,
+        idx: int,
+        record_id: str,
+        entity_type: str,
+        row: Dict[str, Any],
+        group_codes: Dict[str, str],
+        tax_ids: Dict[str, str],
+        scoped_codes: Dict[str, Dict[Tuple[str, str], str]],
+    ) -> List[str]:
+        """Check the record against identifiers already held by other rows"""
+        errors = []
+        code = row.get("code")
+        if entity_type == "group" and code and group_codes.get(code, record_id) != record_id:
+            errors.append(f"Record {idx}: Group code '{code}' already exists")
+        if entity_type == "company" and row.get("tax_id"):
+            if tax_ids.get(row["tax_id"], record_id) != record_id:
+                errors.append(f"Record {idx}: Tax ID '{row['tax_id']}' already exists")
+        if entity_type in scoped_codes and code:
+            parent_field = PARENTS[entity_type][1]
+            key = (row.get(parent_field), code)
+            if scoped_codes[entity_type].get(key, record_id) != record_id:
+                errors.append(
+                    f"Record {idx}: Code '{code}' already exists under {PARENTS[entity_type][0]} {key[0]}"
+                )
+        return errors
+
+    @staticmethod
+    def _claim_unique(
+        record_id: str,
+        entity_type: str,
+        row: Dict[str, Any],
+        group_codes: Dict[str, str],
+        tax_ids: Dict[str, str],
+        scoped_codes: Dict[str, Dict[Tuple[str, str], str]],
+    ) -> None:
+        code = row.get("code")
+        if entity_type == "group" and code:
+            group_codes[code] = record_id
+        if entity_type == "company" and row.get("tax_id"):
+            tax_ids[row["tax_id"]] = record_id
+        if entity_type in scoped_codes and code:
+            scoped_codes[entity_type][(row.get(PARENTS[entity_type][1]), code)] = record_id
+
+    async def _load_existing(
+        self, indexed: List[Tuple[int, Dict[str, Any], str]]
+    ) -> Dict[str, Any]:
+        """Preload every identifier the batch could collide with, one query per key"""
+        wanted_ids: Dict[str, Set[str]] = {entity_type: set() for entity_type in LEVEL_ORDER}
+        group_codes: Set[str] = set()
+        tax_ids: Set[str] = set()
+        location_codes: Set[str] = set()
+        unit_codes: Set[str] = set()
+
+        for _, record, entity_type in indexed:
+            wanted_ids[entity_type].add(record["id"])
+            parent_type, parent_field = PARENTS[entity_type]
+            parent_id = record.get("parent_id") or (record.get(parent_field) if parent_field else None)
+            if parent_type and parent_id:
+                wanted_ids[parent_type].add(parent_id)
+            code = record.get("code")
+            if entity_type == "group" and code:
+                group_codes.add(code)
+            elif entity_type == "company" and record.get("tax_id"):
+                tax_ids.add(str(record["tax_id"]).strip().upper())
+            elif entity_type == "location" and code:
+                location_codes.add(code)
+            elif entity_type == "business_unit" and code:
+                unit_codes.add(code)
+
+        existing: Dict[str, Any] = {"ids": {}}
+        for entity_type, ids in wanted_ids.items():
+            model = MODELS[entity_type]
+            existing["ids"][entity_type] = (
+                set((await self.db.execute(
+                    select(model.id).where(model.id == any_(_array("ids", ids)))
+                )).scalars())
+                if ids
+                else set()
+            )
+
+        existing["group_codes"] = (
+            dict((await self.db.execute(
+                select(CustomerGroup.code, CustomerGroup.id)
+                .where(CustomerGroup.code == any_(_array("codes", group_codes)))
+            )).all())
+            if group_codes
+            else {}
+        )
+        existing["tax_ids"] = (
+            dict((await self.db.execute(
+                select(CustomerCompany.tax_id, CustomerCompany.id)
+                .where(CustomerCompany.tax_id == any_(_array("tax_ids", tax_ids)))
+            )).all())
+            if tax_ids
+            else {}
+        )
+        existing["location_codes"] = (
+            {
+                (company_id, code): location_id
+                for company_id, code, location_id in (await self.db.execute(
+                    select(CustomerLocation.company_id, CustomerLocation.code, CustomerLocation.id)
+                    .where(CustomerLocation.code == any_(_array("codes", location_codes)))
+                )).all()
+            }
+            if location_codes
+            else {}
+        )
+        existing["unit_codes"] = (
+            {
+                (location_id, code): unit_id
+                for location_id, code, unit_id in (await self.db.execute(
+                    select(BusinessUnit.location_id, BusinessUnit.code, BusinessUnit.id)
+                    .where(BusinessUnit.code == any_(_array("codes", unit_codes)))
+                )).all()
+            }
+            if unit_codes
+            else {}
+        )
+        return existing
+
+    @staticmethod
+    def _error(idx: int, record: Any, errors: List[str]) -> Dict[str, Any]:
+        record_id = record.get("id", "unknown") if isinstance(record, dict) else "unknown"
+        return {"record_index": idx, "record_id": record_id, "errors": errors, "error": "; ".join(errors)}
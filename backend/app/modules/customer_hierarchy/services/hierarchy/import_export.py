@@ -2,28 +2,30 @@
 Import/Export Operations Mixin for HierarchyService
 
 Contains methods for import/export operations:
-- export_hierarchy: Export hierarchy structure
+- export_hierarchy: Export hierarchy structure to a file
 - validate_import_data: Validate import data
 - import_hierarchy: Import hierarchy data
-- _export_to_csv: Export to CSV format
-- _export_to_xlsx: Export to Excel format
-- _validate_import_record: Validate single import record
 - _check_duplicate_identifiers: Check for duplicates
-- _validate_import_business_rules: Validate business rules
-- _import_single_record: Import single record
 - _invalidate_import_caches: Invalidate caches after import
+
+Record validation and writes are delegated to HierarchyImportEngine, which
+checks the whole batch with one query per identifier set and inserts it
+level by level in chunked multi-row statements. Exports are streamed from a
+server-side cursor by HierarchyExportEngine.
 """
 
-import csv
-import io
-import json
-import re
+import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
 import structlog
 
 from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.services.hierarchy.export_engine import (
+    HierarchyExportEngine,
+    export_media,
+)
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import HierarchyImportEngine
 
 logger = structlog.get_logger(__name__)
 
@@ -33,50 +35,46 @@ class ImportExportMixin:
 
     async def export_hierarchy(
         self,
-        format: str = "json",
+        format: str = "csv",
         root_id: Optional[str] = None,
         include_inactive: bool = False,
         max_depth: Optional[int] = None,
         user_context: Optional[Dict[str, Any]] = None,
         exported_by: str = None,
+        path: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
-        Export hierarchy structure in various formats
+        Export hierarchy structure to a file (bulk export jobs)
 
-        Supported formats: json, csv, xlsx
+        Supported formats: csv, ndjson, json, xlsx. Rows are written in
+        depth-first order straight from the database cursor, limited to the
+        nodes the requesting user may see (LookupError for an inaccessible
+        root); HTTP downloads stream through export_engine.stream_export instead.
         """
         try:
-            # Get hierarchy tree data
-            tree_data = await self.get_tree(
+            media = export_media(format)
+            filename = f"hierarchy_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{media['extension']}"
+            if path is None:
+                os.makedirs(settings.export_dir, exist_ok=True)
+                path = os.path.join(settings.export_dir, filename)
+
+            access = await self._access_index(user_context)
+            record_count = await HierarchyExportEngine(self.db, access=access).write_file(
+                path,
+                format,
                 root_id=root_id,
-                max_depth=max_depth,
                 include_inactive=include_inactive,
-                include_stats=True,
-                user_context=user_context,
+                max_depth=max_depth,
             )
 
-            if format.lower() == "json":
-                export_data = json.dumps(tree_data, indent=2, default=str)
-                content_type = "application/json"
-            elif format.lower() == "csv":
-                export_data = await self._export_to_csv(tree_data)
-                content_type = "text/csv"
-            elif format.lower() == "xlsx":
-                export_data = await self._export_to_xlsx(tree_data)
-                content_type = (
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            else:
-                raise ValueError(f"Unsupported export format: {format}")
-
             return {
                 "format": format,
-                "data": export_data,
-                "content_type": content_type,
-                "filename": f"hierarchy_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}",
+                "content_type": media["content_type"],
+                "filename": os.path.basename(path),
+                "path": path,
                 "exported_at": datetime.utcnow().isoformat(),
                 "exported_by": exported_by,
-                "record_count": tree_data.get("total_nodes", 0),
+                "record_count": record_count,
             }
 
         except Exception as e:
@@ -113,23 +111,15 @@ class ImportExportMixin:
 
             records = import_data["data"]
 
-            # Validate each record
-            for idx, record in enumerate(records):
-                record_errors = await self._validate_import_record(record, idx)
-                validation_errors.extend(record_errors)
+            # Record, relationship and uniqueness checks for the whole batch
+            plan = await HierarchyImportEngine(self.db).plan(records)
+            for error in plan.errors:
+                validation_errors.extend(error["errors"])
 
             # Check for duplicate IDs or codes
             duplicate_errors = self._check_duplicate_identifiers(records)
             validation_errors.extend(duplicate_errors)
 
-            # Business rule validations
-            (
-                business_errors,
-                business_warnings,
-            ) = await self._validate_import_business_rules(records)
-            validation_errors.extend(business_errors)
-            warnings.extend(business_warnings)
-
             return {
                 "is_valid": len(validation_errors) == 0,
                 "errors": validation_errors,
@@ -152,126 +142,41 @@ class ImportExportMixin:
         """
         try:
             records = import_data["data"]
-            created_count = 0
-            updated_count = 0
-            skipped_count = 0
-            errors = []
+            engine = HierarchyImportEngine(self.db)
 
             async with self.db.begin():
-                for idx, record in enumerate(records):
-                    try:
-                        result = await self._import_single_record(record, imported_by)
-                        if result["action"] == "created":
-                            created_count += 1
-                        elif result["action"] == "updated":
-                            updated_count += 1
-                        else:
-                            skipped_count += 1
-                    except Exception as e:
-                        error_detail = {
-                            "record_index": idx,
-                            "record_id": record.get("id", "unknown"),
-                            "error": str(e),
-                        }
-                        errors.append(error_detail)
-                        logger.warning(
-                            "Failed to import record", record_index=idx, error=str(e)
-                        )
-
-                # Invalidate caches after successful import
-                await self._invalidate_import_caches()
+                plan = await engine.plan(records)
+                await engine.execute(plan, imported_by)
+
+            for error in plan.errors:
+                logger.warning(
+                    "Failed to import record",
+                    record_index=error["record_index"],
+                    error=error["error"],
+                )
 
-                return {
-                    "created_records": created_count,
-                    "updated_records": updated_count,
-                    "skipped_records": skipped_count,
-                    "error_records": len(errors),
-                    "errors": errors,
-                }
+            # Invalidate caches after successful import
+            await self._invalidate_import_caches()
+
+            return {
+                "created_records": plan.created_count,
+                "updated_records": plan.updated_count,
+                "skipped_records": 0,
+                "error_records": len(plan.errors),
+                "errors": [
+                    {
+                        "record_index": error["record_index"],
+                        "record_id": error["record_id"],
+                        "error": error["error"],
+                    }
+                    for error in plan.errors
+                ],
+            }
 
         except Exception as e:
             logger.error("Failed to import hierarchy", error=str(e))
             raise
 
-    async def _export_to_csv(self, tree_data: Dict[str, Any]) -> str:
-        """Export hierarchy tree to CSV format"""
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow(
-            [
-                "ID",
-                "Name",
-                "Type",
-                "Code",
-                "Parent ID",
-                "Parent Type",
-                "Is Active",
-                "Level",
-                "Path",
-            ]
-        )
-
-        # Write tree data (flattened)
-        def write_nodes(
-            nodes: List[Dict[str, Any]], level: int = 1, path: str = ""
-        ) -> None:
-            for node in nodes:
-                node_path = f"{path}/{node['name']}" if path else node["name"]
-                writer.writerow(
-                    [
-                        node["id"],
-                        node["name"],
-                        node["type"],
-                        node.get("code", ""),
-                        node.get("parent_id", ""),
-                        node.get("parent_type", ""),
-                        node["is_active"],
-                        level,
-                        node_path,
-                    ]
-                )
-
-                # Write children recursively
-                if node.get("children"):
-                    write_nodes(node["children"], level + 1, node_path)
-
-        write_nodes(tree_data.get("tree", []))
-
-        return output.getvalue()
-
-    async def _export_to_xlsx(self, tree_data: Dict[str, Any]) -> bytes:
-        """Export hierarchy tree to Excel format"""
-        # This would use openpyxl or similar library to create Excel file
-        # For now, return CSV data as bytes
-        csv_data = await self._export_to_csv(tree_data)
-        return csv_data.encode("utf-8")
-
-    async def _validate_import_record(
-        self, record: Dict[str, Any], index: int
-    ) -> List[str]:
-        """Validate a single import record"""
-        errors = []
-
-        # Required fields
-        required_fields = ["id", "name", "type"]
-        for field in required_fields:
-            if not record.get(field):
-                errors.append(f"Record {index}: Missing required field '{field}'")
-
-        # Validate entity type
-        if record.get("type") not in self.entity_map:
-            errors.append(f"Record {index}: Invalid entity type '{record.get('type')}'")
-
-        # Type-specific validations
-        entity_type = record.get("type")
-        if entity_type == "company" and record.get("tax_id"):
-            if not re.match(settings.taiwan_company_tax_id_pattern, record["tax_id"]):
-                errors.append(f"Record {index}: Invalid tax ID format")
-
-        return errors
-
     def _check_duplicate_identifiers(
         self, records: List[Dict[str, Any]]
     ) -> List[str]:
@@ -303,57 +208,6 @@ class ImportExportMixin:
 
         return errors
 
-    async def _validate_import_business_rules(
-        self, records: List[Dict[str, Any]]
-    ) -> Tuple[List[str], List[str]]:
-        """Validate business rules for import data"""
-        errors = []
-        warnings = []
-
-        # Check hierarchy relationships
-        entity_ids = {record["id"]: record for record in records if record.get("id")}
-
-        for record in records:
-            parent_id = record.get("parent_id")
-            if parent_id:
-                # Check if parent exists in import data or database
-                if parent_id not in entity_ids:
-                    parent_exists = await self._node_exists(
-                        parent_id, record.get("parent_type", "")
-                    )
-                    if not parent_exists:
-                        errors.append(
-                            f"Parent {parent_id} not found for record {record.get('id')}"
-                        )
-
-        return errors, warnings
-
-    async def _import_single_record(
-        self, record: Dict[str, Any], imported_by: str
-    ) -> Dict[str, str]:
-        """Import a single record"""
-        entity_type = record["type"]
-        entity_info = self.entity_map.get(entity_type)
-        if not entity_info:
-            raise ValueError(f"Unknown entity type: {entity_type}")
-
-        crud_service = entity_info["crud"]
-
-        # Check if record exists
-        existing = await crud_service.get(self.db, id=record["id"])
-
-        if existing:
-            # Update existing record
-            update_data = {k: v for k, v in record.items() if k != "id"}
-            await crud_service.update(
-                self.db, db_obj=existing, obj_in=update_data, updated_by=imported_by
-            )
-            return {"action": "updated"}
-        else:
-            # Create new record
-            await crud_service.create(self.db, obj_in=record, created_by=imported_by)
-            return {"action": "created"}
-
     async def _invalidate_import_caches(self) -> None:
         """Invalidate all caches after import"""
         cache_patterns = ["hierarchy_tree:*", "breadcrumb:*", "hierarchy_stats:*"]
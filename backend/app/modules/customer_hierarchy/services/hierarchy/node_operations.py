@@ -46,8 +46,10 @@ class NodeOperationsMixin:
                 return None
 
             # Get cached breadcrumb if available
-            cache_key = f"breadcrumb:{node_type}:{node_id}:{self._get_user_scope(user_context)}"
-            cached_breadcrumb = await self.cache.get(cache_key)
+            cache_key = await self.cache.versioned_key(
+                f"breadcrumb:{node_type}:{node_id}:{self._get_user_scope(user_context)}"
+            )
+            cached_breadcrumb = await self.cache.get(cache_key) if cache_key else None
             if cached_breadcrumb:
                 return cached_breadcrumb
 
@@ -62,9 +64,10 @@ class NodeOperationsMixin:
             }
 
             # Cache breadcrumb
-            await self.cache.set(
-                cache_key, breadcrumb_data, ttl=settings.cache_entity_ttl
-            )
+            if cache_key:
+                await self.cache.set(
+                    cache_key, breadcrumb_data, ttl=settings.cache_entity_ttl
+                )
 
             return breadcrumb_data
 
@@ -426,10 +429,9 @@ class NodeOperationsMixin:
         node_type: str,
         user_context: Optional[Dict[str, Any]],
     ) -> bool:
-        """Validate if user has access to specific node"""
-        # For now, return True
-        # In production, would implement actual access control
-        return True
+        """Validate if user has access to specific node (access index lookup)"""
+        access = await self._access_index(user_context)
+        return access.can_access(node_type, node_id)
 
     async def _build_breadcrumb_path(
         self, node_id: str, node_type: str
@@ -538,9 +540,11 @@ class NodeOperationsMixin:
         user_context: Optional[Dict[str, Any]],
     ) -> bool:
         """Validate user permissions for move operation"""
-        # For now, return True
-        # In production, would implement actual permission validation
-        return True
+        # The moved subtree and the new parent both have to be modifiable
+        access = await self._access_index(user_context)
+        return access.can_access(source_type, source_id, "move") and access.can_access(
+            target_parent_type, target_parent_id, "update"
+        )
 
     async def _count_affected_children(self, node_id: str, node_type: str) -> int:
         """Count children that would be affected by move"""
@@ -2,21 +2,129 @@
 Search Operations Mixin for HierarchyService
 
 Contains methods for search operations:
-- search: Advanced search across hierarchy
-- _search_entity_type: Search within specific entity type
-- _calculate_relevance_score: Calculate relevance score for results
-- _identify_match_fields: Identify matching fields
+- search: Ranked search across all hierarchy levels in a single query
+- typeahead: Prefix lookup for company/location pickers
 - _generate_search_suggestions: Generate search suggestions
 - _validate_search_permissions: Validate search permissions
+
+Both searches run as one UNION ALL over groups, companies, locations and
+business units. Each branch joins its ancestors so the breadcrumb comes back
+with the row, and ranking/limiting happen in PostgreSQL. Ranking uses pg_trgm
+similarity; the trigram indexes live in migration 0009 and the typeahead
+prefix indexes in 0018. Each branch is restricted to the requesting user's
+access index predicate.
 """
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import structlog
+from sqlalchemy import String, case, cast, false, func, literal, null, or_, select, union_all
+from sqlalchemy.dialects.postgresql import array
+
+from app.modules.customer_hierarchy.models import (
+    BusinessUnit,
+    CustomerCompany,
+    CustomerGroup,
+    CustomerLocation,
+)
 
 logger = structlog.get_logger(__name__)
 
+SEARCH_TYPES = ["group", "company", "location", "business_unit"]
+TYPEAHEAD_TYPES = ["company", "location"]
+
+_PARENT_TYPES = {
+    "group": None,
+    "company": "group",
+    "location": "company",
+    "business_unit": "location",
+}
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix_key(name_column):
+    """lower(name) under the "C" collation, matching the typeahead prefix indexes (0018)"""
+    return func.lower(name_column).collate("C")
+
+
+def _hierarchy_select(entity_type: str, include_inactive: bool):
+    """
+    Base SELECT for one hierarchy level with its breadcrumb joined in.
+
+    Returns (select, model, code column); the code column is tax_id for
+    companies, which have no code of their own.
+    """
+    if entity_type == "group":
+        model, code = CustomerGroup, CustomerGroup.code
+        parent_id = cast(null(), String)
+        path = [CustomerGroup.name]
+        source = CustomerGroup.__table__
+    elif entity_type == "company":
+        model, code = CustomerCompany, CustomerCompany.tax_id
+        parent_id = CustomerCompany.group_id
+        path = [CustomerGroup.name, CustomerCompany.name]
+        source = CustomerCompany.__table__.outerjoin(
+            CustomerGroup.__table__, CustomerCompany.group_id == CustomerGroup.id
+        )
+    elif entity_type == "location":
+        model, code = CustomerLocation, CustomerLocation.code
+        parent_id = CustomerLocation.company_id
+        path = [CustomerGroup.name, CustomerCompany.name, CustomerLocation.name]
+        source = CustomerLocation.__table__.join(
+            CustomerCompany.__table__, CustomerLocation.company_id == CustomerCompany.id
+        ).outerjoin(CustomerGroup.__table__, CustomerCompany.group_id == CustomerGroup.id)
+    elif entity_type == "business_unit":
+        model, code = BusinessUnit, BusinessUnit.code
+        parent_id = BusinessUnit.location_id
+        path = [CustomerGroup.name, CustomerCompany.name, CustomerLocation.name, BusinessUnit.name]
+        source = (
+            BusinessUnit.__table__.join(
+                CustomerLocation.__table__, BusinessUnit.location_id == CustomerLocation.id
+            )
+            .join(CustomerCompany.__table__, CustomerLocation.company_id == CustomerCompany.id)
+            .outerjoin(CustomerGroup.__table__, CustomerCompany.group_id == CustomerGroup.id)
+        )
+    else:
+        raise ValueError(f"Unknown hierarchy type: {entity_type}")
+
+    stmt = select(
+        model.id.label("id"),
+        literal(entity_type, String).label("type"),
+        model.name.label("name"),
+        cast(code, String).label("code"),
+        cast(parent_id, String).label("parent_id"),
+        model.is_active.label("is_active"),
+        # array_remove drops the NULL group name of companies without a group
+        func.array_remove(array(path), null()).label("breadcrumb"),
+    ).select_from(source)
+    if not include_inactive:
+        stmt = stmt.where(model.is_active.is_(True))
+    return stmt, model, code
+
+
+def _row_to_result(row: Any) -> Dict[str, Any]:
+    entity = {
+        "id": row.id,
+        "name": row.name,
+        "type": row.type,
+        "code": row.code if row.type != "company" else None,
+        "parent_id": row.parent_id,
+        "parent_type": _PARENT_TYPES[row.type] if row.parent_id else None,
+        "is_active": row.is_active,
+    }
+    if row.type == "company":
+        entity["tax_id"] = row.code
+    return {
+        "entity": entity,
+        "score": float(row.score),
+        "match_type": row.match_type,
+        "breadcrumb": list(row.breadcrumb or []),
+    }
+
 
 class SearchOperationsMixin:
     """Mixin class for search operations"""
@@ -29,85 +137,87 @@ class SearchOperationsMixin:
         limit: int = 100,
         include_inactive: bool = False,
         user_context: Optional[Dict[str, Any]] = None,
+        fuzzy: bool = False,
     ) -> Dict[str, Any]:
         """
-        Advanced search across hierarchy with full-text capabilities
+        Ranked search across the hierarchy in a single round trip
 
         Features:
         - Multi-entity type search (groups, companies, locations, units)
-        - Flexible filtering by status, region, business type
-        - Permission-aware results based on user context
-        - Ranking by relevance and hierarchy position
+        - Substring match on name, prefix match on code (tax ID for companies)
+        - Optional trigram (typo-tolerant) matching on name
+        - Ranking by exact > prefix > similarity, breadcrumb names per result
         """
         try:
             start_time = datetime.utcnow()
-            search_types = search_types or [
-                "group",
-                "company",
-                "location",
-                "business_unit",
-            ]
+            search_types = [str(getattr(t, "value", t)) for t in (search_types or SEARCH_TYPES)]
 
             # Validate user permissions for search scope
             allowed_types = await self._validate_search_permissions(
                 search_types, user_context
             )
-
-            search_results = []
-            total_count = 0
-
-            # Search across each entity type
-            for entity_type in allowed_types:
-                if total_count >= limit:
-                    break
-
-                type_results = await self._search_entity_type(
-                    entity_type=entity_type,
-                    query=query,
-                    filters=filters,
-                    limit=min(limit - total_count, 50),  # Distribute across types
-                    include_inactive=include_inactive,
-                    user_context=user_context,
+            access = await self._access_index(user_context)
+
+            term = query.strip().lower()
+            contains = f"%{_escape_like(term)}%"
+            prefix = f"{_escape_like(term)}%"
+
+            branches = []
+            for entity_type in dict.fromkeys("business_unit" if t == "unit" else t for t in allowed_types):
+                stmt, model, code = _hierarchy_select(entity_type, include_inactive)
+                stmt = stmt.where(access.predicate(entity_type, model.id))
+                name_lc = func.lower(model.name)
+                code_lc = func.lower(func.coalesce(code, ""))
+
+                name_match = name_lc.like(contains, escape="\\")
+                code_match = code_lc.like(prefix, escape="\\")
+                # `%` is pg_trgm's similarity operator (pg_trgm.similarity_threshold, 0.3 by default)
+                fuzzy_match = name_lc.bool_op("%")(term) if fuzzy else false()
+
+                score = func.greatest(
+                    func.similarity(name_lc, term), func.similarity(code_lc, term)
+                ) + case(
+                    (or_(name_lc == term, code_lc == term), 1.0),
+                    (or_(name_lc.like(prefix, escape="\\"), code_match), 0.5),
+                    else_=0.0,
+                )
+                match_type = case(
+                    (name_match, "name"),
+                    (code_match, "tax_id" if entity_type == "company" else "code"),
+                    else_="fuzzy",
+                )
+                branches.append(
+                    stmt.add_columns(score.label("score"), match_type.label("match_type"))
+                    .where(or_(name_match, code_match, fuzzy_match))
                 )
 
-                search_results.extend(type_results)
-                total_count += len(type_results)
-
-            # Sort by relevance score
-            search_results.sort(
-                key=lambda x: x.get("relevance_score", 0), reverse=True
-            )
-
-            # Add breadcrumb information for each result
-            enriched_results = []
-            for result in search_results[:limit]:
-                try:
-                    breadcrumb = await self.get_breadcrumb(
-                        node_id=result["id"],
-                        node_type=result["type"],
-                        user_context=user_context,
-                    )
-                    result["breadcrumb"] = breadcrumb["path"] if breadcrumb else []
-                except Exception as e:
-                    logger.warning(
-                        "Failed to get breadcrumb for search result",
-                        node_id=result["id"],
-                        error=str(e),
+            results: List[Dict[str, Any]] = []
+            total_count = 0
+            if branches:
+                hits = union_all(*branches).subquery("hits")
+                rows = (
+                    await self.db.execute(
+                        select(hits, func.count().over().label("total_count"))
+                        .order_by(hits.c.score.desc(), hits.c.name, hits.c.id)
+                        .limit(limit)
+                        # Already filtered per branch; the session-wide filter
+                        # would put ancestor conditions on the outer joins
+                        .execution_options(hierarchy_access_scope=False)
                     )
-                    result["breadcrumb"] = []
-
-                enriched_results.append(result)
+                ).all()
+                results = [_row_to_result(row) for row in rows]
+                total_count = rows[0].total_count if rows else 0
 
             end_time = datetime.utcnow()
             search_time_ms = (end_time - start_time).total_seconds() * 1000
 
             return {
-                "results": enriched_results,
+                "results": results,
                 "total_matches": total_count,
                 "search_time_ms": search_time_ms,
                 "query": query,
                 "suggestions": await self._generate_search_suggestions(
-                    query, search_results
+                    query, [result["entity"] for result in results]
                 ),
             }
 
@@ -120,123 +230,56 @@ class SearchOperationsMixin:
             )
             raise
 
-    async def _search_entity_type(
+    async def typeahead(
         self,
-        entity_type: str,
-        query: str,
-        filters: Optional[Dict[str, Any]],
-        limit: int,
-        include_inactive: bool,
-        user_context: Optional[Dict[str, Any]],
+        prefix: str,
+        types: Optional[Sequence[str]] = None,
+        parent_id: Optional[str] = None,
+        limit: int = 10,
+        include_inactive: bool = False,
+        user_context: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
-        """Search within specific entity type"""
-        try:
-            entity_info = self.entity_map.get(entity_type)
-            if not entity_info:
-                return []
-
-            crud_service = entity_info["crud"]
-
-            # Perform search
-            search_fields = ["name", "code"]
-            if hasattr(crud_service, "search"):
-                entities = await crud_service.search(
-                    self.db,
-                    query=query,
-                    search_fields=search_fields,
-                    limit=limit,
-                    include_inactive=include_inactive,
-                )
-            else:
-                # Fallback to basic search using base CRUD
-                entities = await crud_service.search(
-                    self.db,
-                    query=query,
-                    search_fields=search_fields,
-                    limit=limit,
-                    include_inactive=include_inactive,
-                )
-
-            results = []
-            for entity in entities:
-                # Calculate relevance score
-                relevance_score = self._calculate_relevance_score(
-                    entity, query, search_fields
-                )
-
-                result = {
-                    "id": entity.id,
-                    "name": entity.name,
-                    "type": entity_type,
-                    "code": getattr(entity, "code", None),
-                    "is_active": entity.is_active,
-                    "relevance_score": relevance_score,
-                    "match_fields": self._identify_match_fields(
-                        entity, query, search_fields
-                    ),
-                }
-
-                # Add type-specific fields for snippet
-                snippet_text = f"{entity.name}"
-                if hasattr(entity, "description") and entity.description:
-                    snippet_text += f" - {entity.description[:100]}"
-                result["snippet"] = snippet_text
-
-                results.append(result)
-
-            return results
+        """
+        Prefix lookup for pickers (companies and locations by default)
 
-        except Exception as e:
-            logger.error(
-                "Failed to search entity type",
-                error=str(e),
-                entity_type=entity_type,
-                query=query,
-            )
+        Matches `lower(name) LIKE 'prefix%'` under the "C" collation. Each
+        branch orders and limits on its own, so the lower(name) index of each
+        table yields the first `limit` names and stops; the union is then
+        merged in the same order.
+        """
+        allowed_types = await self._validate_search_permissions(
+            [str(getattr(t, "value", t)) for t in (types or TYPEAHEAD_TYPES)], user_context
+        )
+        access = await self._access_index(user_context)
+        pattern = f"{_escape_like(prefix.strip().lower())}%"
+
+        branches = []
+        for entity_type in dict.fromkeys("business_unit" if t == "unit" else t for t in allowed_types):
+            stmt, model, _ = _hierarchy_select(entity_type, include_inactive)
+            name_key = _prefix_key(model.name)
+            stmt = stmt.where(access.predicate(entity_type, model.id)).add_columns(
+                literal(1.0).label("score"), literal("prefix", String).label("match_type")
+            ).where(name_key.like(pattern, escape="\\"))
+            if parent_id is not None:
+                parent_field = self.parent_fields.get(entity_type)
+                if parent_field is None:
+                    continue
+                stmt = stmt.where(getattr(model, parent_field) == parent_id)
+            branches.append(select(stmt.order_by(name_key, model.id).limit(limit).subquery()))
+
+        if not branches:
             return []
 
-    def _calculate_relevance_score(
-        self, entity: Any, query: str, search_fields: List[str]
-    ) -> float:
-        """Calculate relevance score for search result"""
-        score = 0.0
-        query_lower = query.lower()
-
-        for field in search_fields:
-            field_value = getattr(entity, field, None)
-            if field_value:
-                field_lower = str(field_value).lower()
-
-                # Exact match gets highest score
-                if field_lower == query_lower:
-                    score += 100.0
-                # Starts with query gets high score
-                elif field_lower.startswith(query_lower):
-                    score += 75.0
-                # Contains query gets medium score
-                elif query_lower in field_lower:
-                    score += 50.0
-
-                # Bonus for shorter fields (more specific matches)
-                if query_lower in field_lower:
-                    length_bonus = max(0, 20 - len(field_lower))
-                    score += length_bonus
-
-        return score
-
-    def _identify_match_fields(
-        self, entity: Any, query: str, search_fields: List[str]
-    ) -> List[str]:
-        """Identify which fields matched the search query"""
-        match_fields = []
-        query_lower = query.lower()
-
-        for field in search_fields:
-            field_value = getattr(entity, field, None)
-            if field_value and query_lower in str(field_value).lower():
-                match_fields.append(field)
-
-        return match_fields
+        hits = union_all(*branches).subquery("hits")
+        rows = (
+            await self.db.execute(
+                select(hits)
+                .order_by(_prefix_key(hits.c.name), hits.c.id)
+                .limit(limit)
+                .execution_options(hierarchy_access_scope=False)
+            )
+        ).all()
+        return [_row_to_result(row) for row in rows]
 
     async def _generate_search_suggestions(
         self, query: str, results: List[Dict[str, Any]]
@@ -266,10 +309,9 @@ class SearchOperationsMixin:
         self, search_types: List[str], user_context: Optional[Dict[str, Any]]
     ) -> List[str]:
         """Validate which entity types user can search"""
-        # For now, return all requested types
-        # In production, would implement actual permission checks
+        access = await self._access_index(user_context)
         allowed_types = []
         for entity_type in search_types:
-            if entity_type in self.entity_map:
+            if entity_type in self.entity_map and access.allows(entity_type, "read"):
                 allowed_types.append(entity_type)
         return allowed_types
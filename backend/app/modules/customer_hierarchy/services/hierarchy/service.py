@@ -28,6 +28,11 @@ from app.modules.customer_hierarchy.models.business_unit import BusinessUnit
 from app.modules.customer_hierarchy.models.customer_company import CustomerCompany
 from app.modules.customer_hierarchy.models.customer_group import CustomerGroup
 from app.modules.customer_hierarchy.models.customer_location import CustomerLocation
+from app.modules.customer_hierarchy.services.access_index_service import (
+    ACCESS_SCOPE_KEY,
+    AccessIndex,
+    hierarchy_access,
+)
 from app.modules.customer_hierarchy.services.cache_service import CacheService
 from app.modules.customer_hierarchy.services.hierarchy.import_export import ImportExportMixin
 from app.modules.customer_hierarchy.services.hierarchy.node_operations import NodeOperationsMixin
@@ -62,6 +67,7 @@ class HierarchyService(
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
         self.cache = CacheService()
+        self._access: Optional[AccessIndex] = None
 
         # Initialize CRUD services
         self.group_crud = CRUDGroup(CustomerGroup)
@@ -107,3 +113,16 @@ class HierarchyService(
         if not user_context:
             return "anonymous"
         return f"user_{user_context.get('user_id', 'unknown')}_{user_context.get('role', 'user')}"
+
+    async def _access_index(self, user_context: Optional[Dict[str, Any]]) -> AccessIndex:
+        """
+        Access index of the requesting user, resolved once per service instance
+
+        Also scopes this session's ORM reads to the nodes the user may see, so
+        tree and statistics queries filter in the database.
+        """
+        if self._access is None:
+            self._access = await hierarchy_access.for_context(self.db, user_context)
+            if user_context is not None:
+                self.db.info[ACCESS_SCOPE_KEY] = self._access
+        return self._access
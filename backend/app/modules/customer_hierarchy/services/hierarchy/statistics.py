@@ -44,10 +44,12 @@ class StatisticsMixin:
         - Integration health status
         """
         try:
-            cache_key = f"hierarchy_stats:{root_id or 'all'}:{include_inactive}:{self._get_user_scope(user_context)}"
+            cache_key = await self.cache.versioned_key(
+                f"hierarchy_stats:{root_id or 'all'}:{include_inactive}:{self._get_user_scope(user_context)}"
+            )
 
             # Try cache first
-            cached_stats = await self.cache.get(cache_key)
+            cached_stats = await self.cache.get(cache_key) if cache_key else None
             if cached_stats:
                 return cached_stats
 
@@ -115,9 +117,10 @@ class StatisticsMixin:
             ) / max(location_count, 1)
 
             # Cache the results
-            await self.cache.set(
-                cache_key, stats, ttl=300
-            )  # 5 minute cache for stats
+            if cache_key:
+                await self.cache.set(
+                    cache_key, stats, ttl=300
+                )  # 5 minute cache for stats
 
             return stats
 
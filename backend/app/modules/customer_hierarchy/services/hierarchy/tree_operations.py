@@ -42,22 +42,23 @@ class TreeOperationsMixin:
         """
         try:
             # Generate cache key based on parameters
-            cache_key = self._generate_tree_cache_key(
+            cache_key = await self.cache.versioned_key(self._generate_tree_cache_key(
                 root_id,
                 max_depth,
                 include_inactive,
                 include_stats,
                 node_types,
                 user_context,
-            )
+            ))
 
             # Try to get from cache first
-            cached_tree = await self.cache.get(cache_key)
+            cached_tree = await self.cache.get(cache_key) if cache_key else None
             if cached_tree:
                 logger.info("Hierarchy tree retrieved from cache", cache_key=cache_key)
                 return cached_tree
 
-            # Build tree from database
+            # Scope the session to the user's visible nodes, then build the tree
+            await self._access_index(user_context)
             tree_data = await self._build_tree_from_db(
                 root_id=root_id,
                 max_depth=max_depth or settings.max_hierarchy_depth,
@@ -68,7 +69,8 @@ class TreeOperationsMixin:
             )
 
             # Cache the result
-            await self.cache.set(cache_key, tree_data, ttl=settings.cache_tree_ttl)
+            if cache_key:
+                await self.cache.set(cache_key, tree_data, ttl=settings.cache_tree_ttl)
 
             logger.info(
                 "Hierarchy tree built and cached",
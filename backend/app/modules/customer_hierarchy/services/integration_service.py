@@ -14,12 +14,10 @@ import asyncio
 from datetime import datetime, timedelta
 from enum import Enum
 import structlog
-from sqlalchemy import select
 
-from app.modules.notifications.core.database import AsyncSessionLocal as NotificationSessionLocal
+from app.modules.customer_hierarchy.services.access_index_service import hierarchy_access
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import LEVEL_ORDER, normalize_type
 from app.modules.notifications.models.notification import Notification
-from app.modules.users.core.database import AsyncSessionLocal as UserSessionLocal
-from app.modules.users.models.user import User
 
 logger = structlog.get_logger(__name__)
 
@@ -109,6 +107,7 @@ class IntegrationService:
                 user_id=user_id,
                 resource_type=resource_type,
                 action=action,
+                resource_id=resource_id,
             )
             logger.info(
                 "In-process permission check completed",
@@ -464,34 +463,16 @@ class IntegrationService:
         self._record_service_success(service_name)
         return None
 
-    async def _check_user_permissions_in_process(self, user_id: str, resource_type: str, action: str) -> bool:
-        """Check hierarchy permissions from the monolith users table."""
-        async with UserSessionLocal() as session:
-            result = await session.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            if not user or not user.is_active:
-                return False
-
-            if getattr(user, "is_super_user", False) or user.role == "platform_admin":
-                return True
-
-            normalized_action = action.lower()
-            if normalized_action in {"read", "list", "view"}:
-                return True
-
-            permission_names = set()
-            for item in user.permissions or []:
-                if isinstance(item, str):
-                    permission_names.add(item)
-                elif isinstance(item, dict):
-                    permission_names.add(str(item.get("name", "")))
-            accepted = {
-                "*",
-                f"{resource_type}:*",
-                f"{resource_type}:{normalized_action}",
-                f"hierarchy:{normalized_action}",
-            }
-            return bool(permission_names & accepted)
+    async def _check_user_permissions_in_process(
+        self, user_id: str, resource_type: str, action: str, resource_id: Optional[str] = None
+    ) -> bool:
+        """Check hierarchy permissions against the user's cached access index."""
+        access = await hierarchy_access.for_user(user_id)
+        if access is None:
+            return False
+        if resource_id and normalize_type(resource_type) in LEVEL_ORDER:
+            return access.can_access(resource_type, resource_id, action)
+        return access.allows(resource_type, action)
     
     def _is_service_available(self, service_name: str) -> bool:
         """Check if service is available based on circuit breaker state"""
@@ -591,6 +572,9 @@ class IntegrationService:
         severity = payload.get("severity", "normal")
         title = f"Hierarchy event: {payload.get('event_type', 'unknown')}"
         message = payload.get("error") or payload.get("entity_id") or payload.get("operation_id") or "Hierarchy integration event"
+        # imported here so loading customer_hierarchy does not import the notifications module's engine
+        from app.modules.notifications.core.database import AsyncSessionLocal as NotificationSessionLocal
+
         async with NotificationSessionLocal() as session:
             session.add(
                 Notification(
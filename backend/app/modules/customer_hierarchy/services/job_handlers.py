@@ -0,0 +1,121 @@
+"""
+Background job handlers for customer hierarchy bulk and migration processing
+
+Each handler opens its own database session: jobs run outside the request
+that submitted them, possibly in another worker process. The job context is
+passed to the service so its per-batch progress reaches the job's progress
+document as well.
+"""
+
+from typing import Any, Dict
+
+from app.modules.customer_hierarchy.core.database import AsyncSessionLocal
+from app.modules.customer_hierarchy.schemas.bulk import (
+    BulkCreateRequestSchema,
+    BulkDeleteRequestSchema,
+    BulkExportRequestSchema,
+    BulkImportRequestSchema,
+    BulkMoveRequestSchema,
+    BulkUpdateRequestSchema,
+)
+from orderly_fastapi_core.background_jobs import JobContext, background_jobs
+from app.modules.customer_hierarchy.services.bulk_service import BulkService
+from app.modules.customer_hierarchy.services.migration_service import MigrationService
+
+# Job types
+BULK_CREATE_JOB = "hierarchy.bulk_create"
+BULK_UPDATE_JOB = "hierarchy.bulk_update"
+BULK_DELETE_JOB = "hierarchy.bulk_delete"
+BULK_MOVE_JOB = "hierarchy.bulk_move"
+BULK_IMPORT_JOB = "hierarchy.bulk_import"
+BULK_EXPORT_JOB = "hierarchy.bulk_export"
+MIGRATION_EXECUTE_JOB = "hierarchy.migration_execute"
+
+
+def bulk_payload(operation_id: str, data_key: str, data: Any, user_id: str, user_context: Any) -> Dict[str, Any]:
+    """Build a JSON job payload for a bulk operation"""
+    return {
+        "operation_id": operation_id,
+        data_key: data.model_dump(mode="json"),
+        "user_id": user_id,
+        "user_context": user_context,
+    }
+
+
+# Creates and imports insert rows batch by batch, so a blind retry would duplicate them
+@background_jobs.job_handler(BULK_CREATE_JOB, concurrency=2, max_retries=0)
+async def run_bulk_create(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await BulkService(db, job_context=context).process_bulk_create_background(
+            operation_id=payload["operation_id"],
+            bulk_data=BulkCreateRequestSchema.model_validate(payload["bulk_data"]),
+            user_id=payload["user_id"],
+            user_context=payload["user_context"],
+        )
+
+
+@background_jobs.job_handler(BULK_UPDATE_JOB, concurrency=2)
+async def run_bulk_update(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await BulkService(db, job_context=context).process_bulk_update_background(
+            operation_id=payload["operation_id"],
+            bulk_data=BulkUpdateRequestSchema.model_validate(payload["bulk_data"]),
+            user_id=payload["user_id"],
+            user_context=payload["user_context"],
+        )
+
+
+@background_jobs.job_handler(BULK_DELETE_JOB, concurrency=2)
+async def run_bulk_delete(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await BulkService(db, job_context=context).process_bulk_delete_background(
+            operation_id=payload["operation_id"],
+            bulk_data=BulkDeleteRequestSchema.model_validate(payload["bulk_data"]),
+            user_id=payload["user_id"],
+            user_context=payload["user_context"],
+        )
+
+
+@background_jobs.job_handler(BULK_MOVE_JOB, concurrency=1)
+async def run_bulk_move(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await BulkService(db, job_context=context).process_bulk_move_background(
+            operation_id=payload["operation_id"],
+            move_data=BulkMoveRequestSchema.model_validate(payload["move_data"]),
+            user_id=payload["user_id"],
+            user_context=payload["user_context"],
+        )
+
+
+@background_jobs.job_handler(BULK_IMPORT_JOB, concurrency=1, max_retries=0, timeout=3600)
+async def run_bulk_import(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await BulkService(db, job_context=context).process_bulk_import_background(
+            operation_id=payload["operation_id"],
+            import_data=BulkImportRequestSchema.model_validate(payload["import_data"]),
+            user_id=payload["user_id"],
+            user_context=payload["user_context"],
+        )
+
+
+# Exports only read and overwrite their own file, so retries are safe
+@background_jobs.job_handler(BULK_EXPORT_JOB, concurrency=1, timeout=3600)
+async def run_bulk_export(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await BulkService(db, job_context=context).process_bulk_export_background(
+            operation_id=payload["operation_id"],
+            export_data=BulkExportRequestSchema.model_validate(payload["export_data"]),
+            user_id=payload["user_id"],
+            user_context=payload["user_context"],
+        )
+
+
+# Migrations track their own execution state and rollback, so they are not retried either
+@background_jobs.job_handler(MIGRATION_EXECUTE_JOB, concurrency=1, max_retries=0)
+async def run_migration_execute(context: JobContext, payload: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await MigrationService(db, job_context=context).execute_migration_background(
+            plan_id=payload["plan_id"],
+            execution_id=payload["execution_id"],
+            user_id=payload["user_id"],
+        )
@@ -0,0 +1,86 @@
+"""
+HierarchyMaintenanceService - periodic housekeeping for the hierarchy module
+
+Runs every ``maintenance_interval_seconds`` in each app process:
+- Deletes stored bulk exports past their expiry
+- Creates entity_change_log partitions ahead of the current month, so a
+  process running across a month boundary never writes into the DEFAULT one
+
+Every task is idempotent, so several processes running the loop at once only
+repeat work.
+"""
+
+from typing import Dict, Optional
+import asyncio
+
+import structlog
+
+from app.modules.customer_hierarchy.core.config import settings
+from app.modules.customer_hierarchy.core.database import AsyncSessionLocal
+from app.modules.customer_hierarchy.models.entity_change_log import ensure_partitions
+from app.modules.customer_hierarchy.services.hierarchy.export_store import purge_expired_exports
+
+logger = structlog.get_logger(__name__)
+
+
+class HierarchyMaintenanceService:
+    """Background loop running hierarchy housekeeping tasks"""
+
+    def __init__(self, interval: Optional[int] = None, session_factory=AsyncSessionLocal):
+        self.interval = interval or settings.maintenance_interval_seconds
+        self.session_factory = session_factory
+        self.running = False
+        self.shutdown_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the maintenance loop in this process"""
+        if self.running:
+            logger.warning("Hierarchy maintenance service is already running")
+            return
+        self.running = True
+        self.shutdown_event.clear()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Hierarchy maintenance service started", interval=self.interval)
+
+    async def stop(self, timeout: float = 30.0):
+        """Stop the loop, letting an in-flight run finish within ``timeout``"""
+        if not self.running:
+            return
+        self.running = False
+        self.shutdown_event.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        logger.info("Hierarchy maintenance service stopped")
+
+    async def _run(self):
+        while self.running:
+            await self.run_once()
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> Dict[str, int]:
+        """Run every task once; a failing task is logged and does not stop the others"""
+        results: Dict[str, int] = {}
+        try:
+            async with self.session_factory() as session:
+                results["expired_exports"] = await purge_expired_exports(session)
+        except Exception as e:
+            logger.error("Purging expired hierarchy exports failed", error=str(e))
+        try:
+            async with self.session_factory() as session:
+                connection = await session.connection()
+                results["change_log_partitions"] = len(await connection.run_sync(ensure_partitions))
+                await session.commit()
+        except Exception as e:
+            logger.error("Failed to create entity_change_log partitions", error=str(e))
+        return results
+
+
+# Global instance (started by the module startup hook)
+hierarchy_maintenance = HierarchyMaintenanceService()
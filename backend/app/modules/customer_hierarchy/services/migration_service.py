@@ -30,7 +30,7 @@ from app.modules.customer_hierarchy.services.cache_service import CacheService
 from app.modules.customer_hierarchy.services.integration_service import IntegrationService
 from app.modules.customer_hierarchy.services.audit_service import AuditService
 from app.modules.customer_hierarchy.services.validation_service import ValidationService
-from app.modules.customer_hierarchy.services.background_job_service import BackgroundJobService
+from orderly_fastapi_core.background_jobs import JobContext, background_jobs
 from app.modules.customer_hierarchy.schemas.migration import (
     MigrationCreatePlanSchema,
     MigrationConfigSchema
@@ -71,13 +71,14 @@ class MigrationService:
     - Comprehensive audit logging
     """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, job_context: Optional[JobContext] = None):
         self.db = db
+        self.job_context = job_context
         self.cache = CacheService()
         self.integration = IntegrationService()
         self.audit = AuditService(db)
         self.validation = ValidationService()
-        self.background_jobs = BackgroundJobService()
+        self.background_jobs = background_jobs
     
     async def validate_source_data(
         self,
@@ -445,6 +446,8 @@ class MigrationService:
             execution_cache_key = f"migration_execution:{execution_id}"
             
             try:
+                await self._report_job_progress(plan_id=plan_id, current_phase="executing")
+
                 # Execute migration in phases
                 await self._execute_migration_phases(
                     migration_log,
@@ -459,6 +462,7 @@ class MigrationService:
                 migration_log.progress["end_time"] = datetime.utcnow().isoformat()
                 
                 await self.db.commit()
+                await self._report_job_progress(**migration_log.progress)
                 
                 # Notify completion
                 await self.integration.notify_migration_completed(
@@ -755,6 +759,11 @@ class MigrationService:
         """Execute migration in phases with progress tracking"""
         # Implementation for phased migration execution
         pass
+
+    async def _report_job_progress(self, **progress: Any) -> None:
+        """Mirror progress into the background job running this migration (no-op when run inline)"""
+        if self.job_context is not None:
+            await self.job_context.report_progress(**progress)
     
     async def _execute_rollback_operations(
         self,
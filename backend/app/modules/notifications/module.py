@@ -0,0 +1,60 @@
+"""
+Notification Service 模組定義
+供單體組合根與獨立入口（main.py）共用的路由與生命週期
+"""
+import os
+
+import structlog
+from fastapi import APIRouter
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.notifications.core.database import async_engine
+from app.modules.notifications.api.v1.notifications import router as notifications_router
+from app.modules.notifications.api import otp as otp_router
+from app.modules.notifications.services.otp_service import OTPService
+from app.modules.notifications.services.email_service import create_email_service
+from app.modules.notifications.services.sms_service import SMSService
+
+logger = structlog.get_logger()
+
+# 初始化 OTP, Email, SMS 服務
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+otp_service = OTPService(redis_url=REDIS_URL)
+email_service = create_email_service()
+sms_service = SMSService()
+
+# OTP 端點為內部服務調用，暫時設為公開
+notification_public_paths = {
+    "/otp/send-email",
+    "/otp/send-sms",
+    "/otp/verify",
+}
+
+
+async def startup():
+    """啟動時連接 Redis"""
+    try:
+        await otp_service.connect()
+        logger.info("notification_service_started", redis_connected=True)
+    except Exception as e:
+        logger.error("notification_service_startup_failed", error=str(e))
+
+
+# 設定 OTP router 的服務實例
+otp_router.otp_service = otp_service
+otp_router.email_service = email_service
+otp_router.sms_service = sms_service
+
+# 註冊路由
+router = APIRouter()
+router.include_router(notifications_router)
+router.include_router(otp_router.router)
+
+module = ServiceModule(
+    name="notifications",
+    router=router,
+    public_paths=notification_public_paths,
+    on_startup=[startup],
+    on_shutdown=[email_service.close, async_engine.dispose],
+)
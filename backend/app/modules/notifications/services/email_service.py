@@ -2,18 +2,20 @@
 Email 發送服務
 
 支援：
-- SMTP 郵件發送
+- SMTP 郵件發送（經 SMTPTransport：常駐連線、批次送出、重試，不阻塞事件迴圈）
 - OTP 驗證碼郵件模板
 - 異步發送
 """
 
+import asyncio
 import os
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import structlog
 
+from app.modules.notifications.services.smtp_transport import SMTPTransport
+
 logger = structlog.get_logger()
 
 
@@ -28,7 +30,8 @@ class EmailService:
         smtp_password: Optional[str] = None,
         smtp_tls: bool = False,
         from_address: str = "noreply@orderly.tw",
-        from_name: str = "井然 Orderly"
+        from_name: str = "井然 Orderly",
+        transport: Optional[SMTPTransport] = None
     ):
         """
         初始化 Email 服務
@@ -41,6 +44,7 @@ class EmailService:
             smtp_tls: 是否使用 TLS
             from_address: 寄件人 Email
             from_name: 寄件人名稱
+            transport: SMTP 傳輸層（可選，預設依上述設定建立）
         """
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
@@ -49,6 +53,13 @@ class EmailService:
         self.smtp_tls = smtp_tls
         self.from_address = from_address
         self.from_name = from_name
+        self.transport = transport or SMTPTransport(
+            host=smtp_host,
+            port=smtp_port,
+            user=smtp_user,
+            password=smtp_password,
+            use_tls=smtp_tls,
+        )
 
     async def send_otp_email(
         self,
@@ -113,33 +124,7 @@ class EmailService:
             是否成功發送
         """
         try:
-            # 創建郵件
-            msg = MIMEMultipart("alternative")
-            msg["From"] = f"{self.from_name} <{self.from_address}>"
-            msg["To"] = to_email
-            msg["Subject"] = subject
-
-            # 添加純文字版本
-            if text_body:
-                msg.attach(MIMEText(text_body, "plain", "utf-8"))
-
-            # 添加 HTML 版本
-            msg.attach(MIMEText(html_body, "html", "utf-8"))
-
-            # 連接 SMTP 伺服器並發送
-            if self.smtp_tls:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                server.starttls()
-            else:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-
-            # 登入（如果需要）
-            if self.smtp_user and self.smtp_password:
-                server.login(self.smtp_user, self.smtp_password)
-
-            # 發送郵件
-            server.send_message(msg)
-            server.quit()
+            await self.transport.send(self._build_message(to_email, subject, html_body, text_body))
 
             logger.info(
                 "email_sent_successfully",
@@ -158,6 +143,45 @@ class EmailService:
             )
             return False
 
+    async def send_emails(self, emails: List[Dict[str, Any]]) -> List[bool]:
+        """
+        批次發送 Email
+
+        全部排入傳輸佇列，由常駐連線成批送出
+
+        Args:
+            emails: [{"to_email", "subject", "html_body", "text_body"(可選)}, ...]
+
+        Returns:
+            各封是否成功發送（與輸入順序相同）
+        """
+        return list(await asyncio.gather(*(self.send_email(**email) for email in emails)))
+
+    async def close(self) -> None:
+        """送完佇列中的郵件並關閉 SMTP 連線"""
+        await self.transport.close()
+
+    def _build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        text_body: Optional[str]
+    ) -> MIMEMultipart:
+        """創建郵件（純文字為備用版本）"""
+        msg = MIMEMultipart("alternative")
+        msg["From"] = f"{self.from_name} <{self.from_address}>"
+        msg["To"] = to_email
+        msg["Subject"] = subject
+
+        # 添加純文字版本
+        if text_body:
+            msg.attach(MIMEText(text_body, "plain", "utf-8"))
+
+        # 添加 HTML 版本
+        msg.attach(MIMEText(html_body, "html", "utf-8"))
+        return msg
+
     def _create_otp_email_html(
         self,
         otp_code: str,
@@ -253,5 +277,16 @@ def create_email_service() -> EmailService:
         smtp_password=os.getenv("SMTP_PASSWORD"),
         smtp_tls=os.getenv("SMTP_TLS", "false").lower() == "true",
         from_address=os.getenv("EMAIL_FROM_ADDRESS", "noreply@orderly.tw"),
-        from_name=os.getenv("EMAIL_FROM_NAME", "井然 Orderly")
+        from_name=os.getenv("EMAIL_FROM_NAME", "井然 Orderly"),
+        transport=SMTPTransport(
+            host=os.getenv("SMTP_HOST", "localhost"),
+            port=int(os.getenv("SMTP_PORT", "1025")),
+            user=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASSWORD"),
+            use_tls=os.getenv("SMTP_TLS", "false").lower() == "true",
+            pool_size=int(os.getenv("SMTP_POOL_SIZE", "2")),
+            batch_size=int(os.getenv("SMTP_BATCH_SIZE", "20")),
+            timeout=float(os.getenv("SMTP_TIMEOUT", "10")),
+            max_retries=int(os.getenv("SMTP_MAX_RETRIES", "3")),
+        )
     )
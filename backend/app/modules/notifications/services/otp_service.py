@@ -15,6 +15,8 @@ from typing import Dict, Optional
 from redis import asyncio as aioredis
 import structlog
 
+from orderly_fastapi_core import redis_manager
+
 logger = structlog.get_logger()
 
 
@@ -36,15 +38,9 @@ class OTPService:
         self.redis: Optional[aioredis.Redis] = None
 
     async def connect(self):
-        """建立 Redis 連接"""
+        """取得共用 Redis 客戶端並測試連接"""
         try:
-            self.redis = await aioredis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-            )
+            self.redis = redis_manager.client("otp", url=self.redis_url)
             # 測試連接
             await self.redis.ping()
             logger.info("otp_service_redis_connected", redis_url=self.redis_url)
@@ -53,9 +49,9 @@ class OTPService:
             raise
 
     async def close(self):
-        """關閉 Redis 連接"""
+        """釋放 Redis 客戶端（共用連線池於應用程式關閉時統一關閉）"""
         if self.redis:
-            await self.redis.close()
+            self.redis = None
             logger.info("otp_service_redis_disconnected")
 
     async def generate_otp(
@@ -0,0 +1,237 @@
+"""
+SMTP 傳輸層
+
+以專用執行緒持有常駐、已驗證的 SMTP 連線，事件迴圈只負責排入佇列並等待結果：
+- 慢速或無回應的郵件中繼不再阻塞 worker 的事件迴圈
+- 每條執行緒維持一條連線（pool_size 條），閒置逾時才關閉，不再每封信連線 / 登入 / QUIT
+- 每次喚醒最多取 batch_size 封，於同一連線連續送出
+- 斷線、逾時與 4xx 暫時性錯誤以指數退避重試；5xx 永久性錯誤直接回報失敗
+
+測試以程序內的 SMTP 伺服器（標準函式庫 socketserver）驗證連線重用、重試與
+不阻塞事件迴圈，見 app/tests/test_smtp_transport.py
+"""
+
+import asyncio
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from email.message import Message
+from typing import List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+_STOP = object()
+
+
+class _Job:
+    __slots__ = ("message", "future", "loop")
+
+    def __init__(self, message: Message, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.message = message
+        self.future = future
+        self.loop = loop
+
+
+def _is_connection_error(exc: Exception) -> bool:
+    """斷線、逾時等連線層級錯誤（SMTPException 亦繼承 OSError，需排除）"""
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    return _is_connection_error(exc)
+
+
+class SMTPTransport:
+    """常駐連線的 SMTP 傳送佇列（執行緒池，每條執行緒一條連線）"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        pool_size: int = 2,
+        batch_size: int = 20,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        idle_timeout: float = 60.0,
+        keepalive_interval: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # ============ 事件迴圈端 ============
+
+    async def send(self, message: Message) -> None:
+        """排入佇列並等待送達；失敗時拋出最後一次的 SMTP 例外"""
+        if self._closed:
+            raise RuntimeError("SMTP transport is closed")
+        self._ensure_workers()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Job(message, future, loop))
+        await future
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """送完已排入的郵件後關閉所有連線"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(_STOP)
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [thread.join(timeout) for thread in threads]
+        )
+        logger.info("smtp_transport_closed")
+
+    def _ensure_workers(self) -> None:
+        if len(self._threads) >= self.pool_size:
+            return
+        with self._lock:
+            while len(self._threads) < self.pool_size:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"smtp-transport-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    # ============ 傳送執行緒 ============
+
+    def _run(self) -> None:
+        connection: Optional[smtplib.SMTP] = None
+        last_used = 0.0
+        while True:
+            try:
+                job = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                # 閒置：主動關閉，避免伺服器端逾時留下半開連線
+                connection = self._disconnect(connection)
+                continue
+            if job is _STOP:
+                self._disconnect(connection)
+                return
+
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    # 送完這一批再結束
+                    self._queue.put(_STOP)
+                    break
+                batch.append(job)
+
+            if connection is not None and time.monotonic() - last_used > self.keepalive_interval:
+                connection = self._check_alive(connection)
+            for job in batch:
+                if job.future.done():
+                    continue
+                connection, error = self._deliver(connection, job.message)
+                self._resolve(job, error)
+            last_used = time.monotonic()
+
+    def _deliver(self, connection: Optional[smtplib.SMTP], message: Message):
+        """送出一封；回傳 (可續用的連線, 最後錯誤或 None)"""
+        attempt = 0
+        while True:
+            try:
+                if connection is None:
+                    connection = self._connect()
+                connection.send_message(message)
+                return connection, None
+            except Exception as exc:
+                if not _is_transient(exc) or attempt >= self.max_retries:
+                    # 永久性回應錯誤後連線已 RSET，可續用
+                    if _is_connection_error(exc):
+                        connection = self._disconnect(connection)
+                    return connection, exc
+                attempt += 1
+                logger.warning(
+                    "smtp_send_retry",
+                    attempt=attempt,
+                    max_retries=self.max_retries,
+                    error=str(exc),
+                )
+                connection = self._disconnect(connection)
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                connection.starttls(context=ssl.create_default_context())
+            if self.user and self.password:
+                connection.login(self.user, self.password)
+        except Exception:
+            self._disconnect(connection)
+            raise
+        logger.info("smtp_connected", host=self.host, port=self.port)
+        return connection
+
+    def _check_alive(self, connection: smtplib.SMTP) -> Optional[smtplib.SMTP]:
+        try:
+            if connection.noop()[0] == 250:
+                return connection
+        except Exception:
+            pass
+        return self._disconnect(connection)
+
+    @staticmethod
+    def _disconnect(connection: Optional[smtplib.SMTP]) -> None:
+        """關閉連線（一律回傳 None，方便 `connection = self._disconnect(connection)`）"""
+        if connection is None:
+            return None
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+        return None
+
+    @staticmethod
+    def _resolve(job: _Job, error: Optional[Exception]) -> None:
+        def settle() -> None:
+            if job.future.done():
+                return
+            if error is None:
+                job.future.set_result(None)
+            else:
+                job.future.set_exception(error)
+
+        try:
+            job.loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            # 呼叫端的事件迴圈已關閉
+            pass
@@ -9,14 +9,16 @@ from fastapi import APIRouter, Depends, HTTPException, Header, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
-from app.modules.orders.core.database import get_async_session
+from app.modules.orders.core.database import get_async_session, get_read_session
 from app.modules.orders.models.enums import OrderStatus
 from app.modules.orders.schemas.order import (
     OrderCreate, OrderUpdate, OrderResponse, OrderListResponse,
     OrderStatusUpdate, OrderConfirmRequest, OrderAdjustmentCreate,
     OrderAdjustmentResponse, OrderStatsResponse, OrderStatusHistoryResponse
 )
-from app.modules.orders.schemas.order_item import OrderItemCreate, OrderItemUpdate, OrderItemResponse
+from app.modules.orders.schemas.order_item import (
+    OrderItemCreate, OrderItemUpdate, OrderItemResponse, OrderItemBatchRequest
+)
 from app.modules.orders.services.order_service import OrderService
 from app.modules.orders.services.order_state_machine import OrderStateMachine
 
@@ -94,7 +96,7 @@ async def list_orders(
     date_from: Optional[date] = Query(None, description="開始日期"),
     date_to: Optional[date] = Query(None, description="結束日期"),
     tenant_id: str = Depends(get_tenant_id),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     獲取訂單列表
@@ -131,7 +133,7 @@ async def get_order_stats(
     date_to: Optional[date] = Query(None, description="結束日期"),
     supplier_id: Optional[str] = Query(None, description="供應商 ID"),
     tenant_id: str = Depends(get_tenant_id),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """獲取訂單統計"""
     stats = await OrderService.get_order_stats(
@@ -439,6 +441,25 @@ async def add_order_item(
     return OrderResponse.model_validate(order)
 
 
+@router.post("/orders/{order_id}/items/batch", response_model=OrderResponse)
+async def edit_order_items(
+    order_id: str,
+    batch: OrderItemBatchRequest,
+    ctx: RequestContext = Depends(get_request_context),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """批次編輯草稿訂單項目（新增 / 修改 / 刪除 / 排序，需帶入讀取時的 version）"""
+    order = await OrderService.edit_order_items(
+        db=db,
+        order_id=order_id,
+        tenant_id=ctx.tenant_id,
+        batch=batch,
+        user_id=ctx.user_id,
+    )
+
+    return OrderResponse.model_validate(order)
+
+
 @router.put("/orders/{order_id}/items/{item_id}", response_model=OrderResponse)
 async def update_order_item(
     order_id: str,
@@ -513,6 +534,10 @@ async def get_next_statuses(
 
 # ==================== 批量操作 ====================
 
+# 批量狀態變更以集合方式處理（單一交易），上限僅為限制單次請求大小
+BULK_STATUS_MAX_ORDERS = 1000
+
+
 @router.post("/orders/bulk-status")
 async def bulk_update_status(
     order_ids: List[str] = Query(..., description="訂單 ID 列表"),
@@ -522,27 +547,17 @@ async def bulk_update_status(
     db: AsyncSession = Depends(get_async_session),
 ):
     """批量更新訂單狀態"""
-    if len(order_ids) > 100:
-        raise HTTPException(status_code=400, detail="批量操作最多支援 100 筆訂單")
-
-    results = {"success": [], "failed": []}
-
-    for order_id in order_ids:
-        try:
-            status_data = OrderStatusUpdate(status=status, reason=reason)
-            await OrderService.update_order_status(
-                db=db,
-                order_id=order_id,
-                tenant_id=ctx.tenant_id,
-                status_data=status_data,
-                user_id=ctx.user_id,
-                role=ctx.role,
-            )
-            results["success"].append(order_id)
-        except HTTPException as e:
-            results["failed"].append({"orderId": order_id, "error": e.detail})
-        except Exception as e:
-            results["failed"].append({"orderId": order_id, "error": str(e)})
+    if len(order_ids) > BULK_STATUS_MAX_ORDERS:
+        raise HTTPException(status_code=400, detail=f"批量操作最多支援 {BULK_STATUS_MAX_ORDERS} 筆訂單")
+
+    results = await OrderService.bulk_update_order_status(
+        db=db,
+        order_ids=order_ids,
+        tenant_id=ctx.tenant_id,
+        status_data=OrderStatusUpdate(status=status, reason=reason),
+        user_id=ctx.user_id,
+        role=ctx.role,
+    )
 
     return {
         "success": True,
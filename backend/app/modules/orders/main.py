@@ -2,15 +2,11 @@
 FastAPI Order Service Application
 使用統一的應用程式工廠簡化初始化
 """
-import os
-import sys
-
-
 from orderly_fastapi_core import create_service_app
 
 from app.modules.orders.core.config import settings
 from app.modules.orders.core.database import async_engine
-from app.modules.orders.api.v1.orders import router as orders_router
+from app.modules.orders.module import module
 
 app = create_service_app(
     service_name="order-service-fastapi",
@@ -19,8 +15,5 @@ app = create_service_app(
     get_db_url=settings.get_database_url_async,
     settings=settings,
     debug=settings.debug,
+    module=module,
 )
-
-# 註冊訂單路由
-app.include_router(orders_router, prefix="/api", tags=["Orders"])
-app.include_router(orders_router, prefix="", tags=["Orders"])
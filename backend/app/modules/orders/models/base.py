@@ -1,7 +1,7 @@
-import uuid
 from sqlalchemy import Column, DateTime, String, func
 
 from app.db.base import Base
+from orderly_fastapi_core.ids import new_id
 
 
 class BaseModel(Base):
@@ -9,6 +9,6 @@ class BaseModel(Base):
     # orders alembic migration creates id/order_id as String(36); the model PK was
     # declared UUID, which made varchar->uuid FKs (order_items.order_id etc.)
     # impossible to build. Align the model to the migration's String(36).
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), unique=True, nullable=False)
+    id = Column(String(36), primary_key=True, default=new_id, unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -35,6 +35,7 @@ class Order(BaseModel):
         created_by: 創建者 ID
         confirmed_by: 確認者 ID
         confirmed_at: 確認時間
+        version: 版本號（樂觀鎖，每次更新訂單列時遞增）
     """
     __tablename__ = "orders"
 
@@ -99,10 +100,15 @@ class Order(BaseModel):
     # 是否已刪除（軟刪除）
     is_deleted = Column("is_deleted", Boolean, nullable=False, default=False)
 
+    # 樂觀鎖：UPDATE 附帶 WHERE version = 讀取時的值，並發修改時拋出 StaleDataError
+    version = Column("version", Integer, nullable=False, default=1, server_default="1")
+
     # 關聯
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan", lazy="selectin")
     status_history = relationship("OrderStatusHistory", back_populates="order", cascade="all, delete-orphan", lazy="selectin")
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Order(id={self.id}, order_number={self.order_number}, status={self.status})>"
 
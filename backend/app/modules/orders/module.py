@@ -0,0 +1,22 @@
+"""
+Order Service 模組定義
+供單體組合根與獨立入口（main.py）共用的路由與生命週期
+"""
+from fastapi import APIRouter
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.orders.core.database import async_engine
+from app.modules.orders.api.v1.orders import router as orders_router
+
+router = APIRouter()
+
+# 註冊訂單路由
+router.include_router(orders_router, prefix="/api", tags=["Orders"])
+router.include_router(orders_router, prefix="", tags=["Orders"])
+
+module = ServiceModule(
+    name="orders",
+    router=router,
+    on_shutdown=[async_engine.dispose],
+)
@@ -11,6 +11,8 @@ from .order_item import (
     OrderItemCreate,
     OrderItemUpdate,
     OrderItemResponse,
+    OrderItemOperation,
+    OrderItemBatchRequest,
 )
 
 __all__ = [
@@ -23,4 +25,6 @@ __all__ = [
     "OrderItemCreate",
     "OrderItemUpdate",
     "OrderItemResponse",
+    "OrderItemOperation",
+    "OrderItemBatchRequest",
 ]
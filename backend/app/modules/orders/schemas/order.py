@@ -166,6 +166,7 @@ class OrderResponse(BaseModel):
     confirmed_by: Optional[str] = None
     confirmed_at: Optional[datetime] = None
     is_deleted: bool = False
+    version: int = 1
     items: List[OrderItemResponse] = []
     status_history: List[OrderStatusHistoryResponse] = []
     created_at: datetime
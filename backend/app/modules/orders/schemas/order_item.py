@@ -2,10 +2,10 @@
 Order Item Schemas
 訂單項目 Pydantic Schema 定義
 """
-from typing import Optional
+from typing import List, Literal, Optional
 from decimal import Decimal
 from datetime import datetime
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
 # Import shared schema utilities from core library
 from orderly_fastapi_core import to_camel
@@ -64,6 +64,51 @@ class OrderItemUpdate(BaseModel):
         return v
 
 
+class OrderItemOperation(BaseModel):
+    """
+    批次編輯中的單一項目操作
+
+    - add: 以 item 新增項目（排在最後）
+    - update: 以 changes 修改 item_id 的數量 / 單價 / 備註
+    - delete: 刪除 item_id
+    - reorder: 將 item_id 的排序改為 sort_order
+    """
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    op: Literal["add", "update", "delete", "reorder"] = Field(..., description="操作類型")
+    item_id: Optional[str] = Field(None, description="項目 ID（update / delete / reorder）")
+    item: Optional[OrderItemCreate] = Field(None, description="新項目（add）")
+    changes: Optional[OrderItemUpdate] = Field(None, description="修改內容（update）")
+    sort_order: Optional[int] = Field(None, ge=0, description="新排序順序（reorder）")
+
+    @model_validator(mode='after')
+    def check_operands(self):
+        if self.op == "add":
+            if self.item is None:
+                raise ValueError("add 操作需要 item")
+        elif not self.item_id:
+            raise ValueError(f"{self.op} 操作需要 itemId")
+        elif self.op == "update" and self.changes is None:
+            raise ValueError("update 操作需要 changes")
+        elif self.op == "reorder" and self.sort_order is None:
+            raise ValueError("reorder 操作需要 sortOrder")
+        return self
+
+
+class OrderItemBatchRequest(BaseModel):
+    """批次編輯草稿訂單項目的請求 Schema（單一交易，金額只重算一次）"""
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    version: int = Field(..., ge=1, description="讀取訂單時的版本號（樂觀鎖）")
+    operations: List[OrderItemOperation] = Field(..., min_length=1, max_length=500, description="依序套用的項目操作")
+
+
 class OrderItemResponse(BaseModel):
     """訂單項目響應 Schema"""
     model_config = ConfigDict(
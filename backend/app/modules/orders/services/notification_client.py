@@ -10,12 +10,10 @@
 
 import os
 import structlog
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
 from app.modules.orders.models.enums import OrderStatus
-from app.modules.notifications.core.database import AsyncSessionLocal as NotificationSessionLocal
-from app.modules.notifications.models.notification import Notification
 
 logger = structlog.get_logger()
 
@@ -73,6 +71,10 @@ class NotificationClient:
         data: Dict[str, Any],
         priority: str = "medium",
     ) -> bool:
+        # 延遲匯入：ORDERLY_MODULES 未列 notifications 時，載入 orders 不會匯入該模組
+        from app.modules.notifications.core.database import AsyncSessionLocal as NotificationSessionLocal
+        from app.modules.notifications.models.notification import Notification
+
         try:
             async with NotificationSessionLocal() as db:
                 db.add(
@@ -127,31 +129,13 @@ class NotificationClient:
             return True
 
         try:
-            # 獲取狀態對應的消息模板
-            messages = self.STATUS_MESSAGES.get(to_status, {})
-
-            event = {
-                "event_type": "order.status_changed",
-                "order_id": order_id,
-                "order_number": order_number,
-                "from_status": from_status.value if from_status else None,
-                "to_status": to_status.value,
-                "tenant_id": tenant_id,
-                "restaurant_id": restaurant_id,
-                "supplier_id": supplier_id,
-                "changed_by": changed_by,
-                "reason": reason,
-                "timestamp": datetime.utcnow().isoformat(),
-                "messages": {
-                    role: msg.format(order_number=order_number)
-                    for role, msg in messages.items()
-                },
-                "extra_data": extra_data or {}
-            }
+            event = self._status_change_event(
+                order_id, order_number, from_status, to_status, tenant_id,
+                restaurant_id, supplier_id, changed_by, reason, extra_data,
+            )
 
             results = []
-            for role, message in event["messages"].items():
-                recipient_id = supplier_id if role == "supplier" else restaurant_id
+            for recipient_id, message in self._status_change_recipients(event):
                 results.append(
                     await self._create_notification(
                         user_id=recipient_id,
@@ -173,6 +157,93 @@ class NotificationClient:
             )
             return False
 
+    async def notify_order_status_changes(self, changes: List[Dict[str, Any]]) -> bool:
+        """
+        批量發送訂單狀態變更通知（單一交易寫入）
+
+        Args:
+            changes: 每筆包含 notify_order_status_change 的參數
+
+        Returns:
+            是否成功發送通知
+        """
+        if not self.enabled or not changes:
+            return True
+
+        from app.modules.notifications.core.database import AsyncSessionLocal as NotificationSessionLocal
+        from app.modules.notifications.models.notification import Notification
+
+        try:
+            notifications = []
+            for change in changes:
+                event = self._status_change_event(**change)
+                for recipient_id, message in self._status_change_recipients(event):
+                    notifications.append(
+                        Notification(
+                            user_id=recipient_id,
+                            type="order.status_changed",
+                            title="訂單狀態更新",
+                            message=message,
+                            data=event,
+                            priority="medium",
+                        )
+                    )
+
+            if notifications:
+                async with NotificationSessionLocal() as db:
+                    db.add_all(notifications)
+                    await db.commit()
+
+            logger.info("notification.batch_sent", orders=len(changes), notifications=len(notifications))
+            return True
+        except Exception as e:
+            logger.error("notification.batch_error", orders=len(changes), error=str(e))
+            return False
+
+    def _status_change_event(
+        self,
+        order_id: str,
+        order_number: str,
+        from_status: Optional[OrderStatus],
+        to_status: OrderStatus,
+        tenant_id: str,
+        restaurant_id: str,
+        supplier_id: str,
+        changed_by: str,
+        reason: Optional[str] = None,
+        extra_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """建立狀態變更事件內容"""
+        # 獲取狀態對應的消息模板
+        messages = self.STATUS_MESSAGES.get(to_status, {})
+
+        return {
+            "event_type": "order.status_changed",
+            "order_id": order_id,
+            "order_number": order_number,
+            "from_status": from_status.value if from_status else None,
+            "to_status": to_status.value,
+            "tenant_id": tenant_id,
+            "restaurant_id": restaurant_id,
+            "supplier_id": supplier_id,
+            "changed_by": changed_by,
+            "reason": reason,
+            "timestamp": datetime.utcnow().isoformat(),
+            "messages": {
+                role: msg.format(order_number=order_number)
+                for role, msg in messages.items()
+            },
+            "extra_data": extra_data or {}
+        }
+
+    @staticmethod
+    def _status_change_recipients(event: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(收件者 ID, 訊息) 列表"""
+        return [
+            (event["supplier_id"] if role == "supplier" else event["restaurant_id"], message)
+            for role, message in event["messages"].items()
+        ]
+
     async def notify_new_order(
         self,
         order_id: str,
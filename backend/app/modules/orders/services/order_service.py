@@ -5,20 +5,23 @@ Order Service
 from typing import Optional, List, Dict, Any, Tuple
 from decimal import Decimal
 from datetime import datetime, date
-from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, insert, update, and_, or_, func, desc
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi import HTTPException, status
 import structlog
 
+from orderly_fastapi_core.ids import new_id, number_allocator
+
 from app.modules.orders.models.order import Order, OrderItem, OrderStatusHistory, OrderAdjustment
 from app.modules.orders.models.enums import OrderStatus, PaymentStatus
 from app.modules.orders.schemas.order import (
     OrderCreate, OrderUpdate, OrderStatusUpdate, OrderConfirmRequest,
     OrderAdjustmentCreate, ConfirmedItem
 )
-from app.modules.orders.schemas.order_item import OrderItemCreate, OrderItemUpdate
+from app.modules.orders.schemas.order_item import OrderItemBatchRequest, OrderItemCreate, OrderItemUpdate
+from . import order_totals
 from .order_state_machine import OrderStateMachine
 from .notification_client import notification_client
 
@@ -29,24 +32,21 @@ class OrderService:
     """訂單服務類"""
 
     # 稅率（可配置）
-    DEFAULT_TAX_RATE = Decimal("0.05")  # 5%
+    DEFAULT_TAX_RATE = order_totals.DEFAULT_TAX_RATE  # 5%
 
     @staticmethod
-    def generate_order_number() -> str:
+    async def generate_order_number(db: AsyncSession) -> str:
         """
         生成訂單編號
 
-        格式：ORD-YYYYMMDD-XXXXXX（時間戳 + 隨機）
+        格式：ORD-YYYYMMDD-NNNNN（每日流水號，依時間排序、不會碰撞）
         """
-        now = datetime.utcnow()
-        date_part = now.strftime("%Y%m%d")
-        random_part = str(uuid4())[:6].upper()
-        return f"ORD-{date_part}-{random_part}"
+        return await number_allocator.next_number(db, "order", "ORD", width=5)
 
     @staticmethod
     def calculate_line_total(quantity: Decimal, unit_price: Decimal) -> Decimal:
         """計算行總計"""
-        return round(quantity * unit_price, 2)
+        return order_totals.line_total(quantity, unit_price)
 
     @classmethod
     def calculate_order_totals(
@@ -56,7 +56,7 @@ class OrderService:
         tax_rate: Decimal = None
     ) -> Dict[str, Decimal]:
         """
-        計算訂單金額
+        計算訂單金額（整數運算，見 order_totals）
 
         Args:
             items: 訂單項目列表
@@ -68,46 +68,10 @@ class OrderService:
         """
         if tax_rate is None:
             tax_rate = cls.DEFAULT_TAX_RATE
-
-        # 計算小計
-        subtotal = sum(
-            Decimal(str(item.line_total)) if item.line_total else Decimal("0")
-            for item in items
+        return order_totals.order_totals(
+            (item.line_total for item in items), adjustments, tax_rate
         )
 
-        # 處理調整項
-        discount_amount = Decimal("0")
-        shipping_fee = Decimal("0")
-
-        if adjustments:
-            for adj in adjustments:
-                adj_type = adj.get("type") or adj.get("adjustment_type", "")
-                amount = Decimal(str(adj.get("amount", 0)))
-
-                if adj_type in ["discount", "credit"]:
-                    discount_amount += amount
-                elif adj_type == "shipping_fee":
-                    shipping_fee += amount
-                elif adj_type == "surcharge":
-                    subtotal += amount
-
-        # 計算稅額（稅前金額 = 小計 - 折扣）
-        taxable_amount = subtotal - discount_amount
-        if taxable_amount < 0:
-            taxable_amount = Decimal("0")
-        tax_amount = round(taxable_amount * tax_rate, 2)
-
-        # 計算總金額
-        total_amount = taxable_amount + tax_amount + shipping_fee
-
-        return {
-            "subtotal": round(subtotal, 2),
-            "tax_amount": tax_amount,
-            "discount_amount": round(discount_amount, 2),
-            "shipping_fee": round(shipping_fee, 2),
-            "total_amount": round(total_amount, 2),
-        }
-
     @classmethod
     async def create_order(
         cls,
@@ -129,11 +93,11 @@ class OrderService:
             Order: 創建的訂單
         """
         # 生成訂單編號
-        order_number = cls.generate_order_number()
+        order_number = await cls.generate_order_number(db)
 
         # 創建訂單主體
         order = Order(
-            id=str(uuid4()),
+            id=new_id(),
             order_number=order_number,
             tenant_id=tenant_id,
             restaurant_id=order_data.restaurant_id or tenant_id,
@@ -156,7 +120,7 @@ class OrderService:
         for idx, item_data in enumerate(order_data.items):
             line_total = cls.calculate_line_total(item_data.quantity, item_data.unit_price)
             order_item = OrderItem(
-                id=str(uuid4()),
+                id=new_id(),
                 order_id=order.id,
                 sku_id=item_data.sku_id,
                 product_id=item_data.product_id,
@@ -182,7 +146,7 @@ class OrderService:
 
         # 記錄初始狀態歷史
         status_history = OrderStatusHistory(
-            id=str(uuid4()),
+            id=new_id(),
             order_id=order.id,
             from_status=None,
             to_status=OrderStatus.DRAFT,
@@ -396,7 +360,7 @@ class OrderService:
 
         # 記錄狀態歷史
         status_history = OrderStatusHistory(
-            id=str(uuid4()),
+            id=new_id(),
             order_id=order.id,
             from_status=old_status,
             to_status=status_data.status,
@@ -406,6 +370,17 @@ class OrderService:
         )
         db.add(status_history)
 
+        # 完成的訂單累計至客戶階層活躍度（savepoint，失敗不影響狀態更新）
+        if status_data.status == OrderStatus.COMPLETED:
+            # 延遲匯入：ORDERLY_MODULES 未列 customer_hierarchy 時，載入 orders 不會匯入該模組
+            from app.modules.customer_hierarchy.services.activity_rollup_service import ActivityRollupService
+
+            try:
+                async with db.begin_nested():
+                    await ActivityRollupService(db).record_order(order)
+            except Exception as e:
+                logger.warning("activity_rollup.record_failed", order_id=order_id, error=str(e))
+
         await db.commit()
         await db.refresh(order)
 
@@ -436,6 +411,140 @@ class OrderService:
 
         return order
 
+    @classmethod
+    async def bulk_update_order_status(
+        cls,
+        db: AsyncSession,
+        order_ids: List[str],
+        tenant_id: str,
+        status_data: OrderStatusUpdate,
+        user_id: str,
+        role: str = None
+    ) -> Dict[str, List[Any]]:
+        """
+        批量更新訂單狀態（單一交易）
+
+        一次查詢載入並鎖定所有訂單，在記憶體中依狀態機驗證轉換，
+        依原狀態分組各執行一次 UPDATE，並以單一多列 INSERT 寫入狀態歷史。
+
+        Args:
+            db: 資料庫會話
+            order_ids: 訂單 ID 列表
+            tenant_id: 租戶 ID
+            status_data: 狀態更新數據
+            user_id: 更新者 ID
+            role: 執行者角色
+
+        Returns:
+            Dict: {"success": [訂單 ID], "failed": [{"orderId", "error"}]}
+        """
+        to_status = status_data.status
+        order_ids = list(dict.fromkeys(order_ids))
+        failed: List[Dict[str, Any]] = []
+
+        result = await db.execute(
+            select(Order)
+            .where(
+                and_(
+                    Order.id.in_(order_ids),
+                    Order.tenant_id == tenant_id,
+                    Order.is_deleted == False
+                )
+            )
+            .with_for_update()
+        )
+        orders = {order.id: order for order in result.scalars().all()}
+
+        # 驗證狀態轉換（同一原狀態只需判斷一次）
+        verdicts: Dict[OrderStatus, Tuple[bool, Optional[str]]] = {}
+        groups: Dict[OrderStatus, List[Order]] = {}
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            if not order:
+                failed.append({"orderId": order_id, "error": f"訂單 ID '{order_id}' 不存在"})
+                continue
+            if order.status not in verdicts:
+                verdicts[order.status] = OrderStateMachine.can_transition(order.status, to_status, role)
+            can_transition, error_msg = verdicts[order.status]
+            if not can_transition:
+                failed.append({"orderId": order_id, "error": error_msg})
+                continue
+            groups.setdefault(order.status, []).append(order)
+
+        if not groups:
+            return {"success": [], "failed": failed}
+
+        # Core UPDATE 不經 ORM 版本檢查，version 需自行遞增，並發中的批次編輯才會失敗
+        values: Dict[str, Any] = {"status": to_status, "version": Order.version + 1}
+        if to_status == OrderStatus.CONFIRMED:
+            values["confirmed_by"] = user_id
+            values["confirmed_at"] = datetime.utcnow()
+
+        history = []
+        changed: List[Tuple[Order, OrderStatus]] = []
+        for from_status, group in groups.items():
+            await db.execute(
+                update(Order)
+                .where(
+                    and_(
+                        Order.id.in_([order.id for order in group]),
+                        Order.status == from_status
+                    )
+                )
+                .values(**values)
+            )
+            for order in group:
+                changed.append((order, from_status))
+                history.append({
+                    "id": new_id(),
+                    "order_id": order.id,
+                    "from_status": from_status,
+                    "to_status": to_status,
+                    "changed_by": user_id,
+                    "reason": status_data.reason,
+                    "notes": status_data.notes,
+                })
+
+        await db.execute(insert(OrderStatusHistory), history)
+
+        # 完成的訂單累計至客戶階層活躍度（savepoint，失敗不影響狀態更新）
+        if to_status == OrderStatus.COMPLETED:
+            from app.modules.customer_hierarchy.services.activity_rollup_service import ActivityRollupService
+
+            try:
+                async with db.begin_nested():
+                    await ActivityRollupService(db).record_orders([order for order, _ in changed])
+            except Exception as e:
+                logger.warning("activity_rollup.record_failed", order_count=len(changed), error=str(e))
+
+        await db.commit()
+
+        logger.info(
+            "order_status_bulk_updated",
+            to_status=to_status.value,
+            updated=len(changed),
+            failed=len(failed),
+            user_id=user_id
+        )
+
+        # 發送狀態變更通知（單一批次，失敗不影響主流程）
+        await notification_client.notify_order_status_changes([
+            {
+                "order_id": order.id,
+                "order_number": order.order_number,
+                "from_status": from_status,
+                "to_status": to_status,
+                "tenant_id": tenant_id,
+                "restaurant_id": order.restaurant_id,
+                "supplier_id": order.supplier_id,
+                "changed_by": user_id,
+                "reason": status_data.reason,
+            }
+            for order, from_status in changed
+        ])
+
+        return {"success": [order.id for order, _ in changed], "failed": failed}
+
     @classmethod
     async def confirm_order(
         cls,
@@ -505,7 +614,7 @@ class OrderService:
 
         # 記錄狀態歷史
         status_history = OrderStatusHistory(
-            id=str(uuid4()),
+            id=new_id(),
             order_id=order.id,
             from_status=old_status,
             to_status=OrderStatus.CONFIRMED,
@@ -575,7 +684,7 @@ class OrderService:
 
         # 記錄狀態歷史
         status_history = OrderStatusHistory(
-            id=str(uuid4()),
+            id=new_id(),
             order_id=order.id,
             from_status=old_status,
             to_status=OrderStatus.CANCELLED,
@@ -675,7 +784,7 @@ class OrderService:
         # 創建新項目
         line_total = cls.calculate_line_total(item_data.quantity, item_data.unit_price)
         order_item = OrderItem(
-            id=str(uuid4()),
+            id=new_id(),
             order_id=order.id,
             sku_id=item_data.sku_id,
             product_id=item_data.product_id,
@@ -834,6 +943,128 @@ class OrderService:
 
         return order
 
+    @classmethod
+    async def edit_order_items(
+        cls,
+        db: AsyncSession,
+        order_id: str,
+        tenant_id: str,
+        batch: OrderItemBatchRequest,
+        user_id: str
+    ) -> Order:
+        """
+        批次編輯草稿訂單項目
+
+        所有操作在記憶體中依序套用後一次 flush（新增 / 更新 / 刪除各自批次送出），
+        訂單金額只重算一次，並於同一交易提交；訂單載入與回傳各只查詢一次。
+        以 version 做樂觀鎖：版本不符、訂單已非草稿或提交時被並發修改皆回傳 409。
+
+        Args:
+            db: 資料庫會話
+            order_id: 訂單 ID
+            tenant_id: 租戶 ID
+            batch: 版本號與項目操作列表
+            user_id: 操作者 ID
+
+        Returns:
+            Order: 更新後的訂單
+        """
+        order = await cls.get_order_by_id(db, order_id, tenant_id)
+        if not order:
+            raise HTTPException(status_code=404, detail=f"訂單 ID '{order_id}' 不存在")
+
+        # 訂單已離開草稿（例如被並發送出）與版本不符同屬衝突，皆回傳 409
+        if order.status != OrderStatus.DRAFT:
+            raise HTTPException(
+                status_code=409,
+                detail=f"只有草稿狀態的訂單可以編輯項目，當前狀態：{order.status.value}"
+            )
+
+        if order.version != batch.version:
+            raise HTTPException(
+                status_code=409,
+                detail=f"訂單已被修改（目前版本 {order.version}），請重新載入後再編輯"
+            )
+
+        items = {str(item.id): item for item in order.items}
+        next_sort = max((item.sort_order for item in order.items), default=-1) + 1
+
+        for index, operation in enumerate(batch.operations):
+            if operation.op == "add":
+                item_data = operation.item
+                order_item = OrderItem(
+                    id=new_id(),
+                    order_id=order.id,
+                    sku_id=item_data.sku_id,
+                    product_id=item_data.product_id,
+                    product_code=item_data.product_code,
+                    product_name=item_data.product_name,
+                    quantity=item_data.quantity,
+                    unit_price=item_data.unit_price,
+                    line_total=cls.calculate_line_total(item_data.quantity, item_data.unit_price),
+                    notes=item_data.notes,
+                    is_variable_price=item_data.is_variable_price,
+                    sort_order=next_sort,
+                )
+                next_sort += 1
+                order.items.append(order_item)
+                items[order_item.id] = order_item
+                continue
+
+            item = items.get(operation.item_id)
+            if item is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"第 {index + 1} 個操作的訂單項目 ID '{operation.item_id}' 不存在"
+                )
+
+            if operation.op == "delete":
+                # delete-orphan：自集合移除即在 flush 時刪除
+                order.items.remove(item)
+                del items[operation.item_id]
+            elif operation.op == "update":
+                changes = operation.changes
+                if changes.quantity is not None:
+                    item.quantity = changes.quantity
+                if changes.unit_price is not None:
+                    item.unit_price = changes.unit_price
+                if changes.notes is not None:
+                    item.notes = changes.notes
+                item.line_total = cls.calculate_line_total(item.quantity, item.unit_price)
+            else:
+                item.sort_order = operation.sort_order
+
+        # 確保至少保留一個項目
+        if not order.items:
+            raise HTTPException(status_code=400, detail="訂單必須至少包含一個項目")
+
+        # 重新計算訂單金額（僅一次）
+        totals = cls.calculate_order_totals(list(order.items), order.adjustments)
+        order.subtotal = totals["subtotal"]
+        order.tax_amount = totals["tax_amount"]
+        order.total_amount = totals["total_amount"]
+        # 即使金額未變（如僅調整排序）也更新訂單列，使 version 遞增
+        order.updated_at = func.now()
+
+        try:
+            await db.commit()
+        except StaleDataError:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="訂單已被其他人修改，請重新載入後再編輯")
+
+        await db.refresh(order)
+
+        logger.info(
+            "order_items_edited",
+            order_id=order_id,
+            operations=len(batch.operations),
+            item_count=len(order.items),
+            version=order.version,
+            user_id=user_id,
+        )
+
+        return order
+
     @classmethod
     async def get_order_stats(
         cls,
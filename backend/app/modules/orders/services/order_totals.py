@@ -0,0 +1,82 @@
+"""
+訂單金額計算引擎
+- 金額規則（整數運算、銀行家進位）見 orderly_fastapi_core.money，此處重新匯出
+- 批次重新定價以一次 GROUP BY 彙總已存的行總計，再以 executemany 一次寫回
+"""
+from decimal import Decimal
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from orderly_fastapi_core.money import (
+    DEFAULT_TAX_RATE,
+    TOTAL_FIELDS,
+    batch_totals,
+    line_total,
+    line_totals,
+    order_totals,
+    sum_amounts,
+)
+
+from app.modules.orders.models.order import Order, OrderItem
+
+__all__ = [
+    "DEFAULT_TAX_RATE",
+    "TOTAL_FIELDS",
+    "batch_totals",
+    "line_total",
+    "line_totals",
+    "order_totals",
+    "sum_amounts",
+    "reprice_orders",
+]
+
+
+async def reprice_orders(
+    db: AsyncSession,
+    order_ids: Sequence[str],
+    tax_rate: Optional[Decimal] = None,
+) -> Dict[str, Dict[str, Decimal]]:
+    """
+    依已存的行總計與調整項重新計算多張訂單金額並寫回（不提交）
+
+    以一次 GROUP BY 取得各訂單小計，以一次 executemany 寫回；
+    version 同時遞增，並行中的編輯會因版本不符而失敗
+    """
+    if not order_ids:
+        return {}
+    subtotals = (
+        select(OrderItem.order_id, func.sum(OrderItem.line_total).label("subtotal"))
+        .where(OrderItem.order_id.in_(order_ids))
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    rows = (
+        await db.execute(
+            select(Order.id, Order.adjustments, subtotals.c.subtotal)
+            .outerjoin(subtotals, subtotals.c.order_id == Order.id)
+            .where(Order.id.in_(order_ids))
+        )
+    ).all()
+    totals = batch_totals({row.id: ([row.subtotal], row.adjustments) for row in rows}, tax_rate)
+    if not totals:
+        return totals
+
+    table = Order.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.id == bindparam("order_id"))
+        .values(
+            {
+                **{field: bindparam(f"new_{field}") for field in TOTAL_FIELDS},
+                "version": table.c.version + 1,
+                "updated_at": func.now(),
+            }
+        ),
+        [
+            {"order_id": order_id, **{f"new_{field}": value for field, value in values.items()}}
+            for order_id, values in totals.items()
+        ],
+    )
+    return totals
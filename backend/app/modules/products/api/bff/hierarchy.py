@@ -5,9 +5,6 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request
 
-from app.modules.customer_hierarchy.core.database import get_async_session
-from app.modules.customer_hierarchy.services.hierarchy_service import HierarchyService
-
 router = APIRouter(tags=["BFF Hierarchy"], include_in_schema=False)
 
 
@@ -27,6 +24,10 @@ def _int_param(value: Optional[str]) -> Optional[int]:
 
 
 async def _fetch_hierarchy_tree(request: Request) -> dict:
+    # imported per call so loading products does not import the customer_hierarchy module
+    from app.modules.customer_hierarchy.core.database import get_async_session
+    from app.modules.customer_hierarchy.services.hierarchy_service import HierarchyService
+
     try:
         async with get_async_session() as db:
             hierarchy_service = HierarchyService(db)
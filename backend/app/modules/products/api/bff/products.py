@@ -18,7 +18,8 @@ from app.modules.products.api.v1.skus_simple import (
     get_sku_stats as v1_get_sku_stats,
     search_skus as v1_search_skus,
 )
-from app.modules.products.core.database import get_async_session
+from app.modules.products.core.database import get_async_session, get_read_session
+from app.modules.products.middleware.sku_permissions import UserContext, get_sku_user_context
 
 router = APIRouter(tags=["BFF Products"], include_in_schema=False)
 
@@ -26,7 +27,7 @@ router = APIRouter(tags=["BFF Products"], include_in_schema=False)
 @router.get("/stats", response_model=ProductStatsResponse)
 async def get_product_stats(  # pragma: no cover - exercised via integration tests
     supplierId: Optional[str] = Query(None, alias="supplierId"),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Return aggregated product statistics for dashboards."""
     return await _get_product_stats(db=db, supplier_id=supplierId)
@@ -47,7 +48,7 @@ async def search_products(  # pragma: no cover - exercised via integration tests
     supplierId: Optional[str] = Query(None, alias="supplierId", description="供應商ID"),
     sortBy: str = Query("createdAt", alias="sortBy", description="排序欄位"),
     sortOrder: str = Query("desc", alias="sortOrder", regex="^(asc|desc)$", description="排序方向"),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     return await _search_products(
         page=page,
@@ -73,6 +74,7 @@ async def search_skus(  # pragma: no cover - exercised via integration tests
     page: int = Query(1, ge=1, description="頁碼"),
     page_size: int = Query(20, alias="page_size", ge=1, le=100, description="每頁數量"),
     is_active: Optional[bool] = Query(None, alias="is_active", description="是否啟用"),
+    user: UserContext = Depends(get_sku_user_context),
     db: AsyncSession = Depends(get_async_session),
 ):
     return await v1_search_skus(
@@ -80,6 +82,7 @@ async def search_skus(  # pragma: no cover - exercised via integration tests
         page=page,
         page_size=page_size,
         is_active=is_active,
+        user=user,
         db=db,
     )
 
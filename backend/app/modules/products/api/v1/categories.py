@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.products.core.database import get_async_session
 from app.modules.products.crud.category import category_crud
+from app.modules.products.services.category_tree_service import CategoryTreeService
 from app.modules.products.schemas.category import (
     ProductCategoryCreate,
     ProductCategoryUpdate,
@@ -49,25 +50,24 @@ async def get_categories(
             include_products=include_products,
             search=search
         )
+        # 商品數以 GROUP BY 計算，不載入商品資料列
+        counts = await CategoryTreeService.product_counts(db, [c.id for c in categories])
         
         # Transform to response format
         category_responses = []
         for category in categories:
-            # Calculate actual product count safely
-            product_count = 0
+            product_count, total_product_count = counts.get(category.id, (0, 0))
             products_data = []
             
-            if hasattr(category, 'products') and category.products is not None:
-                product_count = len(category.products)
-                if include_products:
-                    products_data = [
-                        {
-                            "id": str(product.id),
-                            "name": product.name,
-                            "code": product.code
-                        }
-                        for product in category.products
-                    ]
+            if include_products and category.products:
+                products_data = [
+                    {
+                        "id": str(product.id),
+                        "name": product.name,
+                        "code": product.code
+                    }
+                    for product in category.products
+                ]
             
             response_data = ProductCategoryResponse(
                 id=category.id,
@@ -82,8 +82,8 @@ async def get_categories(
                 metadata=category.meta_data,
                 created_at=category.createdAt,
                 updated_at=category.updatedAt,
-                count={"products": product_count},
-                _count={"products": product_count}
+                count={"products": product_count, "totalProducts": total_product_count},
+                _count={"products": product_count, "totalProducts": total_product_count}
             )
             
             if include_products and products_data:
@@ -125,57 +125,13 @@ async def get_category_tree(
     Compatible with: GET /api/products/categories/tree
     """
     try:
-        root_categories = await category_crud.get_tree_structure(
-            db,
-            include_products=include_products
-        )
-        
-        # Transform to tree response format
-        def build_tree(category):
-            product_count = len(category.products) if category.products else 0
-            
-            tree_node = {
-                "id": category.id,
-                "code": category.code,
-                "name": category.name,
-                "nameEn": category.nameEn,
-                "parent_id": category.parentId,
-                "level": category.level,
-                "sort_order": category.sortOrder,
-                "description": category.description,
-                "is_active": category.isActive,
-                "metadata": category.meta_data,
-                "created_at": category.createdAt,
-                "updated_at": category.updatedAt,
-                "_count": {"products": product_count},
-                "children": []
-            }
-            
-            if include_products and category.products:
-                tree_node["products"] = [
-                    {
-                        "id": str(product.id),
-                        "name": product.name,
-                        "code": product.code
-                    }
-                    for product in category.products
-                ]
-            
-            # Recursively build children
-            if hasattr(category, 'children') and category.children:
-                tree_node["children"] = [build_tree(child) for child in category.children]
-            
-            return tree_node
-        
-        tree_data = [build_tree(root) for root in root_categories]
+        # 版本化快取；未命中時以閉包表一次計算直接 / 彙總商品數
+        tree = await CategoryTreeService.get_tree(db, include_products=include_products)
         
         return CategoryTreeResponse(
             success=True,
-            data=tree_data,
-            meta={
-                "rootCount": len(tree_data),
-                "maxLevel": max([cat.level for cat in root_categories], default=0)
-            }
+            data=tree["data"],
+            meta=tree["meta"]
         )
         
     except Exception as e:
@@ -367,6 +323,11 @@ async def update_category(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Parent category not found"
                     )
+                if await CategoryTreeService.in_subtree(db, str(category_id), str(category_data.parent_id)):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Category cannot be moved under its own descendant"
+                    )
                 # Update level based on new parent
                 category_data.level = parent.level + 1
             else:
@@ -7,7 +7,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.modules.products.core.database import get_async_session
+from app.modules.products.core.database import get_async_session, get_read_session
 from app.modules.products.crud.product import product_crud
 from app.modules.products.schemas.product import (
     ProductSearchParams,
@@ -42,7 +42,7 @@ async def _get_product_stats(
 @router.get("/stats", response_model=ProductStatsResponse)
 async def get_product_stats(
     supplierId: Optional[str] = Query(None, alias="supplierId"),
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """現行端點：GET /api/products/stats"""
     return await _get_product_stats(db, supplier_id=supplierId)
@@ -51,7 +51,7 @@ async def get_product_stats(
 @router.get("/products/stats", response_model=ProductStatsResponse, include_in_schema=False)
 async def get_product_stats_legacy(
     supplierId: Optional[str] = Query(None, alias="supplierId"),
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """相容舊版端點：GET /api/products/products/stats"""
     return await _get_product_stats(db, supplier_id=supplierId)
@@ -119,7 +119,7 @@ async def search_products_legacy(
     supplierId: Optional[str] = Query(None, description="供應商ID"),
     sortBy: Optional[str] = Query("createdAt", description="排序欄位"),
     sortOrder: Optional[str] = Query("desc", pattern="^(asc|desc)$", description="排序方向"),
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     return await _search_products(
         page=page,
@@ -154,7 +154,7 @@ async def search_products(
     supplierId: Optional[str] = Query(None, description="供應商ID"),
     sortBy: Optional[str] = Query("createdAt", description="排序欄位"),
     sortOrder: Optional[str] = Query("desc", pattern="^(asc|desc)$", description="排序方向"),
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """現行端點：GET /api/products"""
     return await _search_products(
@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select, and_, or_, func, text
 
-from app.modules.products.core.database import get_async_session
+from app.modules.products.core.database import get_async_session, get_read_session
 from app.modules.products.models.sku_simple import ProductSKU
 from app.modules.products.models.product import Product
 
@@ -456,7 +456,7 @@ async def get_supplier_matrix(
 
 @router.get("/analytics/dashboard-stats")
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """
     獲取SKU儀表板統計數據
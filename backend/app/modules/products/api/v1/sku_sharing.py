@@ -10,6 +10,16 @@ from sqlalchemy import select, and_, or_, func, text
 from pydantic import BaseModel
 
 from app.modules.products.core.database import get_async_session
+from app.modules.products.middleware.sku_permissions import (
+    SKUPermissionChecker,
+    UserContext,
+    get_sku_user_context,
+    shared_sku_clause,
+    sku_offered_by,
+    sku_supplier_count,
+    sku_type_clause,
+    sku_visibility,
+)
 from app.modules.products.models.sku_simple import ProductSKU
 
 router = APIRouter()
@@ -51,50 +61,62 @@ async def search_skus_with_sharing(
     is_active: Optional[bool] = Query(None, description="是否啟用"),
     sku_type: Optional[str] = Query(None, description="SKU類型: public, private, all"),
     supplier_id: Optional[str] = Query(None, description="供應商ID篩選"),
+    user: UserContext = Depends(get_sku_user_context),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     搜尋SKU - 支援共享機制篩選
+    可見性與類型篩選皆在 SQL 中完成，計數與分頁只涵蓋用戶可見的 SKU
     """
     try:
-        # Build base query
-        query = select(ProductSKU).options(selectinload(ProductSKU.product))
+        conditions = [SKUPermissionChecker.visibility_clause(user)]
         
         # Apply filters
         if is_active is not None:
-            query = query.where(ProductSKU.is_active == is_active)
+            conditions.append(ProductSKU.is_active == is_active)
         
-        # SKU類型篩選 (暫時使用 mock 邏輯，因為還需要遷移資料庫)
-        # TODO: 在完成資料庫遷移後，使用實際的 type 欄位
+        type_clause = sku_type_clause(sku_type)
+        if type_clause is not None:
+            conditions.append(type_clause)
+        
+        if supplier_id:
+            conditions.append(sku_offered_by(supplier_id))
         
         if search:
             search_term = f"%{search}%"
-            query = query.where(
+            conditions.append(
                 or_(
                     ProductSKU.sku_code.ilike(search_term),
                     ProductSKU.name.ilike(search_term)
                 )
             )
         
-        # Count total records
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        # Count total / public / active records in one query
+        count_query = select(
+            func.count(),
+            func.count().filter(shared_sku_clause()),
+            func.count().filter(ProductSKU.is_active.is_(True)),
+        ).select_from(ProductSKU).where(*conditions)
+        total, public_total, active_total = (await db.execute(count_query)).one()
         
         # Apply pagination
         offset = (page - 1) * page_size
-        query = query.offset(offset).limit(page_size)
+        query = (
+            select(ProductSKU, sku_supplier_count())
+            .options(selectinload(ProductSKU.product))
+            .where(*conditions)
+            .order_by(ProductSKU.sku_code)
+            .offset(offset)
+            .limit(page_size)
+        )
         
         # Execute query
         result = await db.execute(query)
-        skus = result.scalars().all()
         
         # Transform to frontend format with sharing info
         sku_data = []
-        for i, sku in enumerate(skus):
-            # Mock sharing data (40% 機率為共享型)
-            is_shared = (hash(sku.id) % 10) < 4
-            supplier_count = 3 if is_shared else 1
+        for sku, supplier_count in result.all():
+            visibility = sku_visibility(sku)
             
             sku_item = {
                 "id": sku.id,
@@ -106,9 +128,9 @@ async def search_skus_with_sharing(
                 "packageType": sku.package_type,
                 "variant": sku.variant or {},
                 # 新增共享機制相關欄位
-                "type": "public" if is_shared else "private",
-                "creatorType": "platform" if is_shared else "supplier",
-                "approvalStatus": "approved",
+                "type": visibility,
+                "creatorType": sku.creator_type.value.lower() if sku.creator_type else "system",
+                "approvalStatus": sku.approval_status.value.lower() if sku.approval_status else "approved",
                 "supplierCount": supplier_count,
                 "product": {
                     "id": sku.product.id if sku.product else None,
@@ -118,24 +140,20 @@ async def search_skus_with_sharing(
             }
             sku_data.append(sku_item)
         
-        # 根據 sku_type 篩選
-        if sku_type and sku_type != "all":
-            sku_data = [s for s in sku_data if s["type"] == sku_type]
-        
         total_pages = (total + page_size - 1) // page_size
         
         return {
             "success": True,
             "data": sku_data,
-            "total": len(sku_data),
+            "total": total,
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
             "meta": {
-                "totalSKUs": len(sku_data),
-                "publicSKUs": len([s for s in sku_data if s["type"] == "public"]),
-                "privateSKUs": len([s for s in sku_data if s["type"] == "private"]),
-                "activeSKUs": len([s for s in sku_data if s["isActive"]]),
+                "totalSKUs": total,
+                "publicSKUs": public_total,
+                "privateSKUs": total - public_total,
+                "activeSKUs": active_total,
                 "page": page,
                 "totalPages": total_pages
             }
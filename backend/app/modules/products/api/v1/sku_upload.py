@@ -7,19 +7,20 @@ import csv
 import json
 import uuid
 import logging
-from typing import List, Dict, Optional, Any
+from typing import Awaitable, Callable, List, Dict, Optional, Any
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
+from sqlalchemy import select, and_, desc, update
 from sqlalchemy.orm import selectinload
 
-from app.modules.products.core.database import get_async_session
+from app.modules.products.core.database import AsyncSessionLocal, get_async_session
 from app.modules.products.models.sku_upload import SKUUpload, SKUUploadItem, SKUUploadAuditLog, UploadStatus, ItemStatus, UploadType
 from app.modules.products.services.id_generator import IDGeneratorService
 from app.modules.products.services.duplicate_detector import AIDuplicateDetector
 from app.modules.products.services.category_matcher import AICategoryValidator
+from orderly_fastapi_core.background_jobs import JobCancelled, JobContext, background_jobs
 from app.modules.products.schemas.sku_upload import (
     SKUUploadCreate,
     SKUUploadResponse,
@@ -42,6 +43,8 @@ category_validator = AICategoryValidator()
 MAX_UPLOAD_ROWS = 200
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 ALLOWED_FILE_TYPES = {'csv', 'text/csv', 'application/csv'}
+SKU_UPLOAD_JOB = "products.sku_upload"
+PROCESS_BATCH_SIZE = 50  # rows per flush / progress report
 
 
 def generate_csv_template() -> str:
@@ -158,9 +161,16 @@ async def process_upload_with_ai(
     upload_id: str,
     csv_content: str,
     user_id: str,
-    db: AsyncSession
+    db: AsyncSession,
+    report_progress: Optional[Callable[..., Awaitable[None]]] = None
 ):
-    """Background task to process upload with AI validation"""
+    """
+    Background task to process upload with AI validation
+
+    Items are flushed every PROCESS_BATCH_SIZE rows; `report_progress` (the job's
+    JobContext.report_progress) is awaited after AI validation and after every batch.
+    """
+    upload = None
     try:
         logger.info(f"Starting AI processing for upload {upload_id}")
         
@@ -209,6 +219,8 @@ async def process_upload_with_ai(
         
         logger.info(f"Running category validation for {len(batch_items)} items")
         category_results = await category_validator.batch_validate_categories(db, batch_items)
+        if report_progress:
+            await report_progress(stage="creating_items", processed=0, total=len(batch_items))
         
         # Create upload items with AI results
         total_duplicates = 0
@@ -271,6 +283,12 @@ async def process_upload_with_ai(
             )
             
             db.add(upload_item)
+
+            processed = i + 1
+            if processed % PROCESS_BATCH_SIZE == 0 or processed == len(batch_items):
+                await db.flush()
+                if report_progress:
+                    await report_progress(stage="creating_items", processed=processed, total=len(batch_items))
         
         # Update upload with final results
         upload.processed_rows = len(batch_items)
@@ -293,10 +311,38 @@ async def process_upload_with_ai(
         
     except Exception as e:
         logger.error(f"Error processing upload {upload_id}: {str(e)}")
+        await db.rollback()
         if upload:
             upload.status = UploadStatus.failed.value
-            upload.error_summary = {'error': str(e)}
+            upload.error_summary = {'error': str(e) or type(e).__name__}
             await db.commit()
+        if isinstance(e, JobCancelled):
+            raise
+
+
+# process_upload_with_ai records failures on the upload itself, so jobs are not retried
+@background_jobs.job_handler(SKU_UPLOAD_JOB, concurrency=2, max_retries=0)
+async def run_sku_upload_job(context: JobContext, payload: Dict[str, Any]) -> None:
+    """Durable job entry point for SKU upload processing (reads the CSV stored on the upload)"""
+    upload_id = payload["upload_id"]
+    async with AsyncSessionLocal() as db:
+        csv_content = (
+            await db.execute(select(SKUUpload.file_content).where(SKUUpload.id == upload_id))
+        ).scalar_one_or_none()
+        if csv_content is None:
+            logger.error(f"Upload {upload_id} has no stored file")
+            return
+        try:
+            await process_upload_with_ai(
+                upload_id, csv_content, payload["user_id"], db, report_progress=context.report_progress
+            )
+        finally:
+            # The upload is reviewed, approved or failed by now; the CSV is no longer needed
+            async with AsyncSessionLocal() as cleanup:
+                await cleanup.execute(
+                    update(SKUUpload).where(SKUUpload.id == upload_id).values(file_content=None)
+                )
+                await cleanup.commit()
 
 
 @router.get("/sku-upload/template", response_class=StreamingResponse)
@@ -316,7 +362,6 @@ async def download_csv_template():
 
 @router.post("/sku-upload", response_model=SKUUploadResponse)
 async def upload_sku_batch(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: str = Query(..., description="User ID performing the upload"),
     organization_id: Optional[str] = Query(None, description="Organization ID"),
@@ -372,6 +417,7 @@ async def upload_sku_batch(
         status=UploadStatus.processing.value,
         upload_type=UploadType.create.value
     )
+    upload.file_content = csv_content
     
     db.add(upload)
     await db.commit()
@@ -391,13 +437,12 @@ async def upload_sku_batch(
     db.add(audit_log)
     await db.commit()
     
-    # Start background processing
-    background_tasks.add_task(
-        process_upload_with_ai,
-        upload_id,
-        csv_content,
-        user_id,
-        db
+    # Queue durable background processing (runs in its own session on any worker)
+    await background_jobs.submit_job(
+        SKU_UPLOAD_JOB,
+        {"upload_id": upload_id, "user_id": user_id},
+        created_by=user_id,
+        metadata={"upload_id": upload_id}
     )
     
     return SKUUploadResponse(
@@ -12,6 +12,13 @@ from sqlalchemy import select, and_, or_, func, text
 import structlog
 
 from app.modules.products.core.database import get_async_session
+from app.modules.products.middleware.sku_permissions import (
+    SKUPermissionChecker,
+    UserContext,
+    get_sku_user_context,
+    sku_supplier_count,
+    sku_visibility,
+)
 from app.modules.products.models.sku_simple import ProductSKU, SKUPricingMethod
 from app.modules.products.models.product import Product
 from app.modules.products.models.price_history import PriceHistory, PriceType
@@ -37,15 +44,20 @@ async def search_skus(
     page: int = Query(1, ge=1, description="頁碼"),
     page_size: int = Query(20, ge=1, le=100, description="每頁數量"),
     is_active: Optional[bool] = Query(None, description="是否啟用"),
+    user: UserContext = Depends(get_sku_user_context),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     搜尋SKU - 支援分頁和篩選
-    返回格式符合前端期望
+    返回格式符合前端期望；可見性於 SQL 中過濾
     """
     try:
         # Build query
-        query = select(ProductSKU).options(selectinload(ProductSKU.product))
+        query = (
+            select(ProductSKU)
+            .options(selectinload(ProductSKU.product))
+            .where(SKUPermissionChecker.visibility_clause(user))
+        )
         
         # Apply filters
         if is_active is not None:
@@ -67,20 +79,15 @@ async def search_skus(
         
         # Apply pagination
         offset = (page - 1) * page_size
-        query = query.offset(offset).limit(page_size)
+        query = query.add_columns(sku_supplier_count()).offset(offset).limit(page_size)
         
         # Execute query
         result = await db.execute(query)
-        skus = result.scalars().all()
         
         # Transform to frontend format with sharing mechanism
         sku_data = []
-        for sku in skus:
-            # 計算供應商數量 (如果是共享型 SKU)
-            supplier_count = 1
-            if hasattr(sku, 'type') and sku.type == 'public':
-                # TODO: 從 supplier_product_sku_participations 查詢實際數量
-                supplier_count = 3  # Mock data for now
+        for sku, supplier_count in result.all():
+            visibility = sku_visibility(sku)
             
             sku_item = {
                 "id": sku.id,
@@ -92,7 +99,7 @@ async def search_skus(
                 "packageType": sku.package_type,
                 "variant": sku.variant or {},
                 # 新增共享機制相關欄位
-                "type": getattr(sku, 'type', 'private'),
+                "type": visibility,
                 "creatorType": getattr(sku, 'creator_type', 'supplier'),
                 "approvalStatus": getattr(sku, 'approval_status', 'approved'),
                 "supplierCount": supplier_count,
@@ -7,17 +7,31 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from pydantic import BaseModel, Field
 import structlog
 
 from app.modules.products.core.database import get_async_session
 from app.modules.products.models.sku_simple import ProductSKU
 from app.modules.products.models.supplier_sku import SupplierSKU
+from app.modules.products.services.supplier_offer_service import SupplierOfferService
 from app.modules.products.services.supplier_sku_service import SupplierSKUService
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 
+class PriceComparisonItem(BaseModel):
+    """批次比價項目"""
+    skuId: str = Field(..., description="SKU ID")
+    quantity: float = Field(1, gt=0, description="購買數量")
+
+
+class BatchPriceComparisonRequest(BaseModel):
+    """批次比價請求"""
+    items: List[PriceComparisonItem] = Field(..., min_length=1, max_length=500, description="比價項目")
+    top: Optional[int] = Field(None, ge=1, le=50, description="每個項目回傳的供應商數（預設全部）")
+
+
 def _get_tenant_id_from_request(request: Request) -> Optional[str]:
     """從請求標頭取得租戶 ID"""
     return request.headers.get("X-Tenant-Id") or request.headers.get("X-Org-Id")
@@ -76,6 +90,50 @@ async def compare_sku_prices(
     }
 
 
+@router.post("/skus/price-comparison")
+async def batch_compare_sku_prices(
+    payload: BatchPriceComparisonRequest,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    批次比較多個 SKU 的供應商價格
+
+    以預先展開的 supplier_offers 一次查詢完成所有項目，每個項目返回：
+    - 依排名排序的供應商報價（符合最低訂購量優先、總成本低者優先）
+    - 價格範圍統計
+    - 最佳供應商推薦
+    """
+    comparisons = await SupplierOfferService.compare_offers(
+        db, [(item.skuId, item.quantity) for item in payload.items], top=payload.top
+    )
+
+    return {
+        "success": True,
+        "total": len(comparisons),
+        "data": comparisons
+    }
+
+
+@router.post("/supplier-offers/rebuild")
+async def rebuild_supplier_offers(
+    sku_ids: Optional[str] = Query(None, description="SKU ID（逗號分隔，預設全部）"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    重建供應商報價展開表
+
+    SupplierSKU 經 ORM 寫入時會自動維護；繞過 ORM 的批次匯入後可呼叫此端點修正
+    """
+    sku_id_list = sku_ids.split(",") if sku_ids else None
+    written = await SupplierOfferService.rebuild_offers(db, sku_id_list)
+    await db.commit()
+
+    return {
+        "success": True,
+        "offers": written
+    }
+
+
 @router.get("/suppliers/performance")
 async def get_supplier_performance_matrix(
     supplier_ids: Optional[str] = Query(None, description="供應商 ID（逗號分隔）"),
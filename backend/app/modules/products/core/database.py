@@ -4,7 +4,7 @@ Database configuration and connection management for Product Service
 import os
 import sys
 
-from orderly_fastapi_core import create_db_engines, get_async_session_dependency
+from orderly_fastapi_core import create_db_engines, get_async_session_dependency, get_read_session_dependency
 
 from .config import settings
 
@@ -13,4 +13,6 @@ async_engine, sync_engine, AsyncSessionLocal, SessionLocal = create_db_engines(
 )
 
 get_async_session = get_async_session_dependency(AsyncSessionLocal)
+# 列表 / 搜尋 / 統計等唯讀端點（可路由到 read replica）
+get_read_session = get_read_session_dependency(AsyncSessionLocal)
 
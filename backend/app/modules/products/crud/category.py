@@ -5,7 +5,7 @@ from typing import List, Optional, Dict, Any
 from uuid import UUID
 from sqlalchemy import select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from app.modules.products.crud.base import CRUDBase
 from app.modules.products.models.category import ProductCategory
@@ -96,8 +96,13 @@ class CRUDProductCategory(CRUDBase[ProductCategory, ProductCategoryCreate, Produ
             ProductCategory.name
         )
         
-        # Always eagerly load products to avoid lazy loading issues
-        query = query.options(selectinload(ProductCategory.products))
+        # Products are only loaded when listed; counts come from
+        # CategoryTreeService.product_counts. The flat list needs no tree links.
+        query = query.options(
+            selectinload(ProductCategory.products) if include_products else noload(ProductCategory.products),
+            noload(ProductCategory.children),
+            noload(ProductCategory.parent),
+        )
         
         result = await db.execute(query)
         categories = result.scalars().all()
@@ -2,8 +2,6 @@
 FastAPI Product Service Application
 使用統一的應用程式工廠簡化初始化
 """
-import os
-import sys
 from pathlib import Path
 
 
@@ -13,19 +11,7 @@ from orderly_fastapi_core import create_service_app
 
 from app.modules.products.core.config import settings
 from app.modules.products.core.database import async_engine
-from app.modules.products.api.v1.categories import router as categories_router
-from app.modules.products.api.v1.products import router as products_router
-from app.modules.products.api.v1.skus_simple import router as skus_router
-from app.modules.products.api.v1.sku_upload import router as sku_upload_router
-from app.modules.products.api.v1.sku_analytics import router as sku_analytics_router
-from app.modules.products.api.v1.sku_sharing import router as sku_sharing_router
-from app.modules.products.api.v1.price_history import router as price_history_router
-from app.modules.products.api.v1.product_images import router as product_images_router
-from app.modules.products.api.v1.promotions import router as promotions_router
-from app.modules.products.api.v1.supplier_skus import router as supplier_skus_router
-from app.modules.products.api.v1.customer_prices import router as customer_prices_router
-from app.modules.products.api.v1.bulk_operations import router as bulk_operations_router
-from app.modules.products.api.bff import router as bff_router
+from app.modules.products.module import module
 from app.modules.products.middleware.error_handler import ErrorHandlerMiddleware, RequestValidationMiddleware
 
 # 使用統一的應用程式工廠建立 FastAPI 應用
@@ -39,6 +25,7 @@ app = create_service_app(
     debug=settings.debug,
     title="Orderly Product Service",
     description="井然 Orderly Product Service - FastAPI Version",
+    module=module,
 )
 
 # 添加 Product Service 特定的 Middleware
@@ -61,121 +48,3 @@ async def readiness_check():
 async def liveness_check():
     """Liveness check endpoint"""
     return {"status": "alive", "service": "product-service-fastapi"}
-
-
-@app.get("/api/products/health")
-async def products_health():
-    """Products health endpoint - matches existing Node.js structure"""
-    return {
-        "status": "healthy",
-        "service": "product-service",
-        "framework": "FastAPI",
-    }
-
-
-# ==================== API Routers ====================
-
-# Product Categories
-app.include_router(
-    categories_router,
-    prefix="/api/products",
-    tags=["Product Categories"]
-)
-
-# Products
-app.include_router(
-    products_router,
-    prefix="/api/products",
-    tags=["Products"]
-)
-
-# SKU Management
-app.include_router(
-    skus_router,
-    prefix="/api/products",
-    tags=["SKU Management"]
-)
-
-# SKU Batch Upload
-app.include_router(
-    sku_upload_router,
-    prefix="/api/products",
-    tags=["SKU Batch Upload"]
-)
-
-# SKU Analytics
-app.include_router(
-    sku_analytics_router,
-    prefix="/api/products",
-    tags=["SKU Analytics"]
-)
-
-# SKU Sharing System
-app.include_router(
-    sku_sharing_router,
-    prefix="/api/products",
-    tags=["SKU Sharing System"]
-)
-
-# Price History
-app.include_router(
-    price_history_router,
-    prefix="/api/products",
-    tags=["Price History"]
-)
-
-# Product Images
-app.include_router(
-    product_images_router,
-    prefix="/api/products",
-    tags=["Product Images"]
-)
-
-# Promotions
-app.include_router(
-    promotions_router,
-    prefix="/api/products/promotions",
-    tags=["Promotions"]
-)
-
-# Supplier SKU Management
-app.include_router(
-    supplier_skus_router,
-    prefix="/api/products",
-    tags=["Supplier SKU Management"]
-)
-
-# Customer Prices
-app.include_router(
-    customer_prices_router,
-    prefix="/api/products/customer-prices",
-    tags=["Customer Prices"]
-)
-
-# Bulk Operations
-app.include_router(
-    bulk_operations_router,
-    prefix="/api/products",
-    tags=["Bulk Operations"]
-)
-
-# BFF routes consumed by the frontend platform
-app.include_router(bff_router)
-
-# API gateway compatibility aliases. These preserve the no-prefix product routes
-# without mounting the retired gateway proxy module.
-for _router, _prefix, _tags in [
-    (categories_router, "/products", ["Product Categories"]),
-    (products_router, "/products", ["Products"]),
-    (skus_router, "/products", ["SKU Management"]),
-    (sku_upload_router, "/products", ["SKU Batch Upload"]),
-    (sku_analytics_router, "/products", ["SKU Analytics"]),
-    (sku_sharing_router, "/products", ["SKU Sharing System"]),
-    (price_history_router, "/products", ["Price History"]),
-    (product_images_router, "/products", ["Product Images"]),
-    (promotions_router, "/products/promotions", ["Promotions"]),
-    (supplier_skus_router, "/products", ["Supplier SKU Management"]),
-    (customer_prices_router, "/products/customer-prices", ["Customer Prices"]),
-    (bulk_operations_router, "/products", ["Bulk Operations"]),
-]:
-    app.include_router(_router, prefix=_prefix, tags=_tags)
@@ -1,11 +1,20 @@
 """
 SKU 權限控制中間件
 實施 RBAC 和訪問隔離機制
+
+列表與搜尋端點以 SKUPermissionChecker.visibility_clause 將可見性規則轉為 SQL 條件，
+在計數與分頁之前由資料庫過濾；filter_visible_skus 僅保留給已載入的少量資料使用。
 """
-from typing import List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 from enum import Enum
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from pydantic import BaseModel
+from sqlalchemy import false, func, not_, or_, select, true
+from sqlalchemy.sql.elements import ColumnElement, Label
+
+from orderly_fastapi_core import get_request_claims
+from app.modules.products.models.sku_simple import ProductSKU, SKUType
+from app.modules.products.models.supplier_sku import SupplierSKU
 
 
 class UserRole(str, Enum):
@@ -35,6 +44,95 @@ class UserContext(BaseModel):
     permissions: Set[str] = set()
 
 
+# 使用者模組角色 -> SKU 權限角色
+_ROLE_PREFIXES = (
+    ("platform_", UserRole.PLATFORM_ADMIN),
+    ("super_admin", UserRole.PLATFORM_ADMIN),
+    ("supplier", UserRole.SUPPLIER),
+    ("restaurant", UserRole.RESTAURANT),
+)
+
+
+def _map_role(role: Optional[str]) -> UserRole:
+    role = (role or "").lower()
+    for prefix, mapped in _ROLE_PREFIXES:
+        if role.startswith(prefix):
+            return mapped
+    return UserRole.GUEST
+
+
+def user_context_from_claims(claims: Dict[str, Any]) -> UserContext:
+    """由已驗證的 JWT claims 建立用戶上下文"""
+    return UserContext(
+        user_id=str(claims.get("sub") or ""),
+        role=_map_role(claims.get("role")),
+        organization_id=claims.get("org_id") or claims.get("tenant_id"),
+        permissions=set(claims.get("permissions") or []),
+    )
+
+
+def get_sku_user_context(request: Request) -> UserContext:
+    """
+    FastAPI 依賴：取得目前請求的 SKU 用戶上下文
+
+    優先使用 AuthMiddleware 已驗證的 claims；僅在未經中介層時讀取 Gateway 轉發的標頭。
+    """
+    claims = get_request_claims(request)
+    if claims is not None:
+        return user_context_from_claims(claims)
+
+    headers = request.headers
+    return UserContext(
+        user_id=headers.get("X-User-ID") or "",
+        role=_map_role(headers.get("X-User-Role")),
+        organization_id=headers.get("X-Org-Id") or headers.get("X-Tenant-Id"),
+    )
+
+
+def shared_sku_clause() -> ColumnElement[bool]:
+    """共享型 SKU：標記為 PUBLIC，或沒有創建組織的平台/系統 SKU"""
+    return or_(ProductSKU.type == SKUType.PUBLIC, ProductSKU.creator_id.is_(None))
+
+
+def sku_visibility(sku: ProductSKU) -> str:
+    """回傳 SKU 的可見性類型（public / private），與 shared_sku_clause 一致"""
+    return "public" if sku.type == SKUType.PUBLIC or sku.creator_id is None else "private"
+
+
+def sku_supplier_count() -> Label:
+    """每個 SKU 的有效供應商數（supplier_skus 中啟用的供應商），供列表查詢一併選取"""
+    return (
+        select(func.count(func.distinct(SupplierSKU.supplier_id)))
+        .where(SupplierSKU.sku_id == ProductSKU.id, SupplierSKU.is_active.is_(True))
+        .correlate(ProductSKU)
+        .scalar_subquery()
+        .label("supplier_count")
+    )
+
+
+def sku_offered_by(supplier_id: str) -> ColumnElement[bool]:
+    """SKU 由指定供應商供貨（supplier_skus 中有該供應商啟用的報價）"""
+    return (
+        select(SupplierSKU.id)
+        .where(
+            SupplierSKU.sku_id == ProductSKU.id,
+            SupplierSKU.supplier_id == supplier_id,
+            SupplierSKU.is_active.is_(True),
+        )
+        .correlate(ProductSKU)
+        .exists()
+    )
+
+
+def sku_type_clause(sku_type: Optional[str]) -> Optional[ColumnElement[bool]]:
+    """SKU 類型篩選條件（public / private / all），不需篩選時回傳 None"""
+    if sku_type == "public":
+        return shared_sku_clause()
+    if sku_type == "private":
+        return not_(shared_sku_clause())
+    return None
+
+
 class SKUPermissionChecker:
     """SKU 權限檢查器"""
     
@@ -88,6 +186,23 @@ class SKUPermissionChecker:
         
         return False
     
+    @classmethod
+    def visibility_clause(cls, user: UserContext) -> ColumnElement[bool]:
+        """
+        將 can_view_sku 的規則轉為 SQL 條件
+
+        - 平台管理員：不限制
+        - 無 VIEW 權限：不可見任何 SKU
+        - 其他：共享型 SKU，或由本組織創建的私有 SKU
+        """
+        if user.role == UserRole.PLATFORM_ADMIN:
+            return true()
+        if not cls.has_permission(user, SKUPermission.VIEW):
+            return false()
+        if not user.organization_id:
+            return shared_sku_clause()
+        return or_(shared_sku_clause(), ProductSKU.creator_id == user.organization_id)
+
     @classmethod
     def can_edit_sku(cls, user: UserContext, sku_type: str, sku_creator_id: Optional[str] = None) -> bool:
         """檢查用戶是否可以編輯 SKU"""
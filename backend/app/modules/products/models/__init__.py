@@ -2,6 +2,7 @@
 
 from .base import Base, BaseModel
 from .category import ProductCategory
+from .category_closure import ProductCategoryClosure
 from .product import Product, ProductState, TaxStatus, PricingMethod
 from .sku_simple import ProductSKU, SKUType, CreatorType, ApprovalStatus, SKUPricingMethod
 from .sku_upload import (
@@ -18,11 +19,13 @@ from .product_image import ProductImage
 from .promotion import Promotion, DiscountType, PromotionStatus
 from .customer_price import CustomerPrice
 from .supplier_sku import SupplierSKU
+from .supplier_offer import SupplierOffer
 
 __all__ = [
     "Base",
     "BaseModel",
     "ProductCategory",
+    "ProductCategoryClosure",
     "Product",
     "ProductState",
     "TaxStatus",
@@ -47,4 +50,5 @@ __all__ = [
     "PromotionStatus",
     "CustomerPrice",
     "SupplierSKU",
+    "SupplierOffer",
 ]
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+ProductCategoryClosure SQLAlchemy model
+分類閉包表：每對 (祖先, 子孫) 一筆，含自身 (depth = 0)
+"""
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
+from .base import Base
+
+
+class ProductCategoryClosure(Base):
+    """
+    Ancestor / descendant pairs of the category tree
+
+    由 product_categories.parentId 衍生，在分類新增或移動時同步維護；
+    子樹查詢與彙總商品數只需一次 join，不必遞迴載入 children
+    """
+    __tablename__ = "product_category_closure"
+
+    ancestor_id = Column(
+        String,
+        ForeignKey("product_categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    descendant_id = Column(
+        String,
+        ForeignKey("product_categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    depth = Column(Integer, nullable=False)  # 0 = 自身, 1 = 直接子分類, ...
+
+    __table_args__ = (
+        # 由子孫往上查祖先（移動子樹、麵包屑）
+        Index("ix_product_category_closure_descendant", "descendant_id", "depth"),
+        {"comment": "Category tree closure (ancestor, descendant, depth), derived from parentId"},
+    )
+
+    def __repr__(self):
+        return (
+            f"<ProductCategoryClosure(ancestor_id={self.ancestor_id}, "
+            f"descendant_id={self.descendant_id}, depth={self.depth})>"
+        )
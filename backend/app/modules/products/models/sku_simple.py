@@ -3,7 +3,7 @@ Simple SKU model that matches the existing database schema
 Maps to the existing product_skus table with camelCase columns
 Aligned with migration f2fcfbdc3a33 (baseline_product_schema)
 """
-from sqlalchemy import Column, String, Boolean, Integer, Float, JSON, ForeignKey, DateTime, func, Enum
+from sqlalchemy import Column, String, Boolean, Integer, Float, JSON, ForeignKey, DateTime, func, Enum, Index
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -52,6 +52,10 @@ class ProductSKU(BaseModel):
     Simple Product SKU model matching existing database schema
     """
     __tablename__ = "product_skus"
+    __table_args__ = (
+        # SKU 可見性篩選（type / 創建組織 / 啟用狀態），migration: 0008_sku_visibility_index
+        Index("ix_product_skus_visibility", "type", "creator_id", "isActive"),
+    )
 
     # 多租戶隔離（migration: 20251210_2000）
     tenant_id = Column(String(36), nullable=True, index=True, comment='租戶ID（組織ID）')
@@ -4,7 +4,7 @@ SKU Upload models for batch processing with AI validation
 import enum
 from datetime import datetime
 from sqlalchemy import Column, String, Boolean, Integer, Float, JSON, ForeignKey, DateTime, func, Text, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from .base import BaseModel
 
@@ -57,6 +57,8 @@ class SKUUpload(BaseModel):
     original_filename = Column(String(255), nullable=False)
     file_size = Column(Integer, nullable=False)
     file_url = Column(Text, nullable=True)
+    # Raw CSV, held in the database until processing ends so any worker can read it
+    file_content = deferred(Column(Text, nullable=True))
     
     # Processing statistics
     total_rows = Column(Integer, nullable=False)
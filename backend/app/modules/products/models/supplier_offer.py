@@ -0,0 +1,44 @@
+"""
+SupplierOffer SQLAlchemy model
+供應商報價展開表：每個 (SKU, 供應商) 依數量區間預先計算的有效單價
+"""
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Index, func
+from .base import Base
+
+
+class SupplierOffer(Base):
+    """
+    Precomputed effective unit price per quantity break
+
+    由 supplier_skus 衍生（基本價、階梯定價、批量折扣展開成數量區間），
+    在 SupplierSKU 寫入時同步重建，價格比較只需一次區間查詢
+    """
+    __tablename__ = "supplier_offers"
+
+    supplier_sku_id = Column(
+        String,
+        ForeignKey("supplier_skus.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # 數量區間 [min_quantity, max_quantity)，max_quantity 為 null 表示無上限
+    min_quantity = Column(Numeric(12, 3), primary_key=True)
+    max_quantity = Column(Numeric(12, 3), nullable=True)
+
+    sku_id = Column(String, ForeignKey("product_skus.id", ondelete="CASCADE"), nullable=False)
+    supplier_id = Column(String, nullable=False, index=True)
+
+    unit_price = Column(Numeric(10, 4), nullable=False)
+    price_source = Column(String(20), nullable=False)  # base / tier / bulk_discount
+
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_supplier_offers_sku_quantity", "sku_id", "min_quantity"),
+        {"comment": "Effective supplier price per quantity break, derived from supplier_skus"},
+    )
+
+    def __repr__(self):
+        return (
+            f"<SupplierOffer(sku_id={self.sku_id}, supplier_id={self.supplier_id}, "
+            f"min_quantity={self.min_quantity}, unit_price={self.unit_price})>"
+        )
@@ -3,7 +3,7 @@ SupplierSKU SQLAlchemy model
 供應商 SKU 關聯模型（獨立檔案避免衝突）
 """
 from decimal import Decimal
-from sqlalchemy import Column, String, Boolean, JSON, ForeignKey, Integer, Numeric, DateTime
+from sqlalchemy import Column, String, Boolean, JSON, ForeignKey, Integer, Numeric, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -63,9 +63,10 @@ class SupplierSKU(BaseModel):
     created_by = Column(String, nullable=True)
     updated_by = Column(String, nullable=True)
 
-    # Unique constraint
     __table_args__ = (
-        {"comment": "Multi-supplier SKU mapping with differential pricing"}
+        # SKU 列表的供應商數量統計，migration: 0015_supplier_sku_lookup_index
+        Index("ix_supplier_skus_sku_supplier", "sku_id", "supplier_id", postgresql_where=text("is_active")),
+        {"comment": "Multi-supplier SKU mapping with differential pricing"},
     )
 
     def __repr__(self):
@@ -0,0 +1,70 @@
+"""
+Product Service 模組定義
+供單體組合根與獨立入口（main.py）共用的路由與生命週期
+"""
+from fastapi import APIRouter
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.products.core.database import async_engine
+from app.modules.products.api.v1.categories import router as categories_router
+from app.modules.products.api.v1.products import router as products_router
+from app.modules.products.api.v1.skus_simple import router as skus_router
+from app.modules.products.api.v1.sku_upload import router as sku_upload_router
+from app.modules.products.api.v1.sku_analytics import router as sku_analytics_router
+from app.modules.products.api.v1.sku_sharing import router as sku_sharing_router
+from app.modules.products.api.v1.price_history import router as price_history_router
+from app.modules.products.api.v1.product_images import router as product_images_router
+from app.modules.products.api.v1.promotions import router as promotions_router
+from app.modules.products.api.v1.supplier_skus import router as supplier_skus_router
+from app.modules.products.api.v1.customer_prices import router as customer_prices_router
+from app.modules.products.api.v1.bulk_operations import router as bulk_operations_router
+from app.modules.products.api.bff import router as bff_router
+
+router = APIRouter()
+
+
+@router.get("/api/products/health")
+async def products_health():
+    """Products health endpoint - matches existing Node.js structure"""
+    return {
+        "status": "healthy",
+        "service": "product-service",
+        "framework": "FastAPI",
+    }
+
+
+# ==================== API Routers ====================
+
+# (router, /api prefix, no-prefix gateway compatibility alias, tags)
+_PRODUCT_ROUTERS = [
+    (categories_router, "/api/products", "/products", ["Product Categories"]),
+    (products_router, "/api/products", "/products", ["Products"]),
+    (skus_router, "/api/products", "/products", ["SKU Management"]),
+    (sku_upload_router, "/api/products", "/products", ["SKU Batch Upload"]),
+    (sku_analytics_router, "/api/products", "/products", ["SKU Analytics"]),
+    (sku_sharing_router, "/api/products", "/products", ["SKU Sharing System"]),
+    (price_history_router, "/api/products", "/products", ["Price History"]),
+    (product_images_router, "/api/products", "/products", ["Product Images"]),
+    (promotions_router, "/api/products/promotions", "/products/promotions", ["Promotions"]),
+    (supplier_skus_router, "/api/products", "/products", ["Supplier SKU Management"]),
+    (customer_prices_router, "/api/products/customer-prices", "/products/customer-prices", ["Customer Prices"]),
+    (bulk_operations_router, "/api/products", "/products", ["Bulk Operations"]),
+]
+
+for _router, _prefix, _alias, _tags in _PRODUCT_ROUTERS:
+    router.include_router(_router, prefix=_prefix, tags=_tags)
+
+# BFF routes consumed by the frontend platform
+router.include_router(bff_router)
+
+# API gateway compatibility aliases. These preserve the no-prefix product routes
+# without mounting the retired gateway proxy module.
+for _router, _prefix, _alias, _tags in _PRODUCT_ROUTERS:
+    router.include_router(_router, prefix=_alias, tags=_tags)
+
+module = ServiceModule(
+    name="products",
+    router=router,
+    on_shutdown=[async_engine.dispose],
+)
@@ -187,7 +187,7 @@ class AICategoryValidator:
     
     async def get_category_tree(self, db: AsyncSession) -> Dict[str, Dict]:
         """Get all categories with their hierarchy"""
-        query = select(ProductCategory).where(ProductCategory.is_active == True)
+        query = select(ProductCategory).where(ProductCategory.isActive == True)
         result = await db.execute(query)
         categories = result.scalars().all()
         
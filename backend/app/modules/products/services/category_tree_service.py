@@ -0,0 +1,276 @@
+"""
+CategoryTreeService - 分類閉包表維護與分類樹快取
+- product_category_closure 於 ProductCategory 新增 / 變更上層時在同一交易內維護
+- 直接與彙總（含所有子分類）商品數以一次 GROUP BY 計算，不載入商品資料列
+- 序列化後的分類樹以版本號快取於 Redis：分類或商品歸屬變更提交後遞增版本，
+  舊版本快取不再被讀取並自然過期
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+import structlog
+
+from orderly_fastapi_core import redis_manager
+
+from app.modules.products.core.config import REDIS_URL, settings
+from app.modules.products.models.category import ProductCategory
+from app.modules.products.models.category_closure import ProductCategoryClosure
+from app.modules.products.models.product import Product
+
+logger = structlog.get_logger()
+
+TREE_VERSION_KEY = "products:category_tree:version"
+TREE_CACHE_PREFIX = "products:category_tree"
+# session.info 標記：本交易改動了分類樹或商品歸屬
+TREE_DIRTY_KEY = "category_tree_dirty"
+
+_CLOSURE = ProductCategoryClosure.__tablename__
+_CATEGORIES = ProductCategory.__tablename__
+
+# 背景遞增版本的 task（保留參照直到完成）
+_pending_bumps: set = set()
+
+
+def rebuild_closure(connection: Connection) -> None:
+    """由 parentId 以遞迴 CTE 重建整個閉包表（同步連線，供 migration 使用）"""
+    connection.execute(text(f"DELETE FROM {_CLOSURE}"))
+    connection.execute(text(f"""
+        INSERT INTO {_CLOSURE} (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM {_CATEGORIES}
+            UNION ALL
+            SELECT tree.ancestor_id, child.id, tree.depth + 1
+            FROM tree JOIN {_CATEGORIES} child ON child."parentId" = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+    """))
+
+
+def _mark_dirty(target: Any) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[TREE_DIRTY_KEY] = True
+
+
+@event.listens_for(ProductCategory, "after_insert")
+def _insert_closure(mapper, connection, target: ProductCategory) -> None:
+    # 自身一筆，加上層的每個祖先各一筆
+    # :id 同時出現在選取清單與 UNION 中，明確轉型，否則 asyncpg 推斷出 text / varchar 兩種型別而拒絕執行
+    connection.execute(
+        text(f"""
+            INSERT INTO {_CLOSURE} (ancestor_id, descendant_id, depth)
+            SELECT CAST(:id AS VARCHAR), CAST(:id AS VARCHAR), 0
+            UNION ALL
+            SELECT ancestor_id, CAST(:id AS VARCHAR), depth + 1 FROM {_CLOSURE} WHERE descendant_id = :parent_id
+        """),
+        {"id": target.id, "parent_id": target.parentId},
+    )
+    _mark_dirty(target)
+
+
+@event.listens_for(ProductCategory, "after_update")
+def _move_closure(mapper, connection, target: ProductCategory) -> None:
+    state = inspect(target)
+    if state.attrs.parentId.history.has_changes():
+        params = {"id": target.id, "parent_id": target.parentId, "level": target.level}
+        # 切斷子樹與舊祖先的連結，再接到新上層的所有祖先下
+        connection.execute(text(f"""
+            DELETE FROM {_CLOSURE}
+            WHERE descendant_id IN (SELECT descendant_id FROM {_CLOSURE} WHERE ancestor_id = :id)
+              AND ancestor_id NOT IN (SELECT descendant_id FROM {_CLOSURE} WHERE ancestor_id = :id)
+        """), params)
+        connection.execute(text(f"""
+            INSERT INTO {_CLOSURE} (ancestor_id, descendant_id, depth)
+            SELECT super.ancestor_id, sub.descendant_id, super.depth + sub.depth + 1
+            FROM {_CLOSURE} super CROSS JOIN {_CLOSURE} sub
+            WHERE super.descendant_id = :parent_id AND sub.ancestor_id = :id
+        """), params)
+        # 子孫層級隨之平移
+        connection.execute(text(f"""
+            UPDATE {_CATEGORIES} c SET level = :level + cl.depth
+            FROM {_CLOSURE} cl
+            WHERE cl.ancestor_id = :id AND cl.descendant_id = c.id AND cl.depth > 0
+        """), params)
+    _mark_dirty(target)
+
+
+@event.listens_for(ProductCategory, "after_delete")
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_delete")
+def _category_tree_changed(mapper, connection, target: Any) -> None:
+    # 閉包列由外鍵 ON DELETE CASCADE 移除
+    _mark_dirty(target)
+
+
+@event.listens_for(Product, "after_update")
+def _product_category_changed(mapper, connection, target: Product) -> None:
+    if inspect(target).attrs.category_id.history.has_changes():
+        _mark_dirty(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    if not session.info.pop(TREE_DIRTY_KEY, False):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 同步情境（migration、腳本）沒有事件迴圈，快取依 TTL 過期
+        return
+    task = loop.create_task(CategoryTreeService.bump_version())
+    _pending_bumps.add(task)
+    task.add_done_callback(_pending_bumps.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty(session: Session) -> None:
+    session.info.pop(TREE_DIRTY_KEY, None)
+
+
+class CategoryTreeService:
+    """分類樹服務"""
+
+    @staticmethod
+    def _redis():
+        return redis_manager.client("products-cache", url=REDIS_URL)
+
+    @staticmethod
+    async def bump_version() -> None:
+        """使目前的分類樹快取失效（提交後呼叫）"""
+        try:
+            await CategoryTreeService._redis().incr(TREE_VERSION_KEY)
+        except Exception as e:
+            logger.warning("category_tree_version_bump_failed", error=str(e))
+
+    @staticmethod
+    async def in_subtree(db: AsyncSession, category_id: str, other_id: str) -> bool:
+        """other_id 是否為 category_id 本身或其子孫（移動分類前檢查，避免形成循環）"""
+        closure = ProductCategoryClosure
+        result = await db.execute(
+            select(
+                select(closure.depth)
+                .where(closure.ancestor_id == category_id, closure.descendant_id == other_id)
+                .exists()
+            )
+        )
+        return bool(result.scalar())
+
+    @staticmethod
+    async def product_counts(
+        db: AsyncSession,
+        category_ids: Optional[List[str]] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        """
+        每個分類的 (直接商品數, 含子分類商品數)
+
+        以閉包表 join 商品後一次 GROUP BY；沒有商品的分類不會出現在結果中
+        """
+        closure = ProductCategoryClosure
+        query = (
+            select(
+                closure.ancestor_id,
+                func.count().filter(closure.depth == 0).label("direct"),
+                func.count().label("total"),
+            )
+            .join(Product, Product.category_id == closure.descendant_id)
+            .group_by(closure.ancestor_id)
+        )
+        if category_ids is not None:
+            query = query.where(closure.ancestor_id.in_(category_ids))
+        result = await db.execute(query)
+        return {row.ancestor_id: (row.direct, row.total) for row in result.all()}
+
+    @staticmethod
+    async def get_tree(db: AsyncSession, include_products: bool = False) -> Dict[str, Any]:
+        """
+        取得序列化分類樹 {"data": [...], "meta": {...}}
+
+        依目前版本號讀取快取；未命中才以一次分類查詢、一次計數查詢
+        （及選擇性的一次商品查詢）組出整棵樹後寫回快取
+        """
+        redis = CategoryTreeService._redis()
+        breaker = redis_manager.breaker(REDIS_URL)
+        cache_key = None
+        if settings.enable_product_cache and breaker.allow():
+            try:
+                version = await redis.get(TREE_VERSION_KEY) or "0"
+                cache_key = f"{TREE_CACHE_PREFIX}:v{version}:{'products' if include_products else 'counts'}"
+                cached = await redis.get(cache_key)
+                breaker.record_success()
+                if cached:
+                    return json.loads(cached)
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning("category_tree_cache_read_failed", error=str(e))
+
+        tree = await CategoryTreeService.build_tree(db, include_products=include_products)
+
+        if cache_key:
+            try:
+                await redis.setex(cache_key, settings.category_cache_ttl, json.dumps(tree, default=str))
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning("category_tree_cache_write_failed", error=str(e))
+        return tree
+
+    @staticmethod
+    async def build_tree(db: AsyncSession, include_products: bool = False) -> Dict[str, Any]:
+        """自資料庫組出分類樹（不經快取）"""
+        table = ProductCategory.__table__
+        rows = (await db.execute(
+            select(table).order_by(table.c.level, table.c.sortOrder, table.c.name)
+        )).mappings().all()
+        counts = await CategoryTreeService.product_counts(db)
+
+        products_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        if include_products:
+            product_rows = await db.execute(
+                select(Product.id, Product.name, Product.code, Product.category_id)
+                .order_by(Product.category_id, Product.name)
+            )
+            for product in product_rows.all():
+                products_by_category.setdefault(product.category_id, []).append(
+                    {"id": str(product.id), "name": product.name, "code": product.code}
+                )
+
+        nodes: Dict[str, Dict[str, Any]] = {}
+        roots: List[Dict[str, Any]] = []
+        for row in rows:
+            direct, total = counts.get(row["id"], (0, 0))
+            node = {
+                "id": row["id"],
+                "code": row["code"],
+                "name": row["name"],
+                "nameEn": row["nameEn"],
+                "parent_id": row["parentId"],
+                "level": row["level"],
+                "sort_order": row["sortOrder"],
+                "description": row["description"],
+                "is_active": row["isActive"],
+                "metadata": row["metadata"],
+                "created_at": row["createdAt"],
+                "updated_at": row["updatedAt"],
+                "_count": {"products": direct, "totalProducts": total},
+                "children": [],
+            }
+            if include_products and row["id"] in products_by_category:
+                node["products"] = products_by_category[row["id"]]
+            nodes[row["id"]] = node
+
+        # 依 (level, sortOrder, name) 排序後附加，子分類維持同樣順序
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"]) if node["parent_id"] else None
+            (parent["children"] if parent else roots).append(node)
+
+        return {
+            "data": roots,
+            "meta": {
+                "rootCount": len(roots),
+                "maxLevel": max((row["level"] for row in rows), default=0),
+            },
+        }
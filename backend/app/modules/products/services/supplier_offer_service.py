@@ -0,0 +1,260 @@
+"""
+SupplierOfferService - 供應商報價展開與批次比價
+將 SupplierSKU 的基本價、階梯定價、批量折扣預先展開為 supplier_offers 數量區間，
+比價時以一次區間查詢取得各供應商有效單價與排名，不再逐筆載入後於 Python 計算
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    Integer, Numeric, String, and_, column, delete, event, func, insert, inspect, or_, select, values,
+)
+from sqlalchemy.engine import Connection
+import structlog
+
+from app.modules.products.models.supplier_offer import SupplierOffer
+from app.modules.products.models.supplier_sku import SupplierSKU
+
+logger = structlog.get_logger()
+
+# 影響報價展開的欄位；其餘欄位（評分、交期等）比價時即時 join 讀取
+OFFER_FIELDS = (
+    "sku_id", "supplier_id", "supplier_price", "pricing_tiers",
+    "bulk_discount_threshold", "bulk_discount_rate", "is_active",
+)
+
+REBUILD_CHUNK_SIZE = 500
+
+
+def _decimal(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def offer_rows(supplier_sku: Any) -> List[Dict[str, Any]]:
+    """
+    將一筆 SupplierSKU（ORM 物件或資料列）展開為數量區間報價
+
+    規則與原即時比價一致：有階梯定價時以不超過數量的最大 min_qty 階梯為準
+    （同 min_qty 取先出現者），否則達批量門檻時套用折扣；停用者不產生報價
+    """
+    if not supplier_sku.is_active or supplier_sku.supplier_price is None:
+        return []
+
+    base_price = _decimal(supplier_sku.supplier_price)
+    breaks: Dict[Decimal, Tuple[Decimal, str]] = {Decimal(0): (base_price, "base")}
+
+    tiers = supplier_sku.pricing_tiers or []
+    if tiers:
+        seen = set()
+        for tier in tiers:
+            min_qty = max(_decimal(tier.get("min_qty", 0)), Decimal(0))
+            if min_qty in seen:
+                continue
+            seen.add(min_qty)
+            price = tier.get("price")
+            breaks[min_qty] = (base_price if price is None else _decimal(price), "tier")
+    elif supplier_sku.bulk_discount_threshold:
+        rate = _decimal(supplier_sku.bulk_discount_rate or 0)
+        breaks[max(_decimal(supplier_sku.bulk_discount_threshold), Decimal(0))] = (
+            base_price - base_price * rate, "bulk_discount"
+        )
+
+    bounds = sorted(breaks)
+    return [
+        {
+            "supplier_sku_id": supplier_sku.id,
+            "sku_id": supplier_sku.sku_id,
+            "supplier_id": supplier_sku.supplier_id,
+            "min_quantity": min_qty,
+            "max_quantity": bounds[index + 1] if index + 1 < len(bounds) else None,
+            "unit_price": breaks[min_qty][0],
+            "price_source": breaks[min_qty][1],
+        }
+        for index, min_qty in enumerate(bounds)
+    ]
+
+
+def write_offers(connection: Connection, supplier_skus: Sequence[Any]) -> int:
+    """以同一交易重建指定 SupplierSKU 的報價區間（同步連線，供 ORM 事件與 migration 使用）"""
+    if not supplier_skus:
+        return 0
+    connection.execute(
+        delete(SupplierOffer).where(SupplierOffer.supplier_sku_id.in_([ss.id for ss in supplier_skus]))
+    )
+    rows = [row for ss in supplier_skus for row in offer_rows(ss)]
+    if rows:
+        connection.execute(insert(SupplierOffer), rows)
+    return len(rows)
+
+
+@event.listens_for(SupplierSKU, "after_insert")
+@event.listens_for(SupplierSKU, "after_update")
+def _refresh_supplier_offers(mapper, connection, target: SupplierSKU) -> None:
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in OFFER_FIELDS):
+        return
+    write_offers(connection, [target])
+
+
+class SupplierOfferService:
+    """供應商報價服務"""
+
+    @staticmethod
+    async def rebuild_offers(
+        db: AsyncSession,
+        sku_ids: Optional[List[str]] = None
+    ) -> int:
+        """
+        重新展開 supplier_offers（全部或指定 SKU）
+
+        正常情況由 SupplierSKU 的 ORM 事件即時維護；此方法用於回填或
+        修正繞過 ORM 的批次寫入。呼叫端負責 commit
+        """
+        table = SupplierSKU.__table__
+        query = select(table).order_by(table.c.id).limit(REBUILD_CHUNK_SIZE)
+        if sku_ids:
+            query = query.where(table.c.sku_id.in_(sku_ids))
+            await db.execute(delete(SupplierOffer).where(SupplierOffer.sku_id.in_(sku_ids)))
+        else:
+            await db.execute(delete(SupplierOffer))
+
+        # 以主鍵分頁，避免一次載入全部 supplier_skus
+        written, last_id = 0, None
+        while True:
+            page = query if last_id is None else query.where(table.c.id > last_id)
+            chunk = (await db.execute(page)).all()
+            if not chunk:
+                break
+            written += await db.run_sync(lambda session: write_offers(session.connection(), chunk))
+            last_id = chunk[-1].id
+
+        logger.info("supplier_offers_rebuilt", sku_count=len(sku_ids) if sku_ids else None, offers=written)
+        return written
+
+    @staticmethod
+    async def compare_offers(
+        db: AsyncSession,
+        items: Iterable[Tuple[str, float]],
+        top: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        批次比價：每個 (SKU, 數量) 回傳依序排名的供應商報價
+
+        排名：符合最低訂購量者優先，其次總成本由低至高、優先供應商優先。
+        一次查詢完成所有項目；top 限制每個項目回傳的供應商數（統計仍涵蓋全部）
+        """
+        items = [(sku_id, _decimal(quantity)) for sku_id, quantity in items]
+        if not items:
+            return []
+
+        wanted = values(
+            column("position", Integer),
+            column("sku_id", String),
+            column("quantity", Numeric(12, 3)),
+            name="wanted",
+        ).data([(position, sku_id, quantity) for position, (sku_id, quantity) in enumerate(items)])
+
+        total_cost = SupplierOffer.unit_price * wanted.c.quantity
+        meets_minimum = (wanted.c.quantity >= func.coalesce(SupplierSKU.minimum_order_quantity, 1))
+        partition = {"partition_by": wanted.c.position}
+
+        ranked = (
+            select(
+                wanted.c.position,
+                SupplierOffer.min_quantity,
+                SupplierOffer.unit_price,
+                SupplierOffer.price_source,
+                total_cost.label("total_cost"),
+                meets_minimum.label("meets_minimum"),
+                SupplierSKU.supplier_id,
+                SupplierSKU.supplier_sku_code,
+                SupplierSKU.supplier_name_for_product,
+                SupplierSKU.supplier_price,
+                SupplierSKU.bulk_discount_threshold,
+                SupplierSKU.bulk_discount_rate,
+                SupplierSKU.lead_time_days,
+                SupplierSKU.minimum_order_quantity,
+                SupplierSKU.is_preferred,
+                SupplierSKU.quality_score,
+                SupplierSKU.delivery_score,
+                SupplierSKU.service_score,
+                func.row_number().over(
+                    order_by=[meets_minimum.desc(), total_cost.asc(), SupplierSKU.is_preferred.desc(), SupplierSKU.supplier_id],
+                    **partition,
+                ).label("rank"),
+                func.count().over(**partition).label("total_suppliers"),
+                func.count().filter(meets_minimum).over(**partition).label("suppliers_with_stock"),
+                func.min(total_cost).filter(total_cost > 0).over(**partition).label("min_cost"),
+                func.max(total_cost).filter(total_cost > 0).over(**partition).label("max_cost"),
+                func.avg(total_cost).filter(total_cost > 0).over(**partition).label("avg_cost"),
+            )
+            .select_from(wanted)
+            .join(
+                SupplierOffer,
+                and_(
+                    SupplierOffer.sku_id == wanted.c.sku_id,
+                    SupplierOffer.min_quantity <= wanted.c.quantity,
+                    or_(SupplierOffer.max_quantity.is_(None), wanted.c.quantity < SupplierOffer.max_quantity),
+                ),
+            )
+            .join(SupplierSKU, SupplierSKU.id == SupplierOffer.supplier_sku_id)
+            .subquery("ranked")
+        )
+        query = select(ranked).order_by(ranked.c.position, ranked.c.rank)
+        if top:
+            query = query.where(ranked.c.rank <= top)
+
+        rows_by_position: Dict[int, List[Any]] = {}
+        for row in (await db.execute(query)).all():
+            rows_by_position.setdefault(row.position, []).append(row)
+
+        comparisons = []
+        for position, (sku_id, quantity) in enumerate(items):
+            rows = rows_by_position.get(position, [])
+            suppliers = [_offer_entry(row) for row in rows]
+            first = rows[0] if rows else None
+            comparisons.append({
+                "skuId": sku_id,
+                "quantity": float(quantity),
+                "suppliers": suppliers,
+                "priceRange": {
+                    "min": round(float(first.min_cost or 0), 2) if first else 0,
+                    "max": round(float(first.max_cost or 0), 2) if first else 0,
+                    "avg": round(float(first.avg_cost or 0), 2) if first else 0,
+                },
+                "recommendation": suppliers[0] if suppliers and suppliers[0]["meetsMinimum"] else None,
+                "totalSuppliers": first.total_suppliers if first else 0,
+                "suppliersWithStock": first.suppliers_with_stock if first else 0,
+            })
+        return comparisons
+
+
+def _offer_entry(row: Any) -> Dict[str, Any]:
+    applied_tier = None
+    if row.price_source == "tier":
+        applied_tier = {"min_qty": float(row.min_quantity), "price": float(row.unit_price)}
+    elif row.price_source == "bulk_discount":
+        applied_tier = {
+            "type": "bulk_discount",
+            "threshold": row.bulk_discount_threshold,
+            "rate": float(row.bulk_discount_rate) if row.bulk_discount_rate else None,
+        }
+
+    scores = [float(s) for s in (row.quality_score, row.delivery_score, row.service_score) if s is not None]
+    overall_score = sum(scores) / len(scores) if scores else None
+
+    return {
+        "rank": row.rank,
+        "supplierId": row.supplier_id,
+        "supplierSkuCode": row.supplier_sku_code,
+        "supplierName": row.supplier_name_for_product,
+        "basePrice": float(row.supplier_price),
+        "effectivePrice": float(row.unit_price),
+        "totalCost": round(float(row.total_cost), 2),
+        "appliedTier": applied_tier,
+        "leadTimeDays": row.lead_time_days,
+        "minimumOrderQuantity": row.minimum_order_quantity,
+        "overallScore": overall_score,
+        "isPreferred": row.is_preferred,
+        "meetsMinimum": row.meets_minimum,
+    }
@@ -14,6 +14,7 @@ import structlog
 from app.modules.products.models.supplier_sku import SupplierSKU
 from app.modules.products.models.sku_simple import ProductSKU
 from app.modules.products.models.product import Product
+from app.modules.products.services.supplier_offer_service import SupplierOfferService
 
 logger = structlog.get_logger()
 
@@ -101,9 +102,14 @@ class SupplierSKUService:
         Returns:
             價格比較結果，包含最佳供應商推薦
         """
-        suppliers = await SupplierSKUService.get_sku_suppliers(db, sku_id, active_only=True)
+        sku_exists = await db.scalar(select(ProductSKU.id).where(ProductSKU.id == sku_id))
+        if not sku_exists:
+            raise HTTPException(status_code=404, detail=f"SKU ID '{sku_id}' 不存在")
+
+        # 有效價格由 supplier_offers 預先展開，這裡只做一次區間查詢
+        [comparison] = await SupplierOfferService.compare_offers(db, [(sku_id, quantity)])
 
-        if not suppliers:
+        if not comparison["suppliers"]:
             return {
                 "skuId": sku_id,
                 "quantity": quantity,
@@ -112,75 +118,7 @@ class SupplierSKUService:
                 "message": "此 SKU 目前沒有可用的供應商"
             }
 
-        # 計算每個供應商的有效價格
-        comparisons = []
-        for supplier in suppliers:
-            effective_price = supplier["price"]
-            applied_tier = None
-
-            # 檢查階梯價格
-            if supplier["pricingTiers"]:
-                for tier in sorted(supplier["pricingTiers"], key=lambda x: x.get('min_qty', 0), reverse=True):
-                    if quantity >= tier.get('min_qty', 0):
-                        effective_price = tier.get('price', effective_price)
-                        applied_tier = tier
-                        break
-
-            # 檢查批量折扣
-            elif supplier["bulkDiscount"] and supplier["bulkDiscount"]["threshold"]:
-                if quantity >= supplier["bulkDiscount"]["threshold"]:
-                    discount = effective_price * (supplier["bulkDiscount"]["rate"] or 0)
-                    effective_price = effective_price - discount
-                    applied_tier = {
-                        "type": "bulk_discount",
-                        "threshold": supplier["bulkDiscount"]["threshold"],
-                        "rate": supplier["bulkDiscount"]["rate"]
-                    }
-
-            total_cost = effective_price * quantity if effective_price else 0
-
-            comparisons.append({
-                "supplierId": supplier["supplierId"],
-                "supplierSkuCode": supplier["supplierSkuCode"],
-                "supplierName": supplier["supplierName"],
-                "basePrice": supplier["price"],
-                "effectivePrice": effective_price,
-                "totalCost": round(total_cost, 2),
-                "appliedTier": applied_tier,
-                "leadTimeDays": supplier["leadTimeDays"],
-                "minimumOrderQuantity": supplier["minimumOrderQuantity"],
-                "overallScore": supplier["overallScore"],
-                "isPreferred": supplier["isPreferred"],
-                "meetsMinimum": quantity >= (supplier["minimumOrderQuantity"] or 1)
-            })
-
-        # 按總成本排序
-        comparisons.sort(key=lambda x: x["totalCost"] if x["totalCost"] else float('inf'))
-
-        # 推薦最佳供應商（考慮價格、品質、交期）
-        best_supplier = None
-        for comp in comparisons:
-            if comp["meetsMinimum"]:
-                best_supplier = comp
-                break
-
-        # 計算價格範圍
-        valid_prices = [c["totalCost"] for c in comparisons if c["totalCost"] > 0]
-        price_range = {
-            "min": min(valid_prices) if valid_prices else 0,
-            "max": max(valid_prices) if valid_prices else 0,
-            "avg": sum(valid_prices) / len(valid_prices) if valid_prices else 0
-        }
-
-        return {
-            "skuId": sku_id,
-            "quantity": quantity,
-            "suppliers": comparisons,
-            "priceRange": price_range,
-            "recommendation": best_supplier,
-            "totalSuppliers": len(comparisons),
-            "suppliersWithStock": len([c for c in comparisons if c["meetsMinimum"]])
-        }
+        return comparison
 
     @staticmethod
     async def get_supplier_performance_matrix(
@@ -12,6 +12,8 @@ import hashlib
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.modules.products.services.supplier_offer_service import SupplierOfferService
+
 logger = logging.getLogger(__name__)
 
 class QueryCache:
@@ -236,24 +238,22 @@ async def execute_optimized_search(
 
 async def get_supplier_comparison(
     db: AsyncSession,
-    sku_id: str
+    sku_id: str,
+    quantity: float = 1
 ) -> List[Dict[str, Any]]:
-    """Get supplier comparison using optimized function"""
-    
-    query = text("SELECT * FROM compare_suppliers_for_sku(:sku_id)")
+    """Get ranked supplier offers for a SKU from the precomputed supplier_offers table"""
     
     start_time = time.time()
-    result = await db.execute(query, {'sku_id': sku_id})
+    [comparison] = await SupplierOfferService.compare_offers(db, [(sku_id, quantity)])
     duration = time.time() - start_time
     
     performance_monitor.record_query(
-        query="compare_suppliers_for_sku",
+        query="supplier_offers_comparison",
         duration=duration,
-        params={'sku_id': sku_id}
+        params={'sku_id': sku_id, 'quantity': quantity}
     )
     
-    rows = result.fetchall()
-    return [dict(row._mapping) for row in rows]
+    return comparison["suppliers"]
 
 async def refresh_materialized_views(db: AsyncSession) -> None:
     """Refresh all materialized views"""
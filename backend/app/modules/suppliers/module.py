@@ -0,0 +1,23 @@
+"""
+Supplier Service 模組定義
+供單體組合根與獨立入口（main.py）共用的路由與生命週期
+"""
+from fastapi import APIRouter
+
+from orderly_fastapi_core import ServiceModule
+
+from app.modules.suppliers.core.database import async_engine
+from app.modules.suppliers.api.v1.suppliers import router as suppliers_router
+
+router = APIRouter()
+
+# 註冊供應商路由
+router.include_router(suppliers_router, prefix="/api/suppliers", tags=["Suppliers"])
+router.include_router(suppliers_router, prefix="/api", tags=["Suppliers"])
+router.include_router(suppliers_router, prefix="", tags=["Suppliers"])
+
+module = ServiceModule(
+    name="suppliers",
+    router=router,
+    on_shutdown=[async_engine.dispose],
+)
@@ -10,14 +10,14 @@ import uuid
 from typing import Any, Dict
 
 import structlog
-from fastapi import Depends, HTTPException, Request, status
-from jose import JWTError, jwt
-from sqlalchemy import select
+from fastapi import Depends, Request
+from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.users.core.database import get_async_session
 from app.modules.users.models.organization import Organization
 from app.modules.users.models.user import User
+from app.modules.users.services.principal_service import resolve_current_user
 from app.modules.users.services.verification_service import VerificationService
 
 logger = structlog.get_logger()
@@ -81,71 +81,9 @@ async def get_current_user_from_token(
     db: AsyncSession = Depends(get_async_session)
 ) -> User:
     """
-    從 Authorization header 提取 JWT 並驗證用戶
+    取得已驗證的目前用戶
 
-    用於需要認證的端點
+    用於需要認證的端點。claims 由外層 AuthMiddleware 解碼一次，
+    User 透過共用快取解析（見 principal_service）。
     """
-    auth_header = request.headers.get("Authorization")
-
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="需要認證",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-
-    token = auth_header.split(" ")[1]
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-
-        # 驗證 token 類型
-        if payload.get("type") != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="無效的 token 類型"
-            )
-
-        user_id = payload.get("sub")
-        token_version = payload.get("token_version", 0)
-
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="無效的 token"
-            )
-
-        # 從資料庫獲取用戶
-        result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="用戶不存在"
-            )
-
-        # 驗證 token 版本（用於撤銷所有 session）
-        if user.token_version != token_version:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token 已失效，請重新登入"
-            )
-
-        # 檢查用戶狀態
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="帳號已停用"
-            )
-
-        return user
-
-    except JWTError as e:
-        logger.warning("jwt_validation_failed", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token 已過期或無效"
-        )
+    return await resolve_current_user(request, db)
@@ -8,11 +8,9 @@ from datetime import datetime
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.users.core.database import get_async_session
-from app.modules.users.models.organization import Organization
 from app.modules.users.schemas.auth import (
     SendPhoneVerificationRequest,
     SendPhoneVerificationResponse,
@@ -21,6 +19,7 @@ from app.modules.users.schemas.auth import (
 )
 from app.modules.users.services.verification_service import VerificationService
 from app.modules.users.services.otp_bridge import in_process_otp
+from app.modules.users.services.principal_service import load_principal_organization
 
 from .core import get_current_user_from_token
 
@@ -174,10 +173,7 @@ async def verify_phone(
         current_user.phone_verified_at = datetime.utcnow()
 
         # 4. 更新驗證級別
-        result = await db.execute(
-            select(Organization).where(Organization.id == current_user.organization_id)
-        )
-        org = result.scalar_one_or_none()
+        org = await load_principal_organization(db, current_user.organization_id)
 
         new_level = VerificationService.calculate_user_level(current_user, org)
         if hasattr(current_user, 'verification_level'):
@@ -29,6 +29,7 @@ from app.modules.users.models.audit_log import AuditEventResult, AuditLog
 from app.modules.users.models.user import User
 from app.modules.users.models.organization import Organization
 from app.modules.users.models.session import Session as UserSession
+from app.modules.users.services.principal_service import resolve_current_user
 from app.modules.users.schemas.auth import (
     MFAEnableRequest,
     MFAEnableResponse,
@@ -78,68 +79,8 @@ async def get_current_user_from_token(
     request: Request,
     db: AsyncSession
 ) -> User:
-    """從 Authorization header 提取 JWT 並驗證用戶"""
-    auth_header = request.headers.get("Authorization")
-
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="需要認證",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-
-    token = auth_header.split(" ")[1]
-
-    try:
-        from jose import JWTError
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-
-        if payload.get("type") != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="無效的 token 類型"
-            )
-
-        user_id = payload.get("sub")
-        token_version = payload.get("token_version", 0)
-
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="無效的 token"
-            )
-
-        result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="用戶不存在"
-            )
-
-        if user.token_version != token_version:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token 已失效"
-            )
-
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="帳號已停用"
-            )
-
-        return user
-
-    except Exception as e:
-        logger.warning("jwt_validation_failed", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token 已過期或無效"
-        )
+    """取得已驗證的目前用戶（與 auth.core 共用主體解析與快取）"""
+    return await resolve_current_user(request, db)
 
 
 def _build_claims(user: User, org: Organization) -> dict:
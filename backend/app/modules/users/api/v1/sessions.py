@@ -17,6 +17,7 @@ import structlog
 
 from app.modules.users.core.database import get_async_session
 from app.modules.users.models.user import User
+from app.modules.users.services.principal_service import get_access_claims
 from app.modules.users.services.session_service import session_service
 from app.modules.users.api.v1.auth import get_current_user_from_token
 
@@ -80,18 +81,8 @@ def get_session_id_from_request(request: Request) -> Optional[str]:
 
 async def get_session_id_from_token(request: Request) -> Optional[str]:
     """從 JWT Token 取得 Session ID"""
-    from jose import jwt
-    import os
-
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return None
-
-    token = auth_header.split(" ")[1]
     try:
-        JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        jti = payload.get("jti")
+        jti = get_access_claims(request).get("jti")
 
         if jti:
             # 透過 JTI 查找 Session
@@ -4,17 +4,24 @@ from typing import Optional
 
 import structlog
 
-from app.modules.notifications.main import email_service, otp_service, sms_service
-
 logger = structlog.get_logger()
 
 
+def _notification_services():
+    """Notification singletons, imported on first use so loading users does not import notifications."""
+    from app.modules.notifications.module import email_service, otp_service, sms_service
+
+    return email_service, otp_service, sms_service
+
+
 class InProcessOTPBridge:
     """Call notification OTP services directly without loopback HTTP."""
 
-    async def _ensure_redis(self) -> None:
+    async def _connected_services(self):
+        email_service, otp_service, sms_service = _notification_services()
         if otp_service.redis is None:
             await otp_service.connect()
+        return email_service, otp_service, sms_service
 
     async def send_email_otp(
         self,
@@ -24,7 +31,7 @@ class InProcessOTPBridge:
         user_name: Optional[str] = None,
     ) -> dict:
         try:
-            await self._ensure_redis()
+            email_service, otp_service, _ = await self._connected_services()
             code = await otp_service.generate_otp(
                 user_id=user_id,
                 otp_type="email",
@@ -48,13 +55,14 @@ class InProcessOTPBridge:
 
     async def send_sms_otp(self, user_id: str, phone: str, purpose: str) -> dict:
         try:
+            _, _, sms_service = _notification_services()
             if not sms_service.is_available():
                 return {
                     "success": False,
                     "message": "SMS service not available",
                     "error": "SMS service not available",
                 }
-            await self._ensure_redis()
+            _, otp_service, _ = await self._connected_services()
             code = await otp_service.generate_otp(
                 user_id=user_id,
                 otp_type="sms",
@@ -73,7 +81,7 @@ class InProcessOTPBridge:
 
     async def verify_otp(self, user_id: str, otp_type: str, code: str) -> dict:
         try:
-            await self._ensure_redis()
+            _, otp_service, _ = await self._connected_services()
             result = await otp_service.verify_otp(user_id=user_id, otp_type=otp_type, code=code)
             return {"success": True, **result}
         except Exception as exc:
@@ -0,0 +1,180 @@
+"""
+Principal Service
+請求主體解析 - 由已驗證的 JWT claims 取得 User / Organization
+
+- claims 由最外層 AuthMiddleware 解碼後存於 request.state，這裡只在單獨執行
+  users 模組（無外層中介層）時才自行解碼
+- User / Organization 以 detached 快照存於共用的短 TTL 快取，命中時以
+  merge(load=False) 掛回本次請求的 session，端點仍可修改並提交
+- User / Organization 的 ORM 更新與刪除在交易提交後才失效快取（flush 時只記下鍵，
+  避免其他請求在提交前又以舊資料回填）；失效經 Redis 版本號通知所有 worker
+"""
+
+import copy
+import os
+from typing import Any, Dict, Optional, TypeVar
+
+import structlog
+from fastapi import HTTPException, Request, status
+from jose import JWTError, jwt
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from orderly_fastapi_core import get_request_claims, principal_cache
+from app.modules.users.models.organization import Organization
+from app.modules.users.models.user import User
+
+logger = structlog.get_logger()
+
+JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
+JWT_ALGORITHM = "HS256"
+
+# session.info：本交易中更新或刪除、提交後需失效的快取鍵
+PENDING_INVALIDATION_KEY = "principal_pending_invalidation"
+
+T = TypeVar("T")
+
+
+def _user_key(user_id: str) -> str:
+    return f"users:user:{user_id}"
+
+
+def _org_key(org_id: str) -> str:
+    return f"users:org:{org_id}"
+
+
+def _detached_copy(obj: T) -> T:
+    """複製已載入的欄位值為新的 detached 實例（JSON 欄位深拷貝，避免共用可變物件）"""
+    mapper = inspect(obj).mapper
+    clone = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        set_committed_value(clone, attr.key, copy.deepcopy(getattr(obj, attr.key)))
+    make_transient_to_detached(clone)
+    return clone
+
+
+async def _load_cached(db: AsyncSession, model: Any, key: str, ident: str) -> Optional[Any]:
+    cached, version = await principal_cache.lookup(key)
+    if cached is not None:
+        return await db.merge(_detached_copy(cached), load=False)
+
+    row = (await db.execute(select(model).where(model.id == ident))).scalar_one_or_none()
+    if row is not None:
+        principal_cache.store(key, _detached_copy(row), version)
+    return row
+
+
+async def load_principal_user(db: AsyncSession, user_id: str) -> Optional[User]:
+    """取得請求主體的 User（掛在 db session 上）"""
+    return await _load_cached(db, User, _user_key(user_id), user_id)
+
+
+async def load_principal_organization(db: AsyncSession, org_id: str) -> Optional[Organization]:
+    """取得請求主體所屬的 Organization（掛在 db session 上）"""
+    return await _load_cached(db, Organization, _org_key(org_id), org_id)
+
+
+def invalidate_principal(user_id: Optional[str] = None, org_id: Optional[str] = None) -> None:
+    """主動失效快取（供 ORM 事件無法涵蓋的批次 UPDATE 使用，須在提交後呼叫）"""
+    if user_id:
+        principal_cache.invalidate(_user_key(str(user_id)))
+    if org_id:
+        principal_cache.invalidate(_org_key(str(org_id)))
+
+
+def get_access_claims(request: Request) -> Dict[str, Any]:
+    """
+    取得 access token 的 claims
+
+    優先使用外層 AuthMiddleware 已驗證的 claims；僅在沒有外層中介層時解碼。
+    """
+    claims = get_request_claims(request)
+    if claims is None:
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="需要認證",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        try:
+            claims = jwt.decode(auth_header.split(" ")[1], JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except JWTError as e:
+            logger.warning("jwt_validation_failed", error=str(e))
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token 已過期或無效"
+            )
+
+    if claims.get("type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="無效的 token 類型"
+        )
+    if not claims.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="無效的 token"
+        )
+    return claims
+
+
+async def resolve_current_user(request: Request, db: AsyncSession) -> User:
+    """驗證 token 版本與帳號狀態後回傳目前使用者"""
+    claims = get_access_claims(request)
+
+    user = await load_principal_user(db, claims["sub"])
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="用戶不存在"
+        )
+
+    # 驗證 token 版本（用於撤銷所有 session）
+    if user.token_version != claims.get("token_version", 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token 已失效，請重新登入"
+        )
+
+    # 檢查用戶狀態
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="帳號已停用"
+        )
+
+    return user
+
+
+def _invalidate_after_commit(target: Any, key: str) -> None:
+    session = object_session(target)
+    if session is None:
+        principal_cache.invalidate(key)
+        return
+    session.info.setdefault(PENDING_INVALIDATION_KEY, set()).add(key)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    _invalidate_after_commit(target, _user_key(str(target.id)))
+
+
+@event.listens_for(Organization, "after_update")
+@event.listens_for(Organization, "after_delete")
+def _invalidate_organization(mapper, connection, target: Organization) -> None:
+    _invalidate_after_commit(target, _org_key(str(target.id)))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for key in session.info.pop(PENDING_INVALIDATION_KEY, ()):
+        principal_cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidation(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATION_KEY, None)
@@ -7,23 +7,205 @@ Session 管理服務
 - 終止特定 Session
 - 終止所有 Session（登出所有裝置）
 - Session 資訊（裝置、IP、最後活動時間）
+
+儲存結構：
+- session:{id}          Hash，每個 Session 一筆（欄位皆為字串）
+- user_sessions:{user}  Set，用戶的 Session ID 索引
+- jti_session:{jti}     String，Access Token JTI -> Session ID
+
+建立以單一 MULTI/EXEC pipeline 完成；查詢、活動更新、列出與終止以 Lua 腳本在一次
+往返內完成。活動更新會合併：同一 Session 每 ACTIVITY_TOUCH_INTERVAL_SECONDS 秒最多寫入一次。
+舊版以 JSON 字串儲存的 Session 仍可讀取與終止，直到自然過期。
 """
 
 import os
 import json
+import time
 import uuid
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime
 from user_agents import parse as parse_user_agent
 import structlog
 
+from orderly_fastapi_core import redis_manager
+
 logger = structlog.get_logger()
 
 # Redis 配置
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 SESSION_TTL_SECONDS = 60 * 60 * 24 * 7  # 7 天
+SESSION_MIN_TTL_SECONDS = 3600  # 活動更新時至少保留 1 小時
 SESSION_PREFIX = "session:"
 USER_SESSIONS_PREFIX = "user_sessions:"
+JTI_SESSION_PREFIX = "jti_session:"
+BLACKLIST_PREFIX = "blacklist:"
+BLACKLIST_TTL_SECONDS = 3600
+
+# 活動時間合併寫入間隔（秒）
+ACTIVITY_TOUCH_INTERVAL_SECONDS = int(os.getenv("SESSION_ACTIVITY_TOUCH_INTERVAL", "60"))
+# 進程內活動合併紀錄上限
+_TOUCH_MEMO_MAX_ENTRIES = 50_000
+
+# 舊版 JSON 字串 Session 在 Lua 回傳中的標記
+_LEGACY_JSON = "__legacy_json"
+
+# 共用 Lua 函式：讀取 Session（Hash 或舊版 JSON 字串）
+_LUA_SESSION_HELPERS = """
+local function load_session(key)
+  local kind = redis.call('TYPE', key)['ok']
+  if kind == 'hash' then
+    return redis.call('HGETALL', key)
+  elseif kind == 'string' then
+    return {'""" + _LEGACY_JSON + """', redis.call('GET', key)}
+  end
+  return nil
+end
+
+local function session_field(key, name)
+  local kind = redis.call('TYPE', key)['ok']
+  if kind == 'hash' then
+    return redis.call('HGET', key, name)
+  elseif kind == 'string' then
+    local ok, data = pcall(cjson.decode, redis.call('GET', key))
+    if ok and type(data[name]) == 'string' then
+      return data[name]
+    end
+  end
+  return false
+end
+
+local function revoke_session(key, jti_prefix, blacklist_prefix, blacklist_ttl)
+  for _, name in ipairs({'access_token_jti', 'refresh_token_jti'}) do
+    local jti = session_field(key, name)
+    if jti and jti ~= '' then
+      redis.call('SETEX', blacklist_prefix .. jti, blacklist_ttl, 'revoked')
+      if name == 'access_token_jti' then
+        redis.call('DEL', jti_prefix .. jti)
+      end
+    end
+  end
+  redis.call('DEL', key)
+end
+"""
+
+# KEYS: session:{id}
+_GET_LUA = _LUA_SESSION_HELPERS + """
+return load_session(KEYS[1])
+"""
+
+# KEYS: jti_session:{jti}；ARGV: session 前綴
+_GET_BY_JTI_LUA = _LUA_SESSION_HELPERS + """
+local session_id = redis.call('GET', KEYS[1])
+if not session_id then
+  return nil
+end
+return load_session(ARGV[1] .. session_id)
+"""
+
+# KEYS: session:{id}；ARGV: 現在時間(ISO), 現在時間(epoch 秒), 合併間隔, 最小 TTL
+# 回傳 0: 不存在；1: 已寫入；2: 間隔內略過
+_TOUCH_LUA = """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'none' then
+  return 0
+end
+if kind ~= 'hash' then
+  return 2
+end
+local last = tonumber(redis.call('HGET', KEYS[1], 'last_activity_ts') or '0') or 0
+if tonumber(ARGV[2]) - last < tonumber(ARGV[3]) then
+  return 2
+end
+redis.call('HSET', KEYS[1], 'last_activity', ARGV[1], 'last_activity_ts', ARGV[2])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[4]) then
+  redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+# KEYS: user_sessions:{user}；ARGV: session 前綴
+# 回傳 {id, fields, id, fields, ...}，並清除索引中已過期的 ID
+_LIST_LUA = _LUA_SESSION_HELPERS + """
+local result = {}
+local expired = {}
+for _, session_id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+  local fields = load_session(ARGV[1] .. session_id)
+  if fields then
+    table.insert(result, session_id)
+    table.insert(result, fields)
+  else
+    table.insert(expired, session_id)
+  end
+end
+if #expired > 0 then
+  redis.call('SREM', KEYS[1], unpack(expired))
+end
+return result
+"""
+
+# KEYS: session:{id}, user_sessions:{user}
+# ARGV: jti 前綴, 用戶 ID, 黑名單前綴, 黑名單 TTL, Session ID
+# 回傳 0: 不存在；-1: 不屬於該用戶；1: 已終止
+_TERMINATE_LUA = _LUA_SESSION_HELPERS + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return 0
+end
+if session_field(KEYS[1], 'user_id') ~= ARGV[2] then
+  return -1
+end
+revoke_session(KEYS[1], ARGV[1], ARGV[3], tonumber(ARGV[4]))
+redis.call('SREM', KEYS[2], ARGV[5])
+return 1
+"""
+
+# KEYS: user_sessions:{user}
+# ARGV: jti 前綴, session 前綴, 保留的 Session ID（可為空字串）, 黑名單前綴, 黑名單 TTL
+# 回傳終止的 Session 數量
+_TERMINATE_ALL_LUA = _LUA_SESSION_HELPERS + """
+local count = 0
+for _, session_id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+  if session_id ~= ARGV[3] then
+    revoke_session(ARGV[2] .. session_id, ARGV[1], ARGV[4], tonumber(ARGV[5]))
+    redis.call('SREM', KEYS[1], session_id)
+    count = count + 1
+  end
+end
+return count
+"""
+
+
+def _encode_session(session: Dict[str, Any]) -> Dict[str, str]:
+    """Session dict -> Hash 欄位（None 不寫入）"""
+    fields = {}
+    for name, value in session.items():
+        if value is None:
+            continue
+        if name == "device_info":
+            value = json.dumps(value)
+        elif name == "is_active":
+            value = "1" if value else "0"
+        fields[name] = str(value)
+    return fields
+
+
+def _decode_session(raw: Any) -> Optional[Dict[str, Any]]:
+    """Lua/HGETALL 回傳值 -> Session dict"""
+    if not raw:
+        return None
+    if raw[0] == _LEGACY_JSON:
+        return json.loads(raw[1])
+    fields = dict(zip(raw[::2], raw[1::2]))
+
+    session: Dict[str, Any] = {
+        name: fields.get(name)
+        for name in (
+            "session_id", "user_id", "access_token_jti", "refresh_token_jti", "user_agent",
+            "ip_address", "device_name", "browser", "os", "created_at", "last_activity",
+        )
+    }
+    session["device_info"] = json.loads(fields["device_info"]) if fields.get("device_info") else {}
+    session["is_active"] = fields.get("is_active", "1") == "1"
+    return session
 
 
 class SessionService:
@@ -34,30 +216,38 @@ class SessionService:
         初始化 Session 服務
 
         Args:
-            redis_client: Redis 客戶端（可選，如果不提供則創建新的）
+            redis_client: Redis 客戶端（可選，如果不提供則使用進程共用客戶端）
         """
         self.redis = redis_client
         self._own_redis = False
+        self._scripts: Dict[str, Any] = {}
+        # session_id -> 最近一次寫入活動時間（monotonic），避免間隔內的往返
+        self._last_touch: Dict[str, float] = {}
 
     async def connect(self):
-        """連接 Redis"""
+        """取得共用 Redis 客戶端（連線池由 redis_manager 管理）"""
         if self.redis is None:
-            import redis.asyncio as redis_lib
-            self.redis = await redis_lib.from_url(
-                REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True
-            )
+            self.redis = redis_manager.client("sessions", url=REDIS_URL)
             self._own_redis = True
             logger.info("session_service_connected")
 
     async def close(self):
-        """關閉 Redis 連接"""
+        """釋放 Redis 客戶端（共用連線池於應用程式關閉時統一關閉）"""
         if self._own_redis and self.redis:
-            await self.redis.close()
             self.redis = None
+            self._scripts.clear()
             logger.info("session_service_closed")
 
+    async def _script(self, name: str, source: str):
+        """取得已註冊的 Lua 腳本（EVALSHA，NOSCRIPT 時自動改用 EVAL）"""
+        if not self.redis:
+            await self.connect()
+        script = self._scripts.get(name)
+        if script is None:
+            script = self.redis.register_script(source)
+            self._scripts[name] = script
+        return script
+
     async def create_session(
         self,
         user_id: str,
@@ -117,25 +307,21 @@ class SessionService:
             "is_active": True
         }
 
-        # 儲存 Session
+        # Session、用戶索引與 JTI 映射在同一個 MULTI/EXEC 中寫入
         session_key = f"{SESSION_PREFIX}{session_id}"
-        await self.redis.setex(
-            session_key,
-            SESSION_TTL_SECONDS,
-            json.dumps(session_data)
-        )
-
-        # 將 Session ID 添加到用戶的 Session 列表
         user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
-        await self.redis.sadd(user_sessions_key, session_id)
-        await self.redis.expire(user_sessions_key, SESSION_TTL_SECONDS)
-
-        # 建立 JTI 到 Session 的映射（用於快速查找）
-        await self.redis.setex(
-            f"jti_session:{access_token_jti}",
-            SESSION_TTL_SECONDS,
-            session_id
-        )
+        fields = _encode_session(session_data)
+        fields["last_activity_ts"] = str(int(time.time()))
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(session_key, mapping=fields)
+            pipe.expire(session_key, SESSION_TTL_SECONDS)
+            pipe.sadd(user_sessions_key, session_id)
+            pipe.expire(user_sessions_key, SESSION_TTL_SECONDS)
+            pipe.setex(f"{JTI_SESSION_PREFIX}{access_token_jti}", SESSION_TTL_SECONDS, session_id)
+            await pipe.execute()
+
+        self._last_touch[session_id] = time.monotonic()
 
         logger.info(
             "session_created",
@@ -148,48 +334,44 @@ class SessionService:
 
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """取得 Session 資訊"""
-        if not self.redis:
-            await self.connect()
-
-        session_key = f"{SESSION_PREFIX}{session_id}"
-        data = await self.redis.get(session_key)
-
-        if not data:
-            return None
-
-        return json.loads(data)
+        script = await self._script("get", _GET_LUA)
+        return _decode_session(await script(keys=[f"{SESSION_PREFIX}{session_id}"]))
 
     async def get_session_by_jti(self, jti: str) -> Optional[Dict[str, Any]]:
         """透過 JTI 取得 Session"""
-        if not self.redis:
-            await self.connect()
-
-        session_id = await self.redis.get(f"jti_session:{jti}")
-        if not session_id:
-            return None
-
-        return await self.get_session(session_id)
+        script = await self._script("get_by_jti", _GET_BY_JTI_LUA)
+        raw = await script(keys=[f"{JTI_SESSION_PREFIX}{jti}"], args=[SESSION_PREFIX])
+        return _decode_session(raw)
 
     async def update_activity(self, session_id: str) -> bool:
-        """更新 Session 最後活動時間"""
-        if not self.redis:
-            await self.connect()
-
-        session = await self.get_session(session_id)
-        if not session:
-            return False
-
-        session["last_activity"] = datetime.utcnow().isoformat()
-
-        session_key = f"{SESSION_PREFIX}{session_id}"
-        ttl = await self.redis.ttl(session_key)
+        """
+        更新 Session 最後活動時間
 
-        await self.redis.setex(
-            session_key,
-            max(ttl, 3600),  # 至少保留 1 小時
-            json.dumps(session)
+        同一 Session 在 ACTIVITY_TOUCH_INTERVAL_SECONDS 內只寫入一次：進程內先行略過，
+        跨進程則由腳本比對 last_activity_ts 決定是否寫入。
+        """
+        now = time.monotonic()
+        last = self._last_touch.get(session_id)
+        if last is not None and now - last < ACTIVITY_TOUCH_INTERVAL_SECONDS:
+            return True
+
+        script = await self._script("touch", _TOUCH_LUA)
+        result = await script(
+            keys=[f"{SESSION_PREFIX}{session_id}"],
+            args=[
+                datetime.utcnow().isoformat(),
+                int(time.time()),
+                ACTIVITY_TOUCH_INTERVAL_SECONDS,
+                SESSION_MIN_TTL_SECONDS,
+            ],
         )
+        if not result:
+            self._last_touch.pop(session_id, None)
+            return False
 
+        if len(self._last_touch) >= _TOUCH_MEMO_MAX_ENTRIES:
+            self._last_touch.clear()
+        self._last_touch[session_id] = now
         return True
 
     async def list_user_sessions(
@@ -207,42 +389,27 @@ class SessionService:
         Returns:
             Session 列表
         """
-        if not self.redis:
-            await self.connect()
-
-        user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
-        session_ids = await self.redis.smembers(user_sessions_key)
+        script = await self._script("list", _LIST_LUA)
+        raw = await script(keys=[f"{USER_SESSIONS_PREFIX}{user_id}"], args=[SESSION_PREFIX])
 
         sessions = []
-        expired_ids = []
-
-        for session_id in session_ids:
-            session = await self.get_session(session_id)
-
-            if session:
+        for session_id, fields in zip(raw[::2], raw[1::2]):
+            session = _decode_session(fields)
+            sessions.append({
+                "id": session.get("session_id") or session_id,
+                "device_name": session.get("device_name") or "Unknown",
+                "browser": session.get("browser") or "Unknown",
+                "os": session.get("os") or "Unknown",
+                "ip_address": session.get("ip_address"),
+                "created_at": session.get("created_at"),
+                "last_activity": session.get("last_activity"),
                 # 標記是否為當前 Session
-                session["is_current"] = (session_id == current_session_id)
-                sessions.append({
-                    "id": session["session_id"],
-                    "device_name": session.get("device_name", "Unknown"),
-                    "browser": session.get("browser", "Unknown"),
-                    "os": session.get("os", "Unknown"),
-                    "ip_address": session.get("ip_address"),
-                    "created_at": session.get("created_at"),
-                    "last_activity": session.get("last_activity"),
-                    "is_current": session["is_current"]
-                })
-            else:
-                # Session 已過期
-                expired_ids.append(session_id)
-
-        # 清理過期的 Session ID
-        if expired_ids:
-            await self.redis.srem(user_sessions_key, *expired_ids)
+                "is_current": session_id == current_session_id
+            })
 
         # 按最後活動時間排序
         sessions.sort(
-            key=lambda x: x.get("last_activity", ""),
+            key=lambda x: x.get("last_activity") or "",
             reverse=True
         )
 
@@ -263,38 +430,24 @@ class SessionService:
         Returns:
             是否成功終止
         """
-        if not self.redis:
-            await self.connect()
-
-        session = await self.get_session(session_id)
-
-        if not session:
-            return False
+        script = await self._script("terminate", _TERMINATE_LUA)
+        result = await script(
+            keys=[f"{SESSION_PREFIX}{session_id}", f"{USER_SESSIONS_PREFIX}{user_id}"],
+            args=[JTI_SESSION_PREFIX, user_id, BLACKLIST_PREFIX, BLACKLIST_TTL_SECONDS, session_id],
+        )
 
-        # 驗證 Session 屬於該用戶
-        if session.get("user_id") != user_id:
+        if result == -1:
+            # 驗證 Session 屬於該用戶
             logger.warning(
                 "session_terminate_unauthorized",
                 session_id=session_id[:8],
                 user_id=user_id[:8]
             )
             return False
+        if result != 1:
+            return False
 
-        # 刪除 Session
-        session_key = f"{SESSION_PREFIX}{session_id}"
-        await self.redis.delete(session_key)
-
-        # 從用戶 Session 列表移除
-        user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
-        await self.redis.srem(user_sessions_key, session_id)
-
-        # 將 Token 加入黑名單
-        if session.get("access_token_jti"):
-            await self.blacklist_token(session["access_token_jti"])
-
-        if session.get("refresh_token_jti"):
-            await self.blacklist_token(session["refresh_token_jti"])
-
+        self._last_touch.pop(session_id, None)
         logger.info(
             "session_terminated",
             session_id=session_id[:8],
@@ -318,34 +471,17 @@ class SessionService:
         Returns:
             終止的 Session 數量
         """
-        if not self.redis:
-            await self.connect()
-
-        user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
-        session_ids = await self.redis.smembers(user_sessions_key)
-
-        terminated_count = 0
-
-        for session_id in session_ids:
-            if session_id == except_session_id:
-                continue
-
-            session = await self.get_session(session_id)
-
-            if session:
-                # 將 Token 加入黑名單
-                if session.get("access_token_jti"):
-                    await self.blacklist_token(session["access_token_jti"])
-
-                if session.get("refresh_token_jti"):
-                    await self.blacklist_token(session["refresh_token_jti"])
-
-            # 刪除 Session
-            session_key = f"{SESSION_PREFIX}{session_id}"
-            await self.redis.delete(session_key)
-            await self.redis.srem(user_sessions_key, session_id)
-
-            terminated_count += 1
+        script = await self._script("terminate_all", _TERMINATE_ALL_LUA)
+        terminated_count = await script(
+            keys=[f"{USER_SESSIONS_PREFIX}{user_id}"],
+            args=[
+                JTI_SESSION_PREFIX,
+                SESSION_PREFIX,
+                except_session_id or "",
+                BLACKLIST_PREFIX,
+                BLACKLIST_TTL_SECONDS,
+            ],
+        )
 
         logger.info(
             "all_sessions_terminated",
@@ -356,7 +492,7 @@ class SessionService:
 
         return terminated_count
 
-    async def blacklist_token(self, jti: str, ttl: int = 3600) -> None:
+    async def blacklist_token(self, jti: str, ttl: int = BLACKLIST_TTL_SECONDS) -> None:
         """
         將 Token JTI 加入黑名單
 
@@ -367,20 +503,17 @@ class SessionService:
         if not self.redis:
             await self.connect()
 
-        await self.redis.setex(f"blacklist:{jti}", ttl, "revoked")
+        await self.redis.setex(f"{BLACKLIST_PREFIX}{jti}", ttl, "revoked")
 
     async def is_token_blacklisted(self, jti: str) -> bool:
         """檢查 Token 是否在黑名單中"""
         if not self.redis:
             await self.connect()
 
-        return await self.redis.exists(f"blacklist:{jti}") > 0
+        return await self.redis.exists(f"{BLACKLIST_PREFIX}{jti}") > 0
 
     async def get_active_session_count(self, user_id: str) -> int:
         """取得用戶的活躍 Session 數量"""
-        if not self.redis:
-            await self.connect()
-
         sessions = await self.list_user_sessions(user_id)
         return len(sessions)
 
@@ -0,0 +1,59 @@
+"""Test DB access for service-level tests.
+
+Same database test_fk_audit uses (freshly migrated in CI / `make test-be`).
+Each test gets one connection inside an outer transaction that is always
+rolled back — the benchmark harness shape — and sessions that join it with
+SAVEPOINTs, so service-level commit()/rollback() only release a SAVEPOINT and
+the schema stays empty for the orphan audit. Skips only if no DB is reachable.
+"""
+
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from benchmarks.harness import BenchContext
+
+
+@asynccontextmanager
+async def rolled_back_connection() -> AsyncIterator[AsyncConnection]:
+    """Connection whose outer transaction is rolled back on exit"""
+    import app.main  # noqa: F401  -- registers every module's mappers so cross-module FKs resolve
+    from app.modules.users.core.config import settings
+
+    engine = create_async_engine(settings.get_database_url_async(), poolclass=NullPool)
+    try:
+        connection = await engine.connect()
+    except (DBAPIError, OSError) as exc:  # no DB locally → DB-free smoke run, skip
+        await engine.dispose()
+        pytest.skip(f"DB not reachable, skipping service DB tests: {exc}")
+
+    transaction = await connection.begin()
+    try:
+        yield connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
+
+
+def savepoint_session_factory(connection: AsyncConnection) -> async_sessionmaker:
+    """Sessions on `connection` whose commit()/rollback() only touch a SAVEPOINT"""
+    return async_sessionmaker(
+        bind=connection, class_=AsyncSession, join_transaction_mode="create_savepoint", expire_on_commit=False
+    )
+
+
+@asynccontextmanager
+async def rolled_back_context(seed: int = 0) -> AsyncIterator[BenchContext]:
+    """BenchContext whose session is discarded with its outer transaction (for the benchmarks' seeders)."""
+    async with rolled_back_connection() as connection:
+        session = savepoint_session_factory(connection)()
+        try:
+            yield BenchContext(rng=random.Random(seed), session=session)
+        finally:
+            await session.close()
@@ -0,0 +1,250 @@
+"""Hierarchy access index tests.
+
+Build per-user access indexes against a seeded hierarchy in the test DB (see
+app/tests/db.py), with the users session pointed at the same rolled-back
+connection: a scoped user sees their subtree plus its ancestors and writes
+only where a permission allows, only ``is_super_user`` / ``platform_admin`` /
+``*`` are unrestricted, and missing, inactive or empty-scope users are denied.
+The last case checks that the session-wide ``do_orm_execute`` row filter
+(``apply_access_scope``) narrows ORM selects to the visible rows, and both the
+export engine and the service's file export only write accessible nodes. Each
+test uses its own RedisManager for the index cache.
+"""
+
+import asyncio
+import json
+import uuid
+
+from sqlalchemy import select
+
+from app.modules.customer_hierarchy.models import CustomerCompany, CustomerGroup, CustomerLocation
+from app.modules.customer_hierarchy.services import access_index_service
+from app.modules.customer_hierarchy.services.access_index_service import apply_access_scope, hierarchy_access
+from app.modules.customer_hierarchy.services.hierarchy import HierarchyService
+from app.modules.customer_hierarchy.services.hierarchy.export_engine import HierarchyExportEngine
+from app.modules.users.core import database as users_database
+from app.modules.users.models.user import User
+from app.tests.db import rolled_back_context, savepoint_session_factory
+from benchmarks.datasets import seed_hierarchy, seed_organizations
+from orderly_fastapi_core import RedisManager
+
+
+def _run(monkeypatch, body):
+    monkeypatch.setattr(access_index_service, "redis_manager", RedisManager())
+
+    async def _main():
+        async with rolled_back_context(seed=46) as ctx:
+            factory = savepoint_session_factory(ctx.session.bind)
+            monkeypatch.setattr(users_database, "AsyncSessionLocal", factory)
+            await seed_organizations(ctx)
+            await seed_hierarchy(ctx, groups=2, companies=2, locations=1, units=0)
+            tree = {
+                "groups": ctx.data["group_ids"],
+                "companies": {
+                    company.id: company.group_id
+                    for company in (await ctx.session.execute(select(CustomerCompany))).scalars()
+                    if company.group_id in ctx.data["group_ids"]
+                },
+                "locations": {
+                    location.id: location.company_id
+                    for location in (await ctx.session.execute(select(CustomerLocation))).scalars()
+                },
+            }
+
+            async def user(**fields):
+                row = User(
+                    id=str(uuid.uuid4()),
+                    organization_id=ctx.data["restaurant_id"],
+                    role=fields.pop("role", "supplier_manager"),
+                    permissions=fields.pop("permissions", []),
+                    **fields,
+                )
+                ctx.session.add(row)
+                await ctx.session.flush()
+                return row
+
+            return await body(ctx, factory, tree, user)
+
+    return asyncio.run(_main())
+
+
+def test_a_scoped_user_sees_their_subtree_and_its_ancestors(monkeypatch) -> None:
+    async def body(ctx, factory, tree, user):
+        group, other_group = tree["groups"]
+        mine, sibling = [company for company, parent in tree["companies"].items() if parent == group]
+        location = next(loc for loc, company in tree["locations"].items() if company == mine)
+        sibling_location = next(loc for loc, company in tree["locations"].items() if company == sibling)
+
+        scoped = await user(permissions=["company:update"], user_metadata={"hierarchy_scope": {"company_ids": [mine]}})
+        # restaurant roles without an explicit scope get the companies migrated from their organization
+        await ctx.session.execute(
+            CustomerCompany.__table__.update()
+            .where(CustomerCompany.id == sibling)
+            .values(legacy_organization_id=ctx.data["restaurant_id"])
+        )
+        restaurant = await user(role="restaurant_manager")
+
+        index = await hierarchy_access.build(scoped.id, db=ctx.session)
+        by_org = await hierarchy_access.build(restaurant.id, db=ctx.session)
+        return {
+            "scoped": index.scoped and not index.unrestricted,
+            "own company": index.can_access("company", mine),
+            "own company update": index.can_access("company", mine, "update"),
+            "own location": index.can_access("location", location),
+            "own location update": index.can_access("location", location, "update"),
+            "sibling company": index.can_access("company", sibling),
+            "sibling location": index.can_access("location", sibling_location),
+            "ancestor group": index.can_access("group", group),
+            "ancestor group update": index.can_access("group", group, "update"),
+            "other group": index.can_access("group", other_group),
+            "restaurant company": by_org.can_access("company", sibling),
+            "restaurant other company": by_org.can_access("company", mine),
+        }
+
+    assert _run(monkeypatch, body) == {
+        "scoped": True,
+        "own company": True,
+        "own company update": True,
+        "own location": True,
+        "own location update": False,  # no location permission
+        "sibling company": False,
+        "sibling location": False,
+        "ancestor group": True,
+        "ancestor group update": False,  # ancestors are read-only
+        "other group": False,
+        "restaurant company": True,
+        "restaurant other company": False,
+    }
+
+
+def test_only_super_users_platform_admins_and_star_are_unrestricted(monkeypatch) -> None:
+    async def body(ctx, factory, tree, user):
+        principals = {
+            "is_super_user": await user(is_super_user=True),
+            "platform_admin": await user(role="platform_admin"),
+            "*": await user(permissions=["*"]),
+            "super_admin": await user(role="super_admin"),
+            "admin": await user(permissions=["admin"]),
+            "hierarchy:*": await user(permissions=["hierarchy:*"]),
+        }
+        results = {}
+        for name, principal in principals.items():
+            index = await hierarchy_access.build(principal.id, db=ctx.session)
+            results[name] = (index.unrestricted, index.can_access("group", tree["groups"][0], "delete"))
+        return results
+
+    assert _run(monkeypatch, body) == {
+        "is_super_user": (True, True),
+        "platform_admin": (True, True),
+        "*": (True, True),
+        # not unrestricted: they read the whole hierarchy but need a matching permission to write
+        "super_admin": (False, False),
+        "admin": (False, False),
+        "hierarchy:*": (False, False),
+    }
+
+
+def test_missing_inactive_and_empty_scope_users_are_denied(monkeypatch) -> None:
+    async def body(ctx, factory, tree, user):
+        group = tree["groups"][0]
+        inactive = await user(is_active=False, permissions=["*"])
+        inactive_admin = await user(is_active=False, role="platform_admin")
+        empty = await user(user_metadata={"hierarchy_scope": {"group_ids": [str(uuid.uuid4())]}})
+        async with factory() as session:
+            indexes = {
+                "missing": await hierarchy_access.for_context(session, {"user_id": str(uuid.uuid4())}),
+                "inactive": await hierarchy_access.for_context(session, {"user_id": inactive.id}),
+                # a still-valid token of a deactivated admin does not fall back to its claims
+                "inactive admin token": await hierarchy_access.for_context(
+                    session, {"user_id": inactive_admin.id, "role": "platform_admin", "permissions": ["*"]}
+                ),
+                "empty scope": await hierarchy_access.for_context(session, {"user_id": empty.id}),
+            }
+            rows = {}
+            for name, index in indexes.items():
+                rows[name] = (await session.execute(
+                    select(CustomerGroup.id).where(index.predicate("group", CustomerGroup.id))
+                )).scalars().all()
+        return (
+            await hierarchy_access.build(inactive.id, db=ctx.session),
+            {name: (index.can_access("group", group), rows[name]) for name, index in indexes.items()},
+        )
+
+    built, results = _run(monkeypatch, body)
+    assert built.scoped and not built.unrestricted
+    assert results == {
+        "missing": (False, []),
+        "inactive": (False, []),
+        "inactive admin token": (False, []),
+        "empty scope": (False, []),
+    }
+
+
+def test_the_session_row_filter_narrows_orm_selects(monkeypatch) -> None:
+    async def body(ctx, factory, tree, user):
+        group = tree["groups"][0]
+        mine = next(company for company, parent in tree["companies"].items() if parent == group)
+        scoped = await user(user_metadata={"hierarchy_scope": {"company_ids": [mine]}})
+        admin = await user(role="platform_admin")
+        await ctx.session.commit()
+
+        async def visible(principal, **options):
+            async with factory() as session:
+                await apply_access_scope(session, {"user_id": principal.id, "role": principal.role})
+                return {
+                    model.__name__: set(
+                        (await session.execute(select(model.id).execution_options(**options))).scalars()
+                    )
+                    for model in (CustomerGroup, CustomerCompany, CustomerLocation)
+                }
+
+        return mine, {
+            "scoped": await visible(scoped),
+            "scoped, filter disabled": await visible(scoped, hierarchy_access_scope=False),
+            "admin": await visible(admin),
+        }
+
+    mine, results = _run(monkeypatch, body)
+    scoped = results["scoped"]
+    assert scoped["CustomerCompany"] == {mine}
+    assert len(scoped["CustomerGroup"]) == 1  # the company's group, visible as an ancestor
+    assert len(scoped["CustomerLocation"]) == 1
+    for unfiltered in (results["scoped, filter disabled"], results["admin"]):
+        assert unfiltered["CustomerCompany"] > {mine}
+        assert unfiltered["CustomerGroup"] >= scoped["CustomerGroup"] and len(unfiltered["CustomerGroup"]) >= 2
+        assert len(unfiltered["CustomerLocation"]) >= 6
+
+
+def test_exports_only_contain_accessible_nodes(monkeypatch, tmp_path) -> None:
+    async def body(ctx, factory, tree, user):
+        group = tree["groups"][0]
+        mine, sibling = [company for company, parent in tree["companies"].items() if parent == group]
+        scoped = await user(user_metadata={"hierarchy_scope": {"company_ids": [mine]}})
+        access = await hierarchy_access.build(scoped.id, db=ctx.session)
+        engine = HierarchyExportEngine(ctx.session, access=access)
+
+        exported = [row async for batch in engine.rows() for row in batch]
+        from_group = [row async for batch in engine.rows(root_id=group) for row in batch]
+        try:
+            await engine.resolve_root_type(sibling)
+            sibling_root = "exported"
+        except LookupError:
+            sibling_root = "not found"
+
+        # the service-level file export resolves the same index from the user context
+        path = tmp_path / "hierarchy_export.ndjson"
+        async with factory() as session:
+            written = await HierarchyService(session).export_hierarchy(
+                format="ndjson", path=str(path), user_context={"user_id": scoped.id}
+            )
+        file_rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        return mine, exported, from_group, sibling_root, (written["record_count"], file_rows)
+
+    mine, exported, from_group, sibling_root, (record_count, file_rows) = _run(monkeypatch, body)
+    companies = {row["id"] for row in exported if row["type"] == "company"}
+    assert companies == {mine}
+    assert sum(row["type"] == "group" for row in exported) == 1  # the ancestor, for the path
+    assert {row["id"] for row in from_group if row["type"] == "company"} == {mine}
+    assert sibling_root == "not found"
+    assert record_count == len(file_rows) == len(exported)
+    assert {row["id"] for row in file_rows} == {row["id"] for row in exported}
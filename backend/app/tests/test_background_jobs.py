@@ -0,0 +1,141 @@
+"""Durable background job engine tests.
+
+The queue lives in Postgres (FOR UPDATE SKIP LOCKED claims, leases, JSONB
+progress), so these drive BackgroundJobService against the test DB with a
+session factory joined to one rolled-back connection (see app/tests/db.py).
+Inside that transaction now() is fixed, which makes lease and backoff
+timestamps exact. Skips the DB cases only if no DB is reachable.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, update
+
+from app.tests.db import rolled_back_connection, savepoint_session_factory
+from orderly_fastapi_core.background_jobs import MAX_RETRY_DELAY, BackgroundJobService, JobPriority, JobStatus
+from orderly_fastapi_core.models.background_job import BackgroundJobRecord
+
+PAST = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+async def _noop(context, payload):
+    return None
+
+
+async def _boom(context, payload):
+    raise ValueError("boom")
+
+
+def _run(body, handler=_noop, **options):
+    async def _main():
+        async with rolled_back_connection() as connection:
+            service = BackgroundJobService(session_factory=savepoint_session_factory(connection), lease_seconds=60)
+            job_type = f"test.{uuid.uuid4().hex[:12]}"
+            service.register_job_type(job_type, handler, **options)
+            return await body(service, job_type)
+
+    return asyncio.run(_main())
+
+
+async def _row(service, job_id):
+    """(job, scheduled_at - now(), locked_until - now()) as stored"""
+    job = BackgroundJobRecord
+    async with service.session_factory() as session:
+        result = await session.execute(
+            select(job, job.scheduled_at - func.now(), job.locked_until - func.now()).where(job.id == job_id)
+        )
+        return result.one()
+
+
+async def _make_due(service, job_id):
+    job = BackgroundJobRecord
+    async with service.session_factory() as session:
+        await session.execute(update(job).where(job.id == job_id).values(scheduled_at=func.now()))
+        await session.commit()
+
+
+async def _expire_lease(service, job_id):
+    job = BackgroundJobRecord
+    async with service.session_factory() as session:
+        await session.execute(
+            update(job).where(job.id == job_id).values(locked_until=func.now() - timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+def test_retry_backoff_doubles_and_is_capped() -> None:
+    delays = [BackgroundJobService.retry_delay_for(attempts, 5.0) for attempts in range(1, 9)]
+    assert delays == [5.0, 10.0, 20.0, 40.0, 80.0, 160.0, MAX_RETRY_DELAY, MAX_RETRY_DELAY]
+
+
+def test_claim_takes_due_jobs_in_priority_order() -> None:
+    async def body(service, job_type):
+        low = await service.submit_job(job_type, {"n": 1}, priority=JobPriority.LOW, scheduled_at=PAST)
+        high = await service.submit_job(job_type, {"n": 2}, priority=JobPriority.HIGH, scheduled_at=PAST)
+        future = await service.submit_job(
+            job_type, {"n": 3}, priority=JobPriority.CRITICAL,
+            scheduled_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+        claims = [await service._claim(job_type) for _ in range(3)]
+        stored = await _row(service, high)
+        return (low, high, future), claims, stored
+
+    (low, high, future), claims, (job, _, lease_left) = _run(body)
+    assert [claim["id"] for claim in claims[:2]] == [high, low]
+    assert claims[2] is None  # the CRITICAL job is not due yet
+    assert claims[0]["payload"] == {"n": 2} and claims[0]["attempts"] == 1
+    assert job.status == JobStatus.RUNNING.value
+    assert job.locked_by is not None
+    assert lease_left == timedelta(seconds=60)
+
+
+def test_expired_lease_is_reaped_then_fails_after_max_retries() -> None:
+    async def body(service, job_type):
+        job_id = await service.submit_job(job_type, max_retries=1, scheduled_at=PAST)
+        live_id = await service.submit_job(job_type, scheduled_at=PAST, priority=JobPriority.LOW)
+
+        first = await service._claim(job_type)
+        await service._claim(job_type)  # live_id keeps its lease
+        await _expire_lease(service, job_id)
+        await service.reap_expired_leases()
+        after_first = await _row(service, job_id)
+        live = await _row(service, live_id)
+
+        second = await service._claim(job_type)
+        await _expire_lease(service, job_id)
+        await service.reap_expired_leases()
+        after_second = await _row(service, job_id)
+        return first, after_first, live, second, after_second
+
+    first, (after_first, due_in, _), (live, _, _), second, (after_second, _, _) = _run(body)
+    assert first["attempts"] == 1
+    assert after_first.status == JobStatus.RETRYING.value
+    assert after_first.locked_by is None and after_first.error == "Worker lease expired"
+    assert due_in == timedelta(0)  # requeued for immediate pickup
+    assert live.status == JobStatus.RUNNING.value
+    assert second["id"] == first["id"] and second["attempts"] == 2
+    assert after_second.status == JobStatus.FAILED.value
+
+
+def test_failed_job_is_retried_with_exponential_backoff() -> None:
+    async def body(service, job_type):
+        job_id = await service.submit_job(job_type, max_retries=2, retry_delay=5.0, scheduled_at=PAST)
+        outcomes = []
+        for _ in range(3):
+            job = await service._claim(job_type)
+            await service._execute_job(job, "test-worker")
+            outcomes.append(await _row(service, job_id))
+            await _make_due(service, job_id)
+        return outcomes
+
+    outcomes = _run(body, handler=_boom)
+    assert [(job.status, job.attempts) for job, _, _ in outcomes] == [
+        (JobStatus.RETRYING.value, 1),
+        (JobStatus.RETRYING.value, 2),
+        (JobStatus.FAILED.value, 3),
+    ]
+    assert [due_in for _, due_in, _ in outcomes[:2]] == [timedelta(seconds=5), timedelta(seconds=10)]
+    assert all(job.error == "boom" and job.locked_by is None for job, _, _ in outcomes)
+    assert outcomes[2][0].completed_at is not None
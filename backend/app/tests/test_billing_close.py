@@ -0,0 +1,311 @@
+"""Month-end billing close run tests.
+
+Drive BillingCloseService against the test DB (see app/tests/db.py): a period
+that fails is checkpointed as failed while the rest close, and a resume only
+retries what is left; closing reprices the period's reconcilable orders from
+their stored line totals and adjustments; closing is idempotent whether a period is closed twice
+directly or closed between a run's enumeration and its execution; and a run
+is not finished while a concurrent resume still holds one of its items. The
+last case needs a second connection to hold the row lock, so it commits its
+own rows under a fresh tenant and deletes them afterwards. Skips only if no DB
+is reachable.
+"""
+
+import asyncio
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.modules.billing.models.billing_close_run import BillingCloseRun, BillingCloseRunItem
+from app.modules.billing.models.reconciliation import BillingPeriod, Reconciliation
+from app.modules.billing.schemas.billing_close_run import BillingCloseRunCreate
+from app.modules.billing.services.billing_close_service import BILLING_CLOSE_JOB, BillingCloseService
+from app.modules.billing.services.billing_period_service import BillingPeriodService
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.models.order import Order, OrderItem
+from app.tests.db import rolled_back_connection, rolled_back_context, savepoint_session_factory
+from benchmarks.datasets import seed_catalog, seed_orders, seed_organizations
+from orderly_fastapi_core import money
+from orderly_fastapi_core.models.background_job import BackgroundJobRecord
+
+CUTOFF = date(2026, 1, 31)
+
+
+def _periods(tenant_id: str, count: int):
+    return [
+        BillingPeriod(
+            tenant_id=tenant_id,
+            restaurant_id=tenant_id,
+            supplier_id=str(uuid.uuid4()),
+            period_name=f"2026-01 月結 #{index}",
+            period_start=date(2026, 1, 1),
+            period_end=CUTOFF,
+        )
+        for index in range(count)
+    ]
+
+
+async def _start(factory, tenant_id: str, count: int, auto_reconcile: bool = True):
+    async with factory() as session:
+        periods = _periods(tenant_id, count)
+        session.add_all(periods)
+        await session.commit()
+        service = BillingCloseService(session, session_factory=factory)
+        run = await service.start_run(
+            tenant_id, BillingCloseRunCreate(cutoff_date=CUTOFF, auto_reconcile=auto_reconcile, concurrency=1)
+        )
+        return service, run, [period.id for period in periods]
+
+
+async def _state(factory, run_id: str):
+    """(run, {period_id: item}, {period_id: period})"""
+    async with factory() as session:
+        run = await session.get(BillingCloseRun, run_id, populate_existing=True)
+        items = (
+            await session.execute(
+                select(BillingCloseRunItem)
+                .where(BillingCloseRunItem.run_id == run_id)
+                .execution_options(populate_existing=True)
+            )
+        ).scalars().all()
+        periods = (
+            await session.execute(
+                select(BillingPeriod)
+                .where(BillingPeriod.id.in_([item.billing_period_id for item in items]))
+                .execution_options(populate_existing=True)
+            )
+        ).scalars().all()
+        return (
+            run,
+            {item.billing_period_id: item for item in items},
+            {period.id: period for period in periods},
+        )
+
+
+async def _reconciliation_count(factory, tenant_id: str) -> int:
+    async with factory() as session:
+        return (
+            await session.execute(select(func.count(Reconciliation.id)).where(Reconciliation.tenant_id == tenant_id))
+        ).scalar_one()
+
+
+def _run(body):
+    async def _main():
+        async with rolled_back_connection() as connection:
+            return await body(savepoint_session_factory(connection), str(uuid.uuid4()))
+
+    return asyncio.run(_main())
+
+
+def test_start_enqueues_a_durable_job() -> None:
+    async def body(factory, tenant_id):
+        _, run, _ = await _start(factory, tenant_id, 2)
+        async with factory() as session:
+            jobs = (
+                await session.execute(
+                    select(BackgroundJobRecord).where(BackgroundJobRecord.job_type == BILLING_CLOSE_JOB)
+                )
+            ).scalars().all()
+        return run, jobs
+
+    run, jobs = _run(body)
+    assert run.total_periods == 2 and run.status == "pending"
+    assert [job.payload for job in jobs if job.payload == {"run_id": run.id}] == [{"run_id": run.id}]
+
+
+def test_partial_failure_is_checkpointed_and_resume_retries_only_the_rest(monkeypatch) -> None:
+    failing = set()
+    calls = []
+    close = BillingPeriodService.close_billing_period
+
+    async def flaky_close(self, period_id, *args, **kwargs):
+        calls.append(period_id)
+        if period_id in failing:
+            raise RuntimeError("reconciliation backend unavailable")
+        return await close(self, period_id, *args, **kwargs)
+
+    monkeypatch.setattr(BillingPeriodService, "close_billing_period", flaky_close)
+
+    async def body(factory, tenant_id):
+        service, run, period_ids = await _start(factory, tenant_id, 3)
+        failing.add(period_ids[1])
+        await service.execute_run(run.id)
+        first = await _state(factory, run.id)
+        first_calls = list(calls)
+
+        failing.clear()
+        calls.clear()
+        await service.execute_run(run.id)
+        second = await _state(factory, run.id)
+        return period_ids, first, first_calls, second, list(calls)
+
+    period_ids, first, first_calls, second, resume_calls = _run(body)
+    run, items, periods = first
+    assert run.status == "completed_with_errors" and run.finished_at is not None
+    assert sorted(first_calls) == sorted(period_ids)
+    failed = items[period_ids[1]]
+    assert (failed.status, failed.attempts, failed.error) == ("failed", 1, "reconciliation backend unavailable")
+    assert not periods[period_ids[1]].is_closed
+    for period_id in (period_ids[0], period_ids[2]):
+        assert items[period_id].status == "done"
+        assert periods[period_id].is_closed
+        assert items[period_id].reconciliation_id == periods[period_id].reconciliation_id is not None
+
+    run, items, periods = second
+    assert resume_calls == [period_ids[1]]  # done periods are not touched again
+    assert run.status == "completed" and run.last_error is None
+    assert (items[period_ids[1]].status, items[period_ids[1]].attempts) == ("done", 2)
+    assert all(period.is_closed for period in periods.values())
+
+
+def test_reclose_is_idempotent() -> None:
+    async def body(factory, tenant_id):
+        service, run, period_ids = await _start(factory, tenant_id, 2)
+        # closed directly after the run enumerated it, then closed again
+        async with factory() as session:
+            periods = BillingPeriodService(session)
+            closed = await periods.close_billing_period(period_ids[0], tenant_id, tenant_id)
+            again = await periods.close_billing_period(period_ids[0], tenant_id, tenant_id)
+        after_direct = await _reconciliation_count(factory, tenant_id)
+
+        await service.execute_run(run.id)
+        after_run = await _reconciliation_count(factory, tenant_id)
+        await service.execute_run(run.id)  # finished runs are not re-executed
+        state = await _state(factory, run.id)
+        return period_ids, closed, again, after_direct, after_run, state, await _reconciliation_count(factory, tenant_id)
+
+    period_ids, closed, again, after_direct, after_run, (run, items, periods), final = _run(body)
+    assert again.reconciliation_id == closed.reconciliation_id is not None
+    assert after_direct == 1
+    assert after_run == final == 2
+    assert run.status == "completed"
+    assert items[period_ids[0]].status == "done"
+    assert items[period_ids[0]].reconciliation_id == closed.reconciliation_id
+    assert periods[period_ids[0]].closed_at == closed.closed_at
+
+
+def test_close_reprices_the_periods_orders() -> None:
+    async def _main():
+        async with rolled_back_context(seed=48) as ctx:
+            await seed_organizations(ctx)
+            await seed_catalog(ctx)
+            await seed_orders(ctx, count=4, lines=3)
+            restaurant_id = ctx.data["restaurant_id"]
+            order_ids = ctx.data["order_ids"]
+            discounted, draft = order_ids[:2]
+            adjustments = [{"type": "discount", "amount": "12.34"}, {"type": "shipping_fee", "amount": 60}]
+            table = Order.__table__
+            await ctx.session.execute(update(table).where(table.c.id == discounted).values(adjustments=adjustments))
+            await ctx.session.execute(update(table).where(table.c.id == draft).values(status=OrderStatus.DRAFT))
+
+            period = BillingPeriod(
+                tenant_id=restaurant_id,
+                restaurant_id=restaurant_id,
+                supplier_id=ctx.data["supplier_id"],
+                period_name="2026-01 月結",
+                period_start=date(2026, 1, 1),
+                period_end=CUTOFF,
+            )
+            ctx.session.add(period)
+            await ctx.session.flush()
+            await BillingPeriodService(ctx.session).close_billing_period(
+                period.id, restaurant_id, restaurant_id, commit=False
+            )
+
+            lines = {}
+            for row in await ctx.session.execute(
+                select(OrderItem.order_id, OrderItem.line_total).where(OrderItem.order_id.in_(order_ids))
+            ):
+                lines.setdefault(row.order_id, []).append(row.line_total)
+            stored = {
+                row.id: row
+                for row in await ctx.session.execute(
+                    select(
+                        table.c.id,
+                        table.c.version,
+                        table.c.adjustments,
+                        *(table.c[field] for field in money.TOTAL_FIELDS),
+                    ).where(table.c.id.in_(order_ids))
+                )
+            }
+            return order_ids, draft, lines, stored
+
+    order_ids, draft, lines, stored = asyncio.run(_main())
+    for order_id in order_ids:
+        row = stored[order_id]
+        if order_id == draft:  # not reconcilable, left as stored
+            assert (row.version, row.total_amount) == (1, 0)
+            continue
+        expected = money.order_totals(lines[order_id], row.adjustments)
+        assert {field: row._mapping[field] for field in money.TOTAL_FIELDS} == expected
+        assert row.version == 2
+
+
+async def _engine_or_skip():
+    from app.modules.users.core.config import settings
+
+    engine = create_async_engine(settings.get_database_url_async(), poolclass=NullPool)
+    try:
+        async with engine.connect():
+            pass
+    except (DBAPIError, OSError) as exc:  # no DB locally → DB-free smoke run, skip
+        await engine.dispose()
+        pytest.skip(f"DB not reachable, skipping billing close DB tests: {exc}")
+    return engine
+
+
+def test_run_is_not_finished_while_a_concurrent_resume_holds_an_item() -> None:
+    async def _main():
+        import app.main  # noqa: F401  -- registers every module's mappers
+
+        engine = await _engine_or_skip()
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        tenant_id = str(uuid.uuid4())
+        run_id = None
+        try:
+            service, run, period_ids = await _start(factory, tenant_id, 3, auto_reconcile=False)
+            run_id = run.id
+            async with factory() as holder:
+                # another execution of the same run is closing this item
+                held = (
+                    await holder.execute(
+                        select(BillingCloseRunItem)
+                        .where(
+                            BillingCloseRunItem.run_id == run_id,
+                            BillingCloseRunItem.billing_period_id == period_ids[0],
+                        )
+                        .with_for_update()
+                    )
+                ).scalar_one()
+                await service.execute_run(run_id)
+                while_held = await _state(factory, run_id)
+
+                held.status = "done"
+                held.attempts += 1
+                await holder.commit()
+            await service._finish_run(run_id, None)
+            return period_ids, while_held, await _state(factory, run_id)
+        finally:
+            async with factory() as session:
+                if run_id is not None:
+                    await session.execute(delete(BillingCloseRunItem).where(BillingCloseRunItem.run_id == run_id))
+                    await session.execute(delete(BillingCloseRun).where(BillingCloseRun.id == run_id))
+                    await session.execute(
+                        delete(BackgroundJobRecord).where(
+                            BackgroundJobRecord.payload["run_id"].as_string() == run_id
+                        )
+                    )
+                await session.execute(delete(BillingPeriod).where(BillingPeriod.tenant_id == tenant_id))
+                await session.commit()
+            await engine.dispose()
+
+    period_ids, (run, items, _), (finished, _, _) = asyncio.run(_main())
+    assert run.status == "running" and run.finished_at is None
+    assert items[period_ids[0]].attempts == 0  # skipped, not failed
+    assert [items[period_id].status for period_id in period_ids[1:]] == ["done", "done"]
+    assert finished.status == "completed"
@@ -0,0 +1,188 @@
+"""Set-based bulk order status transition tests.
+
+Run OrderService.bulk_update_order_status against the test DB (see
+app/tests/db.py) with the statements sent on the test connection recorded: a
+missing order and an invalid transition are reported per order without
+blocking the others, the valid orders are updated with one UPDATE per original
+status (bumping their version) and one multi-row history INSERT, and
+notifications go out as one batch. Completing orders hands them to the
+activity rollup in one call, and a failing rollup does not undo the status
+change.
+"""
+
+import asyncio
+
+from sqlalchemy import event, select, update
+
+from app.modules.customer_hierarchy.services.activity_rollup_service import ActivityRollupService
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.models.order import Order, OrderStatusHistory
+from app.modules.orders.schemas.order import OrderStatusUpdate
+from app.modules.orders.services.notification_client import notification_client
+from app.modules.orders.services.order_service import OrderService
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import seed_catalog, seed_orders, seed_organizations
+
+MISSING_ORDER_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _run(monkeypatch, statuses, body):
+    notifications = []
+
+    async def record_notifications(changes):
+        notifications.append(changes)
+        return True
+
+    monkeypatch.setattr(notification_client, "notify_order_status_changes", record_notifications)
+
+    async def _main():
+        async with rolled_back_context(seed=31) as ctx:
+            await seed_organizations(ctx)
+            await seed_catalog(ctx)
+            await seed_orders(ctx, count=len(statuses), lines=1, status=OrderStatus.DRAFT)
+            table = Order.__table__
+            for order_id, status in zip(ctx.data["order_ids"], statuses):
+                await ctx.session.execute(update(table).where(table.c.id == order_id).values(status=status))
+            ctx.session.expire_all()  # the seeded Order objects still hold DRAFT
+
+            statements = []
+
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement.lstrip())
+
+            sync_connection = ctx.session.bind.sync_connection
+            event.listen(sync_connection, "before_cursor_execute", record)
+            try:
+                return await body(ctx, statements)
+            finally:
+                event.remove(sync_connection, "before_cursor_execute", record)
+
+    return asyncio.run(_main()), notifications
+
+
+async def _bulk_update(ctx, order_ids, to_status):
+    tenant_id = ctx.data["restaurant_id"]
+    return await OrderService.bulk_update_order_status(
+        ctx.session,
+        order_ids,
+        tenant_id,
+        OrderStatusUpdate(status=to_status, reason="bulk test"),
+        tenant_id,
+        role="admin",
+    )
+
+
+async def _stored(ctx, order_ids):
+    table = Order.__table__
+    rows = await ctx.session.execute(
+        select(table.c.id, table.c.status, table.c.version).where(table.c.id.in_(order_ids))
+    )
+    return {row.id: (row.status, row.version) for row in rows}
+
+
+async def _history(ctx, order_ids):
+    rows = await ctx.session.execute(
+        select(
+            OrderStatusHistory.order_id,
+            OrderStatusHistory.from_status,
+            OrderStatusHistory.to_status,
+            OrderStatusHistory.changed_by,
+            OrderStatusHistory.reason,
+        ).where(OrderStatusHistory.order_id.in_(order_ids))
+    )
+    return sorted(tuple(row) for row in rows)
+
+
+def test_bulk_transition_reports_failures_per_order_and_writes_set_based(monkeypatch) -> None:
+    statuses = [OrderStatus.DRAFT, OrderStatus.DRAFT, OrderStatus.SUBMITTED, OrderStatus.COMPLETED]
+
+    async def body(ctx, statements):
+        order_ids = ctx.data["order_ids"]
+        statements.clear()
+        result = await _bulk_update(ctx, [*order_ids, MISSING_ORDER_ID, order_ids[0]], OrderStatus.CANCELLED)
+        writes = [
+            statement for statement in statements
+            if not statement.upper().startswith(("SELECT", "SAVEPOINT", "RELEASE"))
+        ]
+        return ctx, order_ids, result, writes, await _stored(ctx, order_ids), await _history(ctx, order_ids)
+
+    (ctx, order_ids, result, writes, stored, history), notifications = _run(monkeypatch, statuses, body)
+    draft, other_draft, submitted, completed = order_ids
+    user_id = ctx.data["restaurant_id"]
+
+    assert result["success"] == [draft, other_draft, submitted]
+    assert [failure["orderId"] for failure in result["failed"]] == [completed, MISSING_ORDER_ID]
+    assert "completed" in result["failed"][0]["error"]
+    assert MISSING_ORDER_ID in result["failed"][1]["error"]
+
+    # one UPDATE per original status, one multi-row history INSERT
+    assert sum(write.upper().startswith("UPDATE ORDERS") for write in writes) == 2
+    assert sum(write.upper().startswith("INSERT INTO ORDER_STATUS_HISTORY") for write in writes) == 1
+
+    assert stored == {
+        draft: (OrderStatus.CANCELLED, 2),
+        other_draft: (OrderStatus.CANCELLED, 2),
+        submitted: (OrderStatus.CANCELLED, 2),
+        completed: (OrderStatus.COMPLETED, 1),
+    }
+    assert history == sorted([
+        (draft, OrderStatus.DRAFT, OrderStatus.CANCELLED, user_id, "bulk test"),
+        (other_draft, OrderStatus.DRAFT, OrderStatus.CANCELLED, user_id, "bulk test"),
+        (submitted, OrderStatus.SUBMITTED, OrderStatus.CANCELLED, user_id, "bulk test"),
+    ])
+
+    assert len(notifications) == 1
+    assert [(change["order_id"], change["from_status"]) for change in notifications[0]] == [
+        (draft, OrderStatus.DRAFT),
+        (other_draft, OrderStatus.DRAFT),
+        (submitted, OrderStatus.SUBMITTED),
+    ]
+
+
+def test_nothing_is_written_when_every_transition_fails(monkeypatch) -> None:
+    async def body(ctx, statements):
+        statements.clear()
+        result = await _bulk_update(ctx, ctx.data["order_ids"], OrderStatus.COMPLETED)
+        return result, [statement for statement in statements if not statement.upper().startswith("SELECT")]
+
+    (result, writes), notifications = _run(monkeypatch, [OrderStatus.DRAFT, OrderStatus.SUBMITTED], body)
+    assert result["success"] == []
+    assert len(result["failed"]) == 2
+    assert writes == []
+    assert notifications == []
+
+
+def test_completed_orders_are_rolled_up_in_one_call(monkeypatch) -> None:
+    rolled_up = []
+
+    async def record_orders(self, orders):
+        rolled_up.append(sorted(order.id for order in orders))
+        return 0
+
+    monkeypatch.setattr(ActivityRollupService, "record_orders", record_orders)
+
+    async def body(ctx, statements):
+        order_ids = ctx.data["order_ids"]
+        result = await _bulk_update(ctx, order_ids, OrderStatus.COMPLETED)
+        return order_ids, result
+
+    (order_ids, result), _ = _run(monkeypatch, [OrderStatus.ACCEPTED] * 3, body)
+    assert sorted(result["success"]) == sorted(order_ids)
+    assert rolled_up == [sorted(order_ids)]
+
+
+def test_a_failing_rollup_does_not_undo_the_status_change(monkeypatch) -> None:
+    async def failing_record_orders(self, orders):
+        raise RuntimeError("rollup unavailable")
+
+    monkeypatch.setattr(ActivityRollupService, "record_orders", failing_record_orders)
+
+    async def body(ctx, statements):
+        order_ids = ctx.data["order_ids"]
+        result = await _bulk_update(ctx, order_ids, OrderStatus.COMPLETED)
+        return order_ids, result, await _stored(ctx, order_ids)
+
+    (order_ids, result, stored), notifications = _run(monkeypatch, [OrderStatus.ACCEPTED] * 2, body)
+    assert sorted(result["success"]) == sorted(order_ids)
+    assert stored == {order_id: (OrderStatus.COMPLETED, 2) for order_id in order_ids}
+    assert len(notifications) == 1
@@ -0,0 +1,66 @@
+"""Category tree closure tests.
+
+Build a small category tree against the test DB (see app/tests/db.py): the
+closure table answers whether a category lies in another's subtree (itself
+included), which the update endpoint checks before a move so a category cannot
+be put under its own descendant, and a valid move re-links the subtree.
+"""
+
+import asyncio
+
+from app.modules.products.models.category import ProductCategory
+from app.modules.products.services.category_tree_service import CategoryTreeService
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import new_id
+
+
+def test_subtree_lookup_follows_moves() -> None:
+    async def _main():
+        async with rolled_back_context(seed=44) as ctx:
+            def category(name, parent=None):
+                return ProductCategory(
+                    id=new_id(ctx.rng),
+                    code=f"T{ctx.rng.getrandbits(24):06x}",
+                    name=name,
+                    nameEn=f"Tree {name}",
+                    parentId=parent.id if parent else None,
+                    level=parent.level + 1 if parent else 1,
+                )
+
+            root = category("根")
+            other = category("其他")
+            ctx.session.add_all([root, other])
+            await ctx.session.flush()
+            child = category("子", root)
+            ctx.session.add(child)
+            await ctx.session.flush()
+            grandchild = category("孫", child)
+            ctx.session.add(grandchild)
+            await ctx.session.flush()
+
+            async def in_subtree(ancestor, node):
+                return await CategoryTreeService.in_subtree(ctx.session, ancestor.id, node.id)
+
+            before = {
+                "grandchild under root": await in_subtree(root, grandchild),
+                "root under grandchild": await in_subtree(grandchild, root),
+                "itself": await in_subtree(child, child),
+                "unrelated": await in_subtree(other, grandchild),
+            }
+
+            child.parentId, child.level = other.id, 2
+            await ctx.session.flush()
+            after = {
+                "grandchild under root": await in_subtree(root, grandchild),
+                "grandchild under other": await in_subtree(other, grandchild),
+            }
+            return before, after
+
+    before, after = asyncio.run(_main())
+    assert before == {
+        "grandchild under root": True,
+        "root under grandchild": False,
+        "itself": True,
+        "unrelated": False,
+    }
+    assert after == {"grandchild under root": False, "grandchild under other": True}
@@ -0,0 +1,118 @@
+"""Dashboard metrics endpoint and refresher wiring tests.
+
+The scoped metrics route lives on the v2 hierarchy router the monolith mounts,
+and the refresh-ahead loop is started and stopped by the customer_hierarchy
+module hooks. The endpoint cases run against the test DB (see app/tests/db.py)
+with the users session pointed at the same rolled-back connection. A scope is
+only served (and so registered for background refresh) when the caller's
+access index covers it.
+"""
+
+import asyncio
+import uuid
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.modules.customer_hierarchy.api.v2.endpoints import hierarchy as hierarchy_endpoints
+from app.modules.customer_hierarchy.module import module
+from app.modules.customer_hierarchy.services.cache_enhanced_service import CacheConfig, EnhancedCacheService
+from app.modules.customer_hierarchy.services.dashboard_refresh_service import dashboard_refresher
+from app.modules.users.core import database as users_database
+from app.modules.users.models.user import User
+from app.tests.db import rolled_back_context, savepoint_session_factory
+from benchmarks.datasets import seed_hierarchy, seed_organizations
+
+
+def test_metrics_route_is_mounted_on_the_monolith() -> None:
+    from app.main import app
+
+    paths = {route.path for route in app.routes}
+    assert "/api/v2/hierarchy/metrics" in paths
+
+
+def test_module_hooks_start_and_stop_the_refresher(monkeypatch) -> None:
+    monkeypatch.setattr(dashboard_refresher, "poll_seconds", 3600)
+
+    async def _main():
+        await module.startup()
+        started = dashboard_refresher.running
+        await module.shutdown()
+        return started, dashboard_refresher.running
+
+    started, running = asyncio.run(_main())
+    assert started and not running
+
+
+def _request(user: User) -> Request:
+    context = {"user_id": user.id, "role": user.role, "permissions": list(user.permissions)}
+    return Request({"type": "http", "headers": [], "state": {"hierarchy_context": context}})
+
+
+def test_metrics_scope_is_checked_against_the_callers_access(monkeypatch) -> None:
+    served = []
+    cached = EnhancedCacheService.get_dashboard_metrics_cached
+
+    async def recording_cached(self, include_cache_info=False, scope=None):
+        served.append(scope)
+        return await cached(self, include_cache_info, scope=scope)
+
+    monkeypatch.setattr(EnhancedCacheService, "get_dashboard_metrics_cached", recording_cached)
+
+    async def _main():
+        async with rolled_back_context(seed=43) as ctx:
+            monkeypatch.setattr(users_database, "AsyncSessionLocal", savepoint_session_factory(ctx.session.bind))
+            await seed_organizations(ctx)
+            await seed_hierarchy(ctx, groups=2, companies=1, locations=1, units=0)
+            mine, other = ctx.data["group_ids"]
+            scoped = User(
+                id=str(uuid.uuid4()),
+                organization_id=ctx.data["restaurant_id"],
+                role="supplier_manager",
+                permissions=[],
+                user_metadata={"hierarchy_scope": {"group_ids": [mine]}},
+            )
+            admin = User(
+                id=str(uuid.uuid4()), organization_id=ctx.data["restaurant_id"], role="platform_admin", permissions=[]
+            )
+            ctx.session.add_all([scoped, admin])
+            await ctx.session.commit()
+
+            async def metrics(user, scope_type=None, scope_id=None):
+                try:
+                    response = await hierarchy_endpoints.get_dashboard_metrics(
+                        request=_request(user),
+                        include_cache_info=False,
+                        scope_type=scope_type,
+                        scope_id=scope_id,
+                        db=ctx.session,
+                        current_user={"sub": user.id},
+                    )
+                    return 200, response
+                except HTTPException as exc:
+                    return exc.status_code, exc.detail
+
+            results = {
+                "own group": await metrics(scoped, "group", mine),
+                "other group": await metrics(scoped, "group", other),
+                "unscoped": await metrics(scoped),
+                "bad type": await metrics(scoped, "tenant", mine),
+                "admin all": await metrics(admin),
+                "admin other": await metrics(admin, "group", other),
+            }
+            # forget the scopes these reads registered for background refresh
+            cache = EnhancedCacheService(ctx.session)
+            await cache.initialize_redis()
+            if cache.redis_client:
+                await cache.redis_client.zrem(CacheConfig.DASHBOARD_SCOPES_KEY, f"group:{mine}", f"group:{other}")
+            return mine, other, results
+
+    mine, other, results = asyncio.run(_main())
+    assert results["own group"][0] == 200
+    assert results["other group"][0] == 404
+    assert results["unscoped"][0] == 403
+    assert results["bad type"][0] == 400
+    assert results["admin all"][0] == 200
+    assert results["admin other"][0] == 200
+    # denied scopes never reach the cache, so they are never registered for refresh
+    assert served == [("group", mine), None, ("group", other)]
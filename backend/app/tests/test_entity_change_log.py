@@ -0,0 +1,160 @@
+"""Entity change log tests.
+
+Run against the test DB (see app/tests/db.py), with sessions joined to the same
+rolled-back connection. ``audit_log`` entries are buffered on the session and
+inserted by the commit that writes the entity change, inside the same
+transaction. A rollback discards the buffer. Migration 0011 moves legacy
+``extra_data['audit_trail']`` entries into entity_change_log and drops the key.
+Skips only if no DB is reachable.
+"""
+
+import asyncio
+import importlib.util
+from pathlib import Path
+
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import event, select, update
+
+from app.modules.customer_hierarchy.models import CustomerCompany
+from app.modules.customer_hierarchy.models.base import CHANGE_LOG_BUFFER_KEY
+from app.modules.customer_hierarchy.models.entity_change_log import EntityChangeLog
+from app.tests.db import rolled_back_context, savepoint_session_factory
+from benchmarks.datasets import seed_hierarchy, seed_organizations
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "0011_entity_change_log.py"
+
+
+def _run(body):
+    async def _main():
+        async with rolled_back_context(seed=41) as ctx:
+            await seed_organizations(ctx)
+            await seed_hierarchy(ctx, groups=1, companies=2, locations=1, units=0)
+            company_ids = (
+                await ctx.session.execute(
+                    select(CustomerCompany.id)
+                    .where(CustomerCompany.group_id == ctx.data["group_ids"][0])
+                    .order_by(CustomerCompany.id)
+                )
+            ).scalars().all()
+            return await body(ctx, savepoint_session_factory(ctx.session.bind), company_ids)
+
+    return asyncio.run(_main())
+
+
+async def _entries(session, entity_id):
+    return (
+        await session.execute(
+            select(EntityChangeLog)
+            .where(EntityChangeLog.entity_id == entity_id)
+            .order_by(EntityChangeLog.changed_at)
+        )
+    ).scalars().all()
+
+
+def test_buffered_entries_are_written_by_the_entity_commit() -> None:
+    async def body(ctx, factory, company_ids):
+        company_id = company_ids[0]
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split(None, 3)[:3])
+
+        sync_connection = ctx.session.bind.sync_connection
+        event.listen(sync_connection, "before_cursor_execute", record)
+        try:
+            async with factory() as session:
+                company = await session.get(CustomerCompany, company_id)
+                company.name = "Renamed Company"
+                company.audit_log("update", "user-1", {"name": "Renamed Company"})
+                buffered = len(session.info[CHANGE_LOG_BUFFER_KEY])
+                before_commit = await _entries(session, company_id)  # autoflushes the UPDATE
+                await session.commit()
+                left_over = session.info.get(CHANGE_LOG_BUFFER_KEY)
+        finally:
+            event.remove(sync_connection, "before_cursor_execute", record)
+
+        async with factory() as session:
+            return buffered, before_commit, statements, left_over, await _entries(session, company_id)
+
+    buffered, before_commit, statements, left_over, entries = _run(body)
+    assert buffered == 1 and before_commit == []
+    assert left_over is None
+    assert [(entry.entity_type, entry.action, entry.actor_id, entry.details) for entry in entries] == [
+        ("CustomerCompany", "update", "user-1", {"name": "Renamed Company"}),
+    ]
+    # the log INSERT joins the entity UPDATE's transaction, before the savepoint is released
+    verbs = [" ".join(words).lower() for words in statements]
+    update_at = verbs.index("update customer_companies set")
+    insert_at = verbs.index("insert into entity_change_log")
+    release_at = next(i for i, verb in enumerate(verbs) if verb.startswith("release savepoint"))
+    assert update_at < insert_at < release_at
+
+
+def test_a_rollback_discards_the_buffer() -> None:
+    async def body(ctx, factory, company_ids):
+        company_id = company_ids[0]
+        async with factory() as session:
+            company = await session.get(CustomerCompany, company_id)
+            company.name = "Never Committed"
+            company.audit_log("update", "user-1", {"name": "Never Committed"})
+            await session.rollback()
+            after_rollback = session.info.get(CHANGE_LOG_BUFFER_KEY)
+            await session.commit()
+        async with factory() as session:
+            return after_rollback, await _entries(session, company_id)
+
+    after_rollback, entries = _run(body)
+    assert after_rollback is None
+    assert entries == []
+
+
+def test_migration_0011_moves_audit_trails_into_the_log() -> None:
+    spec = importlib.util.spec_from_file_location("migration_0011", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    def upgrade(connection):
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+
+    async def body(ctx, factory, company_ids):
+        migrated, untouched = company_ids
+        trail = [
+            {
+                "entity_type": "CustomerCompany",
+                "action": "create",
+                "user_id": "user-1",
+                "timestamp": "2025-03-01T08:00:00",
+                "details": {"name": "Original"},
+            },
+            {"action": "update", "user_id": "user-2", "timestamp": "2025-03-02T09:30:00"},
+        ]
+        table = CustomerCompany.__table__
+        await ctx.session.execute(
+            update(table).where(table.c.id == migrated).values(extra_data={"audit_trail": trail, "keep": True})
+        )
+
+        await ctx.session.run_sync(lambda session: upgrade(session.connection()))
+
+        rows = await ctx.session.execute(select(table.c.id, table.c.extra_data).where(table.c.id.in_(company_ids)))
+        extra_data = dict(rows.all())
+        return (
+            migrated,
+            untouched,
+            extra_data,
+            await _entries(ctx.session, migrated),
+            await _entries(ctx.session, untouched),
+        )
+
+    migrated, untouched, extra_data, entries, untouched_entries = _run(body)
+    assert extra_data[migrated] == {"keep": True}
+    assert "audit_trail" not in extra_data[untouched]
+    assert [
+        (entry.action, entry.actor_id, entry.details, entry.changed_at.isoformat()) for entry in entries
+    ] == [
+        ("create", "user-1", {"name": "Original"}, "2025-03-01T08:00:00+00:00"),
+        ("update", "user-2", {}, "2025-03-02T09:30:00+00:00"),
+    ]
+    assert all(entry.entity_type == "CustomerCompany" for entry in entries)
+    assert untouched_entries == []
@@ -0,0 +1,254 @@
+"""Fee rule index tests.
+
+FeeConfigService prices orders from a per-tenant FeeRuleIndex cached in
+process under a Redis version. The equivalence case seeds a random fee
+schedule in the test DB (see app/tests/db.py): every scope, overlapping
+effective windows and tiers, inactive and formula configs. It then checks
+that the index prices a batch of random orders exactly as the per-order
+calculation it replaced did. The cache cases check that a version bump from
+another worker rebuilds the index, and that nothing is cached while Redis is
+unreachable. Each test gets its own RedisManager and index cache. Skips only
+if no DB (or, for the version bump, no Redis) is reachable.
+"""
+
+import asyncio
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import pytest
+from sqlalchemy import update
+
+from app.modules.billing.models.reconciliation import FeeConfig
+from app.modules.billing.schemas.fee_config import FeeConfigUpdate
+from app.modules.billing.services import fee_rule_index
+from app.modules.billing.services.fee_config_service import FeeConfigService
+from app.modules.billing.services.fee_rule_index import TierSchedule
+from app.tests.db import rolled_back_context
+from orderly_fastapi_core import RedisManager
+
+FEE_TYPES = ["transaction_fee", "payment_fee", "logistics_fee"]
+PRICING_MODELS = ["percentage", "fixed", "tiered", "formula"]
+START = date(2026, 1, 1)
+ORDER_DATE = date(2026, 2, 15)
+
+
+class _Order:
+    def __init__(self, supplier_id: str, restaurant_id: str, order_amount: Decimal, order_date: date):
+        self.supplier_id = supplier_id
+        self.restaurant_id = restaurant_id
+        self.order_amount = order_amount
+        self.order_date = order_date
+
+
+def _tiered_fee(amount: Decimal, tiers_config: Optional[Dict]) -> Decimal:
+    if not tiers_config or "tiers" not in tiers_config:
+        return Decimal("0")
+    for tier in tiers_config["tiers"]:
+        min_gmv = Decimal(str(tier.get("min_gmv", 0)))
+        max_gmv = tier.get("max_gmv")
+        rate = Decimal(str(tier.get("rate", 0)))
+        if max_gmv is None:
+            if amount >= min_gmv:
+                return amount * rate
+        elif min_gmv <= amount <= Decimal(str(max_gmv)):
+            return amount * rate
+    return Decimal("0")
+
+
+async def _reference_fee(service: FeeConfigService, tenant_id: str, order: _Order) -> Dict[str, Any]:
+    """The per-order calculation calculate_fee used before the index"""
+    configs = await service.get_applicable_fee_configs(
+        tenant_id, order.supplier_id, order.restaurant_id, order.order_date
+    )
+    fee_breakdown: Dict[str, Decimal] = {}
+    configs_applied: List[str] = []
+    for config in configs:
+        fee = Decimal("0")
+        if config.pricing_model == "percentage":
+            fee = order.order_amount * (config.value or Decimal("0"))
+        elif config.pricing_model == "fixed":
+            fee = config.value or Decimal("0")
+        elif config.pricing_model == "tiered":
+            fee = _tiered_fee(order.order_amount, config.value_json)
+        if fee > 0:
+            fee_breakdown[config.fee_type] = fee.quantize(Decimal("0.01"))
+            configs_applied.append(config.id)
+    return {
+        "order_amount": order.order_amount,
+        "fee_breakdown": fee_breakdown,
+        "total_fee": sum(fee_breakdown.values(), Decimal("0")),
+        "fee_configs_applied": configs_applied,
+    }
+
+
+def _random_config(rng: random.Random, tenant_id, supplier_id, restaurant_id, fee_type, starts_on) -> FeeConfig:
+    pricing_model = rng.choice(PRICING_MODELS)
+    value, value_json = None, None
+    if pricing_model == "percentage":
+        value = Decimal(rng.randint(1, 500)) / 10_000
+    elif pricing_model == "fixed":
+        value = Decimal(rng.randint(0, 10_000)) / 100
+    elif pricing_model == "tiered":
+        tiers = []
+        for _ in range(rng.randint(1, 4)):
+            min_gmv = rng.randint(0, 5000)
+            max_gmv = None if rng.random() < 0.3 else min_gmv + rng.randint(0, 4000)
+            tiers.append({"min_gmv": min_gmv, "max_gmv": max_gmv, "rate": rng.randint(1, 300) / 10_000})
+        value_json = {"tiers": tiers}
+    return FeeConfig(
+        id=str(uuid.UUID(int=rng.getrandbits(128))),
+        tenant_id=tenant_id,
+        supplier_id=supplier_id,
+        restaurant_id=restaurant_id,
+        fee_type=fee_type,
+        pricing_model=pricing_model,
+        who_pays=rng.choice(["supplier", "restaurant"]),
+        value=value,
+        value_json=value_json,
+        effective_from=starts_on,
+        effective_to=None if rng.random() < 0.5 else starts_on + timedelta(days=rng.randint(0, 60)),
+        is_active=rng.random() < 0.85,
+    )
+
+
+def test_overlapping_tiers_use_the_first_configured_match() -> None:
+    tiers = {"tiers": [
+        {"min_gmv": 0, "max_gmv": 1000, "rate": 0.01},
+        {"min_gmv": 500, "max_gmv": 600, "rate": 0.02},
+        {"min_gmv": 100, "max_gmv": 200, "rate": 0.03},
+    ]}
+    schedule = TierSchedule.compile(tiers)
+    for amount in ("0", "150", "550", "1000", "1000.01"):
+        amount = Decimal(amount)
+        expected = _tiered_fee(amount, tiers)
+        rate = schedule.rate_for(amount)
+        assert (amount * rate if rate is not None else Decimal("0")) == expected
+
+
+def test_index_prices_orders_like_the_per_order_calculation(monkeypatch) -> None:
+    monkeypatch.setattr(fee_rule_index, "redis_manager", RedisManager())
+    monkeypatch.setattr(fee_rule_index, "_indexes", {})
+    rng = random.Random(32)
+    tenant_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    suppliers = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(3)]
+    restaurants = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(3)]
+
+    configs = []
+    for supplier_id in suppliers[:2] + [None]:
+        for restaurant_id in restaurants[:2] + [None]:
+            # distinct start dates per scope: the old query's order among equal starts is undefined
+            offsets = iter(rng.sample(range(90), 3 * len(FEE_TYPES)))
+            for fee_type in FEE_TYPES:
+                for _ in range(rng.randint(0, 3)):
+                    configs.append(_random_config(
+                        rng, tenant_id, supplier_id, restaurant_id, fee_type, START + timedelta(days=next(offsets))
+                    ))
+    orders = [
+        _Order(
+            rng.choice(suppliers),
+            rng.choice(restaurants),
+            Decimal(rng.randint(0, 1_000_000)) / 100,
+            START + timedelta(days=rng.randint(-5, 120)),
+        )
+        for _ in range(300)
+    ]
+
+    async def _main():
+        async with rolled_back_context(seed=32) as ctx:
+            ctx.session.add_all(configs)
+            await ctx.session.flush()
+            service = FeeConfigService(ctx.session)
+            batch = await service.calculate_fees_batch(tenant_id, orders)
+            single = [
+                await service.calculate_fee(
+                    tenant_id, order.supplier_id, order.restaurant_id, order.order_amount, order.order_date
+                )
+                for order in orders[:50]
+            ]
+            expected = [await _reference_fee(service, tenant_id, order) for order in orders]
+            return batch, single, expected
+
+    batch, single, expected = asyncio.run(_main())
+    assert sum(1 for result in expected if result["fee_breakdown"]) > len(orders) // 2
+    assert batch == expected
+    assert single == expected[:50]
+
+
+def _run_cache_case(monkeypatch, body, manager: RedisManager):
+    monkeypatch.setattr(fee_rule_index, "redis_manager", manager)
+    monkeypatch.setattr(fee_rule_index, "_indexes", {})
+
+    async def _main():
+        async with rolled_back_context(seed=32) as ctx:
+            tenant_id = str(uuid.uuid4())
+            config = FeeConfig(
+                tenant_id=tenant_id,
+                fee_type="transaction_fee",
+                pricing_model="percentage",
+                who_pays="supplier",
+                value=Decimal("0.01"),
+                effective_from=START,
+            )
+            ctx.session.add(config)
+            await ctx.session.commit()
+            service = FeeConfigService(ctx.session)
+
+            async def fee():
+                result = await service.calculate_fee(
+                    tenant_id, str(uuid.uuid4()), str(uuid.uuid4()), Decimal("1000"), ORDER_DATE
+                )
+                return result["total_fee"]
+
+            async def write_elsewhere(value):
+                # a write committed by another worker: this process's cache is not touched
+                await ctx.session.execute(update(FeeConfig).where(FeeConfig.id == config.id).values(value=value))
+                await ctx.session.commit()
+
+            return await body(service, tenant_id, config, fee, write_elsewhere)
+
+    return asyncio.run(_main())
+
+
+def test_a_version_bump_from_another_worker_rebuilds_the_index(monkeypatch) -> None:
+    manager = RedisManager()
+
+    async def body(service, tenant_id, config, fee, write_elsewhere):
+        try:
+            await manager.client("billing-fee-rules").ping()
+        except Exception as exc:
+            pytest.skip(f"Redis not reachable, skipping fee rule version tests: {exc}")
+        results = [await fee()]
+        await write_elsewhere(Decimal("0.02"))
+        results.append(await fee())  # still the cached index
+        await fee_rule_index._bump_version(tenant_id)
+        results.append(await fee())
+
+        # another worker still holds this index when the update commits here
+        other_worker = dict(fee_rule_index._indexes)
+        await service.update_fee_config(config.id, tenant_id, FeeConfigUpdate(value=Decimal("0.03")))
+        await asyncio.gather(*fee_rule_index._pending_bumps)
+        fee_rule_index._indexes.update(other_worker)
+        results.append(await fee())
+        return results
+
+    assert _run_cache_case(monkeypatch, body, manager) == [
+        Decimal("10.00"), Decimal("10.00"), Decimal("20.00"), Decimal("30.00"),
+    ]
+
+
+def test_nothing_is_cached_while_redis_is_unreachable(monkeypatch) -> None:
+    manager = RedisManager(socket_connect_timeout=0.5)
+    monkeypatch.setattr(fee_rule_index.settings, "redis_url", "redis://127.0.0.1:1/0")
+
+    async def body(service, tenant_id, config, fee, write_elsewhere):
+        results = [await fee()]
+        await write_elsewhere(Decimal("0.02"))
+        results.append(await fee())
+        return results, dict(fee_rule_index._indexes)
+
+    results, cached = _run_cache_case(monkeypatch, body, manager)
+    assert results == [Decimal("10.00"), Decimal("20.00")]
+    assert cached == {}
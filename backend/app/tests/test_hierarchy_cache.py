@@ -0,0 +1,84 @@
+"""Hierarchy cache versioning tests.
+
+Tree, breadcrumb and statistics entries are keyed by the hierarchy data
+version. Against the test DB (see app/tests/db.py) and the test Redis: a commit
+that renames a group through the ORM or a bulk UPDATE bumps the version, while
+a commit without hierarchy writes or a rolled-back write leaves it alone. Uses
+its own RedisManager; skips only if no Redis is reachable.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import update
+
+from app.modules.customer_hierarchy.models import CustomerGroup
+from app.modules.customer_hierarchy.services import cache_service
+from app.modules.customer_hierarchy.services.cache_service import CacheService
+from app.tests.db import rolled_back_context, savepoint_session_factory
+from benchmarks.datasets import seed_hierarchy, seed_organizations
+from orderly_fastapi_core import RedisManager
+
+
+def test_hierarchy_writes_bump_the_cache_version(monkeypatch) -> None:
+    manager = RedisManager()
+    monkeypatch.setattr(cache_service, "redis_manager", manager)
+
+    async def _main():
+        try:
+            cache = CacheService()
+            if await cache.versioned_key("probe") is None:
+                pytest.skip("Redis not reachable, skipping hierarchy cache version tests")
+
+            async with rolled_back_context(seed=42) as ctx:
+                await seed_organizations(ctx)
+                await seed_hierarchy(ctx, groups=1, companies=1, locations=1, units=0)
+                group_id = ctx.data["group_ids"][0]
+                factory = savepoint_session_factory(ctx.session.bind)
+
+                async def key_after(write):
+                    async with factory() as session:
+                        try:
+                            await write(session)
+                        finally:
+                            await asyncio.gather(*cache_service._pending_bumps)
+                    return await cache.versioned_key("hierarchy_tree:root")
+
+                async def rename(session):
+                    group = await session.get(CustomerGroup, group_id)
+                    group.name = "Renamed Group"
+                    await session.commit()
+
+                async def bulk_rename(session):
+                    await session.execute(
+                        update(CustomerGroup).where(CustomerGroup.id == group_id).values(name="Bulk Renamed")
+                    )
+                    await session.commit()
+
+                async def rolled_back(session):
+                    group = await session.get(CustomerGroup, group_id)
+                    group.name = "Never Committed"
+                    await session.flush()
+                    await session.rollback()
+                    await session.commit()
+
+                async def no_write(session):
+                    await session.get(CustomerGroup, group_id)
+                    await session.commit()
+
+                keys = {"before": await cache.versioned_key("hierarchy_tree:root")}
+                for name, write in (
+                    ("rename", rename),
+                    ("bulk rename", bulk_rename),
+                    ("rolled back", rolled_back),
+                    ("no write", no_write),
+                ):
+                    keys[name] = await key_after(write)
+                return keys
+        finally:
+            await manager.close()
+
+    keys = asyncio.run(_main())
+    assert len({keys["before"], keys["rename"], keys["bulk rename"]}) == 3
+    assert keys["rolled back"] == keys["no write"] == keys["bulk rename"]
+    assert all(key.startswith("hierarchy_tree:root:v") for key in keys.values())
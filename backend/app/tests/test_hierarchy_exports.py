@@ -0,0 +1,132 @@
+"""Stored bulk export and hierarchy maintenance tests.
+
+Run the export store against the test DB (see app/tests/db.py), with its
+session factory pointed at the same rolled-back connection: a written export
+file is appended into hierarchy_exports chunk by chunk, replacing a previous
+attempt (the local copy is removed), its body streams back chunk by chunk, and
+the maintenance loop purges only expired exports. The
+loop also moves the entity_change_log partition window forward with the clock.
+Skips only if no DB is reachable.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, select
+
+from app.modules.customer_hierarchy.models import entity_change_log
+from app.modules.customer_hierarchy.services.hierarchy import export_store
+from app.modules.customer_hierarchy.services.maintenance_service import HierarchyMaintenanceService
+from app.tests.db import rolled_back_connection, savepoint_session_factory
+
+CONTENT = "ID,Name\n" + "".join(f"node-{index},節點 {index}\n" for index in range(500))
+
+
+def _run(monkeypatch, body):
+    async def _main():
+        async with rolled_back_connection() as connection:
+            factory = savepoint_session_factory(connection)
+            monkeypatch.setattr(export_store, "AsyncSessionLocal", factory)
+            return await body(factory)
+
+    return asyncio.run(_main())
+
+
+def test_exports_are_stored_streamed_and_purged_after_expiry(monkeypatch, tmp_path) -> None:
+    async def body(factory):
+        stored = {}
+        for export_id in ("export-live", "export-expired"):
+            path = tmp_path / f"hierarchy_export_{export_id}.csv"
+            path.write_text(CONTENT, encoding="utf-8")
+            async with factory() as session:
+                export = await export_store.save_export(session, export_id, str(path), "text/csv", 500, "user-1")
+                stored[export_id] = (export.to_dict(), path.exists())
+
+        async with factory() as session:
+            expired = await session.get(export_store.HierarchyExport, "export-expired")
+            expired.expires_at = datetime.now(timezone.utc) - timedelta(hours=1)
+            await session.commit()
+
+        chunks = [chunk async for chunk in export_store.iter_export_content("export-live", chunk_size=1000)]
+        async with factory() as session:
+            visible = {
+                export_id: await export_store.get_export(session, export_id) is not None
+                for export_id in stored
+            }
+        purged = await HierarchyMaintenanceService(session_factory=factory).run_once()
+        async with factory() as session:
+            remaining = {
+                export_id: await session.get(export_store.HierarchyExport, export_id) is not None
+                for export_id in stored
+            }
+        return stored, chunks, visible, purged, remaining
+
+    stored, chunks, visible, purged, remaining = _run(monkeypatch, body)
+    live, local_copy_left = stored["export-live"]
+    assert not local_copy_left
+    assert (live["filename"], live["size_bytes"], live["record_count"]) == (
+        "hierarchy_export_export-live.csv", len(CONTENT.encode("utf-8")), 500,
+    )
+
+    assert len(chunks) > 1 and all(len(chunk) <= 1000 for chunk in chunks)
+    assert b"".join(chunks).decode("utf-8") == CONTENT
+
+    assert visible == {"export-live": True, "export-expired": False}
+    assert purged["expired_exports"] == 1
+    assert remaining == {"export-live": True, "export-expired": False}
+
+
+def test_exports_are_appended_in_chunks_and_replace_a_previous_attempt(monkeypatch, tmp_path) -> None:
+    async def body(factory):
+        path = tmp_path / "hierarchy_export_export-retry.csv"
+        path.write_text("stale attempt\n", encoding="utf-8")
+        async with factory() as session:
+            await export_store.save_export(session, "export-retry", str(path), "text/csv", 1, "user-1")
+
+        appends = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().lower().startswith("update hierarchy_exports set content="):
+                appends.append(statement)
+
+        path.write_text(CONTENT, encoding="utf-8")
+        async with factory() as session:
+            sync_connection = session.bind.sync_connection
+            event.listen(sync_connection, "before_cursor_execute", record)
+            try:
+                export = await export_store.save_export(
+                    session, "export-retry", str(path), "text/csv", 500, "user-2", chunk_size=1000
+                )
+            finally:
+                event.remove(sync_connection, "before_cursor_execute", record)
+        chunks = [chunk async for chunk in export_store.iter_export_content("export-retry")]
+        return export.to_dict(), len(appends), b"".join(chunks)
+
+    stored, appends, content = _run(monkeypatch, body)
+    size = len(CONTENT.encode("utf-8"))
+    assert appends == -(-size // 1000)  # one append per file chunk
+    assert (stored["size_bytes"], stored["record_count"], stored["created_by"]) == (size, 500, "user-2")
+    assert content.decode("utf-8") == CONTENT
+
+
+def test_maintenance_creates_change_log_partitions_ahead(monkeypatch) -> None:
+    class _Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2031, 11, 15, tzinfo=tz)
+
+    monkeypatch.setattr(entity_change_log, "datetime", _Later)
+    expected = ["entity_change_log_203111", "entity_change_log_203112", "entity_change_log_203201"]
+
+    async def body(factory):
+        results = await HierarchyMaintenanceService(session_factory=factory).run_once()
+        async with factory() as session:
+            existing = [
+                await session.scalar(select(func.to_regclass(name)))
+                for name in [*expected, "entity_change_log_203110"]
+            ]
+        return results, existing
+
+    results, existing = _run(monkeypatch, body)
+    assert results["change_log_partitions"] == entity_change_log.PARTITION_MONTHS_AHEAD + 1
+    assert [name is not None for name in existing] == [True, True, True, False]
@@ -0,0 +1,117 @@
+"""Set-based hierarchy import tests.
+
+Run HierarchyImportEngine.plan/execute against the test DB (see
+app/tests/db.py). One batch hangs new rows under parents that already exist,
+referenced by parent_id or by the foreign key column itself. The other brings
+its own parents, listed children first, and checks that a rejected parent
+takes its in-file descendants with it. Both check that the bulk writes mark the
+transaction for a hierarchy access index version bump.
+"""
+
+import asyncio
+
+from sqlalchemy import select
+
+from app.modules.customer_hierarchy.models import BusinessUnit, CustomerCompany, CustomerGroup, CustomerLocation
+from app.modules.customer_hierarchy.services.access_index_service import ACCESS_DIRTY_KEY
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import HierarchyImportEngine
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import seed_hierarchy
+
+
+async def _parents(session, model, ids, parent_column):
+    rows = (await session.execute(select(model.id, parent_column).where(model.id.in_(ids)))).all()
+    return dict(rows)
+
+
+def _run(body):
+    async def _main():
+        async with rolled_back_context(seed=30) as ctx:
+            return await body(ctx)
+
+    return asyncio.run(_main())
+
+
+def test_import_under_existing_parents() -> None:
+    async def body(ctx):
+        await seed_hierarchy(ctx, groups=1, companies=1, locations=1, units=0)
+        session = ctx.session
+        group = (await session.execute(select(CustomerGroup))).scalar_one()
+        company = (await session.execute(select(CustomerCompany).where(CustomerCompany.group_id == group.id))).scalar_one()
+        location = (
+            await session.execute(select(CustomerLocation).where(CustomerLocation.company_id == company.id))
+        ).scalar_one()
+
+        records = [
+            {"id": "imp-company", "type": "company", "name": "Imported Co", "tax_id": "12345678", "group_id": group.id},
+            {"id": "imp-loc-fk", "type": "location", "name": "By FK", "company_id": company.id, "code": "FK1"},
+            {"id": "imp-loc-parent", "type": "location", "name": "By parent_id", "parent_id": company.id,
+             "parent_type": "company"},
+            {"id": "imp-unit", "type": "unit", "name": "Bar", "code": "BAR", "location_id": location.id},
+            {"id": "imp-orphan", "type": "location", "name": "Orphan", "company_id": "no-such-company"},
+        ]
+        engine = HierarchyImportEngine(session)
+        plan = await engine.plan(records)
+        session.info.pop(ACCESS_DIRTY_KEY, None)  # set by the seeding
+        await engine.execute(plan, imported_by="importer")
+        await session.flush()
+        return (
+            group, company, location, plan, session.info.get(ACCESS_DIRTY_KEY),
+            await _parents(session, CustomerCompany, ["imp-company"], CustomerCompany.group_id),
+            await _parents(session, CustomerLocation, ["imp-loc-fk", "imp-loc-parent", "imp-orphan"],
+                           CustomerLocation.company_id),
+            await _parents(session, BusinessUnit, ["imp-unit"], BusinessUnit.location_id),
+        )
+
+    group, company, location, plan, access_dirty, companies, locations, units = _run(body)
+    assert access_dirty is True
+    assert [(error["record_id"], error["errors"]) for error in plan.errors] == [
+        ("imp-orphan", ["Parent no-such-company not found for record imp-orphan"]),
+    ]
+    assert (plan.created_count, plan.updated_count) == (4, 0)
+    assert companies == {"imp-company": group.id}
+    assert locations == {"imp-loc-fk": company.id, "imp-loc-parent": company.id}
+    assert units == {"imp-unit": location.id}
+
+
+def test_import_with_parents_in_the_same_file() -> None:
+    async def body(ctx):
+        await seed_hierarchy(ctx, groups=1, companies=0, locations=0, units=0)
+        session = ctx.session
+        taken_code = (await session.execute(select(CustomerGroup.code))).scalar_one()
+
+        # children first: the engine orders levels itself
+        records = [
+            {"id": "u1", "type": "business_unit", "name": "Kitchen", "code": "K", "parent_id": "l1"},
+            {"id": "l1", "type": "location", "name": "Main", "code": "MAIN", "company_id": "c1"},
+            {"id": "l2", "type": "location", "name": "Annex", "parent_id": "c2"},
+            {"id": "c1", "type": "company", "name": "Chain Co", "tax_id": "87654321", "parent_id": "g1"},
+            {"id": "c2", "type": "company", "name": "Ungrouped Co", "tax_id": "11223344"},
+            {"id": "g1", "type": "group", "name": "Chain", "code": "CHAIN"},
+            # a rejected group takes its company and location with it
+            {"id": "g-bad", "type": "group", "name": "Clash", "code": taken_code},
+            {"id": "c-bad", "type": "company", "name": "Under clash", "tax_id": "99887766", "group_id": "g-bad"},
+            {"id": "l-bad", "type": "location", "name": "Under clash", "company_id": "c-bad"},
+        ]
+        engine = HierarchyImportEngine(session)
+        plan = await engine.plan(records)
+        session.info.pop(ACCESS_DIRTY_KEY, None)
+        await engine.execute(plan, imported_by="importer")
+        await session.flush()
+        return (
+            plan,
+            session.info.get(ACCESS_DIRTY_KEY),
+            await _parents(session, CustomerGroup, ["g1", "g-bad"], CustomerGroup.code),
+            await _parents(session, CustomerCompany, ["c1", "c2", "c-bad"], CustomerCompany.group_id),
+            await _parents(session, CustomerLocation, ["l1", "l2", "l-bad"], CustomerLocation.company_id),
+            await _parents(session, BusinessUnit, ["u1"], BusinessUnit.location_id),
+        )
+
+    plan, access_dirty, groups, companies, locations, units = _run(body)
+    assert access_dirty is True
+    assert [error["record_id"] for error in plan.errors] == ["g-bad", "c-bad", "l-bad"]
+    assert (plan.created_count, plan.updated_count) == (6, 0)
+    assert groups == {"g1": "CHAIN"}
+    assert companies == {"c1": "g1", "c2": None}
+    assert locations == {"l1": "c1", "l2": "c2"}
+    assert units == {"u1": "l1"}
@@ -0,0 +1,206 @@
+"""Hierarchy search and typeahead tests.
+
+Run against the test DB (see app/tests/db.py) inside a rolled-back transaction,
+on a small hierarchy whose names share a token no seeded row uses. ``search``
+ranks exact > prefix > substring matches, returns the ancestor names as the
+breadcrumb, keeps to the access index, treats ``%`` and ``_`` in the query as
+literals and reports the total match count past the limit. ``typeahead`` merges
+the per-table prefix branches in name order. Skips only if no DB is reachable.
+"""
+
+import asyncio
+
+from app.modules.customer_hierarchy.models import (
+    BusinessUnit,
+    CustomerCompany,
+    CustomerGroup,
+    CustomerLocation,
+)
+from app.modules.customer_hierarchy.services.access_index_service import AccessIndex
+from app.modules.customer_hierarchy.services.hierarchy import HierarchyService
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import new_id
+
+
+async def _seed(ctx) -> dict:
+    """Group "Zqxalpha" > companies > locations > one unit, ids keyed by name."""
+    rng, session, ids = ctx.rng, ctx.session, {}
+
+    def add(row):
+        session.add(row)
+        ids[row.name] = row.id
+        return row
+
+    group = add(CustomerGroup(id=new_id(rng), name="Zqxalpha", code="ZG-001", created_by="test"))
+    companies = {}
+    for name, tax_id in (
+        ("Zqxalpha Foods", "T-ZQ-01"),
+        ("Zqx_beta 100% Organic", "T-ZQ-02"),
+        ("Zqxabeta 1000 Organic", "T-ZQ-03"),
+        ("Zqxt Alpha", "T-ZQ-04"),
+        ("Zqxt Beta", "T-ZQ-05"),
+        ("Zqxt Delta", "T-ZQ-06"),
+    ):
+        companies[name] = add(
+            CustomerCompany(id=new_id(rng), group_id=group.id, name=name, tax_id=tax_id, created_by="test")
+        )
+    locations = {}
+    for name, company in (
+        ("Central Zqxalpha Kitchen", "Zqxalpha Foods"),
+        ("Zqxt Aardvark", "Zqxt Alpha"),
+        ("Zqxt Charlie", "Zqxt Beta"),
+    ):
+        locations[name] = add(
+            CustomerLocation(
+                id=new_id(rng),
+                company_id=companies[company].id,
+                name=name,
+                code=f"ZL-{len(locations) + 1:03d}",
+                city="台北市",
+                created_by="test",
+            )
+        )
+    add(
+        BusinessUnit(
+            id=new_id(rng),
+            location_id=locations["Central Zqxalpha Kitchen"].id,
+            name="Zqxalpha Bar",
+            code="ZU-001",
+            type="bar",
+            created_by="test",
+        )
+    )
+    await session.flush()
+    return ids
+
+
+def _run(body, access=None):
+    async def _main():
+        async with rolled_back_context(seed=37) as ctx:
+            ids = await _seed(ctx)
+            service = HierarchyService(ctx.session)
+            if access is not None:
+                service._access = access(ids)
+            return ids, await body(service)
+
+    return asyncio.run(_main())
+
+
+def _names(results):
+    return [result["entity"]["name"] for result in results]
+
+
+def test_search_ranks_exact_then_prefix_then_substring() -> None:
+    ids, found = _run(lambda service: service.search("zqxalpha"))
+    # both prefix matches get the 0.5 bonus; "Zqxalpha Bar" shares more trigrams with the term
+    assert _names(found["results"]) == [
+        "Zqxalpha",
+        "Zqxalpha Bar",
+        "Zqxalpha Foods",
+        "Central Zqxalpha Kitchen",
+    ]
+    scores = [result["score"] for result in found["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] >= 2.0  # exact: similarity 1 plus the exact bonus
+    assert 1.0 < scores[1] <= 1.5 and 1.0 < scores[2] <= 1.5
+    assert scores[3] < 1.0
+    assert found["results"][0]["entity"] == {
+        "id": ids["Zqxalpha"],
+        "name": "Zqxalpha",
+        "type": "group",
+        "code": "ZG-001",
+        "parent_id": None,
+        "parent_type": None,
+        "is_active": True,
+    }
+    assert found["total_matches"] == 4
+
+
+def test_search_returns_ancestor_names_as_the_breadcrumb() -> None:
+    ids, found = _run(lambda service: service.search("zqxalpha"))
+    by_name = {result["entity"]["name"]: result for result in found["results"]}
+    assert by_name["Zqxalpha"]["breadcrumb"] == ["Zqxalpha"]
+    assert by_name["Zqxalpha Foods"]["breadcrumb"] == ["Zqxalpha", "Zqxalpha Foods"]
+    assert by_name["Central Zqxalpha Kitchen"]["breadcrumb"] == [
+        "Zqxalpha",
+        "Zqxalpha Foods",
+        "Central Zqxalpha Kitchen",
+    ]
+    assert by_name["Zqxalpha Bar"]["breadcrumb"] == [
+        "Zqxalpha",
+        "Zqxalpha Foods",
+        "Central Zqxalpha Kitchen",
+        "Zqxalpha Bar",
+    ]
+    company = by_name["Zqxalpha Foods"]["entity"]
+    assert (company["code"], company["tax_id"], company["parent_id"], company["parent_type"]) == (
+        None,
+        "T-ZQ-01",
+        ids["Zqxalpha"],
+        "group",
+    )
+
+
+def test_search_keeps_to_the_access_index() -> None:
+    def scoped(ids):
+        return AccessIndex(
+            "user-1",
+            scoped=True,
+            nodes={"company": [ids["Zqxalpha Foods"]]},
+            ancestors={"group": [ids["Zqxalpha"]]},
+        )
+
+    _, found = _run(lambda service: service.search("zqxalpha"), access=scoped)
+    assert _names(found["results"]) == ["Zqxalpha", "Zqxalpha Foods"]
+    assert found["total_matches"] == 2
+
+    _, denied = _run(lambda service: service.search("zqxalpha"), access=lambda ids: AccessIndex.deny_all("user-1"))
+    assert denied["results"] == [] and denied["total_matches"] == 0
+
+
+def test_search_treats_like_wildcards_as_literals() -> None:
+    _, found = _run(lambda service: service.search("zqx_beta 100%", search_types=["company"]))
+    assert _names(found["results"]) == ["Zqx_beta 100% Organic"]
+
+    _, found = _run(lambda service: service.search("zqxabeta 100", search_types=["company"]))
+    assert _names(found["results"]) == ["Zqxabeta 1000 Organic"]
+
+
+def test_search_reports_the_total_past_the_limit() -> None:
+    _, everything = _run(lambda service: service.search("zqx", limit=100))
+    _, page = _run(lambda service: service.search("zqx", limit=3))
+    assert everything["total_matches"] == len(everything["results"]) == 11
+    assert page["total_matches"] == 11
+    assert _names(page["results"]) == _names(everything["results"])[:3]
+
+
+def test_typeahead_merges_branches_in_name_order() -> None:
+    _, rows = _run(lambda service: service.typeahead("zqxt ", limit=3))
+    assert _names(rows) == ["Zqxt Aardvark", "Zqxt Alpha", "Zqxt Beta"]
+    assert [row["entity"]["type"] for row in rows] == ["location", "company", "company"]
+
+    _, rows = _run(lambda service: service.typeahead("ZQXT", limit=10))
+    assert _names(rows) == ["Zqxt Aardvark", "Zqxt Alpha", "Zqxt Beta", "Zqxt Charlie", "Zqxt Delta"]
+
+    _, rows = _run(lambda service: service.typeahead("zqx_", types=["company"]))
+    assert _names(rows) == ["Zqx_beta 100% Organic"]
+
+
+def test_typeahead_filters_by_parent_and_access() -> None:
+    def scoped(ids):
+        return AccessIndex(
+            "user-1",
+            scoped=True,
+            nodes={"company": [ids["Zqxt Beta"]], "location": [ids["Zqxt Charlie"]]},
+            ancestors={"group": [ids["Zqxalpha"]]},
+        )
+
+    _, rows = _run(lambda service: service.typeahead("zqxt", limit=10), access=scoped)
+    assert _names(rows) == ["Zqxt Beta", "Zqxt Charlie"]
+
+    async def under_alpha(service):
+        company_id = (await service.typeahead("zqxt alpha", types=["company"]))[0]["entity"]["id"]
+        return await service.typeahead("zqxt", types=["location"], parent_id=company_id)
+
+    _, rows = _run(under_alpha)
+    assert _names(rows) == ["Zqxt Aardvark"]
@@ -0,0 +1,140 @@
+"""Background job progress tests.
+
+Run real job handlers through the shared job engine against the test DB (see
+app/tests/db.py): the engine and the module session factories are pointed at
+one rolled-back connection. Every progress report is recorded on its way to
+the job's progress document, so these check that handlers report once per
+batch and that get_job_status shows the last report. The SKU upload job also
+must read its CSV from the upload row rather than from the job payload, and
+drop it once processing ends.
+Skips only if no DB is reachable.
+"""
+
+import asyncio
+import csv
+import io
+
+from sqlalchemy import func, select
+from starlette.datastructures import Headers, UploadFile
+
+from app.modules.customer_hierarchy.schemas.bulk import BulkCreateRequestSchema
+from app.modules.customer_hierarchy.services import job_handlers
+from app.modules.products.api.v1 import sku_upload
+from app.modules.products.models.sku_upload import SKUUpload, SKUUploadItem
+from app.tests.db import rolled_back_connection, savepoint_session_factory
+from orderly_fastapi_core.background_jobs import BackgroundJobService, background_jobs
+from orderly_fastapi_core.models.background_job import BackgroundJobRecord
+
+ROWS = 120
+
+
+def _csv(rows: int) -> bytes:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=["product_name", "category_name", "weight"])
+    writer.writeheader()
+    for index in range(rows):
+        writer.writerow({"product_name": f"測試商品 {index}", "category_name": "蔬菜", "weight": "1.5"})
+    return output.getvalue().encode("utf-8")
+
+
+def _record_progress(monkeypatch):
+    reports = []
+    touch = BackgroundJobService._touch
+
+    async def recording_touch(self, job_id, progress):
+        reports.append(dict(progress))
+        return await touch(self, job_id, progress)
+
+    monkeypatch.setattr(BackgroundJobService, "_touch", recording_touch)
+    return reports
+
+
+async def _execute(factory, job_id):
+    """Claim and run one submitted job; returns its status document"""
+    async with factory() as session:
+        record = await session.get(BackgroundJobRecord, job_id)
+        record.scheduled_at = func.now()  # now() is frozen inside the test transaction
+        await session.commit()
+        job_type = record.job_type
+    job = await background_jobs._claim(job_type)
+    assert job["id"] == job_id
+    await background_jobs._execute_job(job, "test-worker")
+    return await background_jobs.get_job_status(job_id)
+
+
+def _run(monkeypatch, body, *modules):
+    async def _main():
+        async with rolled_back_connection() as connection:
+            factory = savepoint_session_factory(connection)
+            monkeypatch.setattr(background_jobs, "_session_factory", factory)
+            for module in modules:
+                monkeypatch.setattr(module, "AsyncSessionLocal", factory)
+            return await body(factory)
+
+    return asyncio.run(_main())
+
+
+def test_sku_upload_job_reads_the_stored_csv_and_reports_progress_per_batch(monkeypatch) -> None:
+    reports = _record_progress(monkeypatch)
+
+    async def body(factory):
+        file = UploadFile(io.BytesIO(_csv(ROWS)), filename="skus.csv", headers=Headers({"content-type": "text/csv"}))
+        async with factory() as db:
+            response = await sku_upload.upload_sku_batch(file=file, user_id="user-1", organization_id=None, db=db)
+        async with factory() as session:
+            record = (
+                await session.execute(
+                    select(BackgroundJobRecord).where(
+                        BackgroundJobRecord.payload["upload_id"].as_string() == response.id
+                    )
+                )
+            ).scalar_one()
+            stored = (
+                await session.execute(select(SKUUpload.file_content).where(SKUUpload.id == response.id))
+            ).scalar_one()
+        status = await _execute(factory, record.id)
+        async with factory() as session:
+            upload = await session.get(SKUUpload, response.id, populate_existing=True)
+            remaining = (
+                await session.execute(select(SKUUpload.file_content).where(SKUUpload.id == response.id))
+            ).scalar_one()
+            items = (
+                await session.execute(
+                    select(func.count(SKUUploadItem.id)).where(SKUUploadItem.upload_id == response.id)
+                )
+            ).scalar_one()
+        return record.payload, stored, remaining, status, upload, items
+
+    payload, stored, remaining, status, upload, items = _run(monkeypatch, body, sku_upload)
+    assert payload == {"upload_id": upload.id, "user_id": "user-1"}
+    assert stored == _csv(ROWS).decode("utf-8")
+    assert remaining is None
+
+    assert status["status"] == "completed"
+    assert status["progress"] == {"stage": "creating_items", "processed": ROWS, "total": ROWS}
+    assert [report["processed"] for report in reports] == [0, 50, 100, ROWS]
+    assert upload.status in ("completed", "review_required")
+    assert (upload.processed_rows, items) == (ROWS, ROWS)
+
+
+def test_bulk_create_job_reports_progress_per_batch(monkeypatch) -> None:
+    reports = _record_progress(monkeypatch)
+    bulk_data = BulkCreateRequestSchema(
+        entities=[{"entity_type": "group", "data": {"name": f"Group {index}"}} for index in range(ROWS)],
+        batch_size=50,
+    )
+
+    async def body(factory):
+        job_id = await background_jobs.submit_job(
+            job_handlers.BULK_CREATE_JOB,
+            job_handlers.bulk_payload("op-progress", "bulk_data", bulk_data, "user-1", None),
+        )
+        return await _execute(factory, job_id)
+
+    status = _run(monkeypatch, body, job_handlers)
+    assert status["status"] == "completed"
+    assert [(report["processed"], report.get("current_batch")) for report in reports] == [
+        (0, None), (50, 1), (100, 2), (ROWS, 3),
+    ]
+    assert reports[0]["status"] == "processing"
+    assert status["progress"]["processed"] == status["progress"]["total"] == ROWS
@@ -0,0 +1,153 @@
+"""Document number allocator tests.
+
+Several workers lease blocks from the same number_sequences row while their
+own coroutines race for numbers, so these check that concurrent allocation
+never repeats a number — first against an in-memory counter (no DB needed),
+then against the test DB test_fk_audit uses. The DB cases also cover the
+benchmark harness shape: a session bound to a connection with an outer
+transaction (join_transaction_mode="create_savepoint") that is rolled back.
+Skips the DB cases only if no DB is reachable.
+"""
+
+import asyncio
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from orderly_fastapi_core.ids import NumberAllocator
+from orderly_fastapi_core.models.number_sequence import NumberSequence
+
+DAY = date(2000, 1, 1)
+
+
+class _MemoryAllocator(NumberAllocator):
+    """Leases from a counter shared by every allocator (one per simulated worker)."""
+
+    def __init__(self, counter: dict, block_size: int):
+        super().__init__(block_size=block_size)
+        self.counter = counter
+
+    async def _lease(self, bind, name, period):
+        await asyncio.sleep(0)  # let other workers interleave mid-lease
+        key = (name, period)
+        end = self.counter.get(key, 1) + self.block_size
+        self.counter[key] = end
+        return end
+
+
+def test_concurrent_allocation_never_repeats_a_number() -> None:
+    counter: dict = {}
+    workers = [_MemoryAllocator(counter, block_size=3) for _ in range(4)]
+
+    async def _run():
+        return await asyncio.gather(
+            *(worker.next_value(None, "order", "20000101") for worker in workers for _ in range(25))
+        )
+
+    values = asyncio.run(_run())
+    assert len(set(values)) == len(values) == 100
+    # workers only leave gaps at the tail of their last block
+    assert min(values) == 1
+    assert max(values) < counter[("order", "20000101")] <= 100 + 4 * 3 + 1
+
+
+def test_day_change_drops_the_previous_block() -> None:
+    allocator = _MemoryAllocator({}, block_size=5)
+
+    async def _run():
+        first = await allocator.next_value(None, "order", "20000101")
+        second = await allocator.next_value(None, "order", "20000102")
+        return first, second
+
+    assert asyncio.run(_run()) == (1, 1)
+    assert list(allocator._blocks) == [("order", "20000102")]
+
+
+def _database_url() -> str:
+    from app.modules.users.core.config import settings
+
+    return settings.get_database_url_async()
+
+
+async def _engine_or_skip():
+    engine = create_async_engine(_database_url())
+    try:
+        async with engine.connect():
+            pass
+    except (DBAPIError, OSError) as exc:  # no DB locally → DB-free smoke run, skip
+        await engine.dispose()
+        pytest.skip(f"DB not reachable, skipping allocator DB tests: {exc}")
+    return engine
+
+
+async def _stored_next_value(engine, name: str) -> int:
+    async with engine.connect() as connection:
+        return (
+            await connection.execute(
+                select(NumberSequence.next_value).where(
+                    NumberSequence.name == name, NumberSequence.period == DAY.strftime("%Y%m%d")
+                )
+            )
+        ).scalar_one()
+
+
+def test_concurrent_workers_against_the_database() -> None:
+    async def _run():
+        engine = await _engine_or_skip()
+        name = f"t-{uuid.uuid4().hex[:12]}"
+        workers = [NumberAllocator(block_size=3) for _ in range(3)]
+        try:
+            sessions = [AsyncSession(bind=engine) for _ in workers]
+            numbers = await asyncio.gather(
+                *(
+                    worker.next_number(session, name, "T", width=3, day=DAY)
+                    for worker, session in zip(workers, sessions)
+                    for _ in range(10)
+                )
+            )
+            for session in sessions:
+                await session.close()
+            return numbers, await _stored_next_value(engine, name)
+        finally:
+            await engine.dispose()
+
+    numbers, stored = asyncio.run(_run())
+    assert len(set(numbers)) == 30
+    assert all(number.startswith("T-20000101-") for number in numbers)
+    # every number issued came from a committed lease
+    assert max(int(number.rsplit("-", 1)[1]) for number in numbers) < stored
+
+
+def test_connection_bound_session_leases_outside_the_outer_transaction() -> None:
+    async def _run():
+        engine = await _engine_or_skip()
+        name = f"c-{uuid.uuid4().hex[:12]}"
+        allocator = NumberAllocator(block_size=4)
+        try:
+            async with engine.connect() as connection:
+                transaction = await connection.begin()
+                session = AsyncSession(
+                    bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False
+                )
+                first = await allocator.next_number(session, name, "C", day=DAY)
+                await session.rollback()
+                second = await allocator.next_number(session, name, "C", day=DAY)
+                await session.close()
+                await transaction.rollback()
+            # the lease survived both the savepoint and the outer rollback
+            stored = await _stored_next_value(engine, name)
+            allocator._blocks.clear()
+            async with AsyncSession(bind=engine) as session:
+                after_restart = await allocator.next_number(session, name, "C", day=DAY)
+            return first, second, stored, after_restart
+        finally:
+            await engine.dispose()
+
+    first, second, stored, after_restart = asyncio.run(_run())
+    assert (first, second) == ("C-20000101-000001", "C-20000101-000002")
+    assert stored == 5
+    assert after_restart == "C-20000101-000005"
@@ -0,0 +1,173 @@
+"""Batch order-item edit and optimistic locking tests.
+
+Runs OrderService against the test DB (see app/tests/db.py): a stale version or
+an order that already left draft is rejected with 409 before anything is
+written, a successful batch recomputes totals once and bumps the version, and
+the set-based bulk status UPDATE bumps it too, so an edit prepared before a
+status change can no longer be applied.
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.models.order import Order
+from app.modules.orders.schemas.order import OrderStatusUpdate
+from app.modules.orders.schemas.order_item import OrderItemBatchRequest
+from app.modules.orders.services.order_service import OrderService
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import seed_catalog, seed_orders, seed_organizations
+
+
+async def _seed(ctx) -> None:
+    await seed_organizations(ctx)
+    await seed_catalog(ctx)
+    await seed_orders(ctx, count=2, lines=3, status=OrderStatus.DRAFT)
+
+
+async def _stored_version(ctx, order_id: str) -> int:
+    return (await ctx.session.execute(select(Order.__table__.c.version).where(Order.id == order_id))).scalar_one()
+
+
+def _run(body):
+    async def _main():
+        async with rolled_back_context(seed=47) as ctx:
+            await _seed(ctx)
+            return await body(ctx)
+
+    return asyncio.run(_main())
+
+
+def test_version_mismatch_is_a_conflict() -> None:
+    async def body(ctx):
+        order_id = ctx.data["order_ids"][0]
+        order = await OrderService.get_order_by_id(ctx.session, order_id, ctx.data["restaurant_id"])
+        item = order.items[0]
+        with pytest.raises(HTTPException) as exc_info:
+            await OrderService.edit_order_items(
+                ctx.session,
+                order_id,
+                ctx.data["restaurant_id"],
+                OrderItemBatchRequest(version=order.version + 1, operations=[{"op": "delete", "itemId": item.id}]),
+                ctx.data["restaurant_id"],
+            )
+        return exc_info.value.status_code, len(order.items), await _stored_version(ctx, order_id)
+
+    status_code, item_count, version = _run(body)
+    assert status_code == 409
+    assert (item_count, version) == (3, 1)
+
+
+def test_non_draft_order_is_a_conflict() -> None:
+    async def body(ctx):
+        order_id = ctx.data["order_ids"][0]
+        tenant_id = ctx.data["restaurant_id"]
+        order = await OrderService.get_order_by_id(ctx.session, order_id, tenant_id)
+        order.status = OrderStatus.SUBMITTED
+        await ctx.session.flush()
+        with pytest.raises(HTTPException) as exc_info:
+            await OrderService.edit_order_items(
+                ctx.session,
+                order_id,
+                tenant_id,
+                OrderItemBatchRequest(
+                    version=order.version, operations=[{"op": "delete", "itemId": order.items[0].id}]
+                ),
+                tenant_id,
+            )
+        return exc_info.value.status_code
+
+    assert _run(body) == 409
+
+
+def test_successful_batch_recomputes_totals_once_and_bumps_version() -> None:
+    async def body(ctx):
+        order_id = ctx.data["order_ids"][0]
+        tenant_id = ctx.data["restaurant_id"]
+        order = await OrderService.get_order_by_id(ctx.session, order_id, tenant_id)
+        first, second, third = sorted(order.items, key=lambda item: item.sort_order)
+        sku = next(sku for sku in ctx.data["skus"] if sku["sku_id"] not in {i.sku_id for i in order.items})
+        edited = await OrderService.edit_order_items(
+            ctx.session,
+            order_id,
+            tenant_id,
+            OrderItemBatchRequest(
+                version=1,
+                operations=[
+                    {"op": "update", "itemId": first.id, "changes": {"quantity": "2", "unitPrice": "10.005"}},
+                    {"op": "delete", "itemId": second.id},
+                    {"op": "reorder", "itemId": third.id, "sortOrder": 0},
+                    {
+                        "op": "add",
+                        "item": {
+                            "skuId": sku["sku_id"],
+                            "productId": sku["product_id"],
+                            "productCode": sku["product_code"],
+                            "productName": sku["product_name"],
+                            "quantity": "1.5",
+                            "unitPrice": "3.3",
+                        },
+                    },
+                ],
+            ),
+            tenant_id,
+        )
+        return edited, await _stored_version(ctx, order_id)
+
+    edited, stored_version = _run(body)
+    assert edited.version == stored_version == 2
+    assert len(edited.items) == 3
+    lines = {item.line_total for item in edited.items}
+    assert Decimal("20.01") in lines and Decimal("4.95") in lines
+    expected = OrderService.calculate_order_totals(list(edited.items), edited.adjustments)
+    assert (edited.subtotal, edited.tax_amount, edited.total_amount) == (
+        expected["subtotal"],
+        expected["tax_amount"],
+        expected["total_amount"],
+    )
+
+
+def test_concurrent_modification_at_commit_is_a_conflict() -> None:
+    async def body(ctx):
+        order_id = ctx.data["order_ids"][0]
+        tenant_id = ctx.data["restaurant_id"]
+        order = await OrderService.get_order_by_id(ctx.session, order_id, tenant_id)
+        # another writer bumps the row after this session loaded version 1
+        table = Order.__table__
+        await ctx.session.execute(
+            update(table).where(table.c.id == order_id).values(version=table.c.version + 1)
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            await OrderService.edit_order_items(
+                ctx.session,
+                order_id,
+                tenant_id,
+                OrderItemBatchRequest(version=1, operations=[{"op": "delete", "itemId": order.items[0].id}]),
+                tenant_id,
+            )
+        return exc_info.value.status_code
+
+    assert _run(body) == 409
+
+
+def test_bulk_status_update_bumps_version() -> None:
+    async def body(ctx):
+        tenant_id = ctx.data["restaurant_id"]
+        result = await OrderService.bulk_update_order_status(
+            ctx.session,
+            ctx.data["order_ids"],
+            tenant_id,
+            OrderStatusUpdate(status=OrderStatus.SUBMITTED),
+            tenant_id,
+            role="admin",
+        )
+        versions = [await _stored_version(ctx, order_id) for order_id in ctx.data["order_ids"]]
+        return result, versions
+
+    result, versions = _run(body)
+    assert not result["failed"]
+    assert versions == [2, 2]
@@ -0,0 +1,94 @@
+"""Order totals engine property tests.
+
+The integer engine must reproduce the Decimal rules OrderService used before
+it (round(x, 2), i.e. ROUND_HALF_EVEN), so these generate random orders —
+including half-cent ties, surcharges, negative adjustments and float JSON
+amounts — and compare every field against a verbatim copy of those rules.
+"""
+
+import random
+from decimal import Decimal
+
+from orderly_fastapi_core import money
+
+ADJUSTMENT_TYPES = ("discount", "credit", "shipping_fee", "surcharge", "other")
+
+
+def _reference_line_total(quantity, unit_price):
+    return round(quantity * unit_price, 2)
+
+
+def _reference_totals(line_totals, adjustments=None, tax_rate=Decimal("0.05")):
+    subtotal = sum(Decimal(str(lt)) if lt else Decimal("0") for lt in line_totals)
+    discount_amount = Decimal("0")
+    shipping_fee = Decimal("0")
+    if adjustments:
+        for adj in adjustments:
+            adj_type = adj.get("type") or adj.get("adjustment_type", "")
+            amount = Decimal(str(adj.get("amount", 0)))
+            if adj_type in ["discount", "credit"]:
+                discount_amount += amount
+            elif adj_type == "shipping_fee":
+                shipping_fee += amount
+            elif adj_type == "surcharge":
+                subtotal += amount
+    taxable_amount = subtotal - discount_amount
+    if taxable_amount < 0:
+        taxable_amount = Decimal("0")
+    tax_amount = round(taxable_amount * tax_rate, 2)
+    total_amount = taxable_amount + tax_amount + shipping_fee
+    return {
+        "subtotal": round(subtotal, 2),
+        "tax_amount": tax_amount,
+        "discount_amount": round(discount_amount, 2),
+        "shipping_fee": round(shipping_fee, 2),
+        "total_amount": round(total_amount, 2),
+    }
+
+
+def _decimal(rng, places, high):
+    return Decimal(rng.randint(0, high * 10 ** places)).scaleb(-places)
+
+
+def _adjustment(rng):
+    amount = Decimal(rng.randint(-5000, 50000)).scaleb(-rng.choice((0, 2, 3, 4)))
+    if rng.random() < 0.2:
+        amount = float(amount)
+    key = "type" if rng.random() < 0.5 else "adjustment_type"
+    return {key: rng.choice(ADJUSTMENT_TYPES), "amount": amount}
+
+
+def test_line_total_matches_decimal_rounding() -> None:
+    rng = random.Random(48)
+    for _ in range(5000):
+        quantity = _decimal(rng, 3, 500)
+        unit_price = _decimal(rng, 4, 2000)
+        assert money.line_total(quantity, unit_price) == _reference_line_total(quantity, unit_price)
+    # exact half-cent ties round to even
+    assert money.line_total(Decimal("1.000"), Decimal("0.0250")) == Decimal("0.02")
+    assert money.line_total(Decimal("1.000"), Decimal("0.0350")) == Decimal("0.04")
+
+
+def test_order_totals_match_decimal_rules() -> None:
+    rng = random.Random(4848)
+    for _ in range(3000):
+        lines = [
+            _reference_line_total(_decimal(rng, 3, 100), _decimal(rng, 4, 500))
+            for _ in range(rng.randint(0, 30))
+        ]
+        adjustments = [_adjustment(rng) for _ in range(rng.randint(0, 4))]
+        tax_rate = rng.choice((Decimal("0.05"), Decimal("0"), Decimal("0.0875"), Decimal("0.125")))
+        assert money.order_totals(lines, adjustments, tax_rate) == _reference_totals(
+            lines, adjustments, tax_rate
+        )
+
+
+def test_batch_totals_and_inexact_fallback() -> None:
+    orders = {
+        "a": ([Decimal("10.01"), Decimal("0.49")], [{"type": "discount", "amount": 0.1}]),
+        "b": ([Decimal("99.99")], [{"type": "surcharge", "amount": Decimal("0.123456")}]),
+        "c": ([], None),
+    }
+    totals = money.batch_totals(orders)
+    for key, (lines, adjustments) in orders.items():
+        assert totals[key] == _reference_totals(lines, adjustments)
@@ -0,0 +1,122 @@
+"""Principal cache invalidation tests.
+
+The users module caches User / Organization snapshots per process, keyed by a
+version kept in Redis. These check that an ORM update only invalidates once
+its transaction commits (not on flush or rollback), that an invalidation in
+one worker is seen by another worker's cache, that a fill racing with an
+invalidation is not served, and that the cache never serves entries while
+Redis is unreachable. Each test uses its own RedisManager (the shared one is
+bound to a single event loop). Skips only if no DB or Redis is reachable.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.modules.users.models.user import User
+from app.modules.users.services import principal_service
+from app.tests.db import rolled_back_context, savepoint_session_factory
+from benchmarks.datasets import seed_organizations
+from orderly_fastapi_core import RedisManager, SharedPrincipalCache
+
+
+async def _redis_or_skip(manager: RedisManager) -> None:
+    try:
+        await manager.client("principal").ping()
+    except Exception as exc:
+        pytest.skip(f"Redis not reachable, skipping principal cache tests: {exc}")
+
+
+def test_user_updates_invalidate_the_cache_only_after_commit(monkeypatch) -> None:
+    cache = SharedPrincipalCache(manager=RedisManager())
+    monkeypatch.setattr(principal_service, "principal_cache", cache)
+
+    async def cached(key):
+        await asyncio.gather(*cache._pending)
+        return (await cache.lookup(key))[0] is not None
+
+    async def deactivate(factory, user_id, key, commit):
+        async with factory() as writer:
+            user = await writer.get(User, user_id)
+            user.is_active = False
+            await writer.flush()
+            flushed = await cached(key)
+            await (writer.commit() if commit else writer.rollback())
+        return flushed
+
+    async def _main():
+        await _redis_or_skip(cache.manager)
+        async with rolled_back_context(seed=33) as ctx:
+            await seed_organizations(ctx)
+            user = User(
+                id=str(uuid.uuid4()), organization_id=ctx.data["restaurant_id"], role="restaurant_admin", permissions=[]
+            )
+            ctx.session.add(user)
+            await ctx.session.commit()
+            factory = savepoint_session_factory(ctx.session.bind)
+            key = principal_service._user_key(user.id)
+
+            async with factory() as reader:
+                first = await principal_service.load_principal_user(reader, user.id)
+            results = {"filled": await cached(key)}
+            results["after flush"] = await deactivate(factory, user.id, key, commit=False)
+            results["after rollback"] = await cached(key)
+            results["after flush before commit"] = await deactivate(factory, user.id, key, commit=True)
+            results["after commit"] = await cached(key)
+            async with factory() as reader:
+                reloaded = await principal_service.load_principal_user(reader, user.id)
+            return first.is_active, results, reloaded.is_active
+
+    was_active, results, is_active = asyncio.run(_main())
+    assert was_active and not is_active
+    assert results == {
+        "filled": True,
+        "after flush": True,
+        "after rollback": True,
+        "after flush before commit": True,
+        "after commit": False,
+    }
+
+
+def test_invalidation_reaches_other_workers() -> None:
+    async def _main():
+        manager = RedisManager()
+        await _redis_or_skip(manager)
+        # two workers: separate in-process caches over the same Redis
+        worker_a, worker_b = SharedPrincipalCache(manager=manager), SharedPrincipalCache(manager=manager)
+        key = f"users:user:{uuid.uuid4()}"
+
+        _, version = await worker_b.lookup(key)
+        worker_b.store(key, "snapshot", version)
+        before = (await worker_b.lookup(key))[0]
+
+        worker_a.invalidate(key)
+        await asyncio.gather(*worker_a._pending)
+        after = await worker_b.lookup(key)
+
+        # a fill that read the DB before the invalidation landed is stored under the old version
+        _, stale_version = await worker_b.lookup(key)
+        worker_a.invalidate(key)
+        await asyncio.gather(*worker_a._pending)
+        worker_b.store(key, "stale snapshot", stale_version)
+        raced = (await worker_b.lookup(key))[0]
+        return before, after, version, raced
+
+    before, after, version, raced = asyncio.run(_main())
+    assert before == "snapshot"
+    assert after[0] is None and after[1] != version
+    assert raced is None
+
+
+def test_nothing_is_served_while_redis_is_unreachable() -> None:
+    async def _main():
+        cache = SharedPrincipalCache(manager=RedisManager(url="redis://127.0.0.1:1/0", socket_connect_timeout=0.5))
+        key = f"users:user:{uuid.uuid4()}"
+        value, version = await cache.lookup(key)
+        cache.store(key, "snapshot", version)
+        return value, version, await cache.lookup(key)
+
+    value, version, again = asyncio.run(_main())
+    assert (value, version) == (None, None)
+    assert again == (None, None)
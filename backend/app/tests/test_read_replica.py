@@ -0,0 +1,195 @@
+"""Read replica routing tests.
+
+Drive ReadReplicaRouter against real Postgres: the replica is the first URL in
+DATABASE_REPLICA_URLS (e.g. a local streaming standby) or, when unset, the
+test DB itself, which reports zero lag as a non-standby. Covers routing to a
+caught-up replica, the read-only guard on replica sessions, falling back to
+the primary when a replica is unreachable, hangs or lags, and read-your-writes
+stickiness after a committed write (in this process and, via Redis, in
+another worker). Skips only if no DB (or, for stickiness, no Redis) is
+reachable.
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.requests import Request
+
+from orderly_fastapi_core import database
+from orderly_fastapi_core.database import ReadReplicaRouter, _env_urls, get_async_session_dependency
+from orderly_fastapi_core.redis_manager import RedisManager
+
+
+def _primary_url() -> str:
+    from app.modules.users.core.config import settings
+
+    return settings.get_database_url_async()
+
+
+def _replica_url() -> str:
+    urls = _env_urls("DATABASE_REPLICA_URLS")
+    return urls[0] if urls else _primary_url()
+
+
+async def _reachable_or_skip(url: str) -> None:
+    engine = create_async_engine(url, poolclass=NullPool)
+    try:
+        async with engine.connect():
+            pass
+    except (DBAPIError, OSError) as exc:  # no DB locally → DB-free smoke run, skip
+        pytest.skip(f"DB not reachable, skipping read replica tests: {exc}")
+    finally:
+        await engine.dispose()
+
+
+def _run(body, **options):
+    async def _main():
+        await _reachable_or_skip(_replica_url())
+        router = ReadReplicaRouter(replica_urls=[_replica_url()], lag_check_interval=0, **options)
+        try:
+            return await body(router)
+        finally:
+            await router.dispose()
+
+    return asyncio.run(_main())
+
+
+async def _hanging_server():
+    """TCP server that accepts connections and never answers (a wedged replica)"""
+    connections = []
+
+    async def accept(reader, writer):
+        connections.append(writer)
+
+    server = await asyncio.start_server(accept, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_reads_go_to_a_caught_up_replica() -> None:
+    async def body(router):
+        factory = await router.read_session_factory()
+        async with factory() as session:
+            read_only = (await session.execute(text("SHOW transaction_read_only"))).scalar_one()
+        return factory, read_only, router._replicas[0]
+
+    factory, read_only, replica = _run(body)
+    assert factory is replica.session_factory
+    assert replica.lag is not None and replica.lag <= 5
+    assert read_only == "on"
+
+
+def test_replica_sessions_refuse_writes() -> None:
+    async def body(router):
+        factory = await router.read_session_factory()
+        async with factory() as session:
+            with pytest.raises(DBAPIError, match="read-only transaction"):
+                await session.execute(text("DELETE FROM users WHERE false"))
+
+    _run(body)
+
+
+def test_unreachable_or_lagging_replicas_fall_back_to_the_primary() -> None:
+    async def body(router):
+        lagging = ReadReplicaRouter(replica_urls=[_replica_url()], max_lag_seconds=-1, lag_check_interval=0)
+        down = ReadReplicaRouter(
+            replica_urls=[make_url(_replica_url()).set(port=1).render_as_string(hide_password=False), _replica_url()],
+            lag_check_interval=60,
+            connect_timeout=1,
+        )
+        try:
+            results = {
+                "lagging": await lagging.read_session_factory(),
+                # the broken replica is skipped for the healthy one, and not re-probed within the interval
+                "down then healthy": await down.read_session_factory(),
+                "healthy again": await down.read_session_factory(),
+            }
+            return results, [replica.lag for replica in down._replicas], down._replicas[1].session_factory
+        finally:
+            await lagging.dispose()
+            await down.dispose()
+
+    results, lags, healthy = _run(body)
+    assert results["lagging"] is None
+    assert results["down then healthy"] is results["healthy again"] is healthy
+    assert lags[0] is None and lags[1] is not None
+
+
+def test_a_hanging_replica_is_abandoned_after_the_connect_timeout() -> None:
+    async def body(router):
+        server, port = await _hanging_server()
+        wedged = ReadReplicaRouter(
+            replica_urls=[f"postgresql+asyncpg://orderly:x@127.0.0.1:{port}/orderly"], connect_timeout=0.5
+        )
+        try:
+            started = time.monotonic()
+            factory = await wedged.read_session_factory()
+            return factory, time.monotonic() - started, wedged._replicas[0].lag
+        finally:
+            await wedged.dispose()
+            server.close()
+
+    factory, elapsed, lag = _run(body)
+    assert factory is None and lag is None
+    assert elapsed < 3
+
+
+def test_committed_writes_pin_the_user_to_the_primary(monkeypatch) -> None:
+    # the shared manager is bound to one event loop; this test runs its own
+    redis = RedisManager()
+    monkeypatch.setattr(database, "redis_manager", redis)
+    principal = f"user-{uuid.uuid4()}"
+
+    async def write(router, statement, commit=True):
+        engine = create_async_engine(_primary_url(), poolclass=NullPool)
+        dependency = get_async_session_dependency(
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), router
+        )
+        request = Request({"type": "http", "headers": [], "state": {"user_id": principal}})
+        sessions = dependency(request)
+        session = await sessions.__anext__()
+        try:
+            await session.execute(text("CREATE TEMP TABLE IF NOT EXISTS ryw_probe (x int)"))
+            await session.execute(text(statement))
+            await (session.commit() if commit else session.rollback())
+        finally:
+            await sessions.aclose()
+            await engine.dispose()
+        await asyncio.gather(*router._pending)
+
+    async def body(router):
+        try:
+            await redis.client("db-routing").ping()
+        except Exception as exc:
+            pytest.skip(f"Redis not reachable, skipping read-your-writes tests: {exc}")
+
+        await write(router, "INSERT INTO ryw_probe VALUES (1)", commit=False)
+        after_rollback = await router.read_session_factory(principal)
+
+        await write(router, "INSERT INTO ryw_probe VALUES (1)")
+        other_worker = ReadReplicaRouter(replica_urls=router.replica_urls, sticky_seconds=0.5, lag_check_interval=0)
+        try:
+            results = {
+                "after rollback": after_rollback,
+                "after commit": await router.read_session_factory(principal),
+                "another user": await router.read_session_factory(f"user-{uuid.uuid4()}"),
+                "another worker": await other_worker.read_session_factory(principal),
+            }
+            await asyncio.sleep(0.7)
+            results["after the window"] = await router.read_session_factory(principal)
+        finally:
+            await other_worker.dispose()
+        return results
+
+    results = _run(body, sticky_seconds=0.5)
+    assert results["after rollback"] is not None
+    assert results["after commit"] is None
+    assert results["another user"] is not None
+    assert results["another worker"] is None
+    assert results["after the window"] is not None
@@ -0,0 +1,176 @@
+"""Reconciliation engine SQL contract tests.
+
+The order ↔ acceptance match runs as a single INSERT ... SELECT inside Postgres,
+so these compile the statement against the postgresql dialect (no DB needed)
+and assert the shape that matters: it reads the acceptance tables, keeps only
+the latest acceptance per order, and writes every reconciliation_items column
+the Python path used to populate. The matching behaviour itself runs against
+the test DB test_fk_audit uses (see app/tests/db.py): several acceptances per
+order, of which only the latest counts, and orders whose lines do not match
+show up as discrepancies in the items and the summary. Skips the DB case only
+if no DB is reachable.
+"""
+
+import asyncio
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.modules.acceptance.models.acceptance import Acceptance, AcceptanceItem
+from app.modules.billing.models.enums import DiscrepancyType
+from app.modules.billing.models.reconciliation import ReconciliationItem
+from app.modules.billing.services.reconciliation_engine import ReconciliationEngine
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.models.order import OrderItem
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import seed_catalog, seed_orders, seed_organizations
+
+
+class _RecordingSession:
+    def __init__(self) -> None:
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+        class _Result:
+            rowcount = 0
+
+        return _Result()
+
+
+def _compiled_insert() -> str:
+    session = _RecordingSession()
+    engine = ReconciliationEngine(session)
+    asyncio.run(
+        engine._insert_matched_items(
+            "00000000-0000-0000-0000-000000000001",
+            "tenant",
+            "restaurant",
+            "supplier",
+            date(2026, 1, 1),
+            date(2026, 1, 31),
+        )
+    )
+    assert len(session.statements) == 1
+    return str(session.statements[0].compile(dialect=postgresql.dialect()))
+
+
+def test_match_is_one_insert_from_select_over_acceptances() -> None:
+    sql = _compiled_insert()
+    assert sql.startswith("WITH latest_acceptance AS")
+    assert "INSERT INTO reconciliation_items" in sql
+    assert "DISTINCT ON (acceptances.\"orderId\")" in sql
+    assert "JOIN acceptance_items" in sql
+
+
+def test_match_populates_difference_and_match_columns() -> None:
+    sql = _compiled_insert()
+    insert_columns = sql.split("INSERT INTO reconciliation_items (", 1)[1].split(")", 1)[0]
+    for column in (
+        "quantity_difference",
+        "price_difference",
+        "amount_difference",
+        "discrepancy_type",
+        "is_matched",
+        "match_confidence",
+    ):
+        assert column in insert_columns
+
+
+async def _accept(ctx, order_id, accepted_at, quantities):
+    """One acceptance of `order_id`; `quantities` maps product_code to the accepted quantity (text)."""
+    acceptance = Acceptance(
+        id=uuid.UUID(int=ctx.rng.getrandbits(128), version=4),
+        order_id=order_id,
+        restaurant_id=ctx.data["restaurant_id"],
+        supplier_id=ctx.data["supplier_id"],
+        status="completed",
+        created_at=accepted_at,
+    )
+    ctx.session.add(acceptance)
+    for product_code, accepted in quantities.items():
+        ctx.session.add(AcceptanceItem(
+            acceptance_id=acceptance.id,
+            product_code=product_code,
+            product_name=product_code,
+            delivered_qty=accepted,
+            accepted_qty=accepted,
+        ))
+    await ctx.session.flush()
+
+
+def test_latest_acceptance_wins_and_unmatched_orders_are_reported() -> None:
+    async def _run():
+        async with rolled_back_context(seed=26) as ctx:
+            await seed_organizations(ctx)
+            await seed_catalog(ctx)
+            await seed_orders(ctx, count=4, lines=3, status=OrderStatus.DELIVERED)
+            relabelled, partial, untouched, short_delivery = ctx.data["order_ids"]
+            items = (
+                await ctx.session.execute(
+                    select(OrderItem)
+                    .where(OrderItem.order_id.in_(ctx.data["order_ids"]))
+                    .order_by(OrderItem.sort_order)
+                )
+            ).scalars().all()
+            lines = {order_id: [item for item in items if item.order_id == order_id] for order_id in ctx.data["order_ids"]}
+
+            def full(order_id):
+                return {item.product_code: str(item.quantity) for item in lines[order_id]}
+
+            # relabelled: an early short acceptance, then a full one, inserted newest first
+            await _accept(ctx, relabelled, datetime(2026, 1, 3, tzinfo=timezone.utc), full(relabelled))
+            await _accept(
+                ctx, relabelled, datetime(2026, 1, 2, tzinfo=timezone.utc),
+                {code: "0" for code in full(relabelled)},
+            )
+            # partial: a full acceptance superseded by one that is short on a line and misses another
+            first, second, third = lines[partial]
+            await _accept(ctx, partial, datetime(2026, 1, 2, tzinfo=timezone.utc), full(partial))
+            await _accept(
+                ctx, partial, datetime(2026, 1, 4, tzinfo=timezone.utc),
+                {first.product_code: str(first.quantity / 2), second.product_code: str(second.quantity)},
+            )
+            # short_delivery: no acceptance, falls back to the order line's delivered quantity
+            lines[short_delivery][0].delivered_quantity = lines[short_delivery][0].quantity - 1
+            await ctx.session.flush()
+
+            tenant_id = ctx.data["restaurant_id"]
+            reconciliation = await ReconciliationEngine(ctx.session).run_auto_reconciliation(
+                tenant_id, tenant_id, ctx.data["supplier_id"], date(2026, 1, 1), date(2026, 1, 31), commit=False
+            )
+            rows = (
+                await ctx.session.execute(
+                    select(ReconciliationItem).where(ReconciliationItem.reconciliation_id == reconciliation.id)
+                )
+            ).scalars().all()
+            return reconciliation, rows, lines, (relabelled, partial, untouched, short_delivery)
+
+    reconciliation, rows, lines, (relabelled, partial, untouched, short_delivery) = asyncio.run(_run())
+    by_line = {(row.order_id, row.product_code): row for row in rows}
+    assert len(rows) == 12
+
+    # the latest acceptance decides, whatever order the acceptances were written in
+    assert all(by_line[(relabelled, item.product_code)].is_matched for item in lines[relabelled])
+    first, second, third = lines[partial]
+    short = by_line[(partial, first.product_code)]
+    assert (short.actual_quantity, short.discrepancy_type) == (first.quantity / 2, DiscrepancyType.QUANTITY)
+    assert short.amount_difference == short.actual_amount - short.expected_amount < 0
+    assert by_line[(partial, second.product_code)].is_matched
+    missing = by_line[(partial, third.product_code)]
+    assert (missing.actual_quantity, missing.discrepancy_type) == (Decimal("0"), DiscrepancyType.MISSING_ITEM)
+    delivered = by_line[(short_delivery, lines[short_delivery][0].product_code)]
+    assert delivered.discrepancy_type == DiscrepancyType.QUANTITY
+
+    # unmatched orders are reported, matched ones are not
+    assert {row.order_id for row in rows if not row.is_matched} == {partial, short_delivery}
+    assert all(row.is_matched for row in rows if row.order_id == untouched)
+    assert reconciliation.total_orders == 4 and reconciliation.total_items == 12
+    assert reconciliation.confidence_score == 9 / 12
+    assert reconciliation.discrepancy_amount == sum(abs(row.amount_difference) for row in rows) > 0
+    assert reconciliation.summary["discrepancy_breakdown"] == {"none": 9, "quantity": 2, "missing_item": 1}
+    assert not reconciliation.auto_approved
@@ -0,0 +1,121 @@
+"""Shared Redis connection manager tests.
+
+The circuit breaker opens after the failure threshold, lets a probe through
+once the reset timeout has passed (half-open) and closes on success. Named
+clients with the same URL and decode mode share one pool, and a breaker is
+shared per endpoint. run_pipeline sends a batch in one round trip against the
+test Redis, refuses to run while the breaker is open, and counts a connection
+failure against the breaker. Only the round-trip case needs Redis; it skips if
+none is reachable.
+"""
+
+import asyncio
+import importlib
+import uuid
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from orderly_fastapi_core import RedisManager
+from orderly_fastapi_core.redis_manager import CircuitBreaker
+
+# the package re-exports the shared instance under the module's name
+redis_manager_module = importlib.import_module("orderly_fastapi_core.redis_manager")
+UNREACHABLE_URL = "redis://127.0.0.1:1/0"
+
+
+def test_breaker_opens_after_the_threshold_and_half_opens_after_the_timeout(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(redis_manager_module.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+
+    states = []
+    for _ in range(3):
+        breaker.record_failure()
+        states.append(breaker.state)
+    assert states == ["closed", "closed", "open"]
+    assert not breaker.allow()
+
+    now[0] += 59.0
+    assert breaker.state == "open"
+    now[0] += 1.0
+    assert breaker.state == "half_open" and breaker.allow()
+
+    # a failed probe re-opens the breaker for another timeout
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] += 60.0
+    breaker.record_success()
+    assert (breaker.state, breaker.failures) == ("closed", 0)
+
+
+def test_named_clients_share_a_pool_per_url_and_decode_mode() -> None:
+    manager = RedisManager(url="redis://127.0.0.1:6379/0")
+    sessions, otp = manager.client("sessions"), manager.client("otp")
+    binary = manager.client("hierarchy-cache", decode_responses=False)
+    other = manager.client("sessions", url="redis://127.0.0.1:6379/1")
+
+    assert manager.client("sessions") is sessions
+    assert sessions is not otp
+    assert sessions.connection_pool is otp.connection_pool
+    assert binary.connection_pool is not sessions.connection_pool
+    assert other.connection_pool is not sessions.connection_pool
+    assert manager.breaker() is manager.breaker("redis://127.0.0.1:6379/0")
+    assert manager.breaker("redis://127.0.0.1:6379/1") is not manager.breaker()
+    assert manager.stats()["clients"] == ["hierarchy-cache", "otp", "sessions"]
+    assert len(manager.stats()["pools"]) == 3
+
+    with pytest.raises(RuntimeError):
+        manager.configure(max_connections=10)
+
+
+def test_run_pipeline_batches_commands_in_one_round_trip() -> None:
+    async def _main():
+        manager = RedisManager()
+        if not await manager.ping():
+            await manager.close()
+            pytest.skip("Redis not reachable, skipping pipeline round trip")
+        key = f"test-pipeline-{uuid.uuid4()}"
+        borrowed = []
+        pool = manager.client("pipeline-test").connection_pool
+        get_connection = pool.get_connection
+
+        async def counting_get_connection(*args, **kwargs):
+            borrowed.append(args)
+            return await get_connection(*args, **kwargs)
+
+        pool.get_connection = counting_get_connection
+        try:
+            results = await manager.run_pipeline(
+                [("SET", key, "1", "EX", 60), ("INCRBY", key, 41), ("GET", key)], name="pipeline-test"
+            )
+            return results, len(borrowed)
+        finally:
+            pool.get_connection = get_connection
+            await manager.client("pipeline-test").delete(key)
+            await manager.close()
+
+    results, connections = asyncio.run(_main())
+    assert results == [True, 42, "42"]
+    assert connections == 1
+
+
+def test_run_pipeline_respects_and_feeds_the_breaker() -> None:
+    async def _main():
+        manager = RedisManager(url=UNREACHABLE_URL, failure_threshold=2, socket_connect_timeout=1.0)
+        breaker = manager.breaker()
+        try:
+            with pytest.raises(RedisConnectionError):
+                await manager.run_pipeline([("PING",)])
+            failures_after_error = breaker.failures
+
+            breaker.record_failure()
+            with pytest.raises(RedisConnectionError, match="circuit breaker open"):
+                await manager.run_pipeline([("PING",)])
+            return failures_after_error, breaker.failures
+        finally:
+            await manager.close()
+
+    failures_after_error, failures_while_open = asyncio.run(_main())
+    assert failures_after_error == 1
+    assert failures_while_open == 2  # refused without another attempt
@@ -0,0 +1,203 @@
+"""Redis session store tests.
+
+Drive SessionService against the test Redis: creation writes the session hash,
+the user index and the JTI mapping in one transaction; activity touches are
+coalesced per process and, through the Lua script, across workers; listing
+drops index entries whose session expired and still reads legacy JSON
+sessions; terminate / terminate_all revoke the sessions' tokens. Each test
+uses its own RedisManager (the shared one is bound to a single event loop) and
+deletes the keys it created. Skips only if no Redis is reachable.
+"""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.modules.users.services import session_service
+from app.modules.users.services.session_service import (
+    BLACKLIST_PREFIX,
+    JTI_SESSION_PREFIX,
+    SESSION_PREFIX,
+    SESSION_TTL_SECONDS,
+    USER_SESSIONS_PREFIX,
+    SessionService,
+)
+from orderly_fastapi_core import RedisManager
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15"
+
+
+def _run(body):
+    async def _main():
+        manager = RedisManager()
+        redis = manager.client("sessions")
+        try:
+            await redis.ping()
+        except Exception as exc:
+            pytest.skip(f"Redis not reachable, skipping session store tests: {exc}")
+
+        user_id = f"test-user-{uuid.uuid4()}"
+        created = []
+
+        async def create(service=None, **fields):
+            jti = f"test-jti-{uuid.uuid4()}"
+            refresh = f"test-refresh-{uuid.uuid4()}"
+            session = await (service or SessionService(redis)).create_session(
+                fields.pop("user_id", user_id), jti, refresh_token_jti=refresh, user_agent=USER_AGENT, **fields
+            )
+            created.append((session["session_id"], jti, refresh))
+            return session
+
+        try:
+            return await body(redis, user_id, create)
+        finally:
+            keys = [f"{USER_SESSIONS_PREFIX}{user_id}"]
+            for session_id, jti, refresh in created:
+                keys += [
+                    f"{SESSION_PREFIX}{session_id}",
+                    f"{JTI_SESSION_PREFIX}{jti}",
+                    f"{BLACKLIST_PREFIX}{jti}",
+                    f"{BLACKLIST_PREFIX}{refresh}",
+                ]
+            await redis.delete(*keys)
+            await manager.close()
+
+    return asyncio.run(_main())
+
+
+def test_create_writes_the_hash_index_and_jti_mapping() -> None:
+    async def body(redis, user_id, create):
+        session = await create(ip_address="10.0.0.1", device_info={"platform": "web"})
+        session_id = session["session_id"]
+        key = f"{SESSION_PREFIX}{session_id}"
+        service = SessionService(redis)
+        return session, {
+            "type": await redis.type(key),
+            "fields": await redis.hgetall(key),
+            "ttl": await redis.ttl(key),
+            "indexed": await redis.sismember(f"{USER_SESSIONS_PREFIX}{user_id}", session_id),
+            "jti": await redis.get(f"{JTI_SESSION_PREFIX}{session['access_token_jti']}"),
+            "get": await service.get_session(session_id),
+            "by_jti": await service.get_session_by_jti(session["access_token_jti"]),
+        }
+
+    session, stored = _run(body)
+    assert stored["type"] == "hash"
+    assert stored["fields"]["user_id"] == session["user_id"]
+    assert stored["fields"]["is_active"] == "1"
+    assert json.loads(stored["fields"]["device_info"]) == {"platform": "web"}
+    assert "last_activity_ts" in stored["fields"]
+    assert 0 < stored["ttl"] <= SESSION_TTL_SECONDS
+    assert stored["indexed"]
+    assert stored["jti"] == session["session_id"]
+    assert stored["get"] == stored["by_jti"] == session
+    assert session["browser"].startswith("Safari")
+
+
+def test_activity_touches_are_coalesced_within_the_interval(monkeypatch) -> None:
+    async def body(redis, user_id, create):
+        worker = SessionService(redis)
+        session = await create(service=worker)
+        key = f"{SESSION_PREFIX}{session['session_id']}"
+        first = await redis.hget(key, "last_activity")
+
+        results = {
+            # this worker skips the round trip; another one is stopped by the script
+            "same worker": await worker.update_activity(session["session_id"]),
+            "other worker": await SessionService(redis).update_activity(session["session_id"]),
+        }
+        coalesced = await redis.hget(key, "last_activity")
+
+        monkeypatch.setattr(session_service, "ACTIVITY_TOUCH_INTERVAL_SECONDS", 0)
+        results["after the interval"] = await SessionService(redis).update_activity(session["session_id"])
+        results["missing session"] = await SessionService(redis).update_activity(str(uuid.uuid4()))
+        return first, coalesced, await redis.hget(key, "last_activity"), results
+
+    first, coalesced, touched, results = _run(body)
+    assert results == {
+        "same worker": True,
+        "other worker": True,
+        "after the interval": True,
+        "missing session": False,
+    }
+    assert coalesced == first
+    assert touched > first
+
+
+def test_listing_drops_expired_ids_and_reads_legacy_sessions() -> None:
+    async def body(redis, user_id, create):
+        current = await create()
+        expired = await create()
+        await redis.delete(f"{SESSION_PREFIX}{expired['session_id']}")
+
+        # a session written by the previous JSON-string store
+        legacy_id = str(uuid.uuid4())
+        await redis.set(
+            f"{SESSION_PREFIX}{legacy_id}",
+            json.dumps({
+                "session_id": legacy_id, "user_id": user_id, "device_name": "Legacy Device",
+                "last_activity": "2000-01-01T00:00:00", "access_token_jti": f"test-jti-{legacy_id}",
+            }),
+            ex=60,
+        )
+        await redis.sadd(f"{USER_SESSIONS_PREFIX}{user_id}", legacy_id)
+
+        try:
+            sessions = await SessionService(redis).list_user_sessions(user_id, current["session_id"])
+            index = await redis.smembers(f"{USER_SESSIONS_PREFIX}{user_id}")
+        finally:
+            await redis.delete(f"{SESSION_PREFIX}{legacy_id}", f"{BLACKLIST_PREFIX}test-jti-{legacy_id}")
+        return current, expired, legacy_id, sessions, index
+
+    current, expired, legacy_id, sessions, index = _run(body)
+    assert [(session["id"], session["is_current"]) for session in sessions] == [
+        (current["session_id"], True),
+        (legacy_id, False),  # oldest activity last
+    ]
+    assert sessions[1]["device_name"] == "Legacy Device"
+    assert index == {current["session_id"], legacy_id}
+    assert expired["session_id"] not in index
+
+
+def test_terminate_revokes_only_the_owners_sessions() -> None:
+    async def body(redis, user_id, create):
+        service = SessionService(redis)
+        first, second, third = [await create() for _ in range(3)]
+        other_user = await create(user_id=f"test-user-{uuid.uuid4()}")
+        try:
+            results = {
+                "other user's session": await service.terminate_session(other_user["session_id"], user_id),
+                "own session": await service.terminate_session(first["session_id"], user_id),
+                "already terminated": await service.terminate_session(first["session_id"], user_id),
+                "all but current": await service.terminate_all_sessions(user_id, except_session_id=third["session_id"]),
+            }
+            state = {
+                "remaining": await service.list_user_sessions(user_id),
+                "other user's session kept": await redis.exists(f"{SESSION_PREFIX}{other_user['session_id']}"),
+                "revoked": [
+                    await service.is_token_blacklisted(session[jti])
+                    for session in (first, second, third)
+                    for jti in ("access_token_jti", "refresh_token_jti")
+                ],
+                "jti mappings": [
+                    await redis.exists(f"{JTI_SESSION_PREFIX}{session['access_token_jti']}")
+                    for session in (first, second, third)
+                ],
+            }
+        finally:
+            await redis.delete(f"{USER_SESSIONS_PREFIX}{other_user['user_id']}")
+        return third, results, state
+
+    third, results, state = _run(body)
+    assert results == {
+        "other user's session": False,
+        "own session": True,
+        "already terminated": False,
+        "all but current": 1,
+    }
+    assert [session["id"] for session in state["remaining"]] == [third["session_id"]]
+    assert state["other user's session kept"] == 1
+    assert state["revoked"] == [True, True, True, True, False, False]
+    assert state["jti mappings"] == [0, 0, 1]
@@ -0,0 +1,104 @@
+"""SKU search supplier counts.
+
+The SKU search endpoints report `supplierCount` from supplier_skus (distinct
+active suppliers per SKU), selected in the same query as the page; the
+sharing search's `supplier_id` filter keeps the SKUs that supplier actively
+offers. Runs against the test DB (see app/tests/db.py).
+"""
+
+import asyncio
+from decimal import Decimal
+
+from app.modules.products.api.v1.sku_sharing import search_skus_with_sharing
+from app.modules.products.api.v1.skus_simple import search_skus
+from app.modules.products.middleware.sku_permissions import UserContext, UserRole
+from app.modules.products.models.supplier_sku import SupplierSKU
+from app.modules.users.models.organization import Organization, OrganizationType
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import new_id, seed_catalog, seed_organizations
+
+ADMIN = UserContext(user_id="admin", role=UserRole.PLATFORM_ADMIN)
+
+
+async def _seed_listings(ctx):
+    await seed_organizations(ctx)
+    await seed_catalog(ctx, skus_per_product=1)
+    second, retired = (
+        Organization(id=new_id(ctx.rng), name=name, type=OrganizationType.SUPPLIER.value)
+        for name in ("Second Supplier", "Retired Supplier")
+    )
+    ctx.session.add_all([second, retired])
+    await ctx.session.flush()
+    shared, unsupplied = ctx.data["skus"][:2]
+
+    def listing(supplier_id, is_active=True):
+        return SupplierSKU(
+            id=new_id(ctx.rng),
+            sku_id=shared["sku_id"],
+            supplier_id=supplier_id,
+            supplier_sku_code=f"S-{ctx.rng.getrandbits(32):08x}",
+            supplier_price=Decimal("10"),
+            is_active=is_active,
+        )
+
+    # two active suppliers (one listed twice) and one with only an inactive listing
+    ctx.session.add_all([
+        listing(ctx.data["supplier_id"]),
+        listing(ctx.data["supplier_id"]),
+        listing(second.id),
+        listing(retired.id, is_active=False),
+    ])
+    await ctx.session.flush()
+    return shared, unsupplied, second, retired
+
+
+def test_search_reports_active_suppliers_per_sku() -> None:
+    async def _main():
+        async with rolled_back_context(seed=34) as ctx:
+            shared, unsupplied, _, _ = await _seed_listings(ctx)
+
+            counts = {}
+            for name, endpoint, filters in (
+                ("sharing", search_skus_with_sharing, {"sku_type": None, "supplier_id": None}),
+                ("simple", search_skus, {}),
+            ):
+                for sku in (shared, unsupplied):
+                    response = await endpoint(
+                        search=sku["product_code"], page=1, page_size=20, is_active=None,
+                        user=ADMIN, db=ctx.session, **filters,
+                    )
+                    counts[name, sku["sku_id"]] = [item["supplierCount"] for item in response["data"]]
+            return shared["sku_id"], unsupplied["sku_id"], counts
+
+    shared, unsupplied, counts = asyncio.run(_main())
+    for name in ("sharing", "simple"):
+        assert counts[name, shared] == [2]
+        assert counts[name, unsupplied] == [0]
+
+
+def test_supplier_filter_keeps_skus_the_supplier_actively_offers() -> None:
+    async def _main():
+        async with rolled_back_context(seed=34) as ctx:
+            shared, unsupplied, second, retired = await _seed_listings(ctx)
+
+            found = {}
+            for name, supplier_id in (
+                ("supplier", ctx.data["supplier_id"]),
+                ("second", second.id),
+                ("retired", retired.id),
+            ):
+                for sku in (shared, unsupplied):
+                    response = await search_skus_with_sharing(
+                        search=sku["product_code"], page=1, page_size=20, is_active=None,
+                        sku_type=None, supplier_id=supplier_id, user=ADMIN, db=ctx.session,
+                    )
+                    found[name, sku["sku_id"]] = [item["id"] for item in response["data"]]
+            return shared["sku_id"], unsupplied["sku_id"], found
+
+    shared, unsupplied, found = asyncio.run(_main())
+    # offered by a supplier other than its creator, and only through active listings
+    assert found["second", shared] == [shared]
+    assert found["supplier", shared] == [shared]
+    assert found["retired", shared] == []
+    for name in ("supplier", "second", "retired"):
+        assert found[name, unsupplied] == []
@@ -0,0 +1,177 @@
+"""SMTP transport tests.
+
+Drive SMTPTransport against an in-process SMTP server (stdlib socketserver)
+that answers each message's DATA with a scripted outcome: one connection is
+reused across batches, the event loop keeps running while a slow relay holds
+a send, a 5xx fails at once without a retry, and a 4xx or a dropped connection
+is retried on a fresh connection. No network access or external server needed.
+"""
+
+import asyncio
+import smtplib
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+import pytest
+
+from app.modules.notifications.services.smtp_transport import SMTPTransport
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 test ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 test")
+            elif command == "DATA":
+                self._reply("354 end data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b".\r\n":
+                        break
+                    body.append(data)
+                with server.lock:
+                    outcome = server.script.pop(0) if server.script else "250"
+                    server.deliveries.append((outcome, b"".join(body)))
+                time.sleep(server.delay)
+                if outcome == "drop":
+                    return  # close without answering
+                self._reply(f"{outcome} scripted")
+            elif command == "QUIT":
+                self._reply("221 bye")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP
+                self._reply("250 ok")
+
+    def _reply(self, text: str) -> None:
+        self.wfile.write(f"{text}\r\n".encode("ascii"))
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, script, delay):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.script = list(script)
+        self.delay = delay
+        self.connections = 0
+        self.deliveries = []
+
+
+@contextmanager
+def _smtp_server(script=(), delay=0.0):
+    server = _SMTPServer(script, delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@orderly.test"
+    message["To"] = f"user{index}@orderly.test"
+    message["Subject"] = f"Test {index}"
+    message.set_content(f"body {index}")
+    return message
+
+
+def _run(server, body, **options):
+    async def _main():
+        transport = SMTPTransport(
+            "127.0.0.1", server.server_address[1], pool_size=1, timeout=5.0, retry_backoff=0.0, **options
+        )
+        try:
+            return await body(transport)
+        finally:
+            await transport.close()
+
+    return asyncio.run(_main())
+
+
+def test_one_connection_is_reused_across_batches() -> None:
+    async def body(transport):
+        await asyncio.gather(*(transport.send(_message(index)) for index in range(5)))
+        await asyncio.gather(*(transport.send(_message(index)) for index in range(5, 8)))
+
+    with _smtp_server() as server:
+        _run(server, body, batch_size=3)
+    assert server.connections == 1
+    assert len(server.deliveries) == 8
+    for index in range(8):
+        assert sum(f"body {index}".encode() in data for _, data in server.deliveries) == 1
+
+
+def test_the_event_loop_keeps_running_while_the_relay_is_slow() -> None:
+    async def body(transport):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.monotonic()
+        await transport.send(_message(0))
+        elapsed = time.monotonic() - started
+        task.cancel()
+        return elapsed, ticks
+
+    with _smtp_server(delay=0.5) as server:
+        elapsed, ticks = _run(server, body)
+    assert elapsed >= 0.5
+    assert ticks >= 20  # the loop ran throughout the blocking exchange
+
+
+def test_a_permanent_error_fails_at_once_without_a_retry() -> None:
+    async def body(transport):
+        with pytest.raises(smtplib.SMTPDataError) as failure:
+            await transport.send(_message(0))
+        await transport.send(_message(1))  # the connection stays usable
+        return failure.value.smtp_code
+
+    with _smtp_server(script=["550"]) as server:
+        code = _run(server, body, max_retries=3)
+    assert code == 550
+    assert [outcome for outcome, _ in server.deliveries] == ["550", "250"]
+    assert server.connections == 1
+
+
+def test_transient_errors_and_dropped_connections_are_retried() -> None:
+    async def body(transport):
+        await transport.send(_message(0))
+
+    with _smtp_server(script=["451", "drop", "250"]) as server:
+        _run(server, body, max_retries=3)
+    assert [outcome for outcome, _ in server.deliveries] == ["451", "drop", "250"]
+    assert server.connections == 3  # reconnected after each failure
+
+
+def test_retries_stop_after_max_retries() -> None:
+    async def body(transport):
+        with pytest.raises(smtplib.SMTPDataError) as failure:
+            await transport.send(_message(0))
+        return failure.value.smtp_code
+
+    with _smtp_server(script=["451"] * 5) as server:
+        code = _run(server, body, max_retries=2)
+    assert code == 451
+    assert len(server.deliveries) == 3
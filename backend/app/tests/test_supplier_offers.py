@@ -0,0 +1,208 @@
+"""Supplier offer expansion and price comparison.
+
+``offer_rows`` expands a SupplierSKU into quantity ranges; for every case in
+the table below, the range covering a quantity must give the price the old
+per-request comparison computed (``_legacy_price``, kept here as removed from
+SupplierSKUService.compare_suppliers): tier edges, tiers over bulk discounts,
+lapsed discounts and inactive listings. ``compare_offers`` ranking runs
+against the test DB (see app/tests/db.py).
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.modules.products.models.supplier_sku import SupplierSKU
+from app.modules.products.services.supplier_offer_service import SupplierOfferService, offer_rows
+from app.modules.users.models.organization import Organization, OrganizationType
+from app.tests.db import rolled_back_context
+from benchmarks.datasets import new_id, seed_catalog, seed_organizations
+
+
+def _legacy_price(supplier_sku, quantity):
+    """舊版即時比價的有效單價與套用來源（停用者不列入）"""
+    if not supplier_sku.is_active:
+        return None
+    effective_price = float(supplier_sku.supplier_price)
+    source = "base"
+    if supplier_sku.pricing_tiers:
+        for tier in sorted(supplier_sku.pricing_tiers, key=lambda x: x.get("min_qty", 0), reverse=True):
+            if quantity >= tier.get("min_qty", 0):
+                effective_price = tier.get("price", effective_price)
+                source = "tier"
+                break
+    elif supplier_sku.bulk_discount_threshold:
+        if quantity >= supplier_sku.bulk_discount_threshold:
+            rate = float(supplier_sku.bulk_discount_rate or 0)
+            effective_price = effective_price - effective_price * rate
+            source = "bulk_discount"
+    return effective_price, source
+
+
+def _offer_price(rows, quantity):
+    covering = [
+        row for row in rows
+        if row["min_quantity"] <= quantity and (row["max_quantity"] is None or quantity < row["max_quantity"])
+    ]
+    if not covering:
+        return None
+    assert len(covering) == 1
+    return float(covering[0]["unit_price"]), covering[0]["price_source"]
+
+
+def _supplier_sku(price="10", tiers=(), threshold=None, rate=None, is_active=True):
+    return SupplierSKU(
+        id="ss-1",
+        sku_id="sku-1",
+        supplier_id="supplier-1",
+        supplier_price=Decimal(price),
+        pricing_tiers=list(tiers),
+        bulk_discount_threshold=threshold,
+        bulk_discount_rate=None if rate is None else Decimal(rate),
+        is_active=is_active,
+    )
+
+
+# (案例, SupplierSKU 參數, [(數量, 預期單價, 預期來源)])
+PRICING_CASES = [
+    ("base only", {}, [(1, 10.0, "base"), (1000, 10.0, "base")]),
+    (
+        "tier edges",
+        {"tiers": [{"min_qty": 10, "price": 9}, {"min_qty": 50, "price": 8}]},
+        [(1, 10.0, "base"), (9.999, 10.0, "base"), (10, 9.0, "tier"), (49.5, 9.0, "tier"), (50, 8.0, "tier")],
+    ),
+    (
+        "unsorted tiers, first of a repeated min_qty wins",
+        {"tiers": [{"min_qty": 50, "price": 8}, {"min_qty": 10, "price": 9}, {"min_qty": 10, "price": 7}]},
+        [(10, 9.0, "tier"), (50, 8.0, "tier")],
+    ),
+    ("tier from zero", {"tiers": [{"min_qty": 0, "price": 9.5}]}, [(1, 9.5, "tier"), (500, 9.5, "tier")]),
+    (
+        "tiers take precedence over a bulk discount",
+        {"tiers": [{"min_qty": 20, "price": 9}], "threshold": 5, "rate": "0.5"},
+        [(5, 10.0, "base"), (20, 9.0, "tier")],
+    ),
+    (
+        "bulk discount edge",
+        {"threshold": 10, "rate": "0.1"},
+        [(9, 10.0, "base"), (10, 9.0, "bulk_discount"), (100, 9.0, "bulk_discount")],
+    ),
+    ("lapsed discount: threshold cleared", {"threshold": None, "rate": "0.1"}, [(100, 10.0, "base")]),
+    ("lapsed discount: zero threshold", {"threshold": 0, "rate": "0.2"}, [(100, 10.0, "base")]),
+    (
+        "lapsed discount: rate cleared",
+        {"threshold": 10, "rate": None},
+        [(9, 10.0, "base"), (10, 10.0, "bulk_discount")],
+    ),
+    (
+        "inactive listing",
+        {"tiers": [{"min_qty": 10, "price": 9}], "is_active": False},
+        [(1, None, None), (10, None, None)],
+    ),
+]
+
+
+@pytest.mark.parametrize("name, options, expected", PRICING_CASES, ids=[case[0] for case in PRICING_CASES])
+def test_offer_rows_match_the_previous_pricing(name, options, expected) -> None:
+    supplier_sku = _supplier_sku(**options)
+    rows = offer_rows(supplier_sku)
+    for quantity, price, source in expected:
+        wanted = None if price is None else (price, source)
+        assert _offer_price(rows, Decimal(str(quantity))) == pytest.approx(wanted), (name, quantity)
+        assert _legacy_price(supplier_sku, quantity) == pytest.approx(wanted), (name, quantity)
+
+
+def test_offer_ranges_are_contiguous_from_zero() -> None:
+    rows = offer_rows(_supplier_sku(tiers=[{"min_qty": 50, "price": 8}, {"min_qty": 10, "price": 9}]))
+    assert [(row["min_quantity"], row["max_quantity"]) for row in rows] == [
+        (Decimal(0), Decimal(10)),
+        (Decimal(10), Decimal(50)),
+        (Decimal(50), None),
+    ]
+    assert {(row["supplier_sku_id"], row["sku_id"], row["supplier_id"]) for row in rows} == {
+        ("ss-1", "sku-1", "supplier-1")
+    }
+
+
+def test_compare_offers_ranks_by_minimum_then_cost_then_preference() -> None:
+    async def _main():
+        async with rolled_back_context(seed=40) as ctx:
+            await seed_organizations(ctx)
+            await seed_catalog(ctx, skus_per_product=1)
+            suppliers = {"base": ctx.data["supplier_id"]}
+            for name in ("tiered", "high_minimum", "preferred", "inactive"):
+                organization = Organization(
+                    id=new_id(ctx.rng), name=f"{name} supplier", type=OrganizationType.SUPPLIER.value
+                )
+                ctx.session.add(organization)
+                suppliers[name] = organization.id
+            await ctx.session.flush()
+            sku, unsupplied = ctx.data["skus"][:2]
+
+            def listing(name, price, minimum=1, tiers=(), is_preferred=False, is_active=True):
+                return SupplierSKU(
+                    id=new_id(ctx.rng),
+                    sku_id=sku["sku_id"],
+                    supplier_id=suppliers[name],
+                    supplier_sku_code=f"S-{name}",
+                    supplier_price=Decimal(price),
+                    pricing_tiers=list(tiers),
+                    minimum_order_quantity=minimum,
+                    is_preferred=is_preferred,
+                    is_active=is_active,
+                )
+
+            tiered = listing("tiered", "12", tiers=[{"min_qty": 10, "price": 8}])
+            ctx.session.add_all([
+                listing("base", "10"),
+                tiered,
+                listing("high_minimum", "7", minimum=50),
+                listing("preferred", "10", is_preferred=True),
+                listing("inactive", "1", is_active=False),
+            ])
+            await ctx.session.flush()  # the mapper events write the offers
+
+            compared = await SupplierOfferService.compare_offers(
+                ctx.session, [(sku["sku_id"], 20), (sku["sku_id"], 60), (unsupplied["sku_id"], 20)]
+            )
+            top = await SupplierOfferService.compare_offers(ctx.session, [(sku["sku_id"], 20)], top=2)
+
+            # the tier lapses: the listing's offers are rewritten on flush
+            tiered.pricing_tiers = []
+            await ctx.session.flush()
+            lapsed = await SupplierOfferService.compare_offers(ctx.session, [(sku["sku_id"], 20)])
+            return {supplier_id: name for name, supplier_id in suppliers.items()}, compared, top, lapsed
+
+    names, (at_20, at_60, unsupplied), top, lapsed = asyncio.run(_main())
+
+    def ranking(comparison):
+        return [(names[s["supplierId"]], s["rank"], s["totalCost"], s["meetsMinimum"]) for s in comparison["suppliers"]]
+
+    # below the minimum order quantity ranks last despite the lowest cost; equal cost goes to the preferred supplier
+    assert ranking(at_20) == [
+        ("tiered", 1, 160.0, True),
+        ("preferred", 2, 200.0, True),
+        ("base", 3, 200.0, True),
+        ("high_minimum", 4, 140.0, False),
+    ]
+    assert at_20["suppliers"][0]["appliedTier"] == {"min_qty": 10.0, "price": 8.0}
+    assert names[at_20["recommendation"]["supplierId"]] == "tiered"
+    assert (at_20["totalSuppliers"], at_20["suppliersWithStock"]) == (4, 3)
+    assert at_20["priceRange"] == {"min": 140.0, "max": 200.0, "avg": 175.0}
+
+    assert [entry[0] for entry in ranking(at_60)] == ["high_minimum", "tiered", "preferred", "base"]
+
+    assert unsupplied["suppliers"] == [] and unsupplied["recommendation"] is None
+    assert (unsupplied["totalSuppliers"], unsupplied["priceRange"]) == (0, {"min": 0, "max": 0, "avg": 0})
+
+    assert [entry[0] for entry in ranking(top[0])] == ["tiered", "preferred"]
+    assert top[0]["totalSuppliers"] == 4
+
+    assert ranking(lapsed[0]) == [
+        ("preferred", 1, 200.0, True),
+        ("base", 2, 200.0, True),
+        ("tiered", 3, 240.0, True),
+        ("high_minimum", 4, 140.0, False),
+    ]
+    assert lapsed[0]["suppliers"][2]["appliedTier"] is None
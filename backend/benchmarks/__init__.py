@@ -0,0 +1,17 @@
+"""
+Micro-benchmarks for backend hot paths.
+
+Each case drives a service method in-process (no HTTP server) against seeded
+synthetic data, so a regression shows up as a number for that method instead of
+as noise in an end-to-end load test. Run from backend/:
+
+    PYTHONPATH=.:libs python -m benchmarks            # report only
+    PYTHONPATH=.:libs python -m benchmarks --check    # fail on regressions vs baseline.json
+    PYTHONPATH=.:libs python -m benchmarks --update   # accept current numbers
+
+Database cases need the Postgres described by the backend-test env contract
+(DATABASE_* / POSTGRES_PASSWORD, schema at alembic head). Every case seeds its
+data inside one outer transaction that is rolled back afterwards, so the target
+database is left untouched. Redis is used where the code under test uses it
+(REDIS_HOST / REDIS_PORT); those paths fail open when it is absent.
+"""
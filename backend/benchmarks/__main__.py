@@ -0,0 +1,53 @@
+"""Command line entry point: `python -m benchmarks [--check | --update] [-k PATTERN]`."""
+
+import argparse
+import sys
+
+from . import bench_billing, bench_hierarchy, bench_http, bench_orders, bench_products  # noqa: F401  (register cases)
+from .harness import BASELINE_FILE, DEFAULT_SEED, REGISTRY, check, load_baseline, run, update_baseline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backend hot-path micro-benchmarks")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="fail on regressions against baseline.json")
+    mode.add_argument("--update", action="store_true", help="record this run's medians in baseline.json")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains PATTERN")
+    parser.add_argument("--skip-db", action="store_true", help="only run cases that need no database")
+    parser.add_argument("--rounds", type=int, help="timed rounds per case (default: per case)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="dataset seed")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args()
+
+    cases = [
+        case for name, case in sorted(REGISTRY.items())
+        if (not args.pattern or args.pattern in name) and not (args.skip_db and case.requires_db)
+    ]
+    if args.list:
+        for case in cases:
+            print(f"{case.name}{'' if case.requires_db else '  (no db)'}")
+        return 0
+    if not cases:
+        print("No benchmark cases selected", file=sys.stderr)
+        return 2
+
+    results = run(cases, seed=args.seed, rounds=args.rounds)
+    baseline = load_baseline()
+
+    if args.update:
+        update_baseline(results, baseline)
+        print(f"Baseline written to {BASELINE_FILE.name}")
+        return 0
+
+    if args.check:
+        failures = check(results, baseline)
+        for failure in failures:
+            print(f"::error::benchmark: {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print("Benchmarks within baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Billing: automatic reconciliation of a period's orders against acceptances."""
+
+from datetime import date
+
+from app.modules.billing.services.reconciliation_engine import ReconciliationEngine
+
+from .datasets import seed_acceptances, seed_catalog, seed_orders, seed_organizations
+from .harness import BenchContext, benchmark
+
+PERIOD_START = date(2026, 1, 1)
+PERIOD_END = date(2026, 1, 28)
+
+
+async def _seed_period(ctx: BenchContext) -> None:
+    await seed_organizations(ctx)
+    await seed_catalog(ctx)
+    await seed_orders(ctx, count=300, lines=8, period_start=PERIOD_START)
+    await seed_acceptances(ctx)
+
+
+@benchmark("billing.run_auto_reconciliation[300 orders]", setup=_seed_period)
+async def run_auto_reconciliation(ctx: BenchContext) -> None:
+    await ReconciliationEngine(ctx.session).run_auto_reconciliation(
+        tenant_id=ctx.data["restaurant_id"],
+        restaurant_id=ctx.data["restaurant_id"],
+        supplier_id=ctx.data["supplier_id"],
+        period_start=PERIOD_START,
+        period_end=PERIOD_END,
+        created_by=ctx.data["restaurant_id"],
+        commit=False,
+    )
@@ -0,0 +1,100 @@
+"""Customer hierarchy: tree build, ranked search, CRUDBase bulk operations and chain import."""
+
+from app.modules.customer_hierarchy.crud.group import CRUDGroup
+from app.modules.customer_hierarchy.models import CustomerGroup
+from app.modules.customer_hierarchy.services.hierarchy import HierarchyService
+from app.modules.customer_hierarchy.services.hierarchy.import_engine import HierarchyImportEngine
+
+from .datasets import new_id, seed_hierarchy
+from .harness import BenchContext, benchmark
+
+BULK_SIZE = 100
+IMPORT_COMPANIES = 200
+IMPORT_LOCATIONS = 20_000
+
+
+async def _seed_hierarchy(ctx: BenchContext) -> None:
+    # 11 groups (one holding ungrouped companies) x 5 companies x 4 locations x 3 units
+    await seed_hierarchy(ctx, groups=10, companies=5, locations=4, units=3)
+    ctx.data["service"] = HierarchyService(ctx.session)
+
+
+async def _drop_tree_cache(ctx: BenchContext) -> None:
+    """Measure the database build, not a Redis hit from the previous round."""
+    service = ctx.data["service"]
+    await service.cache.delete(service._generate_tree_cache_key(None, None, False, False, None, None))
+
+
+@benchmark("hierarchy.get_tree[full, uncached]", setup=_seed_hierarchy, before_round=_drop_tree_cache)
+async def get_tree(ctx: BenchContext) -> None:
+    await ctx.data["service"].get_tree()
+
+
+@benchmark("hierarchy.search[4 queries]", setup=_seed_hierarchy)
+async def search(ctx: BenchContext) -> None:
+    service = ctx.data["service"]
+    for query in ("Bench Company 3", "Location 7-2", "unit", "Bnech Grop"):
+        await service.search(query, limit=20, fuzzy=query.startswith("Bnech"))
+
+
+async def _prepare_bulk(ctx: BenchContext) -> None:
+    ctx.data["crud"] = CRUDGroup(CustomerGroup)
+    ctx.data["groups"] = [
+        {"id": new_id(ctx.rng), "name": f"Bulk Group {ctx.round}-{index}", "code": f"BULK-{ctx.round}-{index}"}
+        for index in range(BULK_SIZE)
+    ]
+
+
+@benchmark(f"crud.bulk_create[{BULK_SIZE} groups]", before_round=_prepare_bulk)
+async def bulk_create(ctx: BenchContext) -> None:
+    await ctx.data["crud"].bulk_create(ctx.session, objects_in=ctx.data["groups"], created_by="bench")
+
+
+async def _create_bulk_targets(ctx: BenchContext) -> None:
+    await _prepare_bulk(ctx)
+    await ctx.data["crud"].bulk_create(ctx.session, objects_in=ctx.data["groups"], created_by="bench")
+
+
+@benchmark(f"crud.bulk_update[{BULK_SIZE} groups]", before_round=_create_bulk_targets)
+async def bulk_update(ctx: BenchContext) -> None:
+    await ctx.data["crud"].bulk_update(
+        ctx.session,
+        updates={group["id"]: {"description": f"updated in round {ctx.round}"} for group in ctx.data["groups"]},
+        updated_by="bench",
+    )
+
+
+async def _prepare_chain_import(ctx: BenchContext) -> None:
+    """One group, its companies and 20k locations; ids are unique per round."""
+    prefix = f"imp{ctx.round}"
+    records = [{"id": f"{prefix}-g", "type": "group", "name": f"Chain {ctx.round}", "code": f"CHAIN-{ctx.round}"}]
+    for c in range(IMPORT_COMPANIES):
+        records.append({
+            "id": f"{prefix}-c{c}",
+            "type": "company",
+            "name": f"Chain Company {c}",
+            "tax_id": f"{ctx.round:02d}{c:06d}",
+            "group_id": f"{prefix}-g",
+        })
+    for l in range(IMPORT_LOCATIONS):
+        records.append({
+            "id": f"{prefix}-l{l}",
+            "type": "location",
+            "name": f"Chain Location {l}",
+            "code": f"L{l}",
+            "company_id": f"{prefix}-c{l % IMPORT_COMPANIES}",
+        })
+    ctx.data["records"] = records
+
+
+@benchmark(
+    f"hierarchy.import[{IMPORT_LOCATIONS // 1000}k locations]",
+    before_round=_prepare_chain_import,
+    rounds=3,
+    warmup=1,
+)
+async def chain_import(ctx: BenchContext) -> None:
+    engine = HierarchyImportEngine(ctx.session)
+    plan = await engine.plan(ctx.data["records"])
+    assert not plan.errors, plan.errors[:3]
+    await engine.execute(plan, imported_by="bench")
@@ -0,0 +1,47 @@
+"""Monolith middleware stack: CORS, auth, rate limiting and security headers around a no-op route."""
+
+import time
+
+import httpx
+from jose import jwt
+
+from .harness import BenchContext, benchmark
+
+REQUESTS_PER_ROUND = 100
+PING_PATH = "/__bench/ping"
+
+
+async def _client(ctx: BenchContext) -> None:
+    from app.main import app
+    from app.modules.users.core.config import settings
+
+    if not any(getattr(route, "path", None) == PING_PATH for route in app.routes):
+        app.add_api_route(PING_PATH, lambda: {"ok": True}, methods=["GET"], include_in_schema=False)
+
+    token = jwt.encode(
+        {"sub": "bench-user", "type": "access", "role": "restaurant", "exp": int(time.time()) + 3600},
+        settings.jwt_secret,
+        algorithm=settings.jwt_algorithm,
+    )
+    ctx.data["headers"] = {"Authorization": f"Bearer {token}", "Origin": "http://localhost:5566"}
+    # No lifespan: module startup hooks and job workers stay off
+    ctx.data["client"] = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def _close_client(ctx: BenchContext) -> None:
+    await ctx.data["client"].aclose()
+
+
+@benchmark(
+    f"http.middleware_stack[{REQUESTS_PER_ROUND} requests]",
+    setup=_client,
+    teardown=_close_client,
+    requires_db=False,
+)
+async def middleware_stack(ctx: BenchContext) -> None:
+    client, headers = ctx.data["client"], ctx.data["headers"]
+    for index in range(REQUESTS_PER_ROUND):
+        # Distinct client addresses keep the fixed-window limiter from answering 429
+        response = await client.get(PING_PATH, headers={**headers, "X-Forwarded-For": f"10.{ctx.round}.{index // 250}.{index % 250}"})
+        if response.status_code != 200:
+            raise RuntimeError(f"{PING_PATH} returned {response.status_code}: {response.text[:200]}")
@@ -0,0 +1,47 @@
+"""OrderService: order creation and tenant order listing."""
+
+from datetime import date
+
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.services.order_service import OrderService
+
+from .datasets import order_payload, seed_catalog, seed_orders, seed_organizations
+from .harness import BenchContext, benchmark
+
+ORDERS_PER_ROUND = 20
+LINES_PER_ORDER = 10
+
+
+async def _seed_orders(ctx: BenchContext) -> None:
+    await seed_organizations(ctx)
+    await seed_catalog(ctx)
+    await seed_orders(ctx, count=500, lines=8, status=OrderStatus.SUBMITTED)
+
+
+async def _build_payloads(ctx: BenchContext) -> None:
+    ctx.data["payloads"] = [
+        order_payload(ctx.rng, ctx, LINES_PER_ORDER) for _ in range(ORDERS_PER_ROUND)
+    ]
+
+
+@benchmark("orders.create_order[20x10 lines]", setup=_seed_orders, before_round=_build_payloads)
+async def create_order(ctx: BenchContext) -> None:
+    for payload in ctx.data["payloads"]:
+        await OrderService.create_order(
+            ctx.session, payload, tenant_id=ctx.data["restaurant_id"], user_id=ctx.data["restaurant_id"]
+        )
+
+
+@benchmark("orders.list_orders[5 pages + filtered]", setup=_seed_orders)
+async def list_orders(ctx: BenchContext) -> None:
+    tenant_id = ctx.data["restaurant_id"]
+    for page in range(1, 6):
+        await OrderService.list_orders(ctx.session, tenant_id, page=page, page_size=20)
+    await OrderService.list_orders(
+        ctx.session,
+        tenant_id,
+        status=OrderStatus.SUBMITTED,
+        supplier_id=ctx.data["supplier_id"],
+        date_from=date(2026, 1, 7),
+        date_to=date(2026, 1, 21),
+    )
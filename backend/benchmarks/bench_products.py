@@ -0,0 +1,27 @@
+"""Product upload validation: duplicate detection and category validation batches."""
+
+from app.modules.products.services.category_matcher import AICategoryValidator
+from app.modules.products.services.duplicate_detector import AIDuplicateDetector
+
+from .datasets import seed_catalog, seed_organizations, upload_items
+from .harness import BenchContext, benchmark
+
+DUPLICATE_BATCH = 50
+CATEGORY_BATCH = 100
+
+
+async def _seed_catalog(ctx: BenchContext) -> None:
+    await seed_organizations(ctx)
+    await seed_catalog(ctx, skus_per_product=5)
+    ctx.data["duplicate_items"] = upload_items(ctx.rng, DUPLICATE_BATCH, ctx.data["skus"])
+    ctx.data["category_items"] = upload_items(ctx.rng, CATEGORY_BATCH, ctx.data["skus"])
+
+
+@benchmark(f"products.batch_detect_duplicates[{DUPLICATE_BATCH}]", setup=_seed_catalog)
+async def batch_detect_duplicates(ctx: BenchContext) -> None:
+    await AIDuplicateDetector().batch_detect_duplicates(ctx.session, ctx.data["duplicate_items"])
+
+
+@benchmark(f"products.batch_validate_categories[{CATEGORY_BATCH}]", setup=_seed_catalog)
+async def batch_validate_categories(ctx: BenchContext) -> None:
+    await AICategoryValidator().batch_validate_categories(ctx.session, ctx.data["category_items"])
@@ -0,0 +1,264 @@
+"""
+Seeded synthetic datasets.
+
+Everything is derived from the case's random.Random, so a given seed always
+produces the same names, quantities and shapes (ids included). Seeders add rows
+to ctx.session and flush; they never commit.
+"""
+
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from app.modules.acceptance.models.acceptance import Acceptance, AcceptanceItem
+from app.modules.customer_hierarchy.models import (
+    BusinessUnit,
+    CustomerCompany,
+    CustomerGroup,
+    CustomerLocation,
+)
+from app.modules.orders.models.enums import OrderStatus
+from app.modules.orders.models.order import Order, OrderItem
+from app.modules.orders.schemas.order import OrderCreate
+from app.modules.orders.schemas.order_item import OrderItemCreate
+from app.modules.products.models import Product, ProductCategory, ProductSKU
+from app.modules.users.models.organization import Organization, OrganizationType
+
+from .harness import BenchContext
+
+# category name -> product base names (names match AICategoryValidator's keyword table)
+CATALOG = {
+    "蔬菜": ["高麗菜", "洋蔥", "番茄", "胡蘿蔔", "小白菜", "青江菜", "馬鈴薯", "玉米"],
+    "水果": ["蘋果", "香蕉", "芒果", "鳳梨", "草莓", "葡萄", "木瓜", "芭樂"],
+    "肉類": ["豬五花", "雞胸肉", "牛腱", "豬絞肉", "雞腿", "羊肉", "培根", "香腸"],
+    "海鮮": ["鮭魚", "鯖魚", "白蝦", "花枝", "蛤蜊", "鱈魚", "透抽", "干貝"],
+    "乳製品": ["鮮奶", "優格", "起司", "奶油", "鮮奶油", "煉乳"],
+}
+SIZES = ["大", "中", "小"]
+GRADES = ["A級", "B級"]
+ORIGINS = ["台灣", "日本", "美國", "澳洲", "紐西蘭"]
+UNITS = ["kg", "箱", "包", "盒"]
+
+
+def new_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _code(rng: random.Random, prefix: str) -> str:
+    return f"{prefix}{rng.getrandbits(40):010x}".upper()
+
+
+async def seed_organizations(ctx: BenchContext) -> None:
+    """One restaurant and one supplier; ids are reused as tenant ids."""
+    restaurant = Organization(id=new_id(ctx.rng), name="Bench Restaurant", type=OrganizationType.RESTAURANT.value)
+    supplier = Organization(id=new_id(ctx.rng), name="Bench Supplier", type=OrganizationType.SUPPLIER.value)
+    ctx.session.add_all([restaurant, supplier])
+    await ctx.session.flush()
+    ctx.data["restaurant_id"] = restaurant.id
+    ctx.data["supplier_id"] = supplier.id
+
+
+async def seed_catalog(ctx: BenchContext, skus_per_product: int = 3) -> None:
+    """Categories from CATALOG, one product per base name, size/grade SKU variants."""
+    rng = ctx.rng
+    skus: List[Dict[str, Any]] = []
+    for category_name, product_names in CATALOG.items():
+        category = ProductCategory(
+            id=new_id(rng), code=_code(rng, "BC"), name=category_name, nameEn=f"Bench {category_name}"
+        )
+        ctx.session.add(category)
+        for product_name in product_names:
+            product = Product(
+                id=new_id(rng),
+                supplier_id=ctx.data.get("supplier_id"),
+                category_id=category.id,
+                code=_code(rng, "BP"),
+                name=product_name,
+                base_unit="kg",
+                pricing_unit=rng.choice(UNITS),
+            )
+            ctx.session.add(product)
+            for _ in range(skus_per_product):
+                variant = {"size": rng.choice(SIZES), "grade": rng.choice(GRADES), "origin": rng.choice(ORIGINS)}
+                sku = ProductSKU(
+                    id=new_id(rng),
+                    product_id=product.id,
+                    sku_code=_code(rng, "BS"),
+                    name=f"{variant['origin']}{product_name}（{variant['size']}）",
+                    variant=variant,
+                )
+                ctx.session.add(sku)
+                skus.append({
+                    "sku_id": sku.id,
+                    "product_id": product.id,
+                    "product_code": sku.sku_code,
+                    "product_name": sku.name,
+                    "category_name": category_name,
+                    "variant": variant,
+                })
+    await ctx.session.flush()
+    ctx.data["skus"] = skus
+
+
+def upload_items(rng: random.Random, count: int, skus: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """SKU-upload rows: roughly half are near-duplicates of catalog SKUs, some miscategorised."""
+    categories = list(CATALOG)
+    items = []
+    for _ in range(count):
+        if skus and rng.random() < 0.5:
+            base = rng.choice(skus)
+            name, variant, category_name = base["product_name"], dict(base["variant"]), base["category_name"]
+        else:
+            category_name = rng.choice(categories)
+            name = f"{rng.choice(ORIGINS)}{rng.choice(CATALOG[category_name])}"
+            variant = {"size": rng.choice(SIZES), "grade": rng.choice(GRADES)}
+        if rng.random() < 0.2:
+            category_name = rng.choice(categories)
+        items.append({"product_name": name, "variant": variant, "category_name": category_name})
+    return items
+
+
+def order_payload(rng: random.Random, ctx: BenchContext, lines: int) -> OrderCreate:
+    """OrderCreate for the seeded supplier with `lines` catalog items."""
+    return OrderCreate(
+        supplier_id=ctx.data["supplier_id"],
+        restaurant_id=ctx.data["restaurant_id"],
+        delivery_date=date(2026, 1, 1) + timedelta(days=rng.randrange(28)),
+        items=[
+            OrderItemCreate(
+                sku_id=sku["sku_id"],
+                product_id=sku["product_id"],
+                product_code=sku["product_code"],
+                product_name=sku["product_name"],
+                quantity=Decimal(rng.randrange(1, 200)) / Decimal(4),
+                unit_price=Decimal(rng.randrange(500, 50000)) / Decimal(100),
+                sort_order=index,
+            )
+            for index, sku in enumerate(rng.sample(ctx.data["skus"], lines))
+        ],
+    )
+
+
+async def seed_orders(
+    ctx: BenchContext,
+    count: int,
+    lines: int,
+    status: OrderStatus = OrderStatus.DELIVERED,
+    period_start: date = date(2026, 1, 1),
+) -> None:
+    """`count` orders for the seeded restaurant/supplier pair, delivered within one 28-day period."""
+    rng = ctx.rng
+    orders = []
+    for index in range(count):
+        order = Order(
+            id=new_id(rng),
+            order_number=_code(rng, "BENCH-"),
+            tenant_id=ctx.data["restaurant_id"],
+            restaurant_id=ctx.data["restaurant_id"],
+            supplier_id=ctx.data["supplier_id"],
+            status=status,
+            delivery_date=period_start + timedelta(days=index % 28),
+            created_by=ctx.data["restaurant_id"],
+            adjustments=[],
+        )
+        ctx.session.add(order)
+        for sort_order, sku in enumerate(rng.sample(ctx.data["skus"], lines)):
+            quantity = Decimal(rng.randrange(4, 200)) / Decimal(4)
+            unit_price = Decimal(rng.randrange(500, 50000)) / Decimal(100)
+            ctx.session.add(OrderItem(
+                id=new_id(rng),
+                order_id=order.id,
+                sku_id=sku["sku_id"],
+                product_id=sku["product_id"],
+                product_code=sku["product_code"],
+                product_name=sku["product_name"],
+                quantity=quantity,
+                unit_price=unit_price,
+                line_total=round(quantity * unit_price, 2),
+                sort_order=sort_order,
+            ))
+        orders.append(order)
+    await ctx.session.flush()
+    ctx.data["order_ids"] = [order.id for order in orders]
+
+
+async def seed_acceptances(ctx: BenchContext, coverage: float = 0.8) -> None:
+    """Acceptances for a share of the seeded orders, with occasional short or missing lines."""
+    rng = ctx.rng
+    rows = (await ctx.session.execute(
+        OrderItem.__table__.select().where(OrderItem.order_id.in_(ctx.data["order_ids"]))
+    )).mappings().all()
+    by_order: Dict[str, List[Any]] = {}
+    for item in rows:
+        by_order.setdefault(item["order_id"], []).append(item)
+
+    for order_id, items in by_order.items():
+        if rng.random() > coverage:
+            continue
+        acceptance = Acceptance(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            order_id=order_id,
+            restaurant_id=ctx.data["restaurant_id"],
+            supplier_id=ctx.data["supplier_id"],
+            status="completed",
+        )
+        ctx.session.add(acceptance)
+        for item in items:
+            roll = rng.random()
+            if roll < 0.05:
+                continue  # missing line
+            accepted = item["quantity"] if roll > 0.15 else item["quantity"] * Decimal("0.9")
+            ctx.session.add(AcceptanceItem(
+                acceptance_id=acceptance.id,
+                product_code=item["product_code"],
+                product_name=item["product_name"],
+                delivered_qty=str(item["quantity"]),
+                accepted_qty=str(round(accepted, 3)),
+            ))
+    await ctx.session.flush()
+
+
+async def seed_hierarchy(ctx: BenchContext, groups: int, companies: int, locations: int, units: int) -> None:
+    """groups × companies × locations × units customer hierarchy (plus ungrouped companies)."""
+    rng = ctx.rng
+    created_by = "bench"
+    group_ids = []
+    for g in range(groups + 1):
+        group_id = None
+        if g < groups:
+            group = CustomerGroup(id=new_id(rng), name=f"Bench Group {g}", code=_code(rng, "BG"), created_by=created_by)
+            ctx.session.add(group)
+            group_id = group.id
+            group_ids.append(group_id)
+        for c in range(companies):
+            company = CustomerCompany(
+                id=new_id(rng),
+                group_id=group_id,
+                name=f"Bench Company {g}-{c}",
+                tax_id=_code(rng, "T"),
+                created_by=created_by,
+            )
+            ctx.session.add(company)
+            for l in range(locations):
+                location = CustomerLocation(
+                    id=new_id(rng),
+                    company_id=company.id,
+                    name=f"Bench Location {g}-{c}-{l}",
+                    code=_code(rng, "BL"),
+                    city=rng.choice(["台北市", "新北市", "台中市", "高雄市"]),
+                    created_by=created_by,
+                )
+                ctx.session.add(location)
+                for u in range(units):
+                    ctx.session.add(BusinessUnit(
+                        id=new_id(rng),
+                        location_id=location.id,
+                        name=f"Bench Unit {g}-{c}-{l}-{u}",
+                        code=_code(rng, "BU"),
+                        type=rng.choice(["kitchen", "bar", "bakery"]),
+                        created_by=created_by,
+                    ))
+    await ctx.session.flush()
+    ctx.data["group_ids"] = group_ids
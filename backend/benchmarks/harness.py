@@ -0,0 +1,205 @@
+"""
+Benchmark registry, runner and baseline comparison.
+
+A case is an async callable taking a BenchContext. Optional `setup` runs once
+per case (seeding) and `teardown` once after it; optional `before_round` runs
+before every timed round and is excluded from the measurement. Seeded data is
+ANALYZEd inside the case's transaction so plans match a populated database
+rather than whatever statistics earlier (rolled-back) cases left behind. The
+figure gated on is the median round time.
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+# Allowed regression: baseline * (1 + tolerance) + slack_ms
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_SLACK_MS = 5.0
+DEFAULT_SEED = 20240601
+
+
+@dataclass
+class BenchContext:
+    """State shared by a case's setup and rounds."""
+
+    rng: random.Random
+    session: Optional[AsyncSession] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    round: int = 0
+
+
+CaseFn = Callable[[BenchContext], Awaitable[None]]
+
+
+@dataclass
+class Case:
+    name: str
+    body: CaseFn
+    setup: Optional[CaseFn] = None
+    before_round: Optional[CaseFn] = None
+    teardown: Optional[CaseFn] = None
+    requires_db: bool = True
+    rounds: int = 10
+    warmup: int = 2
+
+
+REGISTRY: Dict[str, Case] = {}
+
+
+def benchmark(
+    name: str,
+    *,
+    setup: Optional[CaseFn] = None,
+    before_round: Optional[CaseFn] = None,
+    teardown: Optional[CaseFn] = None,
+    requires_db: bool = True,
+    rounds: int = 10,
+    warmup: int = 2,
+) -> Callable[[CaseFn], CaseFn]:
+    """Register the decorated coroutine as benchmark case `name`."""
+
+    def decorator(body: CaseFn) -> CaseFn:
+        if name in REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        REGISTRY[name] = Case(
+            name=name,
+            body=body,
+            setup=setup,
+            before_round=before_round,
+            teardown=teardown,
+            requires_db=requires_db,
+            rounds=rounds,
+            warmup=warmup,
+        )
+        return body
+
+    return decorator
+
+
+def make_engine() -> AsyncEngine:
+    """Engine for the database described by the shared settings (no pooling between cases)."""
+    from app.modules.users.core.config import settings
+
+    return create_async_engine(settings.get_database_url_async(), poolclass=NullPool)
+
+
+async def _timed_rounds(case: Case, ctx: BenchContext, rounds: int) -> List[float]:
+    samples = []
+    for index in range(case.warmup + rounds):
+        ctx.round = index
+        if case.before_round is not None:
+            await case.before_round(ctx)
+        started = time.perf_counter()
+        await case.body(ctx)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if index >= case.warmup:
+            samples.append(elapsed_ms)
+    return samples
+
+
+async def _run_in_transaction(case: Case, ctx: BenchContext, connection: AsyncConnection, rounds: int) -> List[float]:
+    """Seed and measure inside one outer transaction that is always rolled back."""
+    transaction = await connection.begin()
+    # Service-level commit()/rollback() only release/roll back a SAVEPOINT
+    ctx.session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+    try:
+        if case.setup is not None:
+            await case.setup(ctx)
+            await ctx.session.flush()
+            await connection.execute(text("ANALYZE"))
+        return await _timed_rounds(case, ctx, rounds)
+    finally:
+        if case.teardown is not None:
+            await case.teardown(ctx)
+        await ctx.session.close()
+        await transaction.rollback()
+
+
+async def run_case(case: Case, engine: Optional[AsyncEngine], seed: int, rounds: Optional[int] = None) -> Dict[str, float]:
+    ctx = BenchContext(rng=random.Random(seed))
+    rounds = rounds or case.rounds
+
+    if case.requires_db:
+        async with engine.connect() as connection:
+            samples = await _run_in_transaction(case, ctx, connection, rounds)
+    else:
+        if case.setup is not None:
+            await case.setup(ctx)
+        try:
+            samples = await _timed_rounds(case, ctx, rounds)
+        finally:
+            if case.teardown is not None:
+                await case.teardown(ctx)
+
+    ordered = sorted(samples)
+    return {
+        "rounds": len(samples),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+async def run_cases(cases: List[Case], seed: int, rounds: Optional[int]) -> Dict[str, Dict[str, float]]:
+    engine = make_engine() if any(case.requires_db for case in cases) else None
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for case in cases:
+            stats = await run_case(case, engine, seed, rounds)
+            results[case.name] = stats
+            print(
+                f"{case.name:<44} median {stats['median_ms']:>9.2f} ms"
+                f"   min {stats['min_ms']:>9.2f}   p95 {stats['p95_ms']:>9.2f}   ({stats['rounds']} rounds)"
+            )
+    finally:
+        if engine is not None:
+            await engine.dispose()
+    return results
+
+
+def load_baseline() -> Dict:
+    if BASELINE_FILE.exists():
+        return json.loads(BASELINE_FILE.read_text())
+    return {"tolerance": DEFAULT_TOLERANCE, "slack_ms": DEFAULT_SLACK_MS, "baselines_ms": {}}
+
+
+def check(results: Dict[str, Dict[str, float]], baseline: Dict) -> List[str]:
+    tolerance = baseline.get("tolerance", DEFAULT_TOLERANCE)
+    slack_ms = baseline.get("slack_ms", DEFAULT_SLACK_MS)
+    failures = []
+    for name, stats in results.items():
+        allowed = baseline["baselines_ms"].get(name)
+        measured = stats["median_ms"]
+        if allowed is None:
+            failures.append(f"{name}: no baseline recorded (run with --update)")
+        elif measured > allowed * (1 + tolerance) + slack_ms:
+            failures.append(
+                f"{name}: median {measured:.2f} ms exceeds baseline {allowed:.2f} ms "
+                f"(+{tolerance:.0%} +{slack_ms:.0f} ms)"
+            )
+    return failures
+
+
+def update_baseline(results: Dict[str, Dict[str, float]], baseline: Dict) -> None:
+    """Merge measured medians into the baseline (cases not run keep their figure)."""
+    baseline.setdefault("baselines_ms", {}).update(
+        {name: stats["median_ms"] for name, stats in results.items()}
+    )
+    baseline["baselines_ms"] = dict(sorted(baseline["baselines_ms"].items()))
+    BASELINE_FILE.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def run(cases: List[Case], seed: int = DEFAULT_SEED, rounds: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    return asyncio.run(run_cases(cases, seed, rounds))
@@ -4,12 +4,17 @@
 
 Currently provides:
 - Database engine/session helpers for sync and async SQLAlchemy
+- Read-replica routing for read-only sessions (lag-aware, read-your-writes)
+- Shared Redis connection manager (named clients, pooled connections, circuit breaker)
 - Unified configuration management system
 - Error handling utilities
 - Pagination helpers
 - Health check utilities
 - Schema utilities (CamelCaseModel, response wrappers)
 - Unified model definitions (UnifiedBaseModel, Mixins)
+- Sortable IDs (UUIDv7) and block-leased daily document numbers
+- Fixed-point money arithmetic (order totals, banker's rounding)
+- Durable background job engine (Postgres queue; modules register their job types)
 """
 
 __version__ = "2.2.0"
@@ -20,6 +25,12 @@ from .database import (
     AsyncSessionLocalFactory,
     SessionLocalFactory,
     get_async_session_dependency,
+    get_read_session_dependency,
+    ReadReplicaRouter,
+    read_replica_router,
+    shared_async_engine,
+    shared_session_factory,
+    dispose_shared_engine,
 )
 
 # Import unified_config first to avoid circular import
@@ -35,6 +46,19 @@ from .middleware import (
     SecurityHeadersMiddleware,
 )
 
+# Request principal (decode once, shared short-TTL cache)
+from .principal import (
+    attach_principal,
+    build_hierarchy_context,
+    get_request_claims,
+    PrincipalCache,
+    principal_cache,
+    SharedPrincipalCache,
+)
+
+# Process-wide Redis clients over shared pools
+from .redis_manager import CircuitBreaker, RedisManager, redis_manager
+
 # Health check utilities
 from .health import (
     check_db_health,
@@ -55,7 +79,8 @@ from .schemas import (
 )
 
 # Application factory
-from .app_factory import create_service_app
+from .app_factory import configure_structlog, create_service_app
+from .service_module import ServiceModule
 
 # Unified models
 from .models import (
@@ -64,6 +89,21 @@ from .models import (
     AuditMixin,
     SoftDeleteMixin,
     MetadataMixin,
+    NumberSequence,
+    BackgroundJobRecord,
+)
+
+# Sortable IDs and document numbers
+from .ids import uuid7, new_id, NumberAllocator, number_allocator
+
+# Durable background jobs
+from .background_jobs import (
+    BackgroundJobService,
+    JobCancelled,
+    JobContext,
+    JobPriority,
+    JobStatus,
+    background_jobs,
 )
 
 # CRUD utilities
@@ -88,6 +128,12 @@ __all__ = [
     "AsyncSessionLocalFactory",
     "SessionLocalFactory",
     "get_async_session_dependency",
+    "get_read_session_dependency",
+    "ReadReplicaRouter",
+    "read_replica_router",
+    "shared_async_engine",
+    "shared_session_factory",
+    "dispose_shared_engine",
     # Config
     "UnifiedSettings",
     "get_settings",
@@ -98,6 +144,17 @@ __all__ = [
     "RedisRateLimitMiddleware",
     "SecurityHeadersConfig",
     "SecurityHeadersMiddleware",
+    # Principal
+    "attach_principal",
+    "build_hierarchy_context",
+    "get_request_claims",
+    "PrincipalCache",
+    "principal_cache",
+    "SharedPrincipalCache",
+    # Redis
+    "CircuitBreaker",
+    "RedisManager",
+    "redis_manager",
     # Health
     "check_db_health",
     "get_db_info",
@@ -112,13 +169,29 @@ __all__ = [
     "DataResponse",
     "MessageResponse",
     # App Factory
+    "configure_structlog",
     "create_service_app",
+    "ServiceModule",
     # Models
     "Base",
     "UnifiedBaseModel",
     "AuditMixin",
     "SoftDeleteMixin",
     "MetadataMixin",
+    "NumberSequence",
+    "BackgroundJobRecord",
+    # IDs
+    "uuid7",
+    "new_id",
+    "NumberAllocator",
+    "number_allocator",
+    # Background jobs
+    "BackgroundJobService",
+    "JobCancelled",
+    "JobContext",
+    "JobPriority",
+    "JobStatus",
+    "background_jobs",
     # CRUD
     "CRUDBase",
     # Errors
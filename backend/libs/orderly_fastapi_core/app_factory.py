@@ -10,9 +10,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from .database import read_replica_router
 from .errors import register_exception_handlers
 from .health import create_health_router
 from .middleware import AuthMiddleware, DEFAULT_PUBLIC_PATHS
+from .service_module import ServiceModule
 
 
 def configure_structlog(service_name: str) -> None:
@@ -37,6 +39,7 @@ def create_service_app(
     debug: bool = False,
     title: Optional[str] = None,
     description: Optional[str] = None,
+    module: Optional[ServiceModule] = None,
 ) -> FastAPI:
     """
     建立標準化的 FastAPI 微服務應用程式
@@ -52,6 +55,7 @@ def create_service_app(
         debug: 是否啟用除錯模式
         title: API 文件標題（預設使用 service_name）
         description: API 文件描述
+        module: 模組定義；提供時掛載其路由、合併公開路徑並執行其生命週期掛鉤
 
     Returns:
         配置好的 FastAPI 應用程式
@@ -62,9 +66,14 @@ def create_service_app(
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         logger.info(f"{service_name}.start", version=version)
+        if module:
+            await module.startup()
         yield
         logger.info(f"{service_name}.stop")
+        if module:
+            await module.shutdown()
         await async_engine.dispose()
+        await read_replica_router.dispose()
 
     app = FastAPI(
         title=title or f"Orderly {service_name.replace('-', ' ').title()}",
@@ -99,7 +108,9 @@ def create_service_app(
     )
 
     # Auth 中介層
-    auth_public_paths = public_paths or DEFAULT_PUBLIC_PATHS
+    auth_public_paths = set(public_paths or DEFAULT_PUBLIC_PATHS)
+    if module:
+        auth_public_paths |= module.public_paths
     app.add_middleware(AuthMiddleware, settings=settings, public_paths=auth_public_paths)
 
     # 統一錯誤處理
@@ -119,4 +130,7 @@ def create_service_app(
     async def root():
         return {"service": f"Orderly {service_name}", "docs": "/api/docs"}
 
+    if module:
+        app.include_router(module.router)
+
     return app
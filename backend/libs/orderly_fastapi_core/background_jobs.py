@@ -0,0 +1,685 @@
+"""
+BackgroundJobService - Durable background job engine shared by all modules
+
+Jobs are rows in the ``background_jobs`` table, so they survive restarts and
+their status is visible from every worker process:
+- Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED (priority order)
+- A claimed job holds a lease that is extended while it runs; jobs whose worker
+  died are picked up again once the lease expires
+- Failed jobs are retried with exponential backoff, up to max_retries
+- Jobs can be scheduled for a future time and report progress while running
+- Concurrency is configured per job type (workers per process)
+
+Each module registers its own job types when its handlers are imported; a
+handler receives a JSON payload, so any process running the engine can execute
+any job:
+
+    @background_jobs.job_handler("hierarchy.bulk_create", concurrency=2)
+    async def run_bulk_create(context: JobContext, payload: Dict[str, Any]) -> None:
+        ...
+
+    job_id = await background_jobs.submit_job("hierarchy.bulk_create", {...})
+
+The application lifespan starts the workers when ENABLE_BACKGROUND_WORKERS is
+set (the default). Jobs use the shared primary engine (DATABASE_URL) unless a
+session factory is passed in.
+"""
+
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+import asyncio
+import json
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+import structlog
+from sqlalchemy import select, update, func, and_, case, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .database import shared_session_factory
+from .models.background_job import BackgroundJobRecord
+from .unified_config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Maximum backoff between retries (seconds)
+MAX_RETRY_DELAY = 300
+
+
+class JobStatus(str, Enum):
+    """Background job status"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    RETRYING = "retrying"
+
+
+class JobPriority(int, Enum):
+    """Job priority levels"""
+    LOW = 3
+    NORMAL = 2
+    HIGH = 1
+    CRITICAL = 0
+
+
+CLAIMABLE_STATUSES = (JobStatus.PENDING.value, JobStatus.RETRYING.value)
+CANCELLABLE_STATUSES = (JobStatus.PENDING.value, JobStatus.RETRYING.value, JobStatus.RUNNING.value)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled or lost its lease"""
+
+
+class JobContext:
+    """Handle passed to job handlers for progress reporting"""
+
+    def __init__(self, service: "BackgroundJobService", job_id: str, job_type: str, attempt: int,
+                 metadata: Dict[str, Any]):
+        self.service = service
+        self.job_id = job_id
+        self.job_type = job_type
+        self.attempt = attempt
+        self.metadata = metadata
+
+    async def report_progress(self, **progress: Any) -> None:
+        """
+        Merge ``progress`` into the job's progress document and extend its lease.
+
+        Raises JobCancelled when the job was cancelled meanwhile, so handlers
+        stop at the next progress checkpoint.
+        """
+        if not await self.service._touch(self.job_id, progress):
+            raise JobCancelled(self.job_id)
+
+
+JobHandler = Callable[[JobContext, Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class JobTypeConfig:
+    """Registered handler and execution limits for one job type"""
+    handler: JobHandler
+    concurrency: int = 1
+    max_retries: int = 3
+    timeout: Optional[float] = None
+
+
+class BackgroundJobService:
+    """
+    Postgres-backed background job engine
+
+    Key Features:
+    - Durable queue shared by all worker processes (FOR UPDATE SKIP LOCKED)
+    - Priority ordering, scheduled runs, retries with exponential backoff
+    - Leases with heartbeat so crashed workers' jobs are recovered
+    - Progress tracking and cancellation visible from any process
+    - Per-job-type concurrency
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self._session_factory = session_factory
+        self.poll_interval = poll_interval or settings.background_job_poll_interval
+        self.lease_seconds = lease_seconds or settings.background_job_lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.job_types: Dict[str, JobTypeConfig] = {}
+        self.workers: List[asyncio.Task] = []
+        self.running = False
+        self.shutdown_event = asyncio.Event()
+        self._wakeups: Dict[str, asyncio.Event] = {}
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        """Sessions for queue operations (the shared primary engine unless one was given)"""
+        return self._session_factory or shared_session_factory()
+
+    # ============ Registration ============
+
+    def register_job_type(
+        self,
+        job_type: str,
+        handler: JobHandler,
+        concurrency: int = 1,
+        max_retries: int = 3,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Register the handler for a job type
+
+        Args:
+            job_type: Job type identifier (e.g. "hierarchy.bulk_create")
+            handler: ``async def handler(context, payload)``
+            concurrency: Concurrent jobs of this type per process
+                (overridable via BACKGROUND_JOB_CONCURRENCY)
+            max_retries: Default retry limit for submitted jobs
+            timeout: Default execution timeout in seconds
+        """
+        concurrency = get_settings().background_job_concurrency.get(job_type, concurrency)
+        self.job_types[job_type] = JobTypeConfig(
+            handler=handler,
+            concurrency=max(1, concurrency),
+            max_retries=max_retries,
+            timeout=timeout,
+        )
+        logger.info("Job type registered", job_type=job_type, concurrency=concurrency)
+
+    def job_handler(self, job_type: str, **options: Any) -> Callable[[JobHandler], JobHandler]:
+        """Decorator form of register_job_type"""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.register_job_type(job_type, handler, **options)
+            return handler
+        return decorator
+
+    # ============ Submission and monitoring ============
+
+    async def submit_job(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        priority: JobPriority = JobPriority.NORMAL,
+        max_retries: Optional[int] = None,
+        retry_delay: float = 5.0,
+        timeout: Optional[float] = None,
+        scheduled_at: Optional[datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_by: Optional[str] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> str:
+        """
+        Submit a background job for execution
+
+        Args:
+            job_type: Registered job type
+            payload: JSON-serializable handler arguments
+            priority: Job priority level
+            max_retries: Maximum retry attempts (defaults to the job type's)
+            retry_delay: Base delay between retries in seconds
+            timeout: Job execution timeout in seconds (defaults to the job type's)
+            scheduled_at: Schedule job for future execution
+            metadata: Additional job metadata
+            created_by: Submitting user
+            session: Enqueue inside the caller's transaction (committed by the
+                caller); otherwise the job is committed immediately
+
+        Returns:
+            Job ID for tracking
+        """
+        config = self.job_types.get(job_type)
+        if config is None:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = BackgroundJobRecord(
+            id=str(uuid.uuid4()),
+            job_type=job_type,
+            payload=payload or {},
+            priority=int(priority),
+            status=JobStatus.PENDING.value,
+            max_retries=config.max_retries if max_retries is None else max_retries,
+            retry_delay=retry_delay,
+            timeout=timeout if timeout is not None else config.timeout,
+            scheduled_at=scheduled_at or datetime.now(timezone.utc),
+            job_metadata=metadata or {},
+            created_by=created_by,
+        )
+
+        if session is not None:
+            session.add(job)
+            await session.flush()
+        else:
+            async with self.session_factory() as own_session:
+                own_session.add(job)
+                await own_session.commit()
+
+        if job_type in self._wakeups:
+            self._wakeups[job_type].set()
+
+        logger.info(
+            "Job submitted",
+            job_id=job.id,
+            job_type=job_type,
+            priority=JobPriority(priority).name,
+            scheduled_at=scheduled_at.isoformat() if scheduled_at else None
+        )
+        return job.id
+
+    async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get job status and progress information
+
+        Returns:
+            Job status dictionary or None if not found
+        """
+        async with self.session_factory() as session:
+            job = await session.get(BackgroundJobRecord, job_id)
+            if job is None:
+                return None
+
+            return {
+                "job_id": job.id,
+                "job_type": job.job_type,
+                "status": job.status,
+                "priority": JobPriority(job.priority).name,
+                "progress": job.progress,
+                "result": job.result,
+                "created_at": job.created_at.isoformat(),
+                "scheduled_at": job.scheduled_at.isoformat() if job.scheduled_at else None,
+                "started_at": job.started_at.isoformat() if job.started_at else None,
+                "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+                "retry_count": max(job.attempts - 1, 0),
+                "max_retries": job.max_retries,
+                "error": job.error,
+                "metadata": job.job_metadata
+            }
+
+    async def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancel a pending, retrying or running job
+
+        A running handler observes the cancellation at its next progress report
+        or lease heartbeat.
+
+        Returns:
+            True if job was cancelled, False if not found or already finished
+        """
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(BackgroundJobRecord)
+                .where(
+                    and_(
+                        BackgroundJobRecord.id == job_id,
+                        BackgroundJobRecord.status.in_(CANCELLABLE_STATUSES),
+                    )
+                )
+                .values(
+                    status=JobStatus.CANCELLED.value,
+                    error="Cancelled by user",
+                    completed_at=func.now(),
+                    locked_until=None,
+                    updated_at=func.now(),
+                )
+            )
+            await session.commit()
+
+        cancelled = (result.rowcount or 0) > 0
+        if cancelled:
+            logger.info("Job cancelled", job_id=job_id)
+        return cancelled
+
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Get job queue statistics across all processes (one aggregate query)"""
+        job = BackgroundJobRecord
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(
+                    job.job_type,
+                    func.count(job.id).filter(
+                        and_(job.status.in_(CLAIMABLE_STATUSES), job.scheduled_at <= func.now())
+                    ).label("due"),
+                    func.count(job.id).filter(
+                        and_(job.status.in_(CLAIMABLE_STATUSES), job.scheduled_at > func.now())
+                    ).label("scheduled"),
+                    func.count(job.id).filter(job.status == JobStatus.RUNNING.value).label("running"),
+                    func.count(job.id).filter(job.status == JobStatus.COMPLETED.value).label("completed"),
+                    func.count(job.id).filter(job.status == JobStatus.FAILED.value).label("failed"),
+                    func.avg(
+                        func.extract("epoch", job.completed_at - job.started_at)
+                    ).filter(job.status == JobStatus.COMPLETED.value).label("avg_execution_time"),
+                ).group_by(job.job_type)
+            )
+            by_type = {
+                row.job_type: {
+                    "due": row.due,
+                    "scheduled": row.scheduled,
+                    "running": row.running,
+                    "completed": row.completed,
+                    "failed": row.failed,
+                    "avg_execution_time": float(row.avg_execution_time or 0.0),
+                    "concurrency": self.job_types[row.job_type].concurrency if row.job_type in self.job_types else None,
+                }
+                for row in result.all()
+            }
+
+        return {
+            "queue_size": sum(t["due"] for t in by_type.values()),
+            "active_jobs": sum(t["running"] for t in by_type.values()),
+            "job_types": by_type,
+            "worker_id": self.worker_id,
+            "running_workers": len([w for w in self.workers if not w.done()]),
+            "total_workers": len(self.workers),
+            "service_running": self.running,
+        }
+
+    # ============ Worker lifecycle ============
+
+    async def start(self):
+        """Start workers for every registered job type in this process"""
+        if self.running:
+            logger.warning("Background job service is already running")
+            return
+
+        self.running = True
+        self.shutdown_event.clear()
+
+        for job_type, config in self.job_types.items():
+            self._wakeups[job_type] = asyncio.Event()
+            for i in range(config.concurrency):
+                self.workers.append(asyncio.create_task(self._worker(job_type, f"{job_type}-{i}")))
+        self.workers.append(asyncio.create_task(self._lease_reaper()))
+
+        logger.info(
+            "Background job service started",
+            worker_id=self.worker_id,
+            job_types={t: c.concurrency for t, c in self.job_types.items()},
+        )
+
+    async def stop(self, timeout: float = 30.0):
+        """
+        Stop workers gracefully
+
+        Jobs still running after ``timeout`` are cancelled locally and keep
+        their lease, so another process retries them once it expires.
+        """
+        if not self.running:
+            return
+
+        logger.info("Stopping background job service...")
+        self.running = False
+        self.shutdown_event.set()
+        for event in self._wakeups.values():
+            event.set()
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*self.workers, return_exceptions=True),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Worker shutdown timeout, cancelling remaining tasks")
+            for worker in self.workers:
+                worker.cancel()
+
+        self.workers.clear()
+        logger.info("Background job service stopped")
+
+    async def _worker(self, job_type: str, worker_name: str):
+        """Claim and execute jobs of one type until shutdown"""
+        wakeup = self._wakeups[job_type]
+        try:
+            while self.running:
+                try:
+                    job = await self._claim(job_type)
+                except Exception as e:
+                    logger.error("Job claim failed", worker_name=worker_name, error=str(e))
+                    job = None
+
+                if job is None:
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._execute_job(job, worker_name)
+        except asyncio.CancelledError:
+            logger.info("Worker cancelled", worker_name=worker_name)
+
+    async def reap_expired_leases(self) -> int:
+        """
+        Return running jobs whose lease expired (their worker died) to the queue
+
+        Jobs that already used up their retries fail instead.
+
+        Returns:
+            Number of jobs recovered or failed
+        """
+        job = BackgroundJobRecord
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(job)
+                .where(
+                    and_(
+                        job.status == JobStatus.RUNNING.value,
+                        job.locked_until < func.now(),
+                    )
+                )
+                .values(
+                    status=case(
+                        (job.attempts > job.max_retries, JobStatus.FAILED.value),
+                        else_=JobStatus.RETRYING.value,
+                    ),
+                    error="Worker lease expired",
+                    locked_by=None,
+                    locked_until=None,
+                    scheduled_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.warning("Recovered jobs with expired leases", count=result.rowcount)
+        return result.rowcount or 0
+
+    async def _lease_reaper(self):
+        """Periodically reap expired leases until shutdown"""
+        while self.running:
+            try:
+                await self.reap_expired_leases()
+            except Exception as e:
+                logger.error("Lease recovery failed", error=str(e))
+
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=self.lease_seconds / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    # ============ Execution ============
+
+    async def _claim(self, job_type: str) -> Optional[Dict[str, Any]]:
+        """Atomically claim the next due job of ``job_type``"""
+        job = BackgroundJobRecord
+        next_job = (
+            select(job.id)
+            .where(
+                and_(
+                    job.job_type == job_type,
+                    job.status.in_(CLAIMABLE_STATUSES),
+                    job.scheduled_at <= func.now(),
+                )
+            )
+            .order_by(job.priority, job.scheduled_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(job)
+                .where(job.id == next_job)
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    attempts=job.attempts + 1,
+                    locked_by=self.worker_id,
+                    locked_until=func.now() + timedelta(seconds=self.lease_seconds),
+                    started_at=func.coalesce(job.started_at, func.now()),
+                    updated_at=func.now(),
+                )
+                .returning(
+                    job.id, job.job_type, job.payload, job.attempts, job.max_retries,
+                    job.retry_delay, job.timeout, job.job_metadata,
+                )
+            )
+            row = result.mappings().one_or_none()
+            await session.commit()
+        return dict(row) if row else None
+
+    async def _touch(self, job_id: str, progress: Optional[Dict[str, Any]] = None) -> bool:
+        """Extend this worker's lease (and merge progress); False if the job is no longer ours"""
+        job = BackgroundJobRecord
+        values: Dict[str, Any] = {
+            "locked_until": func.now() + timedelta(seconds=self.lease_seconds),
+            "updated_at": func.now(),
+        }
+        if progress:
+            values["progress"] = job.progress.op("||")(literal(self._jsonable(progress), JSONB))
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(job)
+                .where(
+                    and_(
+                        job.id == job_id,
+                        job.status == JobStatus.RUNNING.value,
+                        job.locked_by == self.worker_id,
+                    )
+                )
+                .values(**values)
+            )
+            await session.commit()
+        return (result.rowcount or 0) > 0
+
+    async def _heartbeat(self, job_id: str, task: asyncio.Task):
+        """Keep the lease alive; cancel the handler if the job was cancelled elsewhere"""
+        while not task.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self._touch(job_id):
+                    task.cancel()
+                    return
+            except Exception as e:
+                logger.warning("Job heartbeat failed", job_id=job_id, error=str(e))
+
+    async def _finish(self, job_id: str, **values: Any) -> None:
+        """Record the outcome of a job still leased by this worker"""
+        job = BackgroundJobRecord
+        async with self.session_factory() as session:
+            await session.execute(
+                update(job)
+                .where(
+                    and_(
+                        job.id == job_id,
+                        job.status == JobStatus.RUNNING.value,
+                        job.locked_by == self.worker_id,
+                    )
+                )
+                .values(locked_by=None, locked_until=None, updated_at=func.now(), **values)
+            )
+            await session.commit()
+
+    async def _execute_job(self, job: Dict[str, Any], worker_name: str):
+        """Execute a claimed job and record its outcome"""
+        config = self.job_types[job["job_type"]]
+        context = JobContext(self, job["id"], job["job_type"], job["attempts"], job["job_metadata"] or {})
+
+        logger.info(
+            "Executing job",
+            job_id=job["id"],
+            job_type=job["job_type"],
+            worker=worker_name,
+            attempt=job["attempts"]
+        )
+
+        start_time = datetime.now(timezone.utc)
+        task = asyncio.create_task(config.handler(context, job["payload"] or {}))
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"], task))
+        try:
+            if job["timeout"]:
+                result = await asyncio.wait_for(task, timeout=job["timeout"])
+            else:
+                result = await task
+
+            await self._finish(
+                job["id"],
+                status=JobStatus.COMPLETED.value,
+                result=self._jsonable(result),
+                error=None,
+                completed_at=func.now(),
+            )
+            logger.info(
+                "Job completed successfully",
+                job_id=job["id"],
+                job_type=job["job_type"],
+                execution_time=(datetime.now(timezone.utc) - start_time).total_seconds(),
+                worker=worker_name
+            )
+
+        except (asyncio.CancelledError, JobCancelled):
+            if not self.running:
+                # Shutdown: keep the lease so the job is retried after it expires
+                logger.info("Job interrupted by shutdown", job_id=job["id"])
+                raise
+            logger.info("Job cancelled during execution", job_id=job["id"])
+
+        except asyncio.TimeoutError:
+            await self._handle_job_failure(job, f"Job timed out after {job['timeout']} seconds", worker_name)
+
+        except Exception as e:
+            await self._handle_job_failure(job, str(e), worker_name)
+
+        finally:
+            heartbeat.cancel()
+
+    async def _handle_job_failure(self, job: Dict[str, Any], error: str, worker_name: str):
+        """Schedule a retry with exponential backoff, or fail permanently"""
+        attempts = job["attempts"]
+
+        logger.error(
+            "Job failed",
+            job_id=job["id"],
+            job_type=job["job_type"],
+            error=error,
+            attempt=attempts,
+            max_retries=job["max_retries"],
+            worker=worker_name
+        )
+
+        if attempts <= job["max_retries"]:
+            retry_delay = self.retry_delay_for(attempts, job["retry_delay"])
+            await self._finish(
+                job["id"],
+                status=JobStatus.RETRYING.value,
+                error=error[:4000],
+                scheduled_at=func.now() + timedelta(seconds=retry_delay),
+            )
+            logger.info("Job scheduled for retry", job_id=job["id"], retry_delay=retry_delay)
+        else:
+            await self._finish(
+                job["id"],
+                status=JobStatus.FAILED.value,
+                error=error[:4000],
+                completed_at=func.now(),
+            )
+            logger.error(
+                "Job failed permanently",
+                job_id=job["id"],
+                job_type=job["job_type"],
+                total_attempts=attempts
+            )
+
+    @staticmethod
+    def retry_delay_for(attempts: int, base_delay: float) -> float:
+        """Exponential backoff before the next attempt (base, 2x, 4x, ... capped at MAX_RETRY_DELAY)"""
+        return min(base_delay * (2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+    @staticmethod
+    def _jsonable(value: Any) -> Any:
+        """Coerce a handler result into something storable as JSONB"""
+        if value is None:
+            return None
+        return json.loads(json.dumps(value, default=str))
+
+
+# Process-wide engine; modules register job types on import, the app lifespan starts workers
+background_jobs = BackgroundJobService()
@@ -312,12 +312,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         try:
             if commit:
-                await db.commit()
-                await db.refresh(db_obj)
-
-                # 記錄審計日誌
+                # 記錄審計日誌（與建立同一次提交）
                 db_obj.audit_log('created', created_by)
                 await db.commit()
+                await db.refresh(db_obj)
 
             logger.info(
                 "Entity created",
@@ -458,13 +456,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         try:
             if commit:
-                await db.commit()
-                await db.refresh(db_obj)
-
-                # 記錄審計日誌（含變更詳情）
+                # 記錄審計日誌（含變更詳情，與更新同一次提交）
                 if changed_fields:
                     db_obj.audit_log('updated', updated_by, {'changes': changed_fields})
-                    await db.commit()
+                await db.commit()
+                await db.refresh(db_obj)
 
             logger.info(
                 "Entity updated",
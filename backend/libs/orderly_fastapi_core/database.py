@@ -1,16 +1,59 @@
+"""
+資料庫引擎與 session 依賴
+
+唯讀 session（get_read_session_dependency）由進程共用的 ReadReplicaRouter 分派：
+- 路由到 DATABASE_REPLICA_URLS（逗號分隔）中的 replica，輪流使用
+- replica 未設定、連線失敗或複寫落後超過 DATABASE_REPLICA_MAX_LAG_SECONDS 時回退主庫；
+  連線與落後查詢最多等 DATABASE_REPLICA_CONNECT_TIMEOUT 秒，故障的 replica 不會卡住請求
+- 同一使用者在主庫 session 提交寫入後 DATABASE_READ_YOUR_WRITES_SECONDS 內的讀取一律走主庫；
+  標記同時寫入 Redis，其他 worker 上的請求也看得到
+測試時可將 DATABASE_REPLICA_URLS 指向第二個本機 Postgres（非 standby 時落後視為 0）。
+
+跨模組用途（背景工作引擎、健康檢查）共用一個主庫 engine（shared_async_engine），
+以 DATABASE_URL 設定，首次使用時才建立。
+"""
+
 from __future__ import annotations
 
-from typing import Tuple, Callable
+import asyncio
+import os
+import time
+from typing import Any, Callable, List, Optional, Tuple
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
+import structlog
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
 
+from .principal import PrincipalCache
+from .redis_manager import redis_manager
+
+logger = structlog.get_logger()
 
 # Factories for session locals (named to avoid confusion when imported)
 AsyncSessionLocalFactory = async_sessionmaker
 SessionLocalFactory = sessionmaker
 
+# session.info 標記
+WRITE_MARK_KEY = "db_wrote"          # 本交易有寫入
+PRINCIPAL_KEY = "db_principal"       # 請求使用者（read-your-writes 的範圍）
+ROUTER_KEY = "db_read_router"
+READ_ONLY_KEY = "db_read_only"       # 唯讀 session（可能連到 replica）
+
+STICKY_KEY_PREFIX = "db:recent_write"
+_TEXT_DML = ("INSERT", "UPDATE", "DELETE")
+
+# standby 的複寫落後秒數；已追上最新 WAL 時為 0，非 standby（主庫或測試用的一般實例）亦為 0
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
 
 def create_db_engines(database_url: str, debug: bool = False) -> Tuple:
     """
@@ -39,17 +82,311 @@ def create_db_engines(database_url: str, debug: bool = False) -> Tuple:
     return async_engine, sync_engine, AsyncSessionLocal, SessionLocal
 
 
-def get_async_session_dependency(AsyncSessionLocal: async_sessionmaker[AsyncSession]) -> Callable[[], AsyncSession]:
+_shared_primary: Optional[Tuple[AsyncEngine, async_sessionmaker]] = None
+
+
+def _primary() -> Tuple[AsyncEngine, async_sessionmaker]:
+    global _shared_primary
+    if _shared_primary is None:
+        from .unified_config import get_settings
+
+        settings = get_settings()
+        engine = create_async_engine(
+            settings.get_database_url_async(),
+            echo=settings.database_echo,
+            pool_pre_ping=True,
+            pool_recycle=300,
+        )
+        _shared_primary = (engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    return _shared_primary
+
+
+def shared_async_engine() -> AsyncEngine:
+    """進程共用的主庫 async engine（不屬於任何模組的用途；首次呼叫時建立）"""
+    return _primary()[0]
+
+
+def shared_session_factory() -> async_sessionmaker:
+    """shared_async_engine 的 session factory"""
+    return _primary()[1]
+
+
+async def dispose_shared_engine() -> None:
+    """關閉共用主庫連線池（應用程式關閉時呼叫一次）"""
+    global _shared_primary
+    if _shared_primary is not None:
+        engine, _ = _shared_primary
+        _shared_primary = None
+        await engine.dispose()
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def _env_urls(name: str) -> List[str]:
+    return [url.strip() for url in os.getenv(name, "").split(",") if url.strip()]
+
+
+class _Replica:
+    __slots__ = ("url", "engine", "session_factory", "lag", "checked_at")
+
+    def __init__(self, url: str, engine: AsyncEngine):
+        self.url = url
+        self.engine = engine
+        self.session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+
+
+class ReadReplicaRouter:
+    """唯讀 session 的 replica 路由 + read-your-writes 標記（單一事件迴圈使用）"""
+
+    def __init__(
+        self,
+        replica_urls: Optional[List[str]] = None,
+        max_lag_seconds: Optional[float] = None,
+        sticky_seconds: Optional[float] = None,
+        lag_check_interval: float = 2.0,
+        connect_timeout: Optional[float] = None,
+    ):
+        self.replica_urls = [_async_url(url) for url in (
+            replica_urls if replica_urls is not None else _env_urls("DATABASE_REPLICA_URLS")
+        )]
+        self.max_lag_seconds = max_lag_seconds if max_lag_seconds is not None else float(
+            os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5")
+        )
+        self.sticky_seconds = sticky_seconds if sticky_seconds is not None else float(
+            os.getenv("DATABASE_READ_YOUR_WRITES_SECONDS", "10")
+        )
+        self.lag_check_interval = lag_check_interval
+        self.connect_timeout = connect_timeout if connect_timeout is not None else float(
+            os.getenv("DATABASE_REPLICA_CONNECT_TIMEOUT", "2")
+        )
+        self._replicas: List[_Replica] = []
+        self._next = 0
+        self._recent_writers: Optional[PrincipalCache] = None
+        self._pending: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replica_urls)
+
+    def configure(self, **options: Any) -> None:
+        """調整設定（需在第一個唯讀 session 建立前呼叫）"""
+        if self._replicas:
+            raise RuntimeError("ReadReplicaRouter already has replica engines; configure it before first use")
+        for key, value in options.items():
+            if not hasattr(self, key) or key.startswith("_"):
+                raise TypeError(f"Unknown ReadReplicaRouter option: {key}")
+            if key == "replica_urls":
+                value = [_async_url(url) for url in value]
+            setattr(self, key, value)
+        self._recent_writers = None
+
+    def _writers(self) -> PrincipalCache:
+        if self._recent_writers is None:
+            self._recent_writers = PrincipalCache(ttl_seconds=self.sticky_seconds)
+        return self._recent_writers
+
+    def _ensure_replicas(self) -> List[_Replica]:
+        if not self._replicas and self.replica_urls:
+            self._replicas = [
+                _Replica(
+                    url,
+                    create_async_engine(
+                        url,
+                        pool_pre_ping=True,
+                        pool_recycle=300,
+                        # 誤用唯讀 session 寫入時直接失敗，而不是寫到 replica
+                        connect_args={
+                            "timeout": self.connect_timeout,
+                            "server_settings": {"default_transaction_read_only": "on"},
+                        },
+                    ),
+                )
+                for url in self.replica_urls
+            ]
+        return self._replicas
+
+    # ============ 複寫落後 ============
+
+    async def replica_lag(self, replica: _Replica) -> Optional[float]:
+        """replica 的落後秒數（每 lag_check_interval 最多查詢一次；無法連線或逾時為 None）"""
+        now = time.monotonic()
+        if replica.checked_at is not None and now - replica.checked_at < self.lag_check_interval:
+            return replica.lag
+        try:
+            lag = await asyncio.wait_for(self._probe_lag(replica), timeout=self.connect_timeout)
+            replica.lag = None if lag is None else float(lag)
+        except Exception as exc:
+            replica.lag = None
+            logger.warning(
+                "db_replica_unavailable", replica=replica.url.rsplit("@", 1)[-1], error=str(exc) or type(exc).__name__
+            )
+        replica.checked_at = now
+        return replica.lag
+
+    @staticmethod
+    async def _probe_lag(replica: _Replica) -> Any:
+        async with replica.engine.connect() as connection:
+            return (await connection.execute(REPLICA_LAG_SQL)).scalar()
+
+    async def read_session_factory(self, principal: Optional[str] = None) -> Optional[async_sessionmaker]:
+        """可用的 replica session factory；應改讀主庫時回傳 None"""
+        if not self.enabled:
+            return None
+        if principal is not None and await self.recently_wrote(principal):
+            return None
+        replicas = self._ensure_replicas()
+        for offset in range(len(replicas)):
+            index = (self._next + offset) % len(replicas)
+            lag = await self.replica_lag(replicas[index])
+            if lag is not None and lag <= self.max_lag_seconds:
+                self._next = (index + 1) % len(replicas)
+                return replicas[index].session_factory
+        logger.debug("db_replica_fallback_to_primary")
+        return None
+
+    # ============ read-your-writes ============
+
+    def record_write(self, principal: str) -> None:
+        """主庫交易提交後呼叫：sticky_seconds 內此使用者的讀取走主庫"""
+        if not self.enabled:
+            return
+        self._writers().set(principal, True)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._publish_write(principal))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish_write(self, principal: str) -> None:
+        breaker = redis_manager.breaker()
+        if not breaker.allow():
+            return
+        try:
+            await redis_manager.client("db-routing").set(
+                f"{STICKY_KEY_PREFIX}:{principal}", 1, px=int(self.sticky_seconds * 1000)
+            )
+            breaker.record_success()
+        except Exception as exc:
+            breaker.record_failure()
+            logger.warning("db_recent_write_publish_failed", error=str(exc))
+
+    async def recently_wrote(self, principal: str) -> bool:
+        """此使用者是否剛寫入（本進程或其他 worker）；無法確認時視為是"""
+        if self._writers().get(principal):
+            return True
+        breaker = redis_manager.breaker()
+        if not breaker.allow():
+            return True
+        try:
+            found = await redis_manager.client("db-routing").exists(f"{STICKY_KEY_PREFIX}:{principal}")
+            breaker.record_success()
+        except Exception as exc:
+            breaker.record_failure()
+            logger.warning("db_recent_write_lookup_failed", error=str(exc))
+            return True
+        return bool(found)
+
+    async def dispose(self) -> None:
+        """關閉 replica 連線池（應用程式關閉時呼叫一次）"""
+        for replica in self._replicas:
+            await replica.engine.dispose()
+        self._replicas = []
+
+
+# 進程共用實例（各模組共用，寫入標記因此跨模組生效）
+read_replica_router = ReadReplicaRouter()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session: Session, flush_context) -> None:
+    session.info[WRITE_MARK_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml_write(orm_execute_state) -> None:
+    statement = orm_execute_state.statement
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+        or (isinstance(statement, TextClause) and statement.text.lstrip()[:6].upper() in _TEXT_DML)
+    ):
+        orm_execute_state.session.info[WRITE_MARK_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed_write(session: Session) -> None:
+    if not session.info.pop(WRITE_MARK_KEY, False):
+        return
+    router = session.info.get(ROUTER_KEY)
+    principal = session.info.get(PRINCIPAL_KEY)
+    if router is not None and principal:
+        router.record_write(principal)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write_mark(session: Session) -> None:
+    session.info.pop(WRITE_MARK_KEY, None)
+
+
+def _request_principal(request: Request) -> Optional[str]:
+    user_id = getattr(request.state, "user_id", None)
+    return str(user_id) if user_id else None
+
+
+def get_async_session_dependency(
+    AsyncSessionLocal: async_sessionmaker[AsyncSession],
+    router: Optional[ReadReplicaRouter] = None,
+) -> Callable[..., AsyncSession]:
     """
-    Build a FastAPI dependency function that yields an AsyncSession
+    Build a FastAPI dependency function that yields a primary AsyncSession
     using the provided AsyncSessionLocal.
+
+    Committed writes mark the requesting user for read-your-writes routing.
     """
+    router = router or read_replica_router
 
-    async def _get_async_session() -> AsyncSession:
+    async def _get_async_session(request: Request) -> AsyncSession:
         async with AsyncSessionLocal() as session:
+            principal = _request_principal(request)
+            if principal:
+                session.info[PRINCIPAL_KEY] = principal
+                session.info[ROUTER_KEY] = router
             try:
                 yield session
             finally:
                 await session.close()
 
     return _get_async_session
+
+
+def get_read_session_dependency(
+    AsyncSessionLocal: async_sessionmaker[AsyncSession],
+    router: Optional[ReadReplicaRouter] = None,
+) -> Callable[..., AsyncSession]:
+    """
+    Build a FastAPI dependency yielding a read-only AsyncSession.
+
+    Routed to a replica when one is configured, caught up and the user has
+    not just written; otherwise falls back to AsyncSessionLocal (primary).
+    """
+    router = router or read_replica_router
+
+    async def _get_read_session(request: Request) -> AsyncSession:
+        factory = await router.read_session_factory(_request_principal(request)) or AsyncSessionLocal
+        async with factory() as session:
+            session.info[READ_ONLY_KEY] = True
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    return _get_read_session
@@ -0,0 +1,141 @@
+"""
+識別碼與人類可讀編號
+
+- uuid7()：時間排序的 UUID（RFC 9562 UUIDv7）。前 48 位元為毫秒時間戳，
+  同一毫秒內以 12 位元計數器遞增，新資料列落在索引尾端，熱寫入表的 B-tree 不再隨機分裂
+- NumberAllocator：每日重置、可排序的單據編號（ORD-20260101-00042）。
+  各 worker 以單一 UPSERT 向 number_sequences 租用一段號碼，之後在進程內逐一發出；
+  租用一律在 engine 的新連線上以獨立交易提交（即使呼叫端 session 綁定在某個連線或
+  SAVEPOINT 上），呼叫端 rollback 不會讓號碼被重複發出（只會留下空號），因此不再需要碰撞重試
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.engine import Connection
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+logger = structlog.get_logger()
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """時間排序的 UUIDv7（同一進程內嚴格遞增）"""
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            # 計數器起點保留隨機性，最高位清零以留出遞增空間
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # 時鐘未前進（或回撥）：沿用上一個時間戳並遞增計數器，溢位則借用下一毫秒
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        ms, counter = _uuid7_last_ms, _uuid7_counter
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """新的實體主鍵（UUIDv7 字串）"""
+    return str(uuid7())
+
+
+class NumberAllocator:
+    """依 (編號名稱, 日期) 租用號段並在進程內逐一發號（單一事件迴圈使用）"""
+
+    def __init__(self, block_size: Optional[int] = None):
+        self.block_size = block_size or int(os.getenv("NUMBER_BLOCK_SIZE", "20"))
+        # (name, period) -> [下一個號碼, 號段結尾（不含）]
+        self._blocks: Dict[Tuple[str, str], list] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def lease_engine(db: AsyncSession) -> AsyncEngine:
+        """
+        呼叫端 session 對應的 engine
+
+        session 可能綁定 engine、連線（測試 / 效能基準的外層交易）或以 binds= 依 mapper 分派，
+        一律透過 get_bind() 解析，連線則取其 engine，租用時另開新連線
+        """
+        from .models.number_sequence import NumberSequence
+
+        bind = db.get_bind(mapper=NumberSequence)
+        if isinstance(bind, Connection):
+            bind = bind.engine
+        return AsyncEngine(bind)
+
+    async def next_value(self, bind: AsyncEngine, name: str, period: str) -> int:
+        """取得 (name, period) 的下一個號碼；號段用盡時才存取資料庫"""
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            key = (name, period)
+            block = self._blocks.get(key)
+            if block is None or block[0] >= block[1]:
+                end = await self._lease(bind, name, period)
+                # 換日後舊日期的號段不再使用
+                for stale in [k for k in self._blocks if k[0] == name and k[1] != period]:
+                    del self._blocks[stale]
+                block = self._blocks[key] = [end - self.block_size, end]
+            value = block[0]
+            block[0] += 1
+            return value
+
+    async def _lease(self, bind: AsyncEngine, name: str, period: str) -> int:
+        """以單一 UPSERT 租用一段號碼並獨立提交；回傳號段結尾（不含）"""
+        # models.base 的主鍵預設值引用本模組，模型於使用時才匯入
+        from .models.number_sequence import NumberSequence
+
+        table = NumberSequence.__table__
+        stmt = insert(table).values(name=name, period=period, next_value=1 + self.block_size)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name, table.c.period],
+            set_={"next_value": table.c.next_value + self.block_size, "updated_at": func.now()},
+        ).returning(table.c.next_value)
+        # 新連線 + 獨立交易：不與呼叫端的連線 / 交易共用，呼叫端 rollback 不影響已租出的號段
+        async with bind.begin() as connection:
+            end = (await connection.execute(stmt)).scalar_one()
+        logger.debug("number_block_leased", name=name, period=period, end=end, block_size=self.block_size)
+        return end
+
+    async def next_number(
+        self,
+        db: AsyncSession,
+        name: str,
+        prefix: str,
+        width: int = 6,
+        day: Optional[date] = None,
+    ) -> str:
+        """
+        產生 {prefix}-{YYYYMMDD}-{流水號} 編號
+
+        Args:
+            db: 呼叫端的 session（僅借用其 engine，租用號段不參與呼叫端連線與交易）
+            name: 計數器名稱（同名共用一組每日流水號）
+            prefix: 編號前綴，例如 "ORD" 或 "REC-ABCD1234"
+            width: 流水號最少位數
+            day: 編號日期（預設 UTC 今日）
+        """
+        day = day or datetime.now(timezone.utc).date()
+        period = day.strftime("%Y%m%d")
+        value = await self.next_value(self.lease_engine(db), name, period)
+        return f"{prefix}-{period}-{value:0{width}d}"
+
+
+# 進程共用實例
+number_allocator = NumberAllocator()
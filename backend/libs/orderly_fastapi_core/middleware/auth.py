@@ -11,6 +11,7 @@ from starlette.responses import JSONResponse
 from jose import jwt, JWTError, ExpiredSignatureError
 
 from orderly_fastapi_core import UnifiedSettings, get_settings
+from orderly_fastapi_core.principal import attach_principal
 
 logger = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -124,11 +125,9 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 content={"success": False, "error": {"code": 401, "message": "Invalid token"}},
             )
 
-        # Attach user context to request.state
-        request.state.user = payload
-        request.state.user_id = payload.get("sub")
-        request.state.tenant_id = payload.get("tenant_id") or payload.get("org_id")
-        request.state.permissions = payload.get("permissions", [])
+        # Attach user context to request.state; module dependencies read it from
+        # there instead of decoding the token again
+        attach_principal(request, payload)
 
         required_level = self._required_verification_level(path)
         if required_level is not None and self._payload_verification_level(payload) < required_level:
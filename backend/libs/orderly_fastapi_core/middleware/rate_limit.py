@@ -9,6 +9,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from ..redis_manager import redis_manager
+
 logger = structlog.get_logger()
 
 
@@ -33,13 +35,7 @@ class RedisRateLimiter:
 
     async def connect(self) -> None:
         try:
-            self.redis = await aioredis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-            )
+            self.redis = redis_manager.client("rate-limit", url=self.redis_url)
             await self.redis.ping()
             logger.info("redis_rate_limiter_connected", redis_url=self.redis_url)
         except Exception as exc:
@@ -47,8 +43,8 @@ class RedisRateLimiter:
             self.redis = None
 
     async def close(self) -> None:
-        if self.redis:
-            await self.redis.close()
+        # The pool is shared and closed once at application shutdown
+        self.redis = None
 
     def get_limit_config(self, endpoint: str) -> Dict[str, int]:
         return self.LIMITS.get(endpoint, self.DEFAULT_LIMIT)
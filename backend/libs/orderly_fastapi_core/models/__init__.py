@@ -8,6 +8,8 @@ Exports:
 - UnifiedBaseModel: 統一的基礎模型（含審計欄位、軟刪除）
 - AuditMixin: 審計欄位 Mixin
 - SoftDeleteMixin: 軟刪除 Mixin
+- NumberSequence: 每日編號計數器
+- BackgroundJobRecord: 背景工作佇列（見 orderly_fastapi_core.background_jobs）
 """
 
 from .base import (
@@ -17,6 +19,8 @@ from .base import (
     SoftDeleteMixin,
     MetadataMixin,
 )
+from .number_sequence import NumberSequence
+from .background_job import BackgroundJobRecord
 
 __all__ = [
     "Base",
@@ -24,4 +28,6 @@ __all__ = [
     "AuditMixin",
     "SoftDeleteMixin",
     "MetadataMixin",
+    "NumberSequence",
+    "BackgroundJobRecord",
 ]
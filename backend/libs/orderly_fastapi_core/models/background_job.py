@@ -0,0 +1,75 @@
+"""
+Background Job Model
+
+Durable job queue rows shared by every worker process and every module. Workers claim due jobs
+with SELECT ... FOR UPDATE SKIP LOCKED and hold a lease (locked_until) that is
+extended while the job runs, so jobs survive restarts and status is visible
+from any process.
+"""
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
+import uuid
+
+from app.db.base import Base
+
+
+class BackgroundJobRecord(Base):
+    """Persistent background job (pending → running → completed / failed / cancelled)"""
+    __tablename__ = "background_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String(100), nullable=False)
+
+    # Execution parameters (JSON-serializable handler payload)
+    payload = Column(JSONB, nullable=False, default=dict)
+    priority = Column(Integer, nullable=False, default=2)  # lower runs first
+    status = Column(String(20), nullable=False, default="pending")
+
+    # Retry policy
+    attempts = Column(Integer, nullable=False, default=0)
+    max_retries = Column(Integer, nullable=False, default=3)
+    retry_delay = Column(Float, nullable=False, default=5.0)
+    timeout = Column(Float, nullable=True)
+
+    # Scheduling and lease
+    scheduled_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    # Progress and outcome
+    progress = Column(JSONB, nullable=False, default=dict)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    job_metadata = Column(JSONB, nullable=False, default=dict)
+
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        # Claim path: due jobs of a type in priority order
+        Index(
+            "ix_background_jobs_claim",
+            "job_type", "priority", "scheduled_at",
+            postgresql_where=text("status IN ('pending', 'retrying')"),
+        ),
+        # Lease recovery for jobs whose worker died
+        Index(
+            "ix_background_jobs_lease",
+            "locked_until",
+            postgresql_where=text("status = 'running'"),
+        ),
+        Index("ix_background_jobs_status_created", "status", "created_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<BackgroundJobRecord(id={self.id}, type={self.job_type}, status={self.status})>"
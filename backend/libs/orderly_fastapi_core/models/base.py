@@ -5,7 +5,7 @@
 所有微服務的模型應繼承此基礎模型以確保一致性。
 
 Features:
-- String UUID 主鍵（與 6/8 服務一致）
+- String UUID 主鍵（UUIDv7，依時間排序）
 - camelCase 時間戳欄位（與前端 API 契約一致）
 - 審計欄位（created_by, updated_by）
 - 軟刪除支援（is_active）
@@ -13,7 +13,6 @@ Features:
 - 內建審計追蹤
 """
 
-import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -24,6 +23,8 @@ from sqlalchemy.ext.hybrid import hybrid_property
 
 from app.db.base import Base
 
+from ..ids import new_id
+
 logger = structlog.get_logger(__name__)
 
 
@@ -170,7 +171,7 @@ class UnifiedBaseModel(Base, AuditMixin, SoftDeleteMixin, MetadataMixin):
         primary_key=True,
         unique=True,
         nullable=False,
-        default=lambda: str(uuid.uuid4())
+        default=new_id
     )
 
     # 時間戳：camelCase 欄位名（與前端 API 契約一致）
@@ -224,12 +225,12 @@ class UnifiedBaseModel(Base, AuditMixin, SoftDeleteMixin, MetadataMixin):
     @classmethod
     def generate_id(cls) -> str:
         """
-        產生新的 UUID
+        產生新的 UUID（UUIDv7）
 
         Returns:
             新的 UUID 字串
         """
-        return str(uuid.uuid4())
+        return new_id()
 
     def audit_log(
         self,
@@ -0,0 +1,33 @@
+"""
+NumberSequence - 人類可讀編號的每日計數器
+
+每個 (編號名稱, 日期) 一筆，next_value 為下一個尚未租出的號碼；
+各 worker 一次租用一段號碼（見 orderly_fastapi_core.ids.NumberAllocator）
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+
+from app.db.base import Base
+
+
+class NumberSequence(Base):
+    """每日編號計數器（order_number、reconciliation_number…）"""
+
+    __tablename__ = "number_sequences"
+
+    name = Column(String(32), primary_key=True)
+    period = Column(String(8), primary_key=True)  # YYYYMMDD
+    next_value = Column(BigInteger, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        {"comment": "Per-day counters leased in blocks for human-readable document numbers"},
+    )
+
+    def __repr__(self) -> str:
+        return f"<NumberSequence(name={self.name}, period={self.period}, next_value={self.next_value})>"
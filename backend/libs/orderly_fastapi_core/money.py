@@ -0,0 +1,186 @@
+"""
+金額計算（固定小數位整數運算）
+
+- 以固定小數位整數（金額 10^-4、稅率 10^-6）運算取代逐項 Decimal 加總，
+  進位規則與 round(x, 2) 相同，即銀行家進位（ROUND_HALF_EVEN）
+- 一次計算多張訂單（訂單建立、確認調整、批次重新定價、對帳彙總）
+- 輸入位數超出固定小數位時（例如 JSON 調整項中的浮點數），該筆退回 Decimal 計算，結果不變
+- 純函式，不依賴任何模組的模型或服務，各模組可直接匯入
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_TAX_RATE = Decimal("0.05")  # 5%
+
+# 固定小數位：數量 DECIMAL(10,3)、單價 DECIMAL(10,4)、金額 DECIMAL(12,2) 皆可無損表示
+QUANTITY_PLACES = 3
+AMOUNT_PLACES = 4
+RATE_PLACES = 6
+
+_AMOUNT_UNIT = 10 ** AMOUNT_PLACES
+_CENTS_PER_UNIT = 10 ** (AMOUNT_PLACES - 2)
+_LINE_DIVISOR = 10 ** (QUANTITY_PLACES + AMOUNT_PLACES - 2)
+_TAX_DIVISOR = 10 ** (AMOUNT_PLACES + RATE_PLACES - 2)
+
+DISCOUNT_TYPES = ("discount", "credit")
+SHIPPING_TYPES = ("shipping_fee",)
+SURCHARGE_TYPES = ("surcharge",)
+
+TOTAL_FIELDS = ("subtotal", "tax_amount", "discount_amount", "shipping_fee", "total_amount")
+
+
+class _Inexact(Exception):
+    """數值位數超出固定小數位"""
+
+
+def _units(value: Any, places: int) -> int:
+    """以 10^-places 為單位的整數值；無法無損表示時拋出 _Inexact"""
+    if not value:
+        return 0
+    if isinstance(value, int):
+        return value * 10 ** places
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int) or exponent < -places:
+        raise _Inexact
+    return int(value.scaleb(places))
+
+
+def _round_half_even(value: int, divisor: int) -> int:
+    """整數除法並以銀行家進位取整（與 Decimal 的 round 相同，正負對稱）"""
+    quotient, remainder = divmod(abs(value), divisor)
+    doubled = remainder * 2
+    if doubled > divisor or (doubled == divisor and quotient % 2):
+        quotient += 1
+    return -quotient if value < 0 else quotient
+
+
+def _cents(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def _adjustment_type(adj: Mapping[str, Any]) -> str:
+    return adj.get("type") or adj.get("adjustment_type", "")
+
+
+def line_total(quantity: Any, unit_price: Any) -> Decimal:
+    """行總計 round(quantity * unit_price, 2)"""
+    try:
+        product = _units(quantity, QUANTITY_PLACES) * _units(unit_price, AMOUNT_PLACES)
+    except _Inexact:
+        return round(Decimal(str(quantity)) * Decimal(str(unit_price)), 2)
+    return _cents(_round_half_even(product, _LINE_DIVISOR))
+
+
+def line_totals(lines: Iterable[Tuple[Any, Any]]) -> List[Decimal]:
+    """多筆 (數量, 單價) 的行總計"""
+    return [line_total(quantity, unit_price) for quantity, unit_price in lines]
+
+
+def _totals_from_units(
+    subtotal: int,
+    discount: int,
+    shipping: int,
+    rate: int,
+) -> Dict[str, Decimal]:
+    taxable = max(subtotal - discount, 0)
+    tax_cents = _round_half_even(taxable * rate, _TAX_DIVISOR)
+    total = taxable + tax_cents * _CENTS_PER_UNIT + shipping
+    return {
+        "subtotal": _cents(_round_half_even(subtotal, _CENTS_PER_UNIT)),
+        "tax_amount": _cents(tax_cents),
+        "discount_amount": _cents(_round_half_even(discount, _CENTS_PER_UNIT)),
+        "shipping_fee": _cents(_round_half_even(shipping, _CENTS_PER_UNIT)),
+        "total_amount": _cents(_round_half_even(total, _CENTS_PER_UNIT)),
+    }
+
+
+def _adjustment_units(adjustments: Optional[Sequence[Mapping[str, Any]]]) -> Tuple[int, int, int]:
+    """(附加費, 折扣, 運費)"""
+    surcharge = discount = shipping = 0
+    for adj in adjustments or ():
+        adj_type = _adjustment_type(adj)
+        if adj_type in DISCOUNT_TYPES:
+            discount += _units(adj.get("amount", 0), AMOUNT_PLACES)
+        elif adj_type in SHIPPING_TYPES:
+            shipping += _units(adj.get("amount", 0), AMOUNT_PLACES)
+        elif adj_type in SURCHARGE_TYPES:
+            surcharge += _units(adj.get("amount", 0), AMOUNT_PLACES)
+    return surcharge, discount, shipping
+
+
+def _decimal_totals(
+    amounts: Sequence[Any],
+    adjustments: Optional[Sequence[Mapping[str, Any]]],
+    tax_rate: Decimal,
+) -> Dict[str, Decimal]:
+    """Decimal 版本（位數超出固定小數位時使用）"""
+    subtotal = sum((Decimal(str(amount)) for amount in amounts if amount), Decimal("0"))
+    discount_amount = Decimal("0")
+    shipping_fee = Decimal("0")
+    for adj in adjustments or ():
+        adj_type = _adjustment_type(adj)
+        amount = Decimal(str(adj.get("amount", 0)))
+        if adj_type in DISCOUNT_TYPES:
+            discount_amount += amount
+        elif adj_type in SHIPPING_TYPES:
+            shipping_fee += amount
+        elif adj_type in SURCHARGE_TYPES:
+            subtotal += amount
+
+    taxable_amount = max(subtotal - discount_amount, Decimal("0"))
+    tax_amount = round(taxable_amount * tax_rate, 2)
+    total_amount = taxable_amount + tax_amount + shipping_fee
+    return {
+        "subtotal": round(subtotal, 2),
+        "tax_amount": tax_amount,
+        "discount_amount": round(discount_amount, 2),
+        "shipping_fee": round(shipping_fee, 2),
+        "total_amount": round(total_amount, 2),
+    }
+
+
+def order_totals(
+    amounts: Iterable[Any],
+    adjustments: Optional[Sequence[Mapping[str, Any]]] = None,
+    tax_rate: Optional[Decimal] = None,
+) -> Dict[str, Decimal]:
+    """
+    單張訂單金額
+
+    Args:
+        amounts: 各項目的行總計
+        adjustments: 調整項列表（discount / credit / shipping_fee / surcharge）
+        tax_rate: 稅率（預設 5%）
+
+    Returns:
+        Dict containing subtotal, tax_amount, discount_amount, shipping_fee, total_amount
+    """
+    if tax_rate is None:
+        tax_rate = DEFAULT_TAX_RATE
+    amounts = list(amounts)
+    try:
+        rate = _units(tax_rate, RATE_PLACES)
+        subtotal = sum(_units(amount, AMOUNT_PLACES) for amount in amounts)
+        surcharge, discount, shipping = _adjustment_units(adjustments)
+    except _Inexact:
+        return _decimal_totals(amounts, adjustments, tax_rate)
+    return _totals_from_units(subtotal + surcharge, discount, shipping, rate)
+
+
+def batch_totals(
+    orders: Mapping[Any, Tuple[Iterable[Any], Optional[Sequence[Mapping[str, Any]]]]],
+    tax_rate: Optional[Decimal] = None,
+) -> Dict[Any, Dict[str, Decimal]]:
+    """多張訂單金額：{key: (行總計, 調整項)} → {key: 金額}"""
+    return {key: order_totals(amounts, adjustments, tax_rate) for key, (amounts, adjustments) in orders.items()}
+
+
+def sum_amounts(amounts: Iterable[Any]) -> Decimal:
+    """金額加總（兩位小數）"""
+    amounts = list(amounts)
+    try:
+        return _cents(_round_half_even(sum(_units(a, AMOUNT_PLACES) for a in amounts), _CENTS_PER_UNIT))
+    except _Inexact:
+        return round(sum((Decimal(str(a)) for a in amounts if a), Decimal("0")), 2)
@@ -0,0 +1,171 @@
+"""
+請求主體（principal）解析
+JWT 只在最外層 AuthMiddleware 解碼一次，claims 與階層上下文存放於 request.state，
+各模組的依賴一律從這裡讀取，不再重複解碼。
+
+另提供短 TTL 的進程內快取，供各模組快取由 claims 解析出的資料列（User、Organization 等），
+寫入提交後由擁有該資料的模組負責失效。principal_cache 的每個鍵在 Redis 有版本號，
+失效時遞增，其他 worker 的舊快取在下一次讀取時即不再使用。
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import structlog
+from fastapi import Request
+
+from .redis_manager import RedisManager, redis_manager
+
+logger = structlog.get_logger()
+
+VERSION_KEY_PREFIX = "principal:version"
+# 版本號需比進程內 TTL 存活更久，過期重置時本地不會還留著舊版本的快取
+VERSION_TTL_SECONDS = 86400
+
+
+def build_hierarchy_context(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """由 claims 的 hierarchy_scope 建立客戶階層上下文"""
+    hierarchy_scope = claims.get("hierarchy_scope") or {}
+    return {
+        "user_id": claims.get("sub"),
+        "role": claims.get("role"),
+        "group_ids": hierarchy_scope.get("group_ids", []),
+        "company_ids": hierarchy_scope.get("company_ids", []),
+        "location_ids": hierarchy_scope.get("location_ids", []),
+        "unit_ids": hierarchy_scope.get("unit_ids", []),
+        "scope_level": hierarchy_scope.get("level", "unit"),  # group, company, location, unit
+        "permissions": claims.get("permissions", []),
+    }
+
+
+def attach_principal(request: Request, claims: Dict[str, Any]) -> None:
+    """將已驗證的 claims 與衍生上下文寫入 request.state"""
+    request.state.user = claims
+    request.state.user_id = claims.get("sub")
+    request.state.tenant_id = claims.get("tenant_id") or claims.get("org_id")
+    request.state.permissions = claims.get("permissions", [])
+    request.state.user_permissions = request.state.permissions
+    request.state.hierarchy_context = build_hierarchy_context(claims)
+
+
+def get_request_claims(request: Request) -> Optional[Dict[str, Any]]:
+    """取得本次請求已驗證的 claims（尚未驗證時回傳 None）"""
+    claims = getattr(request.state, "user", None)
+    return claims if isinstance(claims, dict) else None
+
+
+class PrincipalCache:
+    """短 TTL 的進程內快取（單一事件迴圈使用，無需加鎖）"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.ttl_seconds:
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if len(self._entries) >= self.max_entries:
+            self._evict_expired()
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (stored_at, _) in self._entries.items() if now - stored_at >= self.ttl_seconds]:
+            del self._entries[key]
+
+
+class SharedPrincipalCache:
+    """
+    進程內快取 + Redis 版本號（跨 worker 失效）
+
+    讀取流程：lookup() 先取得鍵目前的版本，本地快取版本相同才命中；未命中時
+    呼叫端讀資料庫，再以 lookup() 取得的版本 store()。版本在讀資料庫之前取得，
+    因此與失效交錯時存入的只會是已過時的版本，下一次讀取即重新載入。
+    Redis 無法使用時一律未命中（改讀資料庫），不會回傳可能已失效的資料。
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_entries: int = 10_000,
+        manager: Optional[RedisManager] = None,
+    ):
+        self._local = PrincipalCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._manager = manager
+        self._pending: set = set()
+
+    @property
+    def manager(self) -> RedisManager:
+        return self._manager or redis_manager
+
+    async def _version(self, key: Hashable) -> Optional[str]:
+        breaker = self.manager.breaker()
+        if not breaker.allow():
+            return None
+        try:
+            version = await self.manager.client("principal").get(f"{VERSION_KEY_PREFIX}:{key}")
+            breaker.record_success()
+        except Exception as exc:
+            breaker.record_failure()
+            logger.warning("principal_version_lookup_failed", error=str(exc))
+            return None
+        return version or "0"
+
+    async def lookup(self, key: Hashable) -> Tuple[Optional[Any], Optional[str]]:
+        """(快取值或 None, 目前版本)；版本為 None 表示無法確認，讀到的資料不應存入"""
+        version = await self._version(key)
+        if version is None:
+            return None, None
+        entry = self._local.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1], version
+        return None, version
+
+    def store(self, key: Hashable, value: Any, version: Optional[str]) -> None:
+        if version is not None:
+            self._local.set(key, (version, value))
+
+    def invalidate(self, key: Hashable) -> None:
+        """本地立即失效，並遞增 Redis 版本號通知其他 worker（應在寫入提交後呼叫）"""
+        self._local.invalidate(key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 同步情境（遷移、腳本）沒有事件迴圈；其他 worker 的快取依 TTL 過期
+            return
+        task = loop.create_task(self._publish(key))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self, key: Hashable) -> None:
+        version_key = f"{VERSION_KEY_PREFIX}:{key}"
+        try:
+            await self.manager.run_pipeline(
+                [("INCR", version_key), ("EXPIRE", version_key, VERSION_TTL_SECONDS)], name="principal"
+            )
+        except Exception as exc:
+            logger.warning("principal_invalidation_publish_failed", error=str(exc))
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+# 全進程共用（單體應用中所有模組共用同一份）
+principal_cache = SharedPrincipalCache()
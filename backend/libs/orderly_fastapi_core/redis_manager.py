@@ -0,0 +1,245 @@
+"""
+進程內共用的 Redis 連線管理
+各模組以名稱取得邏輯客戶端（"sessions"、"otp"、"hierarchy-cache"…），
+同一 URL 與解碼設定的客戶端共用一個有上限的阻塞式連線池，
+連線數不再隨服務實例或 DB session 增長；熔斷狀態依 Redis 端點在各模組間共用。
+
+客戶端快取（RESP3 tracking）僅在 redis-py 的 asyncio 客戶端支援 cache_config 時啟用，
+否則 cached=True 的客戶端退回一般客戶端。
+"""
+
+import inspect
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+logger = structlog.get_logger()
+
+try:  # redis-py 5.1+ 才有 CacheConfig
+    from redis.cache import CacheConfig
+except ImportError:  # pragma: no cover - 依安裝版本而定
+    CacheConfig = None
+
+CLIENT_CACHE_SUPPORTED = (
+    CacheConfig is not None
+    and "cache_config" in inspect.signature(aioredis.ConnectionPool.__init__).parameters
+)
+
+
+class CircuitBreaker:
+    """連續失敗達門檻即開路，冷卻時間後放行探測請求；成功即復位"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.last_failure: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return "closed"
+        if self.last_failure is not None and time.monotonic() - self.last_failure >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        return not self.is_open
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.last_failure = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.last_failure = time.monotonic()
+
+
+class RedisManager:
+    """命名邏輯客戶端 + 共用連線池 + 共用熔斷器（單一事件迴圈使用）"""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        pool_timeout: float = 5.0,
+        socket_timeout: float = 5.0,
+        socket_connect_timeout: float = 5.0,
+        health_check_interval: int = 30,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+    ):
+        self.url = url
+        self.max_connections = max_connections or int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+        self.pool_timeout = pool_timeout
+        self.socket_timeout = socket_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self.health_check_interval = health_check_interval
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._pools: Dict[Tuple[str, bool, bool], aioredis.ConnectionPool] = {}
+        self._clients: Dict[Tuple[str, str, bool, bool], aioredis.Redis] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def configure(self, **options: Any) -> None:
+        """調整設定（需在第一個客戶端建立前呼叫）"""
+        if self._pools:
+            raise RuntimeError("RedisManager already has open pools; configure it before first use")
+        for key, value in options.items():
+            if not hasattr(self, key) or key.startswith("_"):
+                raise TypeError(f"Unknown RedisManager option: {key}")
+            setattr(self, key, value)
+
+    def default_url(self) -> str:
+        if self.url is None:
+            from .unified_config import get_settings
+
+            self.url = os.getenv("REDIS_URL") or get_settings().get_redis_url()
+        return self.url
+
+    def _pool(self, url: str, decode_responses: bool, cached: bool) -> aioredis.ConnectionPool:
+        key = (url, decode_responses, cached)
+        pool = self._pools.get(key)
+        if pool is None:
+            options: Dict[str, Any] = {}
+            if cached:
+                options = {"protocol": 3, "cache_config": CacheConfig()}
+            pool = aioredis.BlockingConnectionPool.from_url(
+                url,
+                max_connections=self.max_connections,
+                timeout=self.pool_timeout,
+                decode_responses=decode_responses,
+                encoding="utf-8",
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_connect_timeout,
+                socket_keepalive=True,
+                health_check_interval=self.health_check_interval,
+                retry_on_timeout=True,
+                **options,
+            )
+            self._pools[key] = pool
+            logger.info(
+                "redis_pool_created",
+                decode_responses=decode_responses,
+                client_cache=cached,
+                max_connections=self.max_connections,
+            )
+        return pool
+
+    def client(
+        self,
+        name: str = "default",
+        *,
+        url: Optional[str] = None,
+        decode_responses: bool = True,
+        cached: bool = False,
+    ) -> aioredis.Redis:
+        """取得命名邏輯客戶端；建立不會連線，第一個指令才向連線池借用連線"""
+        url = url or self.default_url()
+        cached = cached and CLIENT_CACHE_SUPPORTED
+        key = (name, url, decode_responses, cached)
+        client = self._clients.get(key)
+        if client is None:
+            client = aioredis.Redis(connection_pool=self._pool(url, decode_responses, cached))
+            self._clients[key] = client
+        return client
+
+    def breaker(self, url: Optional[str] = None) -> CircuitBreaker:
+        """同一 Redis 端點的熔斷器，所有模組共用"""
+        url = url or self.default_url()
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._breakers[url] = breaker
+        return breaker
+
+    def pipeline(
+        self,
+        name: str = "default",
+        *,
+        transaction: bool = False,
+        url: Optional[str] = None,
+        decode_responses: bool = True,
+    ) -> Pipeline:
+        """命名客戶端的 pipeline（整批指令一次往返）"""
+        return self.client(name, url=url, decode_responses=decode_responses).pipeline(transaction=transaction)
+
+    async def run_pipeline(
+        self,
+        commands: Iterable[Sequence[Any]],
+        name: str = "default",
+        *,
+        transaction: bool = False,
+        url: Optional[str] = None,
+        decode_responses: bool = True,
+    ) -> List[Any]:
+        """以單次往返執行 (指令, *參數) 序列並回傳各指令結果；失敗計入熔斷器"""
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise RedisConnectionError("Redis circuit breaker open")
+        async with self.pipeline(
+            name, transaction=transaction, url=url, decode_responses=decode_responses
+        ) as pipe:
+            for command in commands:
+                pipe.execute_command(*command)
+            try:
+                results = await pipe.execute()
+            except (RedisConnectionError, RedisTimeoutError):
+                breaker.record_failure()
+                raise
+        breaker.record_success()
+        return results
+
+    async def ping(self, url: Optional[str] = None) -> bool:
+        """健康檢查；結果同步更新共用熔斷器"""
+        breaker = self.breaker(url)
+        try:
+            await self.client("health", url=url).ping()
+        except Exception as exc:
+            breaker.record_failure()
+            logger.warning("redis_ping_failed", error=str(exc))
+            return False
+        breaker.record_success()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """連線池與熔斷器狀態（供健康檢查 / 指標端點）"""
+        return {
+            "client_cache_supported": CLIENT_CACHE_SUPPORTED,
+            "clients": sorted({key[0] for key in self._clients}),
+            "pools": [
+                {
+                    "decode_responses": decode_responses,
+                    "client_cache": cached,
+                    "max_connections": pool.max_connections,
+                    "in_use": len(getattr(pool, "_in_use_connections", ())),
+                    "idle": len(getattr(pool, "_available_connections", ())),
+                }
+                for (_, decode_responses, cached), pool in self._pools.items()
+            ],
+            # 去除 URL 中的帳密
+            "breakers": {url.rsplit("@", 1)[-1]: breaker.state for url, breaker in self._breakers.items()},
+        }
+
+    async def close(self) -> None:
+        """關閉所有連線池（應用程式關閉時呼叫一次）"""
+        for pool in self._pools.values():
+            try:
+                await pool.disconnect()
+            except Exception as exc:
+                logger.warning("redis_pool_close_failed", error=str(exc))
+        self._pools.clear()
+        self._clients.clear()
+
+
+# 進程共用實例
+redis_manager = RedisManager()
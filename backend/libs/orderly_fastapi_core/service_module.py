@@ -0,0 +1,37 @@
+"""
+服務模組定義
+各業務模組只提供路由、公開路徑與生命週期掛鉤，由組合根（單體 app.main 或模組自身的
+獨立入口）負責建立 FastAPI 應用並掛載，不再為了取出 .router 而為每個模組建立完整應用。
+"""
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Set
+
+import structlog
+from fastapi import APIRouter
+
+logger = structlog.get_logger()
+
+LifecycleHook = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class ServiceModule:
+    """單一業務模組的可掛載內容"""
+
+    name: str
+    router: APIRouter
+    public_paths: Set[str] = field(default_factory=set)
+    on_startup: List[LifecycleHook] = field(default_factory=list)
+    on_shutdown: List[LifecycleHook] = field(default_factory=list)
+
+    async def startup(self) -> None:
+        for hook in self.on_startup:
+            await hook()
+
+    async def shutdown(self) -> None:
+        """依註冊的相反順序執行；單一掛鉤失敗不影響其餘清理"""
+        for hook in reversed(self.on_shutdown):
+            try:
+                await hook()
+            except Exception as e:
+                logger.error("service_module.shutdown_failed", module=self.name, error=str(e))
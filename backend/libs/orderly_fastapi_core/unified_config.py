@@ -152,6 +152,12 @@ class UnifiedSettings(BaseSettings):
     # === 率限配置 ===
     rate_limit_per_minute: int = Field(default=60, description="每分鐘請求限制")
     rate_limit_burst: int = Field(default=10, description="突發請求限制")
+
+    # === 背景工作引擎（Postgres 持久化佇列，見 orderly_fastapi_core.background_jobs）===
+    enable_background_workers: bool = Field(default=True, description="在本程序啟動背景工作 worker")
+    background_job_poll_interval: float = Field(default=1.0, description="無工作時的輪詢間隔（秒）")
+    background_job_lease_seconds: int = Field(default=300, description="工作租約秒數（心跳延長，逾期由其他 worker 接手）")
+    background_job_concurrency: Dict[str, int] = Field(default_factory=dict, description="各工作類型每程序並行數覆寫，如 {\"products.sku_upload\": 2}")
     
     def __init__(self, **kwargs):
         """初始化配置，自動載入環境配置文件"""
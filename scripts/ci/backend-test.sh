@@ -48,6 +48,7 @@ fi
 
 PY="${BACKEND_TEST_PYTHON:-python}"
 BACKEND_DIR="${BACKEND_DIR:-backend}"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 cd "$BACKEND_DIR"
 
 echo "==> alembic upgrade head (monolith chain)"
@@ -59,3 +60,11 @@ if find app -path '*/tests/*' -name 'test_*.py' | grep -q .; then
 else
   echo "No monolith tests yet, skipping"
 fi
+
+# Cold-start guard: what each module (and each ORDERLY_MODULES worker split)
+# imports, against the committed budget in scripts/perf/import_budget.json.
+# Fails on another module's code imported at load or on module-count growth;
+# import timings are printed for reference only. Refresh it deliberately with
+# `python scripts/perf/import_budget.py --update` when a heavier import is intended.
+echo "==> import budget (monolith entry point)"
+"$PY" "$SCRIPT_DIR/../perf/import_budget.py" --check
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Import budget for the monolith entry point.
+
+Profiles, with `python -X importtime` in a fresh interpreter per measurement:
+- each module definition (app.modules.<name>.module) on top of the shared core
+  (fastapi / sqlalchemy / pydantic / orderly_fastapi_core), i.e. the cold-start
+  cost of a process serving only that module (ORDERLY_MODULES=<name>);
+- `app.main` as a whole (every module mounted) and as each split worker in
+  WORKER_SPLITS (e.g. ORDERLY_MODULES=orders,billing).
+
+--check gates on what gets imported, which does not depend on machine load:
+- other modules' code (anything but their `models` packages) imported by a
+  target that does not serve them fails outright unless import_budget.json
+  lists it;
+- the number of modules imported fails when it exceeds the budget by more than
+  module_tolerance + module_slack.
+Wall-clock import time (best of --repeats runs) is reported next to the
+recorded figure but never fails the check. --update rewrites the budget from
+the current measurement.
+
+Usage (from the repository root):
+    python scripts/perf/import_budget.py            # report only
+    python scripts/perf/import_budget.py --check    # CI gate
+    python scripts/perf/import_budget.py --update   # accept current numbers
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+BACKEND_DIR = REPO_ROOT / "backend"
+BUDGET_FILE = Path(__file__).resolve().parent / "import_budget.json"
+
+MARKER = "--import-budget-start--"
+SHARED_PRELUDE = "import fastapi, sqlalchemy, pydantic, structlog, orderly_fastapi_core"
+TOTAL_KEY = "app.main"
+# ORDERLY_MODULES selections deployed as separate workers
+WORKER_SPLITS = ["orders,billing"]
+
+# Allowed growth in imported modules: budget * (1 + module_tolerance) + module_slack
+DEFAULT_MODULE_TOLERANCE = 0.1
+DEFAULT_MODULE_SLACK = 25
+# Timing is report-only: flagged (not failed) past budget * (1 + tolerance) + slack_ms
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_SLACK_MS = 150.0
+
+
+def module_names() -> List[str]:
+    """Module names in mount order, read from the registry without importing the app."""
+    sys.path[:0] = [str(BACKEND_DIR), str(BACKEND_DIR / "libs")]
+    from app.module_registry import MODULE_PATHS
+
+    return list(MODULE_PATHS)
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Parse `-X importtime` output following MARKER.
+
+    Returns (total_ms, [(self_ms, name), ...]); total_ms sums the cumulative time of
+    the outermost imports so nested imports are not counted twice.
+    """
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # column header
+        depth = len(name) - len(name.lstrip(" "))
+        entries.append((depth, int(self_us) / 1000, int(cumulative_us) / 1000, name.strip()))
+
+    if not entries:
+        return 0.0, []
+    top = min(depth for depth, *_ in entries)
+    total = sum(cumulative for depth, _, cumulative, _ in entries if depth == top)
+    return total, [(self_ms, name) for _, self_ms, _, name in entries]
+
+
+def foreign_imports(names: List[str], served: List[str]) -> List[str]:
+    """Packages of modules outside `served` (other than their models) among the imported names."""
+    found = set()
+    for name in names:
+        parts = name.split(".")
+        if len(parts) > 3 and parts[:2] == ["app", "modules"] and parts[2] not in served and parts[3] != "models":
+            found.add(".".join(parts[2:4]))
+    return sorted(found)
+
+
+def measure(
+    target: str, prelude: Optional[str], modules: Optional[str] = None
+) -> Tuple[float, List[Tuple[float, str]]]:
+    """Import `target` in a fresh interpreter and return its import time breakdown."""
+    code = f"import sys\n{prelude or ''}\nsys.stderr.write({MARKER!r} + '\\n')\nimport {target}\n"
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(BACKEND_DIR), str(BACKEND_DIR / "libs")] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+    env.setdefault("ENVIRONMENT", "testing")
+    env.pop("ORDERLY_MODULES", None)
+    if modules:
+        env["ORDERLY_MODULES"] = modules
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def best_of(
+    target: str, prelude: Optional[str], repeats: int, modules: Optional[str] = None
+) -> Tuple[float, List[Tuple[float, str]]]:
+    return min((measure(target, prelude, modules) for _ in range(repeats)), key=lambda run: run[0])
+
+
+def run_measurements(repeats: int, top: int) -> Dict[str, Dict]:
+    names = module_names()
+    # (key, import target, prelude, ORDERLY_MODULES, modules the target serves)
+    targets = [(name, f"app.modules.{name}.module", SHARED_PRELUDE, None, [name]) for name in names]
+    targets.append((TOTAL_KEY, TOTAL_KEY, None, None, names))
+    for split in WORKER_SPLITS:
+        targets.append((f"{TOTAL_KEY}[{split}]", TOTAL_KEY, None, split, split.split(",")))
+
+    results: Dict[str, Dict] = {}
+    for key, target, prelude, modules, served in targets:
+        total_ms, entries = best_of(target, prelude, repeats, modules)
+        imported = [name for _, name in entries]
+        results[key] = {
+            "modules": len(imported),
+            "foreign": foreign_imports(imported, served),
+            "ms": round(total_ms, 1),
+        }
+        foreign = ", ".join(results[key]["foreign"]) or "-"
+        print(f"{key:<28} {len(imported):>5} modules {total_ms:>9.1f} ms   other modules' code: {foreign}")
+        for self_ms, name in sorted(entries, reverse=True)[:top]:
+            print(f"    {self_ms:>8.1f} ms  {name}")
+    return results
+
+
+def load_budget() -> Dict:
+    if BUDGET_FILE.exists():
+        return json.loads(BUDGET_FILE.read_text())
+    return {
+        "module_tolerance": DEFAULT_MODULE_TOLERANCE,
+        "module_slack": DEFAULT_MODULE_SLACK,
+        "tolerance": DEFAULT_TOLERANCE,
+        "slack_ms": DEFAULT_SLACK_MS,
+        "budgets": {},
+    }
+
+
+def check(results: Dict[str, Dict], budget: Dict) -> Tuple[List[str], List[str]]:
+    """Return (failures, timing warnings)."""
+    module_tolerance = budget.get("module_tolerance", DEFAULT_MODULE_TOLERANCE)
+    module_slack = budget.get("module_slack", DEFAULT_MODULE_SLACK)
+    tolerance = budget.get("tolerance", DEFAULT_TOLERANCE)
+    slack_ms = budget.get("slack_ms", DEFAULT_SLACK_MS)
+    failures, warnings = [], []
+    for key, measured in results.items():
+        allowed = budget.get("budgets", {}).get(key)
+        if allowed is None:
+            failures.append(f"{key}: no budget recorded (run with --update)")
+            continue
+        unexpected = sorted(set(measured["foreign"]) - set(allowed.get("foreign", [])))
+        if unexpected:
+            failures.append(f"{key}: imports other modules' code at load: {', '.join(unexpected)}")
+        if measured["modules"] > allowed["modules"] * (1 + module_tolerance) + module_slack:
+            failures.append(
+                f"{key}: imports {measured['modules']} modules, budget {allowed['modules']} "
+                f"(+{module_tolerance:.0%} +{module_slack})"
+            )
+        if measured["ms"] > allowed["ms"] * (1 + tolerance) + slack_ms:
+            warnings.append(
+                f"{key}: {measured['ms']:.1f} ms over recorded {allowed['ms']:.1f} ms "
+                f"(+{tolerance:.0%} +{slack_ms:.0f} ms; timing is report-only)"
+            )
+    return failures, warnings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="fail on import regressions against the budget")
+    mode.add_argument("--update", action="store_true", help="rewrite the budget from this measurement")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per target (best is kept)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports listed per target")
+    args = parser.parse_args()
+
+    results = run_measurements(args.repeats, args.top)
+    budget = load_budget()
+
+    if args.update:
+        budget["budgets"] = results
+        BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n")
+        print(f"Budget written to {BUDGET_FILE.relative_to(REPO_ROOT)}")
+        return 0
+
+    if args.check:
+        failures, warnings = check(results, budget)
+        for warning in warnings:
+            print(f"::warning::import budget: {warning}", file=sys.stderr)
+        for failure in failures:
+            print(f"::error::import budget: {failure}", file=sys.stderr)
+        if failures:
+            print("  Investigate with: python -X importtime -c 'import app.main' (from backend/)", file=sys.stderr)
+            return 1
+        print("Import budget OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())